@@ -1 +1,149 @@
-# backtester run
+# backtester run: replay recordings (python -m apps.recorder.run) offline
+#   python -m apps.backtester.run mm   --data data/recordings --market ETH --grid spread=0.002,0.003 --grid requote_bps=2,5
+#   python -m apps.backtester.run bars --data data/recordings --market ETH --strategy pkg.mod:fn --grid lookback=20,50
+#   python -m apps.backtester.run copy --data data/recordings --signals signals.jsonl --grid slippage_bps=10,20,50
+import argparse
+import json
+import sys
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from packages.backtest.events import mm_trial
+from packages.backtest.sweep import grid, sweep
+from packages.backtest.vectorized import bars_trial, sweep_copy
+from packages.data.loaders import Recording
+from packages.lighter_sdk_adapter.rest import _norm_symbol
+
+
+def _value(v: str) -> Any:
+    for cast in (int, float):
+        try:
+            return cast(v)
+        except ValueError:
+            pass
+    return {"true": True, "false": False}.get(v.lower(), v)
+
+
+def parse_grid(items: List[str]) -> Dict[str, List[Any]]:
+    axes: Dict[str, List[Any]] = {}
+    for item in items or []:
+        key, _, vals = item.partition("=")
+        axes[key.strip()] = [_value(v.strip()) for v in vals.split(",") if v.strip()]
+    return axes
+
+
+def market_id_for(rec: Recording, market: str) -> int:
+    if market.isdigit():
+        return int(market)
+    want = _norm_symbol(market)
+    for mid, meta in rec.markets().items():
+        sym = _norm_symbol(meta.get("symbol") or "")
+        if sym in (want, want + "USDC") or want == sym + "USDC":
+            return mid
+    raise SystemExit(f"market {market} not in recording (have {rec.markets()})")
+
+
+def _window(args):
+    to_ns = lambda s: int(s * 1e9) if s is not None else None  # noqa: E731
+    return to_ns(args.start), to_ns(args.end)
+
+
+def run_mm(args, rec: Recording):
+    start_ns, end_ns = _window(args)
+    points = grid(parse_grid(args.grid)) or [{}]
+    fixed = {"latency_ms": args.latency_ms, "maker_fee": args.maker_fee, "taker_fee": args.taker_fee}
+    points = [{**fixed, **p} for p in points]
+    return sweep(mm_trial, points, args.processes, root=args.data, market_id=market_id_for(rec, args.market),
+                 mode=args.mode, start_ns=start_ns, end_ns=end_ns)
+
+
+def run_bars(args, rec: Recording):
+    start_ns, end_ns = _window(args)
+    points = grid(parse_grid(args.grid)) or [{}]
+    return sweep(bars_trial, points, args.processes, root=args.data, market_id=market_id_for(rec, args.market),
+                 interval_sec=args.interval, strategy=args.strategy, fee_bps=args.fee_bps,
+                 slippage_bps=args.slippage_bps, latency_bars=args.latency_bars, start_ns=start_ns, end_ns=end_ns)
+
+
+def run_copy(args, rec: Recording):
+    # signals.jsonl: one packages.signals.models.Signal per line (market, side, size, price, ts)
+    by_market: Dict[int, Dict[str, list]] = {}
+    with open(args.signals, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            s = json.loads(line)
+            try:
+                mid = market_id_for(rec, str(s["market"]))
+            except SystemExit:
+                continue
+            d = by_market.setdefault(mid, {"ts": [], "side": [], "size": [], "price": []})
+            d["ts"].append(int(float(s["ts"]) * 1e9))
+            d["side"].append(1.0 if s["side"] == "BUY" else -1.0)
+            d["size"].append(float(s["size"]))
+            d["price"].append(float(s["price"]) if s.get("price") else np.nan)
+    tapes = {mid: dict(zip(("ts", "price"), (a["recv_ns"], a["price"])))
+             for mid in by_market
+             for a in [rec.arrays("trade", ["recv_ns", "price"], [mid])]}
+    points = grid(parse_grid(args.grid)) or [{}]
+    fixed = {"latency_ms": args.latency_ms, "fee_bps": args.fee_bps}
+    points = [{**fixed, **p} for p in points]
+    return sweep(sweep_copy, points, args.processes, signals_by_market=by_market, tapes=tapes)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Offline backtests over recorded market data")
+    ap.add_argument("--processes", type=int, default=None, help="sweep workers (default: all cores)")
+    ap.add_argument("--json", dest="json_out", help="write every result to this file")
+    ap.add_argument("--top", type=int, default=10)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    def common(p):
+        p.add_argument("--data", default="data/recordings")
+        p.add_argument("--grid", action="append", help="param=v1,v2 (repeatable; cartesian product)")
+        p.add_argument("--start", type=float, help="unix seconds")
+        p.add_argument("--end", type=float, help="unix seconds")
+
+    mm = sub.add_parser("mm", help="event replay of MicroSpreadPulseBot (any MSPConfig / FillModel field)")
+    common(mm)
+    mm.add_argument("--market", required=True)
+    mm.add_argument("--mode", default="events", choices=["events", "poll"])
+    mm.add_argument("--latency-ms", type=float, default=50.0)
+    mm.add_argument("--maker-fee", type=float, default=0.0)
+    mm.add_argument("--taker-fee", type=float, default=0.0002)
+
+    bars = sub.add_parser("bars", help="vectorized bar strategy: fn(bars, **params) -> target positions")
+    common(bars)
+    bars.add_argument("--market", required=True)
+    bars.add_argument("--strategy", required=True, help="package.module:function")
+    bars.add_argument("--interval", type=float, default=60.0, help="bar seconds")
+    bars.add_argument("--fee-bps", type=float, default=2.0)
+    bars.add_argument("--slippage-bps", type=float, default=1.0)
+    bars.add_argument("--latency-bars", type=int, default=1)
+
+    cp = sub.add_parser("copy", help="copy-trading rules over leader signals (copy_param, slippage_bps, latency_ms)")
+    common(cp)
+    cp.add_argument("--signals", required=True, help="JSONL of Signal records")
+    cp.add_argument("--latency-ms", type=float, default=250.0)
+    cp.add_argument("--fee-bps", type=float, default=2.0)
+
+    args = ap.parse_args()
+    rec = Recording(args.data)
+    t0 = time.perf_counter()
+    results = {"mm": run_mm, "bars": run_bars, "copy": run_copy}[args.cmd](args, rec)
+    elapsed = time.perf_counter() - t0
+
+    for params, res in results[:args.top]:
+        keep = {k: (round(v, 6) if isinstance(v, float) else v) for k, v in res.items()
+                if not isinstance(v, (dict, list))}
+        print(json.dumps({"params": params, **keep}))
+    print(f"{len(results)} runs in {elapsed:.1f}s", file=sys.stderr)
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump([{"params": p, "result": r} for p, r in results], f, indent=1, default=float)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# market data recorder: python -m apps.recorder.run --network testnet --markets ETH,BTC [--account 12]
+import argparse
+import asyncio
+import os
+import signal
+from types import SimpleNamespace
+
+from dotenv import load_dotenv
+
+from packages.config.constants import MAINNET_ENV, TESTNET_ENV
+from packages.data.recorder import MarketRecorder
+from packages.lighter_sdk_adapter.rest import get_market_meta
+from packages.lighter_sdk_adapter.ws import subscribe_stream
+
+
+async def record(args):
+    if args.base_url:
+        base_url = args.base_url
+    else:
+        load_dotenv(MAINNET_ENV if args.network == "mainnet" else TESTNET_ENV)
+        base_url = os.environ["BASE_URL"]
+    client = SimpleNamespace(url=base_url)  # market lookups only need the base url
+
+    markets = {}
+    for sym in [m.strip() for m in args.markets.split(",") if m.strip()]:
+        meta = await get_market_meta(client, sym)
+        if not meta or meta.get("market_id") is None:
+            print(f"Skipping unknown market {sym}")
+            continue
+        markets[int(meta["market_id"])] = {k: meta.get(k) for k in
+                                           ("symbol", "price_decimals", "size_decimals", "min_base_amount")}
+    if not markets:
+        raise SystemExit("no markets to record")
+
+    rec = MarketRecorder(args.out, markets, account_index=args.account, rotate_sec=args.rotate_sec,
+                         flush_rows=args.flush_rows, flush_sec=args.flush_sec,
+                         compression=None if args.compression == "none" else args.compression)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+    print(f"Recording {sorted(m['symbol'] for m in markets.values())} from {base_url} into {args.out}")
+    feed = asyncio.create_task(subscribe_stream(base_url, rec.channels(), rec.on_stream, stop=stop))
+    try:
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=args.flush_sec)
+            except asyncio.TimeoutError:
+                rec.flush()  # quiet markets still get persisted on time
+    finally:
+        feed.cancel()
+        await rec.aclose()
+        print(f"Recorded rows: {rec.stats}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--network", default="testnet", choices=["testnet", "mainnet"])
+    ap.add_argument("--base-url", help="override BASE_URL (e.g. the local simulator)")
+    ap.add_argument("--markets", required=True, help="comma separated symbols, e.g. ETH,BTC")
+    ap.add_argument("--account", type=int, help="also record account_all events for this account index")
+    ap.add_argument("--out", default="data/recordings")
+    ap.add_argument("--rotate-sec", type=float, default=3600.0)
+    ap.add_argument("--flush-rows", type=int, default=50_000)
+    ap.add_argument("--flush-sec", type=float, default=5.0)
+    ap.add_argument("--compression", default="zstd", choices=["zstd", "lz4", "none"],
+                    help="'none' trades disk for zero-copy memory-mapped reads")
+    asyncio.run(record(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,557 @@
+# in-memory Lighter venue: price-time priority books, accounts, blocks
+import bisect
+import hashlib
+import json
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+# Lighter tx type / enum values as carried in tx_info
+TX_TYPE_CREATE_ORDER = 14
+TX_TYPE_CANCEL_ORDER = 15
+TX_TYPE_CANCEL_ALL_ORDERS = 16
+
+ORDER_TYPE_LIMIT = 0
+ORDER_TYPE_MARKET = 1
+TIF_IOC = 0
+TIF_GTT = 1
+TIF_POST_ONLY = 2
+
+LIQUIDITY_ACCOUNT = 1  # synthetic background maker
+TRADER_ACCOUNTS = (100, 101, 102, 103, 104)  # synthetic takers (show up in blocks / as copy leaders)
+
+
+@dataclass
+class SimMarket:
+    symbol: str
+    market_id: int
+    price_decimals: int
+    size_decimals: int
+    mid: float
+    min_base_amount: float = 0.001
+    min_quote_amount: float = 10.0
+
+    @property
+    def price_scale(self) -> int:
+        return 10 ** self.price_decimals
+
+    @property
+    def size_scale(self) -> int:
+        return 10 ** self.size_decimals
+
+    def px(self, ticks: int) -> str:
+        return f"{ticks / self.price_scale:.{self.price_decimals}f}"
+
+    def sz(self, lots: int) -> str:
+        return f"{lots / self.size_scale:.{self.size_decimals}f}"
+
+
+DEFAULT_MARKETS = [
+    SimMarket("ETH", 0, 2, 4, 3000.0),
+    SimMarket("BTC", 1, 1, 5, 60000.0),
+    SimMarket("SOL", 2, 3, 3, 150.0),
+    SimMarket("HYPE", 3, 4, 2, 25.0),
+]
+
+
+@dataclass
+class SimOrder:
+    order_index: int
+    client_order_index: int
+    account_index: int
+    market_id: int
+    is_ask: bool
+    price: int
+    initial: int
+    remaining: int
+    order_type: int
+    tif: int
+    reduce_only: bool
+    nonce: int
+    ts: int
+
+    def as_dict(self, m: SimMarket) -> dict:
+        filled = self.initial - self.remaining
+        return {
+            "order_index": self.order_index,
+            "client_order_index": self.client_order_index,
+            "order_id": str(self.order_index),
+            "client_order_id": str(self.client_order_index),
+            "market_index": self.market_id,
+            "market": m.symbol,
+            "owner_account_index": self.account_index,
+            "initial_base_amount": m.sz(self.initial),
+            "remaining_base_amount": m.sz(self.remaining),
+            "filled_base_amount": m.sz(filled),
+            "price": m.px(self.price),
+            "is_ask": self.is_ask,
+            "side": "sell" if self.is_ask else "buy",
+            "type": "limit" if self.order_type == ORDER_TYPE_LIMIT else "market",
+            "reduce_only": self.reduce_only,
+            "nonce": self.nonce,
+            "status": "open",
+            "timestamp": self.ts,
+        }
+
+
+class SimBook:
+    """Price levels keyed by integer ticks; each level is a FIFO of resting orders."""
+
+    def __init__(self, market: SimMarket):
+        self.market = market
+        self.levels: Dict[bool, Dict[int, Deque[SimOrder]]] = {False: {}, True: {}}
+        self.prices: Dict[bool, List[int]] = {False: [], True: []}  # ascending
+        self.by_index: Dict[int, SimOrder] = {}
+        self.offset = 0
+
+    def best(self, is_ask: bool) -> Optional[int]:
+        p = self.prices[is_ask]
+        if not p:
+            return None
+        return p[0] if is_ask else p[-1]
+
+    def add(self, o: SimOrder) -> None:
+        lv = self.levels[o.is_ask]
+        if o.price not in lv:
+            lv[o.price] = deque()
+            bisect.insort(self.prices[o.is_ask], o.price)
+        lv[o.price].append(o)
+        self.by_index[o.order_index] = o
+
+    def remove(self, o: SimOrder) -> None:
+        self.by_index.pop(o.order_index, None)
+        q = self.levels[o.is_ask].get(o.price)
+        if q is None:
+            return
+        try:
+            q.remove(o)
+        except ValueError:
+            pass
+        if not q:
+            self._drop_level(o.is_ask, o.price)
+
+    def _drop_level(self, is_ask: bool, price: int) -> None:
+        del self.levels[is_ask][price]
+        p = self.prices[is_ask]
+        i = bisect.bisect_left(p, price)
+        if i < len(p) and p[i] == price:
+            p.pop(i)
+
+    def crosses(self, is_ask: bool, price: int) -> bool:
+        opp = self.best(not is_ask)
+        if opp is None:
+            return False
+        return price <= opp if is_ask else price >= opp
+
+    def match(self, taker: SimOrder) -> List[Tuple[SimOrder, int, int]]:
+        """Fill `taker` against the opposite side; returns (maker, price, qty) fills."""
+        fills = []
+        opp_side = not taker.is_ask
+        while taker.remaining > 0:
+            best = self.best(opp_side)
+            if best is None or not self.crosses(taker.is_ask, taker.price):
+                break
+            q = self.levels[opp_side][best]
+            maker = q[0]
+            qty = min(taker.remaining, maker.remaining)
+            taker.remaining -= qty
+            maker.remaining -= qty
+            fills.append((maker, best, qty))
+            if maker.remaining == 0:
+                q.popleft()
+                self.by_index.pop(maker.order_index, None)
+                if not q:
+                    self._drop_level(opp_side, best)
+        return fills
+
+    def depth(self, is_ask: bool, n: int = 50) -> List[Tuple[int, int]]:
+        p = self.prices[is_ask]
+        it = p[:n] if is_ask else reversed(p[-n:])
+        return [(px, sum(o.remaining for o in self.levels[is_ask][px])) for px in it]
+
+    def level_size(self, is_ask: bool, price: int) -> int:
+        q = self.levels[is_ask].get(price)
+        return sum(o.remaining for o in q) if q else 0
+
+
+@dataclass
+class SimPosition:
+    base: int = 0          # signed lots
+    avg_entry: float = 0.0
+    realized: float = 0.0
+
+
+@dataclass
+class SimAccount:
+    index: int
+    l1_address: str
+    collateral: float
+    positions: Dict[int, SimPosition] = field(default_factory=dict)
+    next_nonce: Dict[int, int] = field(default_factory=dict)
+    trades: int = 0
+    volume: float = 0.0
+
+
+class TxRejected(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class SimExchange:
+    """Matching engine + account ledger. Events are pushed to `listeners` as (channel, payload)."""
+
+    def __init__(self, markets: Optional[List[SimMarket]] = None, seed: int = 7,
+                 start_collateral: float = 10_000.0, taker_fee: float = 0.0, maker_fee: float = 0.0):
+        self.rng = random.Random(seed)
+        self.markets: Dict[int, SimMarket] = {m.market_id: m for m in (markets or DEFAULT_MARKETS)}
+        self.books: Dict[int, SimBook] = {mid: SimBook(m) for mid, m in self.markets.items()}
+        self.accounts: Dict[int, SimAccount] = {}
+        self.start_collateral = start_collateral
+        self.taker_fee = taker_fee
+        self.maker_fee = maker_fee
+        self.last_trade: Dict[int, float] = {mid: m.mid for mid, m in self.markets.items()}
+        self.daily_trades: Dict[int, int] = {mid: 0 for mid in self.markets}
+        self.daily_volume: Dict[int, float] = {mid: 0.0 for mid in self.markets}
+        self.height = 1
+        self.blocks: Dict[int, List[dict]] = {1: []}
+        self.recent_trades: Dict[int, Deque[dict]] = {mid: deque(maxlen=200) for mid in self.markets}
+        self.listeners: List[Callable[[str, dict], None]] = []
+        self._order_seq = 1
+        self._trade_seq = 1
+        self.account(LIQUIDITY_ACCOUNT)
+
+    # --- accounts ---
+    def account(self, index: int) -> SimAccount:
+        acc = self.accounts.get(index)
+        if acc is None:
+            l1 = "0x" + hashlib.sha256(f"acct{index}".encode()).hexdigest()[:40]
+            acc = self.accounts[index] = SimAccount(index, l1, self.start_collateral)
+        return acc
+
+    def market_by_symbol(self, symbol: str) -> Optional[SimMarket]:
+        s = symbol.upper()
+        return next((m for m in self.markets.values() if m.symbol == s), None)
+
+    def next_nonce(self, account_index: int, api_key_index: int) -> int:
+        return self.account(account_index).next_nonce.get(api_key_index, 0)
+
+    # --- txs ---
+    def submit(self, tx_type: int, tx_info: str) -> str:
+        return self.submit_batch([tx_type], [tx_info])[0]
+
+    def submit_batch(self, tx_types: List[int], tx_infos: List[str]) -> List[str]:
+        """All or nothing, like the venue's sendTxBatch: every tx is checked (format, type, nonce,
+        market, amounts) before any is applied, then they are applied in order."""
+        txs, expected = [], {}
+        for tx_type, tx_info in zip(tx_types, tx_infos):
+            txs.append(self._check(int(tx_type), tx_info, expected))
+        return [self._apply(*tx) for tx in txs]
+
+    def _check(self, tx_type: int, tx_info: str, expected: Dict[Tuple[int, int], int]) -> tuple:
+        try:
+            info = json.loads(tx_info)
+        except (TypeError, ValueError):
+            raise TxRejected(21500, "invalid tx info")
+        acc = self.account(int(info.get("AccountIndex", 0)))
+        key = int(info.get("ApiKeyIndex", 0))
+        nonce = int(info.get("Nonce", 0))
+        if nonce < expected.get((acc.index, key), acc.next_nonce.get(key, 0)):
+            raise TxRejected(21104, "invalid nonce")
+        expected[(acc.index, key)] = nonce + 1  # later txs of the same batch must follow it
+        if tx_type == TX_TYPE_CREATE_ORDER:
+            mid = int(info.get("MarketIndex", 0))
+            if mid not in self.books:
+                raise TxRejected(21600, f"unknown market {mid}")
+            if int(info.get("BaseAmount", 0)) <= 0:
+                raise TxRejected(21601, "invalid base amount")
+            if int(info.get("Type", ORDER_TYPE_LIMIT)) == ORDER_TYPE_MARKET and int(info.get("Price", 0)) <= 0:
+                raise TxRejected(21602, "market order without a protection price")
+        elif tx_type == TX_TYPE_CANCEL_ORDER:
+            mid = int(info.get("MarketIndex", 0))
+            if mid not in self.books:
+                raise TxRejected(21600, f"unknown market {mid}")
+        elif tx_type != TX_TYPE_CANCEL_ALL_ORDERS:
+            raise TxRejected(21501, f"unsupported tx type {tx_type}")
+        return tx_type, tx_info, info, acc, key, nonce
+
+    def _apply(self, tx_type: int, tx_info: str, info: dict, acc: SimAccount, key: int, nonce: int) -> str:
+        acc.next_nonce[key] = nonce + 1
+        if tx_type == TX_TYPE_CREATE_ORDER:
+            self._create(acc, info, nonce)
+        elif tx_type == TX_TYPE_CANCEL_ORDER:
+            self._cancel(acc, int(info.get("MarketIndex", 0)), int(info.get("Index", info.get("OrderIndex", 0))))
+        else:
+            for book in self.books.values():
+                for o in [o for o in book.by_index.values() if o.account_index == acc.index]:
+                    book.remove(o)
+                    self._emit_order(o, "canceled")
+        return self._record_tx(acc, tx_type, tx_info, nonce, key)
+
+    def _record_tx(self, acc: SimAccount, tx_type: int, tx_info: str, nonce: int, key: int) -> str:
+        tx_hash = hashlib.sha256(f"{tx_type}|{tx_info}|{self.height}".encode()).hexdigest()
+        self.blocks[self.height].append({
+            "hash": tx_hash, "type": tx_type, "info": tx_info, "account_index": acc.index,
+            "l1_address": acc.l1_address, "nonce": nonce, "api_key_index": key,
+            "block_height": self.height, "queued_at": int(time.time() * 1000),
+        })
+        return tx_hash
+
+    def _create(self, acc: SimAccount, info: dict, nonce: int) -> None:
+        mid = int(info.get("MarketIndex", 0))
+        book = self.books.get(mid)
+        if book is None:
+            raise TxRejected(21600, f"unknown market {mid}")
+        base = int(info.get("BaseAmount", 0))
+        if base <= 0:
+            raise TxRejected(21601, "invalid base amount")
+        is_ask = bool(info.get("IsAsk", 0))
+        order_type = int(info.get("Type", ORDER_TYPE_LIMIT))
+        tif = int(info.get("TimeInForce", TIF_GTT))
+        price = int(info.get("Price", 0))
+        if order_type == ORDER_TYPE_MARKET and price <= 0:
+            raise TxRejected(21602, "market order without a protection price")
+        o = SimOrder(self._order_seq, int(info.get("ClientOrderIndex", 0)), acc.index, mid, is_ask,
+                     price, base, base, order_type, tif, bool(info.get("ReduceOnly", 0)), nonce,
+                     int(time.time() * 1000))
+        self._order_seq += 1
+        if tif == TIF_POST_ONLY and book.crosses(is_ask, price):
+            self._emit_order(o, "canceled-post-only")
+            return
+        fills = book.match(o)
+        for maker, px, qty in fills:
+            self._trade(book.market, o, maker, px, qty)
+        if o.remaining > 0 and order_type == ORDER_TYPE_LIMIT and tif != TIF_IOC:
+            book.add(o)
+            self._emit_order(o, "open")
+        self._emit_book(book, [(o.is_ask, o.price)] + [(not o.is_ask, px) for _, px, _ in fills])
+
+    def _cancel(self, acc: SimAccount, market_id: int, index: int) -> None:
+        book = self.books.get(market_id)
+        if book is None:
+            raise TxRejected(21600, f"unknown market {market_id}")
+        o = book.by_index.get(index)
+        if o is None or o.account_index != acc.index:  # Lighter also accepts the client order index here
+            o = next((x for x in book.by_index.values()
+                      if x.account_index == acc.index and x.client_order_index == index), None)
+        if o is None:
+            return  # cancel of an unknown/filled order is a no-op, like the venue
+        book.remove(o)
+        self._emit_order(o, "canceled")
+        self._emit_book(book, [(o.is_ask, o.price)])
+
+    def _trade(self, m: SimMarket, taker: SimOrder, maker: SimOrder, px: int, qty: int) -> None:
+        price = px / m.price_scale
+        size = qty / m.size_scale
+        for acc_idx, is_ask, fee in ((taker.account_index, taker.is_ask, self.taker_fee),
+                                     (maker.account_index, maker.is_ask, self.maker_fee)):
+            acc = self.account(acc_idx)
+            self._apply_fill(acc, m.market_id, -qty if is_ask else qty, price, m.size_scale)
+            acc.collateral -= fee * price * size
+            acc.trades += 1
+            acc.volume += price * size
+        self.last_trade[m.market_id] = price
+        self.daily_trades[m.market_id] += 1
+        self.daily_volume[m.market_id] += price * size
+        trade = {
+            "trade_id": self._trade_seq, "type": "trade", "market_id": m.market_id,
+            "size": m.sz(qty), "price": m.px(px), "usd_amount": f"{price * size:.6f}",
+            "ask_id": maker.order_index if maker.is_ask else taker.order_index,
+            "bid_id": taker.order_index if maker.is_ask else maker.order_index,
+            "ask_account_id": maker.account_index if maker.is_ask else taker.account_index,
+            "bid_account_id": taker.account_index if maker.is_ask else maker.account_index,
+            "is_maker_ask": maker.is_ask, "block_height": self.height,
+            "timestamp": int(time.time() * 1000),
+        }
+        self._trade_seq += 1
+        self.recent_trades[m.market_id].append(trade)
+        self._emit(f"trade:{m.market_id}", {"type": "update/trade", "trades": [trade]})
+        for acc_idx in {taker.account_index, maker.account_index}:
+            self._emit(f"account_all:{acc_idx}", {"type": "update/account_all", "trades": {str(m.market_id): [trade]},
+                                                   "positions": self.positions_payload(self.account(acc_idx))})
+        if maker.remaining == 0:
+            self._emit_order(maker, "filled")
+
+    @staticmethod
+    def _apply_fill(acc: SimAccount, market_id: int, signed_qty: int, price: float, size_scale: int) -> None:
+        pos = acc.positions.setdefault(market_id, SimPosition())
+        old = pos.base
+        new = old + signed_qty
+        if old == 0 or (old > 0) == (signed_qty > 0):
+            # opening / increasing
+            tot = abs(old) + abs(signed_qty)
+            pos.avg_entry = (pos.avg_entry * abs(old) + price * abs(signed_qty)) / tot
+        else:
+            closed = min(abs(old), abs(signed_qty))
+            pnl = (price - pos.avg_entry) * closed / size_scale * (1 if old > 0 else -1)
+            pos.realized += pnl
+            acc.collateral += pnl
+            if new != 0 and (new > 0) != (old > 0):
+                pos.avg_entry = price  # flipped through zero
+        pos.base = new
+        if new == 0:
+            pos.avg_entry = 0.0
+
+    # --- background flow ---
+    def step(self, levels: int = 10, lot_mult: int = 5, trade_prob: float = 0.3, vol_bps: float = 5.0) -> None:
+        """Random-walk each mid, refresh the liquidity account's ladder, maybe send a taker order."""
+        liq = self.account(LIQUIDITY_ACCOUNT)
+        for mid, m in self.markets.items():
+            book = self.books[mid]
+            m.mid *= 1.0 + self.rng.gauss(0.0, vol_bps / 1e4)
+            tick = max(1, int(m.mid * m.price_scale * 2e-4))  # ~2bps ladder spacing
+            center = int(m.mid * m.price_scale)
+            touched = set()
+            for o in [o for o in book.by_index.values() if o.account_index == liq.index]:
+                book.remove(o)
+                touched.add((o.is_ask, o.price))
+            lot = max(1, int(m.min_base_amount * m.size_scale)) * lot_mult
+            for i in range(1, levels + 1):
+                for is_ask, px in ((False, center - i * tick), (True, center + i * tick)):
+                    if book.crosses(is_ask, px):
+                        continue
+                    book.add(SimOrder(self._order_seq, 0, liq.index, mid, is_ask, px, lot * i, lot * i,
+                                      ORDER_TYPE_LIMIT, TIF_GTT, False, 0, int(time.time() * 1000)))
+                    self._order_seq += 1
+                    touched.add((is_ask, px))
+            if self.rng.random() < trade_prob:
+                is_ask = self.rng.random() < 0.5
+                trader = self.account(self.rng.choice(TRADER_ACCOUNTS))
+                taker = SimOrder(self._order_seq, 0, trader.index, mid, is_ask, 1 if is_ask else 10 ** 18,
+                                 lot, lot, ORDER_TYPE_MARKET, TIF_IOC, False, 0, int(time.time() * 1000))
+                self._order_seq += 1
+                self._record_tx(trader, TX_TYPE_CREATE_ORDER, json.dumps({
+                    "AccountIndex": trader.index, "MarketIndex": mid, "BaseAmount": lot, "IsAsk": int(is_ask),
+                    "Type": ORDER_TYPE_MARKET}), 0, 0)
+                for maker, px, qty in book.match(taker):
+                    self._trade(m, taker, maker, px, qty)
+                    touched.add((maker.is_ask, px))
+            self._emit_book(book, sorted(touched))
+        self.height += 1
+        self.blocks[self.height] = []
+        for h in [h for h in self.blocks if h < self.height - 500]:
+            del self.blocks[h]
+
+    # --- events ---
+    def _emit(self, channel: str, payload: dict) -> None:
+        payload["channel"] = channel
+        for fn in list(self.listeners):
+            fn(channel, payload)
+
+    def _emit_order(self, o: SimOrder, status: str) -> None:
+        d = o.as_dict(self.markets[o.market_id])
+        d["status"] = status
+        self._emit(f"account_all:{o.account_index}", {"type": "update/account_all", "orders": {str(o.market_id): [d]}})
+
+    def _emit_book(self, book: SimBook, touched: List[Tuple[bool, int]]) -> None:
+        """Delta of absolute level sizes (0 = level removed), like the venue's order_book channel."""
+        book.offset += 1
+        m = book.market
+        bids, asks = [], []
+        for is_ask, px in dict.fromkeys(touched):
+            lvl = {"price": m.px(px), "size": m.sz(book.level_size(is_ask, px))}
+            (asks if is_ask else bids).append(lvl)
+        payload = {"code": 0, "asks": asks, "bids": bids, "offset": book.offset}
+        self._emit(f"order_book:{book.market.market_id}", {"type": "update/order_book", "order_book": payload})
+
+    # --- payloads ---
+    def book_payload(self, book: SimBook, depth: int = 50) -> dict:
+        m = book.market
+        return {
+            "code": 0, "offset": book.offset,
+            "bids": [{"price": m.px(p), "size": m.sz(s)} for p, s in book.depth(False, depth)],
+            "asks": [{"price": m.px(p), "size": m.sz(s)} for p, s in book.depth(True, depth)],
+        }
+
+    def positions_payload(self, acc: SimAccount) -> Dict[str, dict]:
+        out = {}
+        for mid, pos in acc.positions.items():
+            m = self.markets[mid]
+            qty = pos.base / m.size_scale
+            mark = self.last_trade[mid]
+            out[str(mid)] = {
+                "market_id": mid, "symbol": m.symbol,
+                "sign": 1 if pos.base >= 0 else -1,
+                "position": m.sz(abs(pos.base)),
+                "avg_entry_price": f"{pos.avg_entry:.{m.price_decimals}f}",
+                "position_value": f"{abs(qty) * mark:.6f}",
+                "unrealized_pnl": f"{(mark - pos.avg_entry) * qty:.6f}",
+                "realized_pnl": f"{pos.realized:.6f}",
+                "open_order_count": sum(1 for o in self.books[mid].by_index.values() if o.account_index == acc.index),
+                "pending_order_count": 0, "position_tied_order_count": 0,
+                "initial_margin_fraction": "0.00", "liquidation_price": "0", "margin_mode": 0,
+                "allocated_margin": "0", "total_discount": "0", "margin_set_flag": 0,
+            }
+        return out
+
+    def open_orders(self, acc_idx: int, market_id: Optional[int] = None) -> List[dict]:
+        out = []
+        for mid, book in self.books.items():
+            if market_id is not None and mid != market_id:
+                continue
+            m = self.markets[mid]
+            out += [o.as_dict(m) for o in book.by_index.values() if o.account_index == acc_idx]
+        return out
+
+    def account_payload(self, acc: SimAccount) -> dict:
+        positions = list(self.positions_payload(acc).values())
+        upnl = sum(float(p["unrealized_pnl"]) for p in positions)
+        equity = acc.collateral + upnl
+        return {
+            "code": 200, "account_type": 0, "index": acc.index, "account_index": acc.index,
+            "l1_address": acc.l1_address, "cancel_all_time": 0,
+            "total_order_count": len(self.open_orders(acc.index)), "total_isolated_order_count": 0,
+            "pending_order_count": 0, "available_balance": f"{acc.collateral:.6f}", "status": 1,
+            "collateral": f"{acc.collateral:.6f}", "name": f"sim-{acc.index}", "description": "",
+            "can_invite": False, "referral_points_percentage": "0", "positions": positions, "assets": [],
+            "total_asset_value": f"{equity:.6f}", "cross_asset_value": f"{equity:.6f}",
+            "pool_info": {"status": 0, "operator_fee": "0", "min_operator_share_rate": "0", "total_shares": 0,
+                          "operator_shares": 0, "annual_percentage_yield": 0, "daily_returns": [],
+                          "share_prices": [], "sharpe_ratio": 0, "strategies": []},
+            "shares": [], "created_at": 0, "transaction_time": int(time.time() * 1e6), "can_rfq": False,
+            "cross_initial_margin_requirement": "0", "cross_maintenance_margin_requirement": "0",
+            "can_rfq_market_ids": [], "metadata": {}, "agent_enabled": False,
+        }
+
+    def market_payload(self, m: SimMarket) -> dict:
+        last = self.last_trade[m.market_id]
+        return {
+            "symbol": m.symbol, "market_id": m.market_id, "market_type": "perp", "base_asset_id": 0,
+            "quote_asset_id": 0, "status": "active", "taker_fee": f"{self.taker_fee:.4f}",
+            "maker_fee": f"{self.maker_fee:.4f}", "liquidation_fee": "1.0000",
+            "min_base_amount": f"{m.min_base_amount}", "min_quote_amount": f"{m.min_quote_amount}",
+            "supported_size_decimals": m.size_decimals, "supported_price_decimals": m.price_decimals,
+            "supported_quote_decimals": 6, "size_decimals": m.size_decimals, "price_decimals": m.price_decimals,
+            "quote_multiplier": 1, "order_quote_limit": "0", "is_maker_fee_enabled": False,
+            "is_taker_fee_enabled": False, "created_at": "0", "multiplier": "1",
+            "default_initial_margin_fraction": 500, "min_initial_margin_fraction": 200,
+            "maintenance_margin_fraction": 120, "closeout_margin_fraction": 80,
+            "last_trade_price": last, "daily_trades_count": self.daily_trades[m.market_id],
+            "daily_base_token_volume": self.daily_volume[m.market_id] / max(last, 1e-9),
+            "daily_quote_token_volume": self.daily_volume[m.market_id],
+            "daily_price_low": last, "daily_price_high": last, "daily_price_change": 0.0,
+            "open_interest": 0.0, "daily_chart": {},
+            "market_config": {"market_margin_mode": 0, "insurance_fund_account_index": 0, "liquidation_mode": 0,
+                              "force_reduce_only": False, "trading_hours": "", "hidden": False,
+                              "rfq_enabled": False},
+            "strategy_index": 0, "funding_clamp_small": "0", "funding_clamp_big": "0",
+            "base_interest_rate": "0", "mark_price": f"{last}", "index_price": f"{last}",
+            "market_flags": 0, "funding_premium_multiplier": 0,
+        }
+
+    def pnl_payload(self, acc: SimAccount) -> dict:
+        realized = sum(p.realized for p in acc.positions.values())
+        entry = {k: 0.0 for k in ("inflow", "outflow", "pool_pnl", "pool_inflow", "pool_outflow",
+                                  "pool_total_shares", "spot_inflow", "spot_outflow", "staked_lit",
+                                  "staking_inflow", "staking_outflow", "staking_pnl", "trade_spot_pnl")}
+        entry.update(timestamp=int(time.time()), trade_pnl=realized, volume=acc.volume)
+        eq = acc.collateral or 1.0
+        return {
+            "code": 200, "resolution": "1d", "pnl": [entry],
+            # flat summary fields the leaderboard scanner looks for
+            "pnl_7d_pct": realized / eq * 100, "pnl_30d_pct": realized / eq * 100,
+            "trades_7d": acc.trades, "win_rate_pct": 50.0, "max_drawdown_30d_pct": 0.0, "sharpe_30d": 0.0,
+        }
@@ -0,0 +1,39 @@
+# local Lighter simulator: python -m apps.simulator.run --port 8787 [--latency-ms 20 --rps 5 ...]
+import argparse
+import asyncio
+
+from .server import FaultConfig, LighterSim
+
+
+async def serve(args):
+    faults = FaultConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                         rps=args.rps, burst=args.burst, tx_reject_rate=args.tx_reject_rate)
+    sim = LighterSim(host=args.host, port=args.port, faults=faults, tick_ms=args.tick_ms, seed=args.seed)
+    await sim.start()
+    print(f"Lighter simulator listening on {sim.base_url} (set BASE_URL={sim.base_url})")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await sim.stop()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8787)
+    ap.add_argument("--tick-ms", type=float, default=250.0, help="background price/liquidity step")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--jitter-ms", type=float, default=0.0)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--rps", type=float, default=0.0, help="per-client rate limit (429 above it); 0 = off")
+    ap.add_argument("--burst", type=float, default=10.0)
+    ap.add_argument("--tx-reject-rate", type=float, default=0.0)
+    try:
+        asyncio.run(serve(ap.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
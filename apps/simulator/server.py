@@ -0,0 +1,362 @@
+# aiohttp front-end for SimExchange: REST + WS with latency / error / 429 injection
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass, asdict
+from typing import Dict, Optional, Set
+
+from aiohttp import web, WSMsgType
+
+from .engine import SimExchange, TxRejected
+
+
+@dataclass
+class FaultConfig:
+    latency_ms: float = 0.0       # added to every REST response
+    jitter_ms: float = 0.0        # uniform +/- on top of latency_ms
+    error_rate: float = 0.0       # fraction of REST calls answered with HTTP 500
+    rps: float = 0.0              # per-client token bucket; 0 disables 429s
+    burst: float = 10.0
+    tx_reject_rate: float = 0.0   # fraction of sendTx/sendTxBatch rejected with a venue error code
+
+
+class _Bucket:
+    __slots__ = ("tokens", "ts")
+
+    def __init__(self, burst: float):
+        self.tokens = burst
+        self.ts = time.monotonic()
+
+
+class LighterSim:
+    """In-process Lighter venue.
+
+        async with LighterSim(port=0) as sim:
+            os.environ["BASE_URL"] = sim.base_url
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8787, faults: Optional[FaultConfig] = None,
+                 tick_ms: float = 250.0, exchange: Optional[SimExchange] = None, seed: int = 7):
+        self.host = host
+        self.port = port
+        self.faults = faults or FaultConfig()
+        self.tick_ms = tick_ms
+        self.ex = exchange or SimExchange(seed=seed)
+        self.rng = random.Random(seed)
+        self.stats: Dict[str, int] = {"requests": 0, "errors": 0, "throttled": 0, "txs": 0}
+        self._buckets: Dict[str, _Bucket] = {}
+        self._subs: Dict[str, Set[web.WebSocketResponse]] = {}
+        self._runner: Optional[web.AppRunner] = None
+        self._ticker: Optional[asyncio.Task] = None
+        self.ex.listeners.append(self._fanout)
+        self.app = self._build_app()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    # --- lifecycle ---
+    async def start(self) -> "LighterSim":
+        self.ex.step()  # seed books before the first request
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        if self.port == 0:
+            self.port = site._server.sockets[0].getsockname()[1]
+        if self.tick_ms > 0:
+            self._ticker = asyncio.create_task(self._tick_loop())
+        return self
+
+    async def stop(self) -> None:
+        if self._ticker:
+            self._ticker.cancel()
+        for subs in self._subs.values():
+            for ws in list(subs):
+                await ws.close()
+        if self._runner:
+            await self._runner.cleanup()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def _tick_loop(self):
+        while True:
+            await asyncio.sleep(self.tick_ms / 1000.0)
+            self.ex.step()
+
+    # --- fault injection ---
+    @web.middleware
+    async def _faults(self, request: web.Request, handler):
+        if request.path.startswith(("/ws", "/stream", "/sim/")):
+            return await handler(request)
+        f = self.faults
+        self.stats["requests"] += 1
+        if f.rps > 0:
+            b = self._buckets.setdefault(request.remote or "?", _Bucket(f.burst))
+            now = time.monotonic()
+            b.tokens = min(f.burst, b.tokens + (now - b.ts) * f.rps)
+            b.ts = now
+            if b.tokens < 1.0:
+                self.stats["throttled"] += 1
+                return web.json_response({"code": 429, "message": "Too Many Requests"}, status=429)
+            b.tokens -= 1.0
+        delay = f.latency_ms + (self.rng.uniform(-f.jitter_ms, f.jitter_ms) if f.jitter_ms else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000.0)
+        if f.error_rate and self.rng.random() < f.error_rate:
+            self.stats["errors"] += 1
+            return web.json_response({"code": 500, "message": "injected error"}, status=500)
+        return await handler(request)
+
+    def _build_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._faults])
+        r = app.router
+        r.add_get("/api/v1/account", self.account)
+        r.add_get("/api/v1/accountActiveOrders", self.active_orders)
+        r.add_get("/api/v1/orderBooks", self.order_books)
+        r.add_get("/api/v1/orderBookDetails", self.order_book_details)
+        r.add_get("/api/v1/orderBookOrders", self.order_book_orders)
+        r.add_get("/api/v1/recentTrades", self.recent_trades)
+        r.add_get("/api/v1/exchangeStats", self.exchange_stats)
+        r.add_get("/api/v1/currentHeight", self.current_height)
+        r.add_get("/api/v1/blockTxs", self.block_txs)
+        r.add_get("/api/v1/pnl", self.pnl)
+        r.add_get("/api/v1/nextNonce", self.next_nonce)
+        r.add_get("/api/v1/apikeys", self.apikeys)
+        r.add_post("/api/v1/sendTx", self.send_tx)
+        r.add_post("/api/v1/sendTxBatch", self.send_tx_batch)
+        r.add_get("/ws/account", self.ws_account)
+        r.add_get("/stream", self.ws_stream)
+        r.add_get("/sim/stats", self.sim_stats)
+        r.add_post("/sim/faults", self.sim_faults)
+        return app
+
+    # --- REST ---
+    def _market_arg(self, request: web.Request) -> Optional[int]:
+        v = request.query.get("market_id")
+        return int(v) if v not in (None, "", "255") else None
+
+    async def account(self, request: web.Request):
+        by = request.query.get("by", "index")
+        value = request.query.get("value", "0")
+        if by == "index":
+            acc = self.ex.account(int(value))
+        else:
+            acc = next((a for a in self.ex.accounts.values() if a.l1_address.lower() == value.lower()), None)
+            if acc is None:
+                return web.json_response({"code": 21100, "message": "account not found"}, status=400)
+        d = self.ex.account_payload(acc)
+        # `account` mirrors accounts[0] for callers that read a single-account shape
+        return web.json_response({"code": 200, "total": 1, "accounts": [d], "account": d, "next_cursor": ""})
+
+    async def active_orders(self, request: web.Request):
+        idx = int(request.query.get("account_index", "0"))
+        return web.json_response({"code": 200, "orders": self.ex.open_orders(idx, self._market_arg(request))})
+
+    async def order_books(self, request: web.Request):
+        mid = self._market_arg(request)
+        rows = [self.ex.market_payload(m) for m in self.ex.markets.values() if mid is None or m.market_id == mid]
+        return web.json_response({"code": 200, "order_books": rows})
+
+    async def order_book_details(self, request: web.Request):
+        mid = self._market_arg(request)
+        rows = [self.ex.market_payload(m) for m in self.ex.markets.values() if mid is None or m.market_id == mid]
+        body = {"code": 200, "order_book_details": rows, "spot_order_book_details": []}
+        if mid is not None:
+            body.update(self.ex.book_payload(self.ex.books[mid]))  # top-of-book for get_orderbook()
+        return web.json_response(body)
+
+    async def order_book_orders(self, request: web.Request):
+        mid = self._market_arg(request) or 0
+        limit = int(request.query.get("limit", "50"))
+        book = self.ex.books[mid]
+        m = book.market
+
+        def rows(is_ask):
+            out = []
+            for px in (book.prices[is_ask] if is_ask else reversed(book.prices[is_ask])):
+                for o in book.levels[is_ask][px]:
+                    out.append({"order_index": o.order_index, "order_id": str(o.order_index),
+                                "owner_account_index": o.account_index,
+                                "initial_base_amount": m.sz(o.initial), "remaining_base_amount": m.sz(o.remaining),
+                                "price": m.px(o.price), "order_expiry": 0, "transaction_time": o.ts})
+                    if len(out) >= limit:
+                        return out
+            return out
+        asks, bids = rows(True), rows(False)
+        return web.json_response({"code": 200, "total_asks": len(asks), "asks": asks,
+                                  "total_bids": len(bids), "bids": bids})
+
+    async def recent_trades(self, request: web.Request):
+        mid = self._market_arg(request) or 0
+        limit = int(request.query.get("limit", "100"))
+        return web.json_response({"code": 200, "trades": list(self.ex.recent_trades[mid])[-limit:]})
+
+    async def exchange_stats(self, request: web.Request):
+        stats = [{
+            "symbol": m.symbol, "market_id": m.market_id,
+            "last_trade_price": self.ex.last_trade[m.market_id],
+            "daily_trades_count": self.ex.daily_trades[m.market_id],
+            "daily_base_token_volume": 0.0, "daily_quote_token_volume": self.ex.daily_volume[m.market_id],
+            "daily_price_change": 0.0,
+        } for m in self.ex.markets.values()]
+        return web.json_response({"code": 200, "total": len(stats), "order_book_stats": stats,
+                                  "daily_usd_volume": sum(self.ex.daily_volume.values()),
+                                  "daily_trades_count": sum(self.ex.daily_trades.values())})
+
+    async def current_height(self, request: web.Request):
+        return web.json_response({"code": 200, "height": self.ex.height})
+
+    async def block_txs(self, request: web.Request):
+        h = int(request.query.get("value", self.ex.height))
+        txs = []
+        for i, t in enumerate(self.ex.blocks.get(h, [])):
+            txs.append({**t, "event_info": "", "status": 2, "transaction_index": i, "expire_at": 0,
+                        "executed_at": t["queued_at"], "sequence_index": i, "parent_hash": "",
+                        "transaction_time": t["queued_at"]})
+        return web.json_response({"code": 200, "txs": txs})
+
+    async def pnl(self, request: web.Request):
+        idx = int(request.query.get("account_index", request.query.get("value", "0")))
+        return web.json_response(self.ex.pnl_payload(self.ex.account(idx)))
+
+    async def next_nonce(self, request: web.Request):
+        acc = int(request.query.get("account_index", "0"))
+        key = int(request.query.get("api_key_index", "0"))
+        return web.json_response({"code": 200, "nonce": self.ex.next_nonce(acc, key)})
+
+    async def apikeys(self, request: web.Request):
+        acc = int(request.query.get("account_index", "0"))
+        key = int(request.query.get("api_key_index", "255"))
+        keys = [{"account_index": acc, "api_key_index": k, "nonce": n, "public_key": ""}
+                for k, n in self.ex.account(acc).next_nonce.items() if key in (255, k)]
+        return web.json_response({"code": 200, "api_keys": keys})
+
+    def _reject(self, code: int, message: str):
+        return web.json_response({"code": code, "message": message}, status=400)
+
+    async def send_tx(self, request: web.Request):
+        form = await request.post()
+        if self.faults.tx_reject_rate and self.rng.random() < self.faults.tx_reject_rate:
+            return self._reject(21700, "injected tx rejection")
+        try:
+            tx_hash = self.ex.submit(int(form.get("tx_type", 0)), form.get("tx_info", ""))
+        except TxRejected as e:
+            return self._reject(e.code, e.message)
+        self.stats["txs"] += 1
+        return web.json_response({"code": 200, "tx_hash": tx_hash, "predicted_execution_time_ms": 0,
+                                  "volume_quota_remaining": 0})
+
+    async def send_tx_batch(self, request: web.Request):
+        form = await request.post()
+        if self.faults.tx_reject_rate and self.rng.random() < self.faults.tx_reject_rate:
+            return self._reject(21700, "injected tx rejection")
+        try:
+            types = json.loads(form.get("tx_types", "[]"))
+            infos = json.loads(form.get("tx_infos", "[]"))
+        except ValueError:
+            return self._reject(21500, "invalid batch")
+        if len(types) != len(infos) or not types:
+            return self._reject(21500, "tx_types and tx_infos must be non-empty and of equal length")
+        try:  # all or nothing; applied in order, so cancels placed first take effect first
+            hashes = self.ex.submit_batch([int(t) for t in types], infos)
+        except TxRejected as e:
+            return self._reject(e.code, e.message)
+        self.stats["txs"] += len(hashes)
+        return web.json_response({"code": 200, "tx_hash": hashes, "predicted_execution_time_ms": 0,
+                                  "volume_quota_remaining": 0})
+
+    # --- WS ---
+    def _fanout(self, channel: str, payload: dict) -> None:
+        subs = self._subs.get(channel)
+        if not subs:
+            return
+        data = json.dumps(payload)
+        for ws in list(subs):
+            if ws.closed:
+                subs.discard(ws)
+                continue
+            asyncio.ensure_future(ws.send_str(data))
+
+    def _subscribe(self, ws: web.WebSocketResponse, channel: str) -> None:
+        self._subs.setdefault(channel, set()).add(ws)
+
+    def _unsubscribe_all(self, ws: web.WebSocketResponse) -> None:
+        for subs in self._subs.values():
+            subs.discard(ws)
+
+    async def ws_account(self, request: web.Request):
+        """Legacy single-account stream used by ws.account_stream (auth token is not verified)."""
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        idx = request.query.get("account_index")
+        if idx is None:  # auth tokens look like "<expiry>:<account_index>:<api_key_index>:<sig>"
+            parts = request.query.get("auth", "").split(":")
+            idx = parts[1] if len(parts) > 1 and parts[1].isdigit() else "0"
+        idx = int(idx)
+        self._subscribe(ws, f"account_all:{idx}")
+        await ws.send_str(json.dumps({"type": "subscribed/account_all", "channel": f"account_all:{idx}",
+                                      "account": self.ex.account_payload(self.ex.account(idx))}))
+        try:
+            async for _ in ws:
+                pass
+        finally:
+            self._unsubscribe_all(ws)
+        return ws
+
+    async def ws_stream(self, request: web.Request):
+        """Venue-style stream: {"type":"subscribe","channel":"order_book/0" | "trade/0" | "account_all/12"}."""
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        await ws.send_str(json.dumps({"type": "connected"}))
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                try:
+                    req = json.loads(msg.data)
+                except ValueError:
+                    continue
+                if req.get("type") == "ping":
+                    await ws.send_str(json.dumps({"type": "pong"}))
+                    continue
+                if req.get("type") not in ("subscribe", "unsubscribe"):
+                    continue
+                kind, _, arg = str(req.get("channel", "")).partition("/")
+                channel = f"{kind}:{arg}"
+                if req["type"] == "unsubscribe":
+                    self._subs.get(channel, set()).discard(ws)
+                    continue
+                self._subscribe(ws, channel)
+                if kind == "order_book":
+                    book = self.ex.books.get(int(arg))
+                    if book is not None:
+                        await ws.send_str(json.dumps({"type": "subscribed/order_book", "channel": channel,
+                                                      "order_book": self.ex.book_payload(book)}))
+                elif kind == "trade":
+                    await ws.send_str(json.dumps({"type": "subscribed/trade", "channel": channel,
+                                                  "trades": list(self.ex.recent_trades.get(int(arg), []))[-50:]}))
+                elif kind == "account_all":
+                    acc = self.ex.account(int(arg))
+                    await ws.send_str(json.dumps({"type": "subscribed/account_all", "channel": channel,
+                                                  "positions": self.ex.positions_payload(acc),
+                                                  "account": self.ex.account_payload(acc)}))
+        finally:
+            self._unsubscribe_all(ws)
+        return ws
+
+    # --- control ---
+    async def sim_stats(self, request: web.Request):
+        return web.json_response({**self.stats, "height": self.ex.height, "faults": asdict(self.faults)})
+
+    async def sim_faults(self, request: web.Request):
+        body = await request.json()
+        for k, v in body.items():
+            if hasattr(self.faults, k):
+                setattr(self.faults, k, float(v))
+        return web.json_response(asdict(self.faults))
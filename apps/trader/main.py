@@ -1,45 +1,85 @@
-import argparse, asyncio, json
+import argparse, asyncio, json, os
+from types import SimpleNamespace
 from packages.config.env import load_cfg
 from packages.config.constants import TESTNET_ENV, MAINNET_ENV
 from packages.config.logging import setup_logging
-from packages.lighter_sdk_adapter.signer import make_signer
-from packages.execution.exchange_impl import LighterExchange
-from packages.risk.guards import can_open
-from packages.risk.brackets import build_intent
-from packages.portfolio.tracker import snapshot as acct_snapshot
-from apps.trader.tasks.signal_watch import run as run_signal_watch
-from packages.strategies.micro_spread_pulse import MicroSpreadPulseBot, MSPConfig
+from packages.telemetry import latency
 
+# Subcommands import what they use when they run: the SDK/signer graph (lighter, py_ecc,
+# aiohttp, ...) costs ~1s and read-only commands never touch it. scripts/check_startup.py
+# keeps `import apps.trader.main` within its budget.
 
 log = setup_logging()
 
 def envfile(network:str)->str:
     return MAINNET_ENV if network=="mainnet" else TESTNET_ENV
 
+def public_client(cfg):
+    # read-only REST helpers only need the base url (same shape the recorder uses)
+    return SimpleNamespace(url=cfg.base_url)
+
+def signer_client(cfg):
+    from packages.lighter_sdk_adapter.signer import make_signer
+    return make_signer(cfg.base_url, cfg.account_index, cfg.api_key_index, cfg.api_pk, cfg.eth_pk)
+
+NO_DAEMON = object()
+
+async def daemon_call(args, cmd, **params):
+    """Result from a running `daemon` for this network, or NO_DAEMON to run the command here.
+    Errors raised by the daemon propagate: a failed order is never retried in-process."""
+    if args.no_daemon:
+        return NO_DAEMON
+    from apps.trader.rpc import DaemonUnavailable, call, socket_path
+    try:
+        return await call(socket_path(args.network), cmd, params)
+    except DaemonUnavailable:
+        return NO_DAEMON
+
 async def run_place(args):
     log.info("=== PLACE ORDER ===", market=args.market, side=args.side, entry=args.entry, stop=args.stop, tp=args.tp, size=args.size)
-    
+    res = await daemon_call(args, "place", market=args.market, side=args.side, entry=args.entry, stop=args.stop,
+                            tp=args.tp, size=args.size, lev=args.lev)
+    if res is not NO_DAEMON:
+        if not res["placed"]:
+            log.warn("Risk check blocked order", reason=res["reason"], risk=res["risk"], via="daemon")
+        else:
+            log.info("Bracket order placed successfully", result=res["result"], via="daemon")
+        return
+    # the SDK / signer graph is only paid for when the command runs in this process
+    from packages.execution.exchange_impl import LighterExchange
+    from packages.portfolio.tracker import snapshot as acct_snapshot
+    from packages.risk.brackets import build_intent
+    from packages.risk.engine import RiskEngine, RiskLimits
+
     log.info("Loading configuration...")
     cfg = load_cfg(envfile(args.network))
     log.info("Config loaded", base_url=cfg.base_url, account_index=cfg.account_index)
     
     log.info("Creating signer client...")
-    client = make_signer(cfg.base_url, cfg.account_index, cfg.api_key_index, cfg.api_pk, cfg.eth_pk)
+    client = signer_client(cfg)
     log.info("Signer client created successfully")
     
     log.info("Creating exchange instance...")
     ex = LighterExchange(client, cfg.account_index)
     log.info("Exchange instance created")
     
-    log.info("Checking risk guards...")
-    ok, reason = can_open(args.lev, cfg.risk_lev_cap, args.open_positions, cfg.max_concurrent, 0.0, cfg.risk_daily_dd_stop)
-    if not ok:
-        log.warn("Risk guard blocked order", reason=reason)
-        return
-    
     log.info("Building order intent...")
     intent = build_intent(args.market, args.side, args.entry, args.stop, args.tp, args.size)
     log.info("Order intent built", intent=intent.model_dump())
+
+    log.info("Checking pre-trade risk...")
+    limits = RiskLimits.from_cfg(cfg)
+    limits.max_leverage = min(limits.max_leverage, args.lev)
+    risk = RiskEngine(limits)
+    risk.sync_account(await acct_snapshot(client, cfg.account_index))
+    px = args.entry
+    if px is None:
+        bid, ask, _ = await ex.get_spread(args.market)
+        px = ask if args.side == "BUY" else bid
+    ok, reason = risk.check_intent(intent, px)
+    if not ok:
+        log.warn("Risk check blocked order", reason=reason, risk=risk.snapshot())
+        return
     
     log.info("Placing bracket order...")
     res = await ex.place_bracket(intent)
@@ -47,13 +87,19 @@ async def run_place(args):
 
 async def run_close(args):
     log.info("=== CLOSE POSITION ===", market=args.market, current_side=args.current_side, size=args.size)
-    
+    res = await daemon_call(args, "close", market=args.market, current_side=args.current_side, size=args.size)
+    if res is not NO_DAEMON:
+        log.info("Position closed successfully", result=res, via="daemon")
+        print(json.dumps(res, indent=2))
+        return
+    from packages.execution.exchange_impl import LighterExchange
+
     log.info("Loading configuration...")
     cfg = load_cfg(envfile(args.network))
     log.info("Config loaded", base_url=cfg.base_url, account_index=cfg.account_index)
     
     log.info("Creating signer client...")
-    client = make_signer(cfg.base_url, cfg.account_index, cfg.api_key_index, cfg.api_pk, cfg.eth_pk)
+    client = signer_client(cfg)
     log.info("Signer client created successfully")
     
     log.info("Creating exchange instance...")
@@ -67,38 +113,30 @@ async def run_close(args):
 
 async def run_open_orders(args):
     log.info("=== LIST OPEN ORDERS ===", market=args.market or "ALL")
-    
-    log.info("Loading configuration...")
-    cfg = load_cfg(envfile(args.network))
-    log.info("Config loaded", base_url=cfg.base_url, account_index=cfg.account_index)
-    
-    log.info("Creating signer client...")
-    client = make_signer(cfg.base_url, cfg.account_index, cfg.api_key_index, cfg.api_pk, cfg.eth_pk)
-    log.info("Signer client created successfully")
-    
-    log.info("Creating exchange instance...")
-    ex = LighterExchange(client, cfg.account_index)
-    log.info("Exchange instance created")
-    
-    log.info("Fetching open orders...")
-    orders = await ex.list_open_orders(market=args.market)
+    orders = await daemon_call(args, "open-orders", market=args.market)
+    if orders is NO_DAEMON:
+        from packages.lighter_sdk_adapter.rest import get_open_orders_by_index
+        log.info("Loading configuration...")
+        cfg = load_cfg(envfile(args.network))
+        log.info("Config loaded", base_url=cfg.base_url, account_index=cfg.account_index)
+
+        log.info("Fetching open orders...")
+        orders = await get_open_orders_by_index(public_client(cfg), cfg.account_index, market=args.market, limit=200)
     log.info("Open orders fetched", count=len(orders))
     print(json.dumps(orders, indent=2))
 
 # ---------- NEW: balances + open positions ----------
 async def run_account(args):
     log.info("=== ACCOUNT SNAPSHOT ===")
-    
-    log.info("Loading configuration...")
-    cfg = load_cfg(envfile(args.network))
-    log.info("Config loaded", base_url=cfg.base_url, account_index=cfg.account_index)
-    
-    log.info("Creating signer client...")
-    client = make_signer(cfg.base_url, cfg.account_index, cfg.api_key_index, cfg.api_pk, cfg.eth_pk)
-    log.info("Signer client created successfully")
-    
-    log.info("Fetching account snapshot...")
-    acc = await acct_snapshot(client, cfg.account_index)
+    acc = await daemon_call(args, "account", fresh=args.fresh)
+    if acc is NO_DAEMON:
+        from packages.portfolio.tracker import snapshot as acct_snapshot
+        log.info("Loading configuration...")
+        cfg = load_cfg(envfile(args.network))
+        log.info("Config loaded", base_url=cfg.base_url, account_index=cfg.account_index)
+
+        log.info("Fetching account snapshot...")
+        acc = await acct_snapshot(public_client(cfg), cfg.account_index)
     log.info("Account snapshot fetched")
 
     if args.json:
@@ -134,11 +172,26 @@ async def run_account(args):
             entry = p.get("entry_price") or p.get("avg_entry") or "?"
             upnl  = p.get("unrealized_pnl") or p.get("uPnL") or "?"
             print(f"{mkt} | {side} | qty={qty} | entry={entry} | uPnL={upnl}")
+
+    from packages.portfolio.valuation import Valuation
+    from packages.risk.engine import RiskEngine
+    book = RiskEngine(state_dir="")
+    book.sync_account(acc)
+    val = Valuation()
+    val.sync_imf(positions)
+    val.load(book)
+    print("\n=== VALUATION ===")
+    print(f"equity={val.equity:.2f} uPnL={val.unrealized:.2f} gross={val.gross_exposure:.2f} "
+          f"net={val.net_exposure:.2f} leverage={val.leverage:.2f} margin_usage={val.margin_usage:.2%}")
 # ---------------------------------------------------
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--network", default="testnet", choices=["testnet","mainnet"])
+    ap.add_argument("--latency", action="store_true", help="record per-stage latency histograms (dump on SIGUSR1 and at exit)")
+    ap.add_argument("--no-daemon", action="store_true", help="run in this process even when a trader daemon is up")
+    ap.add_argument("--metrics-port", type=int, default=int(os.environ.get("AEGON_METRICS_PORT") or 0),
+                    help="serve /healthz, /readyz and /metrics on this port (0: off)")
     sub = ap.add_subparsers(dest="cmd")
 
     p = sub.add_parser("place")
@@ -148,8 +201,7 @@ def main():
     p.add_argument("--stop", type=float, required=True)
     p.add_argument("--tp", type=float, required=True)
     p.add_argument("--size", type=int, required=True)
-    p.add_argument("--lev", type=float, default=2.0)
-    p.add_argument("--open-positions", type=int, default=0)
+    p.add_argument("--lev", type=float, default=2.0, help="max account leverage after this order")
     p.set_defaults(func=run_place)
 
     c = sub.add_parser("close")
@@ -165,10 +217,14 @@ def main():
     # NEW: balances + positions
     a = sub.add_parser("account")
     a.add_argument("--json", action="store_true", help="print raw JSON payload")
+    a.add_argument("--fresh", action="store_true", help="(daemon) refetch instead of the stream-refreshed snapshot")
     a.set_defaults(func=run_account)
 
     cw = sub.add_parser("copy-watch")
-    cw.set_defaults(func=lambda args: asyncio.run(run_signal_watch(args.network)))
+    cw.add_argument("--config", default="configs/copy.yml", help="watched: edits apply without a restart")
+    cw.add_argument("--risk-config", default="configs/risk.yml")
+    cw.add_argument("--accounts", default="main", help="follower accounts from the env file's ACCOUNTS: names or 'all'")
+    cw.set_defaults(func=run_copy_watch)
 
     # market maker: micro-spread pulse
     mm = sub.add_parser("mm")
@@ -177,8 +233,35 @@ def main():
     mm.add_argument("--spread", type=float, default=0.003)
     mm.add_argument("--cooling", type=int, default=30)
     mm.add_argument("--max-cycles", type=int, default=3)
+    mm.add_argument("--events", action="store_true", help="requote on WS book/fill events instead of fixed sleeps")
+    mm.add_argument("--requote-bps", type=float, default=5.0, help="(--events) mid move that triggers a requote")
+    mm.add_argument("--max-rps", type=float, default=2.0, help="(--events) requote rate limit (token bucket)")
     mm.set_defaults(func=run_mm)
 
+    # many markets in one process: shared signer/nonces, HTTP pool and WS stream
+    mmm = sub.add_parser("mm-multi")
+    mmm.add_argument("--config", default="configs/mm.yml")
+    mmm.set_defaults(func=run_multi_mm)
+
+    # streamed risk limits with automatic reduce-only closeouts
+    rw = sub.add_parser("risk-watch")
+    rw.add_argument("--config", default="configs/risk.yml")
+    rw.set_defaults(func=run_risk_watch)
+
+    # warm signer / markets / account behind a Unix socket; account, open-orders, market-data,
+    # place and close forward to it while it runs
+    dm = sub.add_parser("daemon")
+    dm.add_argument("--markets", default="", help="comma separated symbols to resolve at startup")
+    dm.add_argument("--socket", help="default $AEGON_SOCKET or .state/trader-<network>.sock")
+    dm.set_defaults(func=run_daemon)
+
+    # bar strategies (packages/strategies) on live trades
+    st = sub.add_parser("strategy")
+    st.add_argument("--name", required=True, help="breakout_retest | range_fade (strategy_run.STRATEGIES)")
+    st.add_argument("--market", required=True)
+    st.add_argument("--config", default="configs/strategy.example.yml")
+    st.set_defaults(func=run_strategy)
+
     # NEW: test command for individual components
     test = sub.add_parser("test")
     test.add_argument("--function", required=True, choices=["config", "signer", "exchange", "account", "orders"])
@@ -190,6 +273,15 @@ def main():
     md.add_argument("--depth", type=int, default=10, help="Order book depth (0 for spread only)")
     md.set_defaults(func=run_market_data)
 
+    # all (or --markets) books at once: top of book, depth, last price -> table + JSON/CSV
+    sn = sub.add_parser("snapshot")
+    sn.add_argument("--markets", default="", help="comma separated symbols (default: every active market)")
+    sn.add_argument("--depth", type=int, default=10, help="price levels per side summed into depth")
+    sn.add_argument("--rps", type=float, default=8.0, help="request budget across all markets")
+    sn.add_argument("--concurrency", type=int, default=16)
+    sn.add_argument("--out", help="write rows to .json or .csv")
+    sn.set_defaults(func=run_snapshot)
+
     # NEW: list all markets with live prices
     lm = sub.add_parser("list-markets")
     lm.add_argument("--limit", type=int, default=20, help="Number of markets to show")
@@ -198,9 +290,28 @@ def main():
     args = ap.parse_args()
     if not getattr(args, "func", None):
         ap.print_help(); return
-    asyncio.run(args.func(args))
+    if args.latency:
+        latency.enable()
+        latency.install_signal_dump()
+    try:
+        asyncio.run(with_telemetry(args) if args.metrics_port else args.func(args))
+    finally:
+        if latency.enabled():
+            latency.dump()
+
+async def with_telemetry(args):
+    from packages.telemetry import server
+    stop = await server.start(args.metrics_port, log=log)
+    try:
+        await args.func(args)
+    finally:
+        await stop()
 
 async def run_mm(args):
+    from packages.execution.exchange_impl import LighterExchange
+    from packages.lighter_sdk_adapter.ws import subscribe_stream
+    from packages.strategies.micro_spread_pulse import MicroSpreadPulseBot, MSPConfig
+    from packages.telemetry import health
     log.info("=== MARKET MAKER START ===", market=args.market, order_size=args.order_size, spread=args.spread, cooling=args.cooling, max_cycles=args.max_cycles)
     
     log.info("Loading configuration...")
@@ -208,7 +319,7 @@ async def run_mm(args):
     log.info("Config loaded", base_url=cfg.base_url, account_index=cfg.account_index)
     
     log.info("Creating signer client...")
-    client = make_signer(cfg.base_url, cfg.account_index, cfg.api_key_index, cfg.api_pk, cfg.eth_pk)
+    client = signer_client(cfg)
     log.info("Signer client created successfully")
     
     log.info("Creating exchange instance...")
@@ -222,41 +333,92 @@ async def run_mm(args):
         spread=args.spread,
         cooling_sec=args.cooling,
         max_active_cycles=args.max_cycles,
+        requote_bps=args.requote_bps,
+        max_requotes_per_sec=args.max_rps,
     ))
     log.info("Market maker bot created")
     
-    log.info("Starting market maker loop...")
-    while True:
+    log.info("Starting market maker loop...", mode="events" if args.events else "poll")
+    market_id = await ex.resolve_market_id(args.market)
+    if market_id is None:
+        raise ValueError(f"Could not resolve market ID for {args.market}")
+    trade_feed = None
+    try:
+        if args.events:
+            await bot.run_events(market_id, cfg.account_index, log=log)
+            return
+        # the streams keep the book (mid, imbalance) and last price / activity / volatility current between pulses
+        def start_feed():
+            return asyncio.create_task(subscribe_stream(cfg.base_url, [f"order_book/{market_id}", f"trade/{market_id}"],
+                                                        bot.on_stream, log=log))
+        trade_feed = start_feed()
+        health.expect("mm.pulse", max(60.0, 5 * args.cooling))
+        while True:
+            if trade_feed.done():  # subscribe_stream only returns on stop: if the task died anyway, restart it
+                err = None if trade_feed.cancelled() else trade_feed.exception()
+                log.warn("Market data feed stopped, restarting", err=str(err))
+                trade_feed = start_feed()
+            try:
+                log.debug("Running market maker pulse...")
+                res = await bot.pulse()
+                health.beat("mm.pulse")
+                if res:
+                    log.info("Pulse completed", **res, features=bot.features.snapshot())
+                else:
+                    log.info("Pulse completed with no result")
+            except Exception as e:
+                log.warn("Market maker error", err=str(e))
+            log.debug("Waiting for next pulse", sleep_sec=args.cooling)
+            await asyncio.sleep(args.cooling)
+    finally:
+        if trade_feed is not None:
+            trade_feed.cancel()
+        # Don't leave stale quotes resting on the book when the loop exits
         try:
-            log.info("Running market maker pulse...")
-            res = await bot.pulse()
-            if res:
-                log.info("Pulse completed", **res)
-            else:
-                log.info("Pulse completed with no result")
+            await bot.withdraw_quotes()
         except Exception as e:
-            log.warn("Market maker error", err=str(e))
-        log.info("Waiting for next pulse", sleep_sec=args.cooling)
-        await asyncio.sleep(args.cooling)
+            log.warn("Failed to withdraw quotes", err=str(e))
+
+async def run_copy_watch(args):
+    from apps.trader.tasks.signal_watch import run as run_signal_watch
+    await run_signal_watch(args.network, args.config, args.risk_config, args.accounts, log=log)
+
+async def run_multi_mm(args):
+    from apps.trader.tasks.multi_mm import run as run_multi_mm_task
+    log.info("=== MULTI-MARKET MAKER START ===", config=args.config)
+    await run_multi_mm_task(args.network, args.config, log=log)
+
+async def run_risk_watch(args):
+    from apps.trader.tasks.risk_watch import run as run_risk_watch_task
+    log.info("=== RISK WATCH START ===", config=args.config)
+    await run_risk_watch_task(args.network, args.config, log=log)
+
+async def run_daemon(args):
+    from apps.trader.tasks.daemon import run as run_daemon_task
+    log.info("=== TRADER DAEMON START ===", markets=args.markets)
+    await run_daemon_task(args.network, [m.strip() for m in args.markets.split(",") if m.strip()], log=log,
+                          path=args.socket)
+
+async def run_strategy(args):
+    from apps.trader.tasks.strategy_run import run as run_strategy_task
+    log.info("=== STRATEGY START ===", name=args.name, market=args.market, config=args.config)
+    await run_strategy_task(args.network, args.name, args.market, args.config, log=log)
 
 async def run_market_data(args):
+    from packages.lighter_sdk_adapter.rest import get_orderbook, get_spread
     log.info("=== MARKET DATA FETCH ===", market=args.market, depth=args.depth)
-    
-    log.info("Loading configuration...")
-    cfg = load_cfg(envfile(args.network))
-    log.info("Config loaded", base_url=cfg.base_url)
-    
-    log.info("Creating signer client...")
-    client = make_signer(cfg.base_url, cfg.account_index, cfg.api_key_index, cfg.api_pk, cfg.eth_pk)
-    log.info("Signer client created successfully")
-    
-    log.info("Creating exchange instance...")
-    ex = LighterExchange(client, cfg.account_index)
-    log.info("Exchange instance created")
-    
+    warm = await daemon_call(args, "market-data", market=args.market, depth=args.depth)
+    if warm is NO_DAEMON:
+        log.info("Loading configuration...")
+        cfg = load_cfg(envfile(args.network))
+        log.info("Config loaded", base_url=cfg.base_url)
+        client = public_client(cfg)
     try:
         log.info("Fetching spread data...")
-        best_bid, best_ask, spread = await ex.get_spread(args.market)
+        if warm is NO_DAEMON:
+            best_bid, best_ask, spread = await get_spread(client, args.market)
+        else:
+            best_bid, best_ask, spread = warm["bid"], warm["ask"], warm["spread"]
         log.info("Spread data fetched", best_bid=best_bid, best_ask=best_ask, spread=spread)
         
         if best_bid is not None and best_ask is not None:
@@ -271,8 +433,7 @@ async def run_market_data(args):
             
             if args.depth > 0:
                 log.info("Fetching order book...")
-                from packages.lighter_sdk_adapter.rest import get_orderbook
-                orderbook = await get_orderbook(client, args.market, args.depth)
+                orderbook = warm["book"] if warm is not NO_DAEMON else await get_orderbook(client, args.market, args.depth)
                 log.info("Order book fetched", bids_count=len(orderbook["bids"]), asks_count=len(orderbook["asks"]))
                 
                 print(f"\n=== ORDER BOOK (Top {args.depth}) ===")
@@ -291,6 +452,12 @@ async def run_market_data(args):
         log.error("Error fetching market data", error=str(e))
         print(f"Error fetching market data: {e}")
 
+async def run_snapshot(args):
+    from apps.trader.tasks.snapshot import run as run_snapshot_task
+    log.info("=== MARKET SNAPSHOT ===", markets=args.markets or "ALL", depth=args.depth, rps=args.rps)
+    await run_snapshot_task(args.network, [m.strip() for m in args.markets.split(",") if m.strip()], args.depth,
+                            args.out, args.rps, args.concurrency, log=log)
+
 async def run_list_markets(args):
     log.info("=== LIST ALL MARKETS ===", limit=args.limit)
     
@@ -298,10 +465,6 @@ async def run_list_markets(args):
     cfg = load_cfg(envfile(args.network))
     log.info("Config loaded", base_url=cfg.base_url)
     
-    log.info("Creating signer client...")
-    client = make_signer(cfg.base_url, cfg.account_index, cfg.api_key_index, cfg.api_pk, cfg.eth_pk)
-    log.info("Signer client created successfully")
-    
     try:
         # Get market metadata from the SDK
         from lighter import ApiClient, Configuration, OrderApi
@@ -347,27 +510,30 @@ async def run_test(args):
     elif args.function == "signer":
         log.info("Testing signer client creation...")
         cfg = load_cfg(envfile(args.network))
-        client = make_signer(cfg.base_url, cfg.account_index, cfg.api_key_index, cfg.api_pk, cfg.eth_pk)
+        client = signer_client(cfg)
         log.info("Signer test passed")
         
     elif args.function == "exchange":
         log.info("Testing exchange instance creation...")
         cfg = load_cfg(envfile(args.network))
-        client = make_signer(cfg.base_url, cfg.account_index, cfg.api_key_index, cfg.api_pk, cfg.eth_pk)
+        client = signer_client(cfg)
+        from packages.execution.exchange_impl import LighterExchange
         ex = LighterExchange(client, cfg.account_index)
         log.info("Exchange test passed")
         
     elif args.function == "account":
         log.info("Testing account snapshot...")
         cfg = load_cfg(envfile(args.network))
-        client = make_signer(cfg.base_url, cfg.account_index, cfg.api_key_index, cfg.api_pk, cfg.eth_pk)
+        client = signer_client(cfg)
+        from packages.portfolio.tracker import snapshot as acct_snapshot
         acc = await acct_snapshot(client, cfg.account_index)
         log.info("Account test passed", keys=list(acc.keys())[:5])
         
     elif args.function == "orders":
         log.info("Testing open orders fetch...")
         cfg = load_cfg(envfile(args.network))
-        client = make_signer(cfg.base_url, cfg.account_index, cfg.api_key_index, cfg.api_pk, cfg.eth_pk)
+        client = signer_client(cfg)
+        from packages.execution.exchange_impl import LighterExchange
         ex = LighterExchange(client, cfg.account_index)
         orders = await ex.list_open_orders()
         log.info("Orders test passed", count=len(orders))
@@ -0,0 +1,79 @@
+# local RPC between the trader daemon and the CLI: one JSON object per line over a Unix socket
+import asyncio, os, time
+from typing import Any, Awaitable, Callable, Dict, Optional
+from packages.lighter_sdk_adapter.codec import dumpb, loads
+
+Handler = Callable[[dict], Awaitable[Any]]
+_LIMIT = 1 << 24  # account payloads run well past asyncio's 64 KiB line default
+
+
+class DaemonUnavailable(ConnectionError):
+    """No daemon listening on the socket; the caller runs the command itself."""
+
+
+def socket_path(network: str) -> str:
+    return os.environ.get("AEGON_SOCKET") or \
+        os.path.join(os.environ.get("COI_STATE_DIR") or ".state", f"trader-{network}.sock")
+
+
+async def serve(path: str, handlers: Dict[str, Handler], log=None):
+    """{"cmd": name, "args": {...}} -> {"ok": true, "result": ...} | {"ok": false, "error": "..."},
+    plus "ms" spent in the handler. Requests on one connection are answered in order."""
+
+    async def on_conn(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                t0 = time.perf_counter()
+                cmd = None
+                try:
+                    req = loads(line)
+                    cmd = req.get("cmd")
+                    handler = handlers.get(cmd)
+                    if handler is None:
+                        raise KeyError(f"unknown command {cmd!r}")
+                    resp = {"ok": True, "result": await handler(req.get("args") or {})}
+                except Exception as e:
+                    resp = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+                resp["ms"] = round((time.perf_counter() - t0) * 1e3, 3)
+                if log:
+                    log.info("RPC", cmd=cmd, ok=resp["ok"], ms=resp["ms"])
+                writer.write(dumpb(resp) + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if os.path.exists(path):
+        try:
+            _, w = await asyncio.open_unix_connection(path)
+            w.close()
+            raise RuntimeError(f"a daemon is already listening on {path}")
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.unlink(path)  # left behind by a daemon that died
+    server = await asyncio.start_unix_server(on_conn, path=path, limit=_LIMIT)
+    os.chmod(path, 0o600)  # same user only: the socket can place orders
+    return server
+
+
+async def call(path: str, cmd: str, args: Optional[dict] = None, timeout: float = 30.0) -> Any:
+    try:
+        reader, writer = await asyncio.open_unix_connection(path, limit=_LIMIT)
+    except (FileNotFoundError, ConnectionRefusedError) as e:
+        raise DaemonUnavailable(path) from e
+    try:
+        writer.write(dumpb({"cmd": cmd, "args": args or {}}) + b"\n")
+        await writer.drain()
+        line = await asyncio.wait_for(reader.readline(), timeout)
+    finally:
+        writer.close()
+    if not line:
+        raise ConnectionError(f"daemon closed the connection during {cmd}")
+    resp = loads(line)
+    if not resp.get("ok"):
+        raise RuntimeError(f"daemon {cmd} failed: {resp.get('error')}")
+    return resp["result"]
@@ -0,0 +1,169 @@
+# trader daemon: signer, nonces, market registry and account state kept warm behind a local RPC socket
+import asyncio, os, signal, time
+from types import SimpleNamespace
+from typing import Optional
+from packages.config.env import load_cfg
+from packages.config.constants import TESTNET_ENV, MAINNET_ENV
+from packages.config.models import RiskConfig
+from packages.config.service import ConfigService, model
+from packages.lighter_sdk_adapter import rest
+from packages.lighter_sdk_adapter.signer import make_signer
+from packages.lighter_sdk_adapter.ws import subscribe_stream
+from packages.execution.exchange_impl import LighterExchange
+from packages.portfolio.tracker import snapshot
+from packages.risk.brackets import build_intent
+from packages.risk.engine import RiskEngine, RiskLimits, bracket_legs, market_key
+from packages.telemetry import health
+from apps.trader.rpc import serve, socket_path
+
+
+class TraderDaemon:
+    """The CLI's commands against long-lived state: one SignerClient (nonce stream),
+    LighterExchange, resolved markets, pooled HTTP sessions and an account snapshot that
+    account_all events keep fresh (and that feeds the pre-trade RiskEngine)."""
+
+    def __init__(self, cfg, log=None, refresh_sec: float = 60.0, risk_path: str = "configs/risk.yml"):
+        self.cfg = cfg
+        self.log = log
+        self.refresh_sec = refresh_sec
+        self.public = SimpleNamespace(url=cfg.base_url)
+        self.client = make_signer(cfg.base_url, cfg.account_index, cfg.api_key_index, cfg.api_pk, cfg.eth_pk)
+        self.exchange = LighterExchange(self.client, cfg.account_index)
+        self.cfgs = ConfigService(log)
+        rc = self.cfgs.register("risk", risk_path, model(RiskConfig))
+        self.risk = RiskEngine(RiskLimits.from_cfg(cfg, data=rc.data()))
+        self.cfgs.subscribe("risk", lambda new, old: self.risk.set_limits(RiskLimits.from_cfg(cfg, data=new.data())))
+        self.account: Optional[dict] = None
+        self.account_at = 0.0
+        self.started = time.time()
+        self._refreshing: Optional[asyncio.Task] = None
+        self._dirty = False
+
+    def handlers(self) -> dict:
+        return {"status": self.status, "account": self.get_account, "open-orders": self.open_orders,
+                "market-data": self.market_data, "place": self.place, "close": self.close}
+
+    # --- warm state ---
+    async def warm(self, markets) -> None:
+        for m in markets:
+            if await self.exchange.resolve_market_id(m) is None:
+                if self.log:
+                    self.log.warn("Unknown market", market=m)
+                continue
+            await rest.get_market_meta(self.client, m)  # decimals for signing
+        await self.refresh_account()
+
+    async def refresh_account(self) -> dict:
+        acc = await snapshot(self.public, self.cfg.account_index)
+        self.account, self.account_at = acc, time.time()
+        health.beat("account")
+        self.risk.sync_account(acc)
+        return acc
+
+    def on_stream(self, msg: dict) -> None:
+        # fills / position changes: refresh the snapshot in the background, coalescing bursts
+        if not msg.get("type", "").endswith("/account_all"):
+            return
+        if self._refreshing is not None and not self._refreshing.done():
+            self._dirty = True
+            return
+        self._refreshing = asyncio.get_running_loop().create_task(self._refresh_loop())
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            self._dirty = False
+            try:
+                await self.refresh_account()
+            except Exception as e:
+                if self.log:
+                    self.log.warn("Account refresh failed", err=str(e))
+            if not self._dirty:
+                return
+
+    # --- commands ---
+    async def status(self, args: dict) -> dict:
+        return {"network_url": self.cfg.base_url, "account_index": self.cfg.account_index, "pid": os.getpid(),
+                "uptime_sec": round(time.time() - self.started, 1), "markets": len(rest._MARKET_ID_CACHE),
+                "account_age_sec": round(time.time() - self.account_at, 3) if self.account_at else None,
+                "risk": self.risk.snapshot(), "risk_config_version": self.cfgs.version("risk")}
+
+    async def get_account(self, args: dict) -> dict:
+        if args.get("fresh") or self.account is None:
+            return await self.refresh_account()
+        return self.account
+
+    async def open_orders(self, args: dict) -> list:
+        return await rest.get_open_orders_by_index(self.public, self.cfg.account_index,
+                                                   market=args.get("market"), limit=int(args.get("limit", 200)))
+
+    async def market_data(self, args: dict) -> dict:
+        market, depth = args["market"], int(args.get("depth", 0))
+        bid, ask, spread = await rest.get_spread(self.public, market)
+        book = await rest.get_orderbook(self.public, market, depth) if depth > 0 and bid is not None else None
+        return {"bid": bid, "ask": ask, "spread": spread, "book": book}
+
+    async def place(self, args: dict) -> dict:
+        intent = build_intent(args["market"], args["side"], args.get("entry"), args["stop"], args["tp"], args["size"])
+        px = args.get("entry")
+        if px is None:
+            bid, ask, _ = await rest.get_spread(self.public, args["market"])
+            px = ask if args["side"] == "BUY" else bid
+        if time.time() - self.account_at > self.refresh_sec:
+            await self.refresh_account()
+        limits = self.risk.limits
+        cap = limits.max_leverage
+        limits.max_leverage = min(cap, float(args.get("lev") or cap))
+        try:
+            ok, reason = self.risk.check_intent(intent, px)
+        finally:
+            limits.max_leverage = cap
+        if not ok:
+            return {"placed": False, "reason": reason, "risk": self.risk.snapshot(), "intent": intent.model_dump()}
+        res = await self.exchange.place_bracket(intent)
+        self.risk.on_order_open(intent.market, bracket_legs(intent))  # until the account stream's refresh lands
+        return {"placed": True, "result": res, "intent": intent.model_dump()}
+
+    async def close(self, args: dict):
+        e = self.risk.markets.get(market_key(args["market"]))  # the streamed mark; the book when there is none
+        return await self.exchange.close_market(args["market"], args["current_side"], str(args["size"]),
+                                                mark_px=e.mark if e else None)
+
+
+async def run(network="testnet", markets=(), log=None, path=None):
+    env_file = MAINNET_ENV if network=="mainnet" else TESTNET_ENV
+    cfg = load_cfg(env_file)
+    daemon = TraderDaemon(cfg, log)
+    health.expect("account", 3 * daemon.refresh_sec)
+    await daemon.warm(markets)
+    path = path or socket_path(network)
+    server = await serve(path, daemon.handlers(), log=log)
+    log.info("Trader daemon listening", socket=path, account_index=cfg.account_index,
+             markets=len(rest._MARKET_ID_CACHE), warm=list(markets))
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+    feed = asyncio.create_task(subscribe_stream(cfg.base_url, [f"account_all/{cfg.account_index}"],
+                                                daemon.on_stream, stop=stop))
+    reloader = asyncio.create_task(daemon.cfgs.watch(stop))
+    try:
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=daemon.refresh_sec)
+            except asyncio.TimeoutError:
+                daemon.on_stream({"type": "update/account_all"})  # periodic backstop refresh
+    finally:
+        feed.cancel()
+        reloader.cancel()
+        server.close()
+        await server.wait_closed()
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        await rest.close_sessions()
+        log.info("Trader daemon stopped")
@@ -0,0 +1,101 @@
+# multi-market market making: one signer, exchange, HTTP pool and WS stream shared by N bots
+import asyncio, yaml
+from dataclasses import fields
+from packages.config.env import load_cfg
+from packages.config.constants import TESTNET_ENV, MAINNET_ENV
+from packages.lighter_sdk_adapter.signer import make_signer
+from packages.lighter_sdk_adapter.rest import close_sessions
+from packages.lighter_sdk_adapter.ws import StreamHub
+from packages.execution.exchange_impl import LighterExchange
+from packages.strategies.micro_spread_pulse import MicroSpreadPulseBot, MSPConfig
+from packages.utils.ratelimit import TokenBucket
+
+_MSP_FIELDS = {f.name for f in fields(MSPConfig)}
+
+def load_mm_cfg(path="configs/mm.yml"):
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+def bot_config(defaults: dict, entry: dict) -> MSPConfig:
+    merged = {**(defaults or {}), **entry}
+    return MSPConfig(**{k: v for k, v in merged.items() if k in _MSP_FIELDS})
+
+async def supervise(bot: MicroSpreadPulseBot, stop: asyncio.Event, shared: TokenBucket, log, restart_delay: float):
+    """Keep one market's loop alive; a crash pulls that market's quotes and restarts it alone."""
+    while not stop.is_set():
+        try:
+            await bot.quote_loop(stop, shared_bucket=shared, log=log)
+            log.info("Market maker finished", market=bot.market, cycles=bot.active_cycles)
+            return
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.warn("Market maker crashed, restarting", market=bot.market, err=str(e), delay=restart_delay)
+            try:
+                await bot.withdraw_quotes()
+            except Exception as e2:
+                log.warn("Failed to withdraw quotes", market=bot.market, err=str(e2))
+            await asyncio.sleep(restart_delay)
+
+async def withdraw_all(bots, log) -> None:
+    for bot, res in zip(bots, await asyncio.gather(*(b.withdraw_quotes() for b in bots), return_exceptions=True)):
+        if isinstance(res, Exception):
+            log.warn("Failed to withdraw quotes", market=bot.market, err=str(res))
+
+async def supervise_feed(hub: StreamHub, bots, stop: asyncio.Event, log, restart_delay: float):
+    """Keep the shared stream alive. If it dies every bot's book is frozen: drop the books (no
+    requote until the resubscribe snapshot), pull all quotes, then restart it."""
+    while not stop.is_set():
+        try:
+            await hub.run(stop, log=log)
+            return
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.warn("Stream hub crashed, withdrawing quotes and restarting", err=str(e), delay=restart_delay)
+        for bot in bots:
+            bot.book.reset({})
+        await withdraw_all(bots, log)
+        await asyncio.sleep(restart_delay)
+
+async def run(network="testnet", config_path="configs/mm.yml", log=None):
+    env_file = MAINNET_ENV if network=="mainnet" else TESTNET_ENV
+    cfg = load_cfg(env_file)
+    mm_cfg = load_mm_cfg(config_path)
+    acct = mm_cfg.get("account", {})
+
+    # a single SignerClient -> one nonce stream; LighterExchange serialises sign+send on it
+    client = make_signer(cfg.base_url, cfg.account_index, cfg.api_key_index, cfg.api_pk, cfg.eth_pk)
+    exchange = LighterExchange(client, cfg.account_index)
+    hub = StreamHub(cfg.base_url, on_error=lambda h, e: log.warn("Stream handler failed", err=str(e)))
+    shared = TokenBucket(float(acct.get("max_requotes_per_sec", 10)), float(acct.get("burst", 20)))
+
+    bots = []
+    for entry in mm_cfg.get("markets", []):
+        market = entry["market"]
+        market_id = await exchange.resolve_market_id(market)
+        if market_id is None:
+            log.warn("Skipping unknown market", market=market)
+            continue
+        bot = MicroSpreadPulseBot(exchange, market, bot_config(mm_cfg.get("defaults"), entry))
+        bot.market_id = market_id
+        hub.subscribe(f"order_book/{market_id}", bot.on_stream)
+        hub.subscribe(f"trade/{market_id}", bot.on_stream)
+        hub.subscribe(f"account_all/{cfg.account_index}", bot.on_stream)  # each bot filters its market's fills
+        bots.append(bot)
+    if not bots:
+        log.warn("No markets to make")
+        return
+    log.info("Multi-market maker starting", markets=[b.market for b in bots], account_index=cfg.account_index)
+
+    stop = asyncio.Event()
+    restart_delay = float(mm_cfg.get("restart_delay_sec", 5))
+    feed = asyncio.create_task(supervise_feed(hub, bots, stop, log, restart_delay))
+    try:
+        await asyncio.gather(*(supervise(b, stop, shared, log, restart_delay) for b in bots))
+    finally:
+        stop.set()
+        feed.cancel()
+        # Don't leave stale quotes resting on any book when the runner exits
+        await withdraw_all(bots, log)
+        await close_sessions()
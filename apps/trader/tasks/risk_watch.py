@@ -1 +1,268 @@
-# risk watch task
\ No newline at end of file
+# risk watch: stream account + marks, evaluate limits on every update, fire reduce-only closeouts
+import asyncio, time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from packages.config.env import load_cfg
+from packages.config.constants import TESTNET_ENV, MAINNET_ENV
+from packages.config.models import RiskConfig
+from packages.config.service import ConfigService, load_yaml, model
+from packages.lighter_sdk_adapter.signer import make_signer
+from packages.lighter_sdk_adapter.ws import subscribe_stream
+from packages.execution.exchange_impl import LighterExchange
+from packages.portfolio.tracker import snapshot
+from packages.portfolio.valuation import Valuation
+from packages.risk.engine import RiskEngine, RiskLimits, market_key
+from packages.telemetry.latency import record
+
+# closeout priority (lower fires first)
+LIQUIDATION, POSITION_STOP, DAILY_STOP, MARGIN = 0, 1, 2, 3
+REASONS = {LIQUIDATION: "LIQUIDATION", POSITION_STOP: "POSITION_STOP", DAILY_STOP: "DAILY_STOP", MARGIN: "MARGIN"}
+
+
+@dataclass
+class WatchConfig:
+    position_stop_pct: float = 5.0     # close a position this far (%) against its entry; 0 disables
+    liq_buffer_pct: float = 2.0        # close when the mark is within this % of the liquidation price
+    max_margin_usage: float = 0.8      # initial margin / equity; largest positions go first
+    close_all_on_daily_stop: bool = True
+    closeout_budget_ms: float = 250.0  # breach -> batch sent budget (logged when exceeded)
+    retry_sec: float = 5.0             # a market being closed is not re-fired before this
+
+
+def watch_cfg(rc: RiskConfig) -> WatchConfig:
+    return WatchConfig(**rc.watch.model_dump())
+
+
+def load_watch_cfg(path="configs/risk.yml") -> WatchConfig:
+    return watch_cfg(RiskConfig.model_validate(load_yaml(path)))
+
+
+class RiskWatcher:
+    """Keeps a RiskEngine current from account_all (fills, positions) and trade/N (marks)
+    and re-evaluates drawdown, margin usage and per-position stops on every message.
+    Breaches become one batch of reduce-only market closes, highest priority first."""
+
+    def __init__(self, risk: RiskEngine, exchange, cfg: Optional[WatchConfig] = None, account_index: int = 0,
+                 log=None, clock=time.perf_counter, resync: Optional[Callable[[], Awaitable[dict]]] = None):
+        self.risk = risk
+        self.exchange = exchange
+        self.cfg = cfg or WatchConfig()
+        self.account_index = account_index
+        self.log = log
+        self.clock = clock
+        self.symbols: Dict[int, str] = {}       # market id -> symbol
+        self.liq_px: Dict[str, float] = {}      # market key -> liquidation price
+        # margin usage per tick, over the RiskEngine's positions (loaded after each account update)
+        self.valuation = Valuation(default_imf=1.0 / max(risk.limits.max_leverage, 1e-9))
+        self.closing: Dict[str, float] = {}     # market key -> clock() when a close was fired
+        self.inflight: Optional[asyncio.Task] = None
+        self.latencies: List[float] = []        # breach -> batch sent, seconds
+        self.channels_changed = asyncio.Event()
+        self.resync = resync                    # REST account snapshot (positions + cash)
+        self.last_trade: Dict[int, int] = {}    # market id -> last trade id applied / seen
+        self.cash_stale = False                 # positions resynced, cash not yet: equity rules wait
+        self._resyncing: Optional[asyncio.Task] = None
+
+    # --- state ---
+    def on_stream(self, msg: dict) -> None:
+        kind = msg.get("type", "")
+        if kind.endswith("/account_all"):
+            self._on_account(msg)
+        elif kind.endswith("/trade"):
+            trades = msg.get("trades") or []
+            if trades:
+                ch = str(msg.get("channel", ""))
+                mid = int(ch.split(":")[-1]) if ":" in ch else int(trades[-1].get("market_id", -1))
+                sym, px = self.symbols.get(mid, str(mid)), float(trades[-1]["price"])
+                self.risk.on_mark(sym, px)
+                self.valuation.on_mark(sym, px)
+        else:
+            return
+        self.check()
+
+    def _on_account(self, msg: dict) -> None:
+        positions = msg.get("positions") or {}
+        plist = list(positions.values()) if isinstance(positions, dict) else positions
+        known = set(self.symbols)
+        for p in plist:
+            if p.get("market_id") is not None and p.get("symbol"):
+                self.symbols[int(p["market_id"])] = p["symbol"]
+        if msg.get("type", "").startswith("subscribed"):
+            # (re)subscribe snapshot: its trades are history already in the positions / cash it
+            # reports, so they only move the watermark and are never applied as fills
+            for mid, trades in (msg.get("trades") or {}).items():
+                ids = [int(t.get("trade_id", -1)) for t in trades]
+                self.last_trade[int(mid)] = max(ids + [self.last_trade.get(int(mid), -1)])
+            if msg.get("account"):
+                self.risk.sync_account(msg["account"])
+                self.cash_stale = False
+            else:
+                self.risk.sync_positions(plist, replace=True)
+                self.cash_stale = True  # fills missed while disconnected moved cash too
+                self._resync()
+        else:
+            # fills first (cash / realized), then positions as the authoritative quantities
+            for mid, trades in (msg.get("trades") or {}).items():
+                sym = self.symbols.get(int(mid), str(mid))
+                for t in trades:
+                    tid = int(t.get("trade_id", -1))
+                    if tid >= 0:
+                        if tid <= self.last_trade.get(int(mid), -1):
+                            continue  # already applied
+                        self.last_trade[int(mid)] = tid
+                    if int(t.get("bid_account_id", -1)) == self.account_index:
+                        side = "BUY"
+                    elif int(t.get("ask_account_id", -1)) == self.account_index:
+                        side = "SELL"
+                    else:
+                        continue
+                    self.risk.on_fill(sym, side, float(t["size"]), float(t["price"]))
+            self.risk.sync_positions(plist)
+        self.valuation.sync_imf(plist)
+        self.valuation.load(self.risk)
+        for p in plist:
+            key = market_key(p.get("symbol") or p.get("market_id"))
+            self.liq_px[key] = float(p.get("liquidation_price") or 0)
+            if key in self.closing and not self.risk.exposure(key).qty:
+                self.closing.pop(key, None)
+        if set(self.symbols) != known:
+            self.channels_changed.set()
+
+    def _resync(self) -> None:
+        if self.resync is not None and (self._resyncing is None or self._resyncing.done()):
+            self._resyncing = asyncio.get_running_loop().create_task(self._resync_loop())
+
+    async def _resync_loop(self) -> None:
+        while self.cash_stale:
+            try:
+                self.risk.sync_account(await self.resync())
+                self.valuation.load(self.risk)
+                self.cash_stale = False
+            except Exception as e:
+                if self.log:
+                    self.log.warn("Account resync failed", err=str(e))
+                await asyncio.sleep(self.cfg.retry_sec or 1.0)
+        self.check()
+
+    def channels(self) -> List[str]:
+        return [f"account_all/{self.account_index}"] + [f"trade/{mid}" for mid in sorted(self.symbols)]
+
+    # --- limits ---
+    def breaches(self) -> List[Tuple[int, str, float]]:
+        """[(priority, market key, signed qty to close)], one per market, priority order."""
+        cfg, risk = self.cfg, self.risk
+        held = [(k, e) for k, e in risk.markets.items() if e.qty and e.mark]
+        out: Dict[str, Tuple[int, str, float]] = {}
+
+        def add(prio, key, qty):
+            if key not in out or prio < out[key][0]:
+                out[key] = (prio, key, qty)
+
+        for k, e in held:
+            liq = self.liq_px.get(k) or 0.0
+            if liq > 0 and abs(e.mark - liq) / e.mark * 100.0 <= cfg.liq_buffer_pct:
+                add(LIQUIDATION, k, e.qty)
+            if cfg.position_stop_pct and e.avg_px:
+                adverse = (e.avg_px - e.mark) / e.avg_px if e.qty > 0 else (e.mark - e.avg_px) / e.avg_px
+                if adverse * 100.0 >= cfg.position_stop_pct:
+                    add(POSITION_STOP, k, e.qty)
+        if self.cash_stale:
+            return self._ordered(out)  # equity is off by the missed fills until the resync lands
+        day0 = risk.day_start_equity
+        if cfg.close_all_on_daily_stop and day0 and \
+                risk.intraday_pnl <= -day0 * risk.limits.daily_dd_stop_pct / 100.0:
+            for k, e in held:
+                add(DAILY_STOP, k, e.qty)
+        val = self.valuation
+        usage = val.margin_usage
+        if usage > cfg.max_margin_usage:
+            eq = val.equity
+            for k, e in sorted(held, key=lambda ke: -abs(ke[1].qty) * ke[1].mark):
+                if usage <= cfg.max_margin_usage:
+                    break
+                add(MARGIN, k, e.qty)
+                usage -= val.margin[val.slot(k)] / eq if eq > 0 else 0.0
+        return self._ordered(out)
+
+    def _ordered(self, out: Dict[str, Tuple[int, str, float]]) -> List[Tuple[int, str, float]]:
+        return sorted(out.values(), key=lambda b: (b[0], -abs(b[2]) * (self.risk.markets[b[1]].mark or 0.0)))
+
+    def check(self) -> None:
+        if self.inflight is not None and not self.inflight.done():
+            return  # the running batch re-checks when it completes
+        t0 = self.clock()
+        todo = [b for b in self.breaches() if t0 - self.closing.get(b[1], -1e18) >= self.cfg.retry_sec]
+        if todo:
+            for _, key, _ in todo:
+                self.closing[key] = t0
+            self.inflight = asyncio.get_running_loop().create_task(self.closeout(todo, t0))
+
+    async def closeout(self, todo: List[Tuple[int, str, float]], t0: float) -> None:
+        marks = self.risk.markets
+        closes = [(key, "BUY" if qty > 0 else "SELL", abs(qty), marks[key].mark) for _, key, qty in todo]
+        try:
+            res = await self.exchange.close_positions(closes)
+            dt = self.clock() - t0
+            self.latencies.append(dt)
+            record("risk.breach_to_send", dt)
+            if self.log:
+                self.log.warn("Risk closeout sent", latency_ms=round(dt * 1e3, 3),
+                              over_budget=dt * 1e3 > self.cfg.closeout_budget_ms,
+                              closes=[{"market": k, "reason": REASONS[p], "qty": q} for p, k, q in todo],
+                              risk=self.risk.snapshot(), result=res)
+        except Exception as e:
+            for _, key, _ in todo:
+                self.closing.pop(key, None)  # allow an immediate retry
+            if self.log:
+                self.log.warn("Risk closeout failed", err=str(e), markets=[k for _, k, _ in todo])
+        finally:
+            self.inflight = None
+        self.check()
+
+    def stats(self) -> dict:
+        lat = sorted(self.latencies)
+        pct = lambda q: lat[min(len(lat) - 1, int(q * len(lat)))] * 1e3 if lat else None  # noqa: E731
+        return {"closeouts": len(lat), "p50_ms": pct(0.5), "p99_ms": pct(0.99), "max_ms": lat[-1] * 1e3 if lat else None}
+
+
+async def run(network="testnet", config_path="configs/risk.yml", log=None):
+    env_file = MAINNET_ENV if network=="mainnet" else TESTNET_ENV
+    cfg = load_cfg(env_file)
+    cfgs = ConfigService(log)
+    rc = cfgs.register("risk", config_path, model(RiskConfig))
+    client = make_signer(cfg.base_url, cfg.account_index, cfg.api_key_index, cfg.api_pk, cfg.eth_pk)
+    exchange = LighterExchange(client, cfg.account_index)
+    risk = RiskEngine(RiskLimits.from_cfg(cfg, data=rc.data()))
+    acc = await snapshot(client, cfg.account_index)
+    risk.sync_account(acc)
+    watcher = RiskWatcher(risk, exchange, watch_cfg(rc), cfg.account_index, log,
+                          resync=lambda: snapshot(client, cfg.account_index))
+
+    def on_risk(new: RiskConfig, old: RiskConfig):
+        # limits and watch thresholds swap in place; positions, marks and closeout state are kept
+        risk.set_limits(RiskLimits.from_cfg(cfg, data=new.data()))
+        watcher.cfg = watch_cfg(new)
+        watcher.check()
+
+    cfgs.subscribe("risk", on_risk)
+    root = acc.get("account", acc)
+    if isinstance(root.get("accounts"), list) and root["accounts"]:
+        root = root["accounts"][0]
+    watcher.on_stream({"type": "subscribed/account_all", "positions": root.get("positions") or [], "account": acc})
+    log.info("Risk watch started", account_index=cfg.account_index, risk=risk.snapshot(), watch=vars(watcher.cfg))
+
+    reloader = asyncio.create_task(cfgs.watch())
+    try:
+        while True:
+            # resubscribe when a new market shows up so its marks stream too
+            watcher.channels_changed.clear()
+            feed = asyncio.create_task(subscribe_stream(cfg.base_url, watcher.channels(), watcher.on_stream))
+            changed = asyncio.create_task(watcher.channels_changed.wait())
+            try:
+                await asyncio.wait({feed, changed}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                feed.cancel()
+                changed.cancel()
+            log.info("Risk watch resubscribing", channels=watcher.channels(), closeouts=watcher.stats())
+    finally:
+        reloader.cancel()
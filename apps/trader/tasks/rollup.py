@@ -1 +1,227 @@
-# rollup task
\ No newline at end of file
+# rollup task: recorded account events -> per-day / market / strategy / leader PnL and turnover
+# python -m apps.trader.tasks.rollup --data data/recordings --account 12 [--by market,strategy]
+import argparse, json, os, yaml
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from packages.data.loaders import Recording
+from packages.lighter_sdk_adapter.codec import loads
+from packages.portfolio import report
+from packages.utils.ids import load_tags, split
+
+UNKNOWN = "-"
+_DAY_MS = 86_400_000
+_MAX_ORDERS = 200_000  # order_index -> client_order_index entries carried between runs
+
+
+def load_rollup_cfg(path="configs/rollup.yml") -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return yaml.safe_load(f) or {}
+    except FileNotFoundError:
+        return {}
+
+
+class Rollup:
+    """Folds account_all events (fills, order acks, funding) into per-(day, market,
+    strategy, leader) deltas. Fills are attributed through their client order index:
+    a tags journal entry (packages.utils.ids tag()) wins, else the index's shard name.
+
+    Realized PnL uses the average-cost position per market, reset from each positions
+    payload, so a gap in the recording costs at most the fills inside it."""
+
+    def __init__(self, account_index: int, shards: Optional[Dict[int, str]] = None, tags: Optional[Dict[int, dict]] = None,
+                 taker_fee_bps: float = 0.0, maker_fee_bps: float = 0.0, state: Optional[dict] = None):
+        st = state or {}
+        self.account_index = account_index
+        self.shards = {int(k): v for k, v in (shards or {}).items()}
+        self.tags = tags or {}
+        self.taker_fee, self.maker_fee = taker_fee_bps / 1e4, maker_fee_bps / 1e4
+        self.watermark: int = st.get("watermark", 0)                        # last recv_ns folded in
+        self.symbols: Dict[str, str] = st.get("symbols", {})                # market id -> symbol
+        self.positions: Dict[str, List[float]] = st.get("positions", {})    # symbol -> [qty, avg_px]
+        self.last_trade: Dict[str, int] = st.get("last_trade", {})          # market id -> trade id
+        self.last_funding: Dict[str, int] = st.get("last_funding", {})      # market id -> timestamp
+        self.orders: Dict[int, int] = {int(k): v for k, v in st.get("orders", {}).items()}
+        self.rows: Dict[Tuple[int, str, str, str], List[float]] = {}
+        self._recv_ms = 0  # day of events without a venue timestamp
+
+    def state(self) -> dict:
+        orders = list(self.orders.items())[-_MAX_ORDERS:]
+        return {"watermark": self.watermark, "symbols": self.symbols, "positions": self.positions,
+                "last_trade": self.last_trade, "last_funding": self.last_funding,
+                "orders": {str(k): v for k, v in orders}}
+
+    # --- events ---
+    def on_event(self, msg: dict, recv_ns: int = 0) -> None:
+        self._recv_ms = recv_ns // 1_000_000
+        positions = msg.get("positions") or {}
+        plist = list(positions.values()) if isinstance(positions, dict) else positions
+        for p in plist:
+            if p.get("market_id") is not None and p.get("symbol"):
+                self.symbols[str(p["market_id"])] = p["symbol"]
+        for orders in (msg.get("orders") or {}).values():
+            for o in orders:
+                if o.get("order_index") is not None and o.get("client_order_index") is not None:
+                    self.orders[int(o["order_index"])] = int(o["client_order_index"])
+        for mid, trades in (msg.get("trades") or {}).items():
+            for t in trades:
+                tid = int(t.get("trade_id", -1))
+                if tid >= 0:
+                    if tid <= self.last_trade.get(str(mid), -1):
+                        continue  # replayed on resubscribe
+                    self.last_trade[str(mid)] = tid
+                self.on_trade(str(mid), t)
+        for mid, hist in (msg.get("funding_histories") or {}).items():
+            for f in hist:
+                ts = int(f.get("timestamp", 0))
+                if ts <= self.last_funding.get(str(mid), -1):
+                    continue
+                self.last_funding[str(mid)] = ts
+                ms = ts * 1000 if ts < 10**11 else ts  # venue funding timestamps are seconds
+                self._row(ms, self.symbols.get(str(mid), str(mid)), UNKNOWN, UNKNOWN)[5] += float(f.get("change") or 0)
+        for p in plist:  # authoritative quantities after the fills above
+            sym = p.get("symbol") or self.symbols.get(str(p.get("market_id")))
+            if sym:
+                qty = float(p.get("position") or 0) * (-1 if int(p.get("sign", 1) or 1) < 0 else 1)
+                self.positions[sym] = [qty, float(p.get("avg_entry_price") or 0) if qty else 0.0]
+
+    def on_trade(self, mid: str, t: dict) -> None:
+        if int(t.get("bid_account_id", -1)) == self.account_index:
+            side, oid, coi = 1, t.get("bid_id"), t.get("bid_client_id")
+        elif int(t.get("ask_account_id", -1)) == self.account_index:
+            side, oid, coi = -1, t.get("ask_id"), t.get("ask_client_id")
+        else:
+            return
+        if coi is None and oid is not None:
+            coi = self.orders.get(int(oid))
+        strategy, leader = self.attribute(coi)
+        sym = self.symbols.get(mid, mid)
+        qty, px = float(t["size"]), float(t["price"])
+        maker = bool(t.get("is_maker_ask")) == (side < 0)
+        notional = qty * px
+        row = self._row(int(t.get("timestamp") or self._recv_ms), sym, strategy, leader)
+        row[0] += 1
+        row[1] += qty
+        row[2] += notional
+        row[3] += self._fill(sym, side * qty, px)
+        row[4] += notional * (self.maker_fee if maker else self.taker_fee)
+
+    def attribute(self, coi) -> Tuple[str, str]:
+        if coi is None:
+            return UNKNOWN, UNKNOWN
+        tag = self.tags.get(int(coi)) or {}
+        shard = split(coi)[0]
+        return tag.get("strategy") or self.shards.get(shard, f"shard{shard}"), tag.get("leader") or UNKNOWN
+
+    def _fill(self, sym: str, signed: float, px: float) -> float:
+        q, avg = self.positions.get(sym, (0.0, 0.0))
+        new = q + signed
+        pnl = 0.0
+        if q == 0 or (q > 0) == (signed > 0):
+            avg = (avg * abs(q) + px * abs(signed)) / abs(new)
+        else:
+            pnl = min(abs(signed), abs(q)) * (px - avg) * (1.0 if q > 0 else -1.0)
+            if abs(new) < 1e-12:
+                new, avg = 0.0, 0.0
+            elif (new > 0) != (q > 0):
+                avg = px  # flipped through zero
+        self.positions[sym] = [new, avg]
+        return pnl
+
+    def _row(self, ts_ms: int, market: str, strategy: str, leader: str) -> List[float]:
+        key = (ts_ms // _DAY_MS, market, strategy, leader)
+        row = self.rows.get(key)
+        if row is None:
+            row = self.rows[key] = [0, 0.0, 0.0, 0.0, 0.0, 0.0]
+        return row
+
+    # --- output ---
+    def table(self):
+        keys, vals = list(self.rows), list(self.rows.values())
+        cols = {"day": pa.array([k[0] for k in keys], pa.int32()).cast(pa.date32())}
+        for i, name in enumerate(report.KEYS[1:], 1):
+            cols[name] = pa.array([k[i] for k in keys], pa.string())
+        for i, name in enumerate(report.METRICS):
+            cols[name] = pa.array([v[i] for v in vals], pa.int64() if name == "fills" else pa.float64())
+        return pa.table(cols, schema=report.SCHEMA)
+
+
+def fold(roll: Rollup, rec: Recording) -> int:
+    """Feed every account row after the watermark; returns the number of events read."""
+    n = 0
+    for mid, meta in rec.markets().items():
+        roll.symbols.setdefault(str(mid), meta.get("symbol") or str(mid))
+    for b in rec.batches("account", start_ns=roll.watermark + 1):
+        mine = pc.equal(b.column("account_index"), roll.account_index)
+        payload = b.column("payload")
+        useful = pc.match_substring_regex(payload, '"(trades|orders|positions|funding_histories)"')
+        b2 = b.filter(pc.and_(mine, useful))
+        for ns, raw in zip(b2.column("recv_ns").to_pylist(), b2.column("payload").to_pylist()):
+            roll.on_event(loads(raw), ns)
+        n += b2.num_rows
+        roll.watermark = b.column("recv_ns")[-1].as_py()
+    return n
+
+
+def state_path(out: str) -> str:
+    return os.path.join(out, "rollup-state.json")
+
+
+def run(data="data/recordings", out="data/rollup", account_index=0, config_path="configs/rollup.yml",
+        state_dir=None, log=None) -> dict:
+    """Fold the account events recorded since the last run into a new part file."""
+    cfg = load_rollup_cfg(config_path)
+    try:
+        with open(state_path(out), "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        state = {}
+    if state.get("account_index", account_index) != account_index:
+        raise ValueError(f"{out} holds a rollup of account {state['account_index']}, not {account_index}")
+    for lo, hi, p in report.parts(out):
+        if hi > state.get("watermark", 0):
+            os.remove(p)  # written by a run that died before saving its state
+    roll = Rollup(account_index, cfg.get("shards"), load_tags(state_dir or os.environ.get("COI_STATE_DIR", ".state")),
+                  float(cfg.get("taker_fee_bps", 0)), float(cfg.get("maker_fee_bps", 0)), state)
+    start = roll.watermark
+    events = fold(roll, Recording(data))
+    if roll.rows:
+        report.write_part(out, roll.table(), start + 1, roll.watermark)
+    if roll.watermark != start:
+        os.makedirs(out, exist_ok=True)
+        tmp = state_path(out) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"account_index": account_index, **roll.state()}, f)
+        os.replace(tmp, state_path(out))
+    report.compact(out, int(cfg.get("max_parts", 64)))
+    res = {"events": events, "rows": len(roll.rows), "watermark": roll.watermark}
+    if log:
+        log.info("Rollup updated", **res)
+    return res
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--data", default="data/recordings", help="recording directory (apps.recorder.run --account)")
+    ap.add_argument("--out", default="data/rollup")
+    ap.add_argument("--account", type=int, required=True)
+    ap.add_argument("--config", default="configs/rollup.yml")
+    ap.add_argument("--state-dir", help="client order index tags (default $COI_STATE_DIR or .state)")
+    ap.add_argument("--by", default="day", help="comma separated report keys: day,market,strategy,leader ('' for totals)")
+    ap.add_argument("--start", help="first day (YYYY-MM-DD)")
+    ap.add_argument("--end", help="day after the last (YYYY-MM-DD)")
+    ap.add_argument("--report-only", action="store_true", help="skip the update, just report")
+    args = ap.parse_args()
+    if not args.report_only:
+        print(json.dumps(run(args.data, args.out, args.account, args.config, args.state_dir)))
+    t = report.load(args.out, date.fromisoformat(args.start) if args.start else None,
+                    date.fromisoformat(args.end) if args.end else None)
+    print(report.render(report.summarize(t, [k for k in args.by.split(",") if k])))
+
+
+if __name__ == "__main__":
+    main()
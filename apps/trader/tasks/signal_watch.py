@@ -1,97 +1,140 @@
 # background loop: fetch → publish → execute → alert
-import asyncio, yaml, json
-from packages.config.env import load_cfg
+import asyncio, json, time
+from types import SimpleNamespace
+from packages.config.env import load_accounts, select_accounts
 from packages.config.constants import TESTNET_ENV, MAINNET_ENV
-from packages.lighter_sdk_adapter.signer import make_signer
-from packages.execution.exchange_impl import LighterExchange
+from packages.config.models import CopyConfig, RiskConfig
+from packages.config.service import ConfigService, load_yaml, model
+from packages.execution.accounts import build_accounts, fan_out
 from packages.signals.bus import SignalBus
 from packages.signals.sources import DynamicLeaderPoller
 from packages.followers.engine import CopyEngine
 from packages.portfolio.tracker import snapshot
+from packages.risk.engine import RiskLimits
 from packages.leaderboard.onchain_scanner import OnchainScanner
+from packages.telemetry import health
+from packages.telemetry.latency import span, record
 
-async def equity_provider(client, account_index:int):
+async def equity_provider(client, account_index:int, risk=None):
     acc = await snapshot(client, account_index)
+    if risk is not None:
+        risk.sync_account(acc)  # real positions / equity for the in-memory pre-trade checks
     root = acc.get("account", acc)
     return float(root.get("total_asset_value") or root.get("collateral") or 0.0)
 
-def load_copy_cfg(path="configs/copy.yml"):
-    import os
-    with open(path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+def load_copy_cfg(path="configs/copy.yml") -> CopyConfig:
+    return CopyConfig.model_validate(load_yaml(path))
 
-async def run(network="testnet"):
+async def run(network="testnet", copy_path="configs/copy.yml", risk_path="configs/risk.yml", accounts="main", log=None):
     env_file = MAINNET_ENV if network=="mainnet" else TESTNET_ENV
-    cfg = load_cfg(env_file)
-    copy_cfg = load_copy_cfg()
-    poll_iv = int(copy_cfg.get("poll", {}).get("interval_sec", 5))
-    refresh_sec = int(copy_cfg.get("leaderboard", {}).get("refresh_sec", 30))
+    # one leader poller / scanner / market cache for every follower account; each account signs,
+    # sizes (own equity) and risk-checks on its own
+    cfgs_by_name = select_accounts(load_accounts(env_file), accounts)
+    cfg = next(iter(cfgs_by_name.values()))
+    # copy.yml / risk.yml are watched: edits are validated and swapped in without losing poller or leader state
+    cfgs = ConfigService(log)
+    copy_cfg = cfgs.register("copy", copy_path, model(CopyConfig))
+    cfgs.register("risk", risk_path, model(RiskConfig))
 
-    client = make_signer(cfg.base_url, cfg.account_index, cfg.api_key_index, cfg.api_pk, cfg.eth_pk)
-    exchange = LighterExchange(client, cfg.account_index)
+    accts = build_accounts(cfgs_by_name, cfgs.get("risk").data())
+    for name, r in (await fan_out(accts, lambda a: equity_provider(a.client, a.index, a.risk))).items():
+        if isinstance(r, Exception):
+            raise RuntimeError(f"account {name}: initial sync failed: {r}") from r
+    public = SimpleNamespace(url=cfg.base_url)  # leader reads: public endpoints, shared session
 
     # On-chain scanner discovers + ranks leaders
-    scanner = OnchainScanner(
-        cfg.base_url,
-        lookback_blocks=copy_cfg.get("leaderboard", {}).get("lookback_blocks", 200),
-        max_accounts=copy_cfg.get("leaderboard", {}).get("max_accounts", 100),
-        rps=float(copy_cfg.get("leaderboard", {}).get("rps", 1.0)),
-    )
+    lb = copy_cfg.leaderboard
+    scanner = OnchainScanner(cfg.base_url, lookback_blocks=lb.lookback_blocks, max_accounts=lb.max_accounts, rps=lb.rps)
 
     # Provide leaders (dynamic), refreshed periodically
     leaders_cache = []
     last_refresh = 0.0
 
+    def on_copy(new: CopyConfig, old: CopyConfig):
+        nonlocal last_refresh
+        lb = new.leaderboard
+        scanner.lookback_blocks, scanner.max_accounts = lb.lookback_blocks, lb.max_accounts
+        scanner.set_rate(lb.rps)
+        if new.leaderboard != old.leaderboard or new.copy_defaults != old.copy_defaults:
+            last_refresh = 0.0  # re-select / re-template leaders on the next tick
+
+    cfgs.subscribe("copy", on_copy)
+    def on_risk(new: RiskConfig, old: RiskConfig):
+        for a in accts:
+            a.risk.set_limits(RiskLimits.from_cfg(a.cfg, data=new.data()))
+
+    cfgs.subscribe("risk", on_risk)
+
     async def provide_leaders():
         nonlocal leaders_cache, last_refresh
+        copy_cfg = cfgs.get("copy")
+        lb, sel = copy_cfg.leaderboard, copy_cfg.leaderboard.selection
         now = asyncio.get_running_loop().time()
-        if now - last_refresh > refresh_sec or not leaders_cache:
-            top = await scanner.top_n(
-                n=int(copy_cfg["leaderboard"].get("follow_slots", 3)),
-                min_equity=float(copy_cfg["leaderboard"]["selection"].get("min_equity_usdc", 50)),
-                min_trades7=int(copy_cfg["leaderboard"]["selection"].get("min_trades_7d", 5)),
-                max_dd30=float(copy_cfg["leaderboard"]["selection"].get("max_drawdown_30d_pct", 35)),
-                sort_by=copy_cfg["leaderboard"].get("sort_by", "sharpe_30d"),
-            )
+        if now - last_refresh > lb.refresh_sec or not leaders_cache:
+            top = await scanner.top_n(n=lb.follow_slots, min_equity=sel.min_equity_usdc, min_trades7=sel.min_trades_7d,
+                                      max_dd30=sel.max_drawdown_30d_pct, sort_by=lb.sort_by)
             # If empty, relax constraints once with defaults to seed leaders
             if not top:
                 top = await scanner.top_n(n=3, min_equity=0.0, min_trades7=0, max_dd30=10_000.0, sort_by="equity_usdc")
             # map to leader dicts expected by poller/engine
-            leaders_cache = [{
-                "name": t["name"],
-                "l1_address": t["l1_address"],
-                "account_index": int(t["account_index"]),
-                "markets_allow": copy_cfg["copy_defaults"].get("markets_allow", []),
-                "copy_mode": copy_cfg["copy_defaults"].get("copy_mode", "risk"),
-                "copy_param": copy_cfg["copy_defaults"].get("copy_param", 0.5),
-                "slippage_bps": copy_cfg["copy_defaults"].get("slippage_bps", 20),
-                "max_leverage": copy_cfg["copy_defaults"].get("max_leverage", 5),
-                "max_positions": copy_cfg["copy_defaults"].get("max_positions", 3),
-                "enabled": True,
-            } for t in top]
+            leaders_cache = [copy_cfg.leader(t) for t in top]
             last_refresh = now
             print("[leaders]", json.dumps(leaders_cache, indent=2))
         return leaders_cache
 
-    poller = DynamicLeaderPoller(client, provide_leaders)
+    poller = DynamicLeaderPoller(public, provide_leaders)
     bus = SignalBus()
+    active = accts  # accounts whose risk check passed this tick's batch
+
+    async def exec_one(a, sig, cfg_leader):
+        # sized and checked from the in-memory state; sync_accounts keeps it current
+        return await CopyEngine(cfgs.get("copy"), a.exchange, lambda: a.risk.equity, risk=a.risk).on_signal(sig, cfg_leader)
+
+    async def sync_accounts():
+        while True:
+            await asyncio.sleep(cfgs.get("copy").poll.account_sync_sec)
+            for name, r in (await fan_out(accts, lambda a: equity_provider(a.client, a.index, a.risk))).items():
+                if isinstance(r, Exception):
+                    print("account sync failed:", name, r)
+            health.beat("copy.account_sync")
 
-    async def exec_handler(sig):
+    async def exec_handler(sig, targets):
         leaders = await provide_leaders()
         cfg_leader = next((l for l in leaders if l["name"] == sig.leader), None)
-        if not cfg_leader: return
-        eq = await equity_provider(client, cfg.account_index)
-        engine = CopyEngine(copy_cfg, exchange, lambda: eq)
-        res = await engine.on_signal(sig, cfg_leader)
-        print("[ALERT]", sig.model_dump(), "res:", str(res)[:140])
+        if not cfg_leader or not targets: return
+        with span("copy.exec"):
+            res = await fan_out(targets, lambda a: exec_one(a, sig, cfg_leader))
+        record("copy.signal_to_exec", time.time() - sig.ts)
+        for name, r in res.items():
+            print("[ALERT]", name, sig.model_dump(), "res:", str(r)[:140])
 
-    bus.subscribe(lambda s: asyncio.create_task(exec_handler(s)))
+    bus.subscribe(lambda s: asyncio.create_task(exec_handler(s, active)))
+    watcher = asyncio.create_task(cfgs.watch())
+    syncer = asyncio.create_task(sync_accounts())
+    health.beat("copy.account_sync")  # initial sync above
+    health.expect("copy.poll", max(60.0, 3 * cfgs.get("copy").poll.interval_sec))
 
     # main loop
-    while True:
-        try:
-            sigs = await poller.tick()
-            bus.publish_many(sigs)
-        except Exception as e:
-            print("copy-watch error:", e)
-        await asyncio.sleep(poll_iv)
+    try:
+        while True:
+            try:
+                with span("copy.poll_tick"):
+                    sigs = await poller.tick()
+                active = []
+                if sigs:
+                    leaders = {l["name"]: l for l in await provide_leaders()}
+                    batch = [(s, leaders[s.leader]) for s in sigs if s.leader in leaders]
+                    for a in accts:
+                        ok, reason = CopyEngine(cfgs.get("copy"), a.exchange, lambda: None, risk=a.risk).check_batch(batch)
+                        if ok:
+                            active.append(a)
+                        else:
+                            print("[RISK] copy batch blocked:", a.name, reason, json.dumps(a.risk.snapshot()))
+                bus.publish_many(sigs)
+                health.beat("copy.poll")
+            except Exception as e:
+                print("copy-watch error:", e)
+            await asyncio.sleep(cfgs.get("copy").poll.interval_sec)
+    finally:
+        watcher.cancel()
+        syncer.cancel()
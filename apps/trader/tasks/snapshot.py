@@ -0,0 +1,144 @@
+# venue snapshot: top of book, depth and last price for many markets at once, within a request budget
+import asyncio, csv, json, os, random, time
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+from packages.config.env import load_cfg
+from packages.config.constants import TESTNET_ENV, MAINNET_ENV
+from packages.lighter_sdk_adapter import rest
+from packages.utils.ratelimit import TokenBucket
+
+FIELDS = ("market", "market_id", "bid", "ask", "mid", "spread", "spread_bps", "bid_size", "ask_size",
+          "bid_depth_usd", "ask_depth_usd", "levels", "last_price", "daily_volume_usd", "ms", "error")
+
+
+class Snapshotter:
+    """Fetches one /orderBookOrders per market concurrently (`concurrency` in flight, `rps`
+    token bucket across all of them); market list and last prices come from one request each.
+    A 429 halves the request rate for the rest of the scan and backs off (Retry-After when given)."""
+
+    def __init__(self, client, rps: float = 8.0, burst: Optional[float] = None, concurrency: int = 16,
+                 max_tries: int = 4):
+        self.client = client
+        self.bucket = TokenBucket(rps, burst)
+        self.sem = asyncio.Semaphore(concurrency)
+        self.max_tries = max_tries
+        self.stats = {"requests": 0, "throttled": 0, "errors": 0}
+
+    async def _get(self, fn, *args):
+        for attempt in range(self.max_tries):
+            async with self.sem:
+                await self.bucket.acquire()
+                self.stats["requests"] += 1
+                try:
+                    return await fn(self.client, *args)
+                except httpx.HTTPStatusError as e:
+                    if e.response.status_code != 429 or attempt == self.max_tries - 1:
+                        raise
+                    self.stats["throttled"] += 1
+                    self.bucket.rate = max(0.5, self.bucket.rate / 2)  # the venue's budget is lower than ours
+                    self.bucket.tokens = 0.0
+                    retry_after = e.response.headers.get("retry-after")
+            delay = float(retry_after) if retry_after and retry_after.replace(".", "", 1).isdigit() \
+                else 0.25 * (2 ** attempt) + random.uniform(0, 0.1)
+            await asyncio.sleep(delay)  # outside the semaphore: other markets keep going
+
+    async def market(self, meta: dict, depth: int, stats: Dict[int, dict]) -> dict:
+        mid_id = int(meta["market_id"])
+        row = dict.fromkeys(FIELDS)
+        row.update(market=meta.get("symbol"), market_id=mid_id)
+        st = stats.get(mid_id) or {}
+        row["last_price"] = _num(st.get("last_trade_price"))
+        row["daily_volume_usd"] = _num(st.get("daily_quote_token_volume"))
+        t0 = time.perf_counter()
+        try:
+            book = await self._get(rest.get_book_orders, mid_id, depth * 4)  # orders, folded into levels
+        except Exception as e:
+            self.stats["errors"] += 1
+            row["error"] = f"{type(e).__name__}: {e}"
+            return row
+        finally:
+            row["ms"] = round((time.perf_counter() - t0) * 1e3, 2)
+        bids, asks = book["bids"][:depth], book["asks"][:depth]
+        row["levels"] = max(len(bids), len(asks))
+        if bids:
+            row["bid"], row["bid_size"] = bids[0]
+            row["bid_depth_usd"] = round(sum(p * s for p, s in bids), 2)
+        if asks:
+            row["ask"], row["ask_size"] = asks[0]
+            row["ask_depth_usd"] = round(sum(p * s for p, s in asks), 2)
+        if bids and asks:
+            row["mid"] = (row["bid"] + row["ask"]) / 2
+            row["spread"] = row["ask"] - row["bid"]
+            row["spread_bps"] = round(row["spread"] / row["mid"] * 1e4, 3) if row["mid"] else None
+        return row
+
+    async def scan(self, markets: Optional[Sequence[str]] = None, depth: int = 10,
+                   active_only: bool = True) -> Tuple[List[dict], dict]:
+        t0 = time.perf_counter()
+        books, stats = await asyncio.gather(self._get(rest.get_order_books), self._get(rest.get_exchange_stats))
+        if markets:
+            want = {_base(m) for m in markets}
+            books = [b for b in books if _base(b.get("symbol", "")) in want]
+        if active_only:
+            books = [b for b in books if str(b.get("status", "active")).lower() == "active"]
+        rows = await asyncio.gather(*(self.market(b, depth, stats) for b in books))
+        info = {"ts": time.time(), "wall_ms": round((time.perf_counter() - t0) * 1e3, 1),
+                "markets": len(rows), **self.stats}
+        return list(rows), info
+
+
+def _base(symbol: str) -> str:
+    s = rest._norm_symbol(symbol)
+    return s[:-4] if s.endswith("USDC") and len(s) > 4 else s
+
+
+def _num(v) -> Optional[float]:
+    try:
+        return float(v) if v not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def write(rows: List[dict], info: dict, path: str) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if path.endswith(".csv"):
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            w = csv.DictWriter(f, fieldnames=FIELDS)
+            w.writeheader()
+            w.writerows(rows)
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({**info, "rows": rows}, f, indent=2)
+
+
+def render(rows: List[dict]) -> str:
+    head = f"{'Market':<10} {'Bid':>14} {'Ask':>14} {'Spread bps':>11} {'Bid depth $':>13} {'Ask depth $':>13} {'Last':>14} {'ms':>7}"
+    out = [head, "-" * len(head)]
+    for r in rows:
+        f = lambda v, spec: format(v, spec) if v is not None else "-"  # noqa: E731
+        out.append(f"{r['market'] or '?':<10} {f(r['bid'], '>14.6f')} {f(r['ask'], '>14.6f')} {f(r['spread_bps'], '>11.2f')} "
+                   f"{f(r['bid_depth_usd'], '>13,.0f')} {f(r['ask_depth_usd'], '>13,.0f')} {f(r['last_price'], '>14.6f')} "
+                   f"{f(r['ms'], '>7.1f')}" + (f"  {r['error']}" if r["error"] else ""))
+    return "\n".join(out)
+
+
+async def run(network="testnet", markets=(), depth=10, out=None, rps=8.0, concurrency=16, log=None):
+    env_file = MAINNET_ENV if network=="mainnet" else TESTNET_ENV
+    cfg = load_cfg(env_file)
+    snap = Snapshotter(SimpleNamespace(url=cfg.base_url), rps=rps, concurrency=concurrency)
+    try:
+        rows, info = await snap.scan(markets, depth)
+    finally:
+        await rest.close_sessions()
+    rows.sort(key=lambda r: -(r["daily_volume_usd"] or 0))
+    print(render(rows))
+    print(f"\n{info['markets']} markets in {info['wall_ms']:.0f} ms "
+          f"({info['requests']} requests, {info['throttled']} throttled, {info['errors']} errors)")
+    if out:
+        write(rows, info, out)
+    if log:
+        log.info("Snapshot done", out=out, **info)
+    return rows, info
@@ -0,0 +1,112 @@
+# live bar strategies: stream -> Strategy hooks -> market orders toward the target
+import asyncio, time
+from dataclasses import asdict, fields
+from typing import Dict
+from pydantic import TypeAdapter
+from packages.config.env import load_cfg
+from packages.config.constants import TESTNET_ENV, MAINNET_ENV
+from packages.config.service import ConfigError, ConfigService, load_yaml
+from packages.lighter_sdk_adapter.signer import make_signer
+from packages.lighter_sdk_adapter.ws import subscribe_stream
+from packages.execution.exchange_impl import LighterExchange
+from packages.strategies.base import Fill, Strategy
+from packages.strategies.breakout_retest import BreakoutRetest, BRConfig
+from packages.strategies.range_fade import RangeFade, RFConfig
+
+STRATEGIES = {
+    "breakout_retest": (BreakoutRetest, BRConfig),
+    "range_fade": (RangeFade, RFConfig),
+}
+
+# sized at construction (bar clock, indicator windows): a change here needs a restart
+RESTART_FIELDS = ("interval_sec", "lookback", "atr_len", "trend_len")
+
+def parse_strategy_cfg(data: dict) -> Dict[str, object]:
+    """{strategy name: validated, frozen config dataclass} for the sections naming a known strategy."""
+    out = {}
+    for name, (_, cfg_cls) in STRATEGIES.items():
+        params = data.get(name) or {}
+        unknown = set(params) - {f.name for f in fields(cfg_cls)}
+        if unknown:
+            raise ConfigError(f"{name}: unknown field(s) {', '.join(sorted(unknown))}")
+        out[name] = TypeAdapter(cfg_cls).validate_python(params)
+    return out
+
+def load_strategy_cfg(path="configs/strategy.example.yml"):
+    return load_yaml(path)
+
+def build_strategy(name: str, params) -> Strategy:
+    if name not in STRATEGIES:
+        raise ValueError(f"unknown strategy {name!r} (one of {', '.join(sorted(STRATEGIES))})")
+    cls, cfg_cls = STRATEGIES[name]
+    if isinstance(params, cfg_cls):
+        return cls(params)
+    names = {f.name for f in fields(cfg_cls)}
+    return cls(cfg_cls(**{k: v for k, v in (params or {}).items() if k in names}))
+
+async def rebalance(strategy: Strategy, exchange, market: str, log) -> None:
+    """Market order for target - position. Market orders are treated as filled at the
+    current mid (or last print); the fill is reported back through on_fill."""
+    delta = strategy.target - strategy.position
+    if abs(delta) < 1e-12:
+        return
+    side = "BUY" if delta > 0 else "SELL"
+    px = strategy.book.mid() or strategy.last_px
+    await exchange.place_market(market, side, abs(delta), tag={"strategy": strategy.name})
+    strategy.on_fill(Fill(time.time(), 1 if delta > 0 else -1, abs(delta), px or 0.0))
+    log.info("Strategy rebalanced", market=market, side=side, qty=abs(delta), px=px, **strategy.state())
+
+async def run(network="testnet", name="breakout_retest", market="ETH", config_path="configs/strategy.example.yml",
+              log=None, timer_sec=1.0):
+    env_file = MAINNET_ENV if network=="mainnet" else TESTNET_ENV
+    cfg = load_cfg(env_file)
+    if name not in STRATEGIES:
+        raise ValueError(f"unknown strategy {name!r} (one of {', '.join(sorted(STRATEGIES))})")
+    cfgs = ConfigService(log)
+    strategy = build_strategy(name, cfgs.register("strategy", config_path, parse_strategy_cfg)[name])
+
+    def on_cfg(new, old):
+        cur, nxt = asdict(strategy.cfg), asdict(new[name])
+        if cur == nxt:
+            return
+        held = [k for k in RESTART_FIELDS if k in cur and cur[k] != nxt[k]]
+        if held:
+            log.warn("Strategy config change needs a restart, keeping current", name=name, fields=held)
+            return
+        strategy.cfg = new[name]  # thresholds / size / stops: read on every bar
+        log.info("Strategy config swapped", name=name, params=nxt)
+
+    cfgs.subscribe("strategy", on_cfg)
+    client = make_signer(cfg.base_url, cfg.account_index, cfg.api_key_index, cfg.api_pk, cfg.eth_pk)
+    exchange = LighterExchange(client, cfg.account_index)
+    market_id = await exchange.resolve_market_id(market)
+    if market_id is None:
+        raise ValueError(f"Could not resolve market ID for {market}")
+    log.info("Strategy starting", name=name, market=market, market_id=market_id, params=vars(strategy.cfg))
+
+    stop, wake = asyncio.Event(), asyncio.Event()
+
+    def on_msg(msg):
+        strategy.on_stream(msg, time.time())
+        if strategy.target != strategy.position:
+            wake.set()
+
+    feed = asyncio.create_task(subscribe_stream(cfg.base_url, [f"order_book/{market_id}", f"trade/{market_id}"],
+                                                on_msg, stop=stop))
+    reloader = asyncio.create_task(cfgs.watch(stop))
+    try:
+        while True:
+            try:
+                await asyncio.wait_for(wake.wait(), timeout=timer_sec)
+            except asyncio.TimeoutError:
+                pass
+            wake.clear()
+            strategy.on_timer(time.time())  # closes a bar even when its interval had no later print
+            try:
+                await rebalance(strategy, exchange, market, log)
+            except Exception as e:
+                log.warn("Strategy order failed", market=market, err=str(e))
+    finally:
+        stop.set()
+        feed.cancel()
+        reloader.cancel()
@@ -0,0 +1,134 @@
+# event-driven replay of recorded book/trade messages through quote strategies
+import math
+from dataclasses import asdict, fields
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from packages.data.loaders import Recording
+from packages.strategies.micro_spread_pulse import MicroSpreadPulseBot, MSPConfig
+from packages.utils.ratelimit import TokenBucket
+
+from .fills import FillModel, SimBroker
+
+
+def run_sync(coro) -> Any:
+    """Drive a strategy coroutine whose awaits all complete immediately (SimBroker)."""
+    try:
+        coro.send(None)
+    except StopIteration as e:
+        return e.value
+    coro.close()
+    raise RuntimeError("strategy awaited real I/O inside a backtest")
+
+
+def stream_messages(rec: Recording, market_id: int, start_ns: Optional[int] = None,
+                    end_ns: Optional[int] = None) -> Iterator[Tuple[int, dict]]:
+    """Recorded rows turned back into /stream-shaped messages, in receive order."""
+    book_ch, trade_ch = f"order_book:{market_id}", f"trade:{market_id}"
+    seq, ts, snap, msg = None, 0, False, None
+    for recv_ns, kind, row in rec.events(("book", "trade"), [market_id], start_ns, end_ns):
+        if kind == "book" and row["msg_seq"] == seq:
+            if row["size"] > 0 or not snap:
+                msg["asks" if row["is_ask"] else "bids"].append((row["price"], row["size"]))
+            continue
+        if msg is not None:
+            yield ts, {"type": ("subscribed" if snap else "update") + "/order_book", "channel": book_ch,
+                       "order_book": msg}
+            msg = None
+        if kind == "book":
+            seq, ts, snap = row["msg_seq"], recv_ns, row["is_snapshot"]
+            msg = {"bids": [], "asks": [], "offset": row["offset"]}
+            if row["size"] > 0 or not snap:
+                msg["asks" if row["is_ask"] else "bids"].append((row["price"], row["size"]))
+        else:
+            seq = None
+            yield recv_ns, {"type": "update/trade", "channel": trade_ch, "trades": [{
+                "price": row["price"], "size": row["size"], "is_maker_ask": row["taker_buy"],
+                "timestamp": row["ts_ms"] or recv_ns // 1_000_000, "trade_id": row["trade_id"]}]}
+    if msg is not None:
+        yield ts, {"type": ("subscribed" if snap else "update") + "/order_book", "channel": book_ch,
+                   "order_book": msg}
+
+
+def backtest_mm(rec: Recording, market_id: int, cfg: Optional[MSPConfig] = None,
+                model: Optional[FillModel] = None, mode: str = "events",
+                start_ns: Optional[int] = None, end_ns: Optional[int] = None) -> Dict[str, Any]:
+    """Replay one market through MicroSpreadPulseBot.
+
+    mode="events" mirrors run_events (requote on mid move / fill, token bucket on the
+    simulated clock); mode="poll" mirrors run_mm (pulse every cooling_sec).
+    """
+    cfg = cfg or MSPConfig()
+    now = [0]
+    clock = lambda: now[0] / 1e9  # noqa: E731
+    symbol = rec.markets().get(market_id, {}).get("symbol") or str(market_id)
+    bot: MicroSpreadPulseBot
+
+    def on_fill(o, qty, px, maker):
+        bot.on_stream({"type": "update/account_all", "channel": "account_all:0",
+                       "trades": {str(market_id): [{"price": px, "size": qty}]}})
+
+    bot = MicroSpreadPulseBot(None, symbol, cfg)
+    broker = SimBroker(bot.book, model, on_fill=on_fill)
+    bot.exchange = broker
+    bot.market_id = market_id
+    bot.features.clock = clock
+    bucket = TokenBucket(cfg.max_requotes_per_sec, cfg.requote_burst, clock=clock)
+    next_pulse = None
+    requotes = 0
+    peak, max_dd, first_ns, last_mid = 0.0, 0.0, None, None
+
+    for ts, msg in stream_messages(rec, market_id, start_ns, end_ns):
+        now[0] = ts
+        first_ns = first_ns or ts
+        broker.advance(ts)
+        bot.on_stream(msg)
+        if msg["type"].endswith("/order_book"):
+            broker.on_book()
+        else:
+            t = msg["trades"][0]
+            broker.on_trade(t["price"], t["size"], bool(t["is_maker_ask"]))
+        mid = bot.book.mid()
+        if mid is None:
+            continue
+        last_mid = mid
+
+        if mode == "poll":
+            if next_pulse is None or ts >= next_pulse:
+                next_pulse = ts + int(cfg.cooling_sec * 1e9)
+                if run_sync(bot.pulse()) is not None:
+                    requotes += 1
+        elif bot.active_cycles < cfg.max_active_cycles and bucket.wait_time() == 0.0:
+            if bot.requote_reason() is not None and bucket.try_acquire():
+                run_sync(bot.requote(mid))
+                requotes += 1
+        elif bot.active_cycles >= cfg.max_active_cycles and bot.live_quotes:
+            run_sync(bot.withdraw_quotes())
+
+        eq = broker.equity(mid)
+        peak = max(peak, eq)
+        max_dd = max(max_dd, peak - eq)
+
+    s = broker.stats
+    span = ((now[0] - first_ns) / 1e9) if first_ns else 0.0
+    return {
+        "market_id": market_id, "mode": mode, "params": asdict(cfg), "model": asdict(model or broker.model),
+        "pnl": broker.equity(last_mid), "fees": s.fees, "position": broker.position,
+        "fills": s.fills, "maker_volume": s.maker_volume, "taker_volume": s.taker_volume,
+        "orders": s.orders, "cancels": s.cancels, "requotes": requotes,
+        "max_abs_position": s.max_abs_position, "max_drawdown": max_dd, "duration_sec": span,
+    }
+
+
+_MSP_FIELDS = {f.name for f in fields(MSPConfig)}
+_MODEL_FIELDS = {f.name for f in fields(FillModel)}
+
+
+def mm_trial(root: str, market_id: int, params: Dict[str, Any], mode: str = "events",
+             start_ns: Optional[int] = None, end_ns: Optional[int] = None) -> Dict[str, Any]:
+    """Picklable sweep entry point: each worker memory-maps the recording itself."""
+    cfg = MSPConfig(**{k: v for k, v in params.items() if k in _MSP_FIELDS})
+    model = FillModel(**{k: v for k, v in params.items() if k in _MODEL_FIELDS})
+    res = backtest_mm(Recording(root), market_id, cfg, model, mode, start_ns, end_ns)
+    res["pnl_per_fill"] = res["pnl"] / res["fills"] if res["fills"] else 0.0
+    res["score"] = res["pnl"] - 0.5 * res["max_drawdown"] if math.isfinite(res["pnl"]) else float("-inf")
+    return res
@@ -0,0 +1,160 @@
+# simulated broker: latency, queue position and fees against a replayed book
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from packages.data.book import LocalBook
+
+
+@dataclass
+class FillModel:
+    maker_fee: float = 0.0      # fraction of notional
+    taker_fee: float = 0.0002
+    latency_ms: float = 50.0    # order / cancel -> venue
+    queue: bool = True          # False: rest at the front of the level (fill on touch)
+
+
+@dataclass
+class SimOrder:
+    coi: int
+    is_ask: bool
+    price: float
+    size: float
+    active_ns: int
+    remaining: float = 0.0
+    queue_ahead: Optional[float] = None  # None until the order reaches the venue
+    cancel_ns: Optional[int] = None
+
+
+@dataclass
+class BrokerStats:
+    fills: int = 0
+    maker_volume: float = 0.0
+    taker_volume: float = 0.0
+    fees: float = 0.0
+    orders: int = 0
+    cancels: int = 0
+    max_abs_position: float = 0.0
+    log: List[Tuple[int, int, float, float, bool]] = field(default_factory=list)  # ns, side, qty, px, maker
+
+
+class SimBroker:
+    """Stands in for LighterExchange (cancel_replace / get_spread) inside a replay.
+
+    Orders and cancels reach the venue `latency_ms` after they are sent, so a quote being
+    cancelled can still fill. A resting order joins the back of its level (queue_ahead =
+    level size on arrival); prints at its price eat the queue first, prints through it
+    fill it, and level shrinkage without prints is assumed to come from ahead of us.
+    Our fills do not remove liquidity from the replayed book.
+    """
+
+    def __init__(self, book: LocalBook, model: Optional[FillModel] = None,
+                 on_fill: Optional[Callable[[SimOrder, float, float, bool], None]] = None):
+        self.book = book
+        self.model = model or FillModel()
+        self.on_fill = on_fill
+        self.now_ns = 0
+        self.orders: Dict[int, SimOrder] = {}
+        self.position = 0.0
+        self.cash = 0.0
+        self.stats = BrokerStats()
+        self._next = 1
+
+    # --- exchange port used by strategies ---
+    async def cancel_replace(self, market: str, cancel_indices: List[int], quotes: List[dict]) -> dict:
+        arrive = self.now_ns + int(self.model.latency_ms * 1e6)
+        for coi in cancel_indices:
+            o = self.orders.get(int(coi))
+            if o is not None and o.cancel_ns is None:
+                o.cancel_ns = arrive
+                self.stats.cancels += 1
+        placed = []
+        for q in quotes:
+            coi = self._next
+            self._next += 1
+            size = float(q["base_amount"])
+            self.orders[coi] = SimOrder(coi, q["side"] == "SELL", float(q["price"]), size, arrive, size)
+            self.stats.orders += 1
+            placed.append(coi)
+        return {"placed": placed, "cancelled": [int(i) for i in cancel_indices], "result": None}
+
+    async def get_spread(self, market: str):
+        bid, ask = self.book.best_bid, self.book.best_ask
+        return bid, ask, (ask - bid) if bid is not None and ask is not None else None
+
+    # --- replay hooks ---
+    def advance(self, now_ns: int) -> None:
+        """Apply cancels/arrivals that are due by now_ns (in time order)."""
+        self.now_ns = now_ns
+        due = [o for o in self.orders.values()
+               if (o.cancel_ns is not None and o.cancel_ns <= now_ns) or (o.queue_ahead is None and o.active_ns <= now_ns)]
+        for o in sorted(due, key=lambda o: min(o.active_ns, o.cancel_ns or o.active_ns)):
+            if o.queue_ahead is None and o.active_ns <= now_ns and (o.cancel_ns is None or o.active_ns < o.cancel_ns):
+                self._arrive(o)
+            if o.cancel_ns is not None and o.cancel_ns <= now_ns:
+                self.orders.pop(o.coi, None)
+
+    def _arrive(self, o: SimOrder) -> None:
+        opp = self.book.bids if o.is_ask else self.book.asks
+        best = self.book.best_bid if o.is_ask else self.book.best_ask
+        if best is not None and (o.price <= best if o.is_ask else o.price >= best):
+            # marketable: take liquidity level by level up to our limit
+            for px in sorted(opp, reverse=o.is_ask):
+                beyond = px < o.price if o.is_ask else px > o.price
+                if beyond or o.remaining <= 0:
+                    break
+                self._fill(o, min(o.remaining, opp[px]), px, maker=False)
+            if o.remaining <= 0:
+                return
+        side = self.book.asks if o.is_ask else self.book.bids
+        o.queue_ahead = side.get(o.price, 0.0) if self.model.queue else 0.0
+
+    def on_book(self) -> None:
+        """After a book message: shrink queues to the level size; fill orders the book crossed."""
+        bb, ba = self.book.best_bid, self.book.best_ask
+        for o in list(self.orders.values()):
+            if o.queue_ahead is None:
+                continue
+            if (o.is_ask and bb is not None and bb > o.price) or (not o.is_ask and ba is not None and ba < o.price):
+                self._fill(o, o.remaining, o.price, maker=True)
+                continue
+            lvl = (self.book.asks if o.is_ask else self.book.bids).get(o.price, 0.0)
+            if o.queue_ahead > lvl:
+                o.queue_ahead = lvl
+
+    def on_trade(self, price: float, size: float, taker_buy: bool) -> None:
+        for o in list(self.orders.values()):
+            if o.queue_ahead is None or o.is_ask != taker_buy:
+                continue  # taker buys hit asks, taker sells hit bids
+            through = price > o.price if o.is_ask else price < o.price
+            if through:
+                self._fill(o, o.remaining, o.price, maker=True)
+            elif price == o.price:
+                left = size - o.queue_ahead
+                o.queue_ahead = max(0.0, -left)
+                if left > 0:
+                    self._fill(o, min(left, o.remaining), o.price, maker=True)
+
+    def _fill(self, o: SimOrder, qty: float, px: float, maker: bool) -> None:
+        if qty <= 0:
+            return
+        o.remaining -= qty
+        signed = -qty if o.is_ask else qty
+        fee = (self.model.maker_fee if maker else self.model.taker_fee) * qty * px
+        self.position += signed
+        self.cash -= signed * px + fee
+        s = self.stats
+        s.fills += 1
+        s.fees += fee
+        if maker:
+            s.maker_volume += qty * px
+        else:
+            s.taker_volume += qty * px
+        s.max_abs_position = max(s.max_abs_position, abs(self.position))
+        s.log.append((self.now_ns, -1 if o.is_ask else 1, qty, px, maker))
+        if o.remaining <= 1e-12:
+            self.orders.pop(o.coi, None)
+        if self.on_fill:
+            self.on_fill(o, qty, px, maker)
+
+    def equity(self, mark: Optional[float]) -> float:
+        return self.cash + (self.position * mark if mark is not None else 0.0)
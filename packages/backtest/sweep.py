@@ -0,0 +1,33 @@
+# parameter sweeps across CPU cores
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+def grid(axes: Dict[str, Iterable[Any]]) -> List[Dict[str, Any]]:
+    """Cartesian product: {"spread": [.002, .003], "requote_bps": [2, 5]} -> 4 param dicts."""
+    keys = list(axes)
+    return [dict(zip(keys, combo)) for combo in itertools.product(*(list(axes[k]) for k in keys))]
+
+
+def _call(fn: Callable[..., Dict[str, Any]], kwargs: Dict[str, Any], params: Dict[str, Any]):
+    return params, fn(params=params, **kwargs)
+
+
+def sweep(fn: Callable[..., Dict[str, Any]], points: List[Dict[str, Any]], processes: Optional[int] = None,
+          sort_by: Optional[str] = "score", **kwargs) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """Run `fn(params=p, **kwargs)` for every point in a process pool (fn must be a module-level
+    function). Workers open their own memory-mapped recording, so the data is shared through
+    the page cache rather than pickled."""
+    processes = processes or os.cpu_count() or 1
+    call = partial(_call, fn, kwargs)
+    if processes == 1 or len(points) == 1:
+        results = [call(p) for p in points]
+    else:
+        with ProcessPoolExecutor(max_workers=min(processes, len(points))) as pool:
+            results = list(pool.map(call, points))
+    if sort_by:
+        results.sort(key=lambda r: r[1].get(sort_by, float("-inf")), reverse=True)
+    return results
@@ -0,0 +1,134 @@
+# vectorized (numpy) backtests: bar strategies and copy-trading rules
+import math
+from typing import Any, Callable, Dict, Optional
+
+try:  # optional dependency: pip install numpy
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+Bars = Dict[str, Any]  # {"t", "open", "high", "low", "close", "volume", "trades"} arrays + "interval_sec"
+
+
+def bars_from_trades(ts_ns, price, size, interval_sec: float) -> Bars:
+    """OHLCV bars from a trade tape (sorted by ts). Intervals without prints are skipped."""
+    ts_ns, price, size = np.asarray(ts_ns), np.asarray(price, dtype=float), np.asarray(size, dtype=float)
+    if not len(ts_ns):
+        empty = np.empty(0)
+        return {"t": empty.astype(np.int64), "open": empty, "high": empty, "low": empty, "close": empty,
+                "volume": empty, "trades": empty.astype(np.int64), "interval_sec": interval_sec}
+    bucket = ts_ns // int(interval_sec * 1e9)
+    starts = np.r_[0, np.flatnonzero(np.diff(bucket)) + 1]
+    ends = np.r_[starts[1:], len(ts_ns)]
+    return {
+        "t": bucket[starts] * int(interval_sec * 1e9),
+        "open": price[starts], "close": price[ends - 1],
+        "high": np.maximum.reduceat(price, starts), "low": np.minimum.reduceat(price, starts),
+        "volume": np.add.reduceat(size, starts), "trades": ends - starts,
+        "interval_sec": interval_sec,
+    }
+
+
+def run_vectorized(bars: Bars, positions, fee_bps: float = 2.0, slippage_bps: float = 1.0,
+                   latency_bars: int = 1) -> Dict[str, float]:
+    """Mark-to-close backtest of a target-position series (base units, one per bar).
+
+    The position decided on bar i is held from bar i + latency_bars; every change pays
+    fee + slippage on its notional at that bar's close.
+    """
+    close = np.asarray(bars["close"], dtype=float)
+    pos = np.asarray(positions, dtype=float)
+    n = len(close)
+    if n < 2:
+        return {"pnl": 0.0, "fees": 0.0, "trades": 0, "turnover": 0.0, "max_drawdown": 0.0, "sharpe": 0.0,
+                "exposure": 0.0, "bars": n}
+    held = np.zeros(n)
+    if latency_bars < n:
+        held[latency_bars:] = pos[:n - latency_bars]
+    dq = np.abs(np.diff(held, prepend=0.0))
+    cost = dq * close * (fee_bps + slippage_bps) / 1e4
+    pnl = np.zeros(n)
+    pnl[1:] = held[:-1] * np.diff(close)
+    pnl -= cost
+    equity = np.cumsum(pnl)
+    dd = np.maximum.accumulate(np.maximum(equity, 0.0)) - equity
+    sd = pnl.std()
+    per_year = math.sqrt(365 * 86400 / float(bars.get("interval_sec") or 60))
+    return {
+        "pnl": float(equity[-1]), "fees": float(cost.sum()), "trades": int(np.count_nonzero(dq)),
+        "turnover": float((dq * close).sum()), "max_drawdown": float(dd.max()),
+        "sharpe": float(pnl.mean() / sd * per_year) if sd > 0 else 0.0,
+        "exposure": float(np.count_nonzero(held) / n), "bars": n,
+    }
+
+
+def backtest_bars(bars: Bars, strategy: Callable[..., Any], params: Optional[dict] = None,
+                  fee_bps: float = 2.0, slippage_bps: float = 1.0, latency_bars: int = 1) -> Dict[str, float]:
+    """`strategy(bars, **params)` returns a target-position array aligned with the bars."""
+    return run_vectorized(bars, strategy(bars, **(params or {})), fee_bps, slippage_bps, latency_bars)
+
+
+def backtest_copy(sig_ts_ns, sig_side, sig_size, tape_ts_ns, tape_px, sig_px=None,
+                  copy_param: float = 1.0, slippage_bps: float = 20.0, latency_ms: float = 250.0,
+                  fee_bps: float = 2.0) -> Dict[str, float]:
+    """Follow one market's leader fills through a price tape.
+
+    Each signal (side +1/-1, leader size) executes `latency_ms` later at the tape price,
+    scaled by `copy_param`, and is skipped when that is worse than the leader's price
+    (or the tape at signal time) by more than `slippage_bps` -- the copy slippage guard.
+    """
+    ts, side = np.asarray(sig_ts_ns, dtype=np.int64), np.asarray(sig_side, dtype=float)
+    size = np.asarray(sig_size, dtype=float)
+    tts, tpx = np.asarray(tape_ts_ns, dtype=np.int64), np.asarray(tape_px, dtype=float)
+    if not len(ts) or not len(tpx):
+        return {"pnl": 0.0, "fees": 0.0, "copied": 0, "skipped": int(len(ts)), "avg_slippage_bps": 0.0,
+                "position": 0.0}
+    at = np.clip(np.searchsorted(tts, ts, "right") - 1, 0, len(tpx) - 1)
+    ref = np.asarray(sig_px, dtype=float) if sig_px is not None else tpx[at]
+    ref = np.where(np.isfinite(ref) & (ref > 0), ref, tpx[at])
+    ex = np.clip(np.searchsorted(tts, ts + int(latency_ms * 1e6), "right") - 1, 0, len(tpx) - 1)
+    px = tpx[ex]
+    slip = (px - ref) / ref * 1e4 * side  # adverse slippage is positive
+    take = slip <= slippage_bps
+    qty = np.where(take, side * size * copy_param, 0.0)
+    fees = np.abs(qty) * px * fee_bps / 1e4
+    position = qty.sum()
+    pnl = -(qty * px).sum() - fees.sum() + position * tpx[-1]
+    return {"pnl": float(pnl), "fees": float(fees.sum()), "copied": int(take.sum()), "skipped": int((~take).sum()),
+            "avg_slippage_bps": float(slip[take].mean()) if take.any() else 0.0, "position": float(position)}
+
+
+def sweep_copy(signals_by_market: Dict[int, Dict[str, Any]], tapes: Dict[int, Dict[str, Any]],
+               params: Dict[str, Any]) -> Dict[str, float]:
+    """Sum backtest_copy over markets for one parameter set."""
+    tot = {"pnl": 0.0, "fees": 0.0, "copied": 0, "skipped": 0}
+    for mid, sig in signals_by_market.items():
+        tape = tapes.get(mid)
+        if tape is None:
+            tot["skipped"] += len(sig["ts"])
+            continue
+        r = backtest_copy(sig["ts"], sig["side"], sig["size"], tape["ts"], tape["price"], sig.get("price"),
+                          **params)
+        for k in tot:
+            tot[k] += r[k]
+    tot["score"] = tot["pnl"]
+    return tot
+
+
+def load_strategy(spec: str) -> Callable[..., Any]:
+    """"package.module:function" -> callable."""
+    import importlib
+    mod, _, name = spec.partition(":")
+    return getattr(importlib.import_module(mod), name)
+
+
+def bars_trial(root: str, market_id: int, interval_sec: float, strategy: str, params: Dict[str, Any],
+               fee_bps: float = 2.0, slippage_bps: float = 1.0, latency_bars: int = 1,
+               start_ns: Optional[int] = None, end_ns: Optional[int] = None) -> Dict[str, float]:
+    """Picklable sweep entry point for bar strategies over a recording's trade tape."""
+    from packages.data.loaders import Recording
+    tape = Recording(root).arrays("trade", ["recv_ns", "price", "size"], [market_id], start_ns, end_ns)
+    bars = bars_from_trades(tape["recv_ns"], tape["price"], tape["size"], interval_sec)
+    res = backtest_bars(bars, load_strategy(strategy), params, fee_bps, slippage_bps, latency_bars)
+    res["score"] = res["sharpe"]
+    return res
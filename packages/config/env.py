@@ -1,5 +1,6 @@
 # config environment
 import os
+from typing import Dict, Tuple
 from dotenv import load_dotenv
 from pydantic import BaseModel
 
@@ -14,9 +15,14 @@ class Cfg(BaseModel):
     risk_lev_cap: float
     max_concurrent: int
 
+_LOADED = {}
+
 def load_cfg(env_file: str) -> Cfg:
+    # keys and endpoints: read once per process (not hot-reloaded, unlike packages/config/service.py)
+    if env_file in _LOADED:
+        return _LOADED[env_file]
     load_dotenv(env_file)
-    return Cfg(
+    cfg = _LOADED[env_file] = Cfg(
         base_url=os.environ["BASE_URL"],
         account_index=int(os.environ["ACCOUNT_INDEX"]),
         api_key_index=int(os.environ["API_KEY_INDEX"]),
@@ -27,3 +33,47 @@ def load_cfg(env_file: str) -> Cfg:
         risk_lev_cap=float(os.environ.get("RISK_LEVERAGE_CAP","5")),
         max_concurrent=int(os.environ.get("MAX_CONCURRENT_POS","2")),
     )
+    return cfg
+
+PRIMARY = "main"
+
+def load_accounts(env_file: str) -> Dict[str, Cfg]:
+    """name -> Cfg for every account in the env file: the unprefixed one as "main", plus each name in
+    ACCOUNTS=sub1,sub2 read from SUB1_ACCOUNT_INDEX / SUB1_API_KEY_INDEX / SUB1_API_KEY_PRIVATE_KEY
+    (SUB1_ETH_PRIVATE_KEY, SUB1_RISK_* and SUB1_MAX_CONCURRENT_POS fall back to the main account's)."""
+    main = load_cfg(env_file)
+    out = {PRIMARY: main}
+    for name in filter(None, (n.strip().lower() for n in os.environ.get("ACCOUNTS", "").split(","))):
+        p = name.upper() + "_"
+        get = lambda k, default=None: os.environ.get(p + k, default)  # noqa: E731
+        try:
+            out[name] = main.model_copy(update=dict(
+                account_index=int(os.environ[p + "ACCOUNT_INDEX"]),
+                api_key_index=int(os.environ[p + "API_KEY_INDEX"]),
+                api_pk=os.environ[p + "API_KEY_PRIVATE_KEY"],
+                eth_pk=get("ETH_PRIVATE_KEY", main.eth_pk),
+                risk_max_risk_pct=float(get("RISK_MAX_RISK_PCT", main.risk_max_risk_pct)),
+                risk_daily_dd_stop=float(get("RISK_DAILY_DD_STOP", main.risk_daily_dd_stop)),
+                risk_lev_cap=float(get("RISK_LEVERAGE_CAP", main.risk_lev_cap)),
+                max_concurrent=int(get("MAX_CONCURRENT_POS", main.max_concurrent)),
+            ))
+        except KeyError as e:
+            raise ValueError(f"account {name!r}: {e.args[0]} is not set in {env_file}") from e
+    # one process, one native signer: it keeps a client per api key index, so two accounts can't share one
+    seen: Dict[Tuple[str, int], str] = {}
+    for name, c in out.items():
+        for key in (("account_index", c.account_index), ("api_key_index", c.api_key_index)):
+            if key in seen:
+                raise ValueError(f"accounts {seen[key]!r} and {name!r} share {key[0]}={key[1]}")
+            seen[key] = name
+    return out
+
+def select_accounts(accounts: Dict[str, Cfg], spec: str) -> Dict[str, Cfg]:
+    """--accounts: "all" or a comma list of names."""
+    if spec.strip().lower() == "all":
+        return accounts
+    names = [n.strip().lower() for n in spec.split(",") if n.strip()]
+    unknown = [n for n in names if n not in accounts]
+    if unknown:
+        raise ValueError(f"unknown account(s) {unknown}; configured: {sorted(accounts)}")
+    return {n: accounts[n] for n in names}
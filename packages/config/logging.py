@@ -1,10 +1,213 @@
-# config logging
-import structlog, sys
-def setup_logging():
+# config logging: structlog JSON lines, queued on the caller and written in batches by a background thread
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import structlog
+
+from packages.lighter_sdk_adapter import codec
+from packages.telemetry import metrics
+
+_STOP = object()
+
+
+class LogWriter:
+    """Background writer: `put()` is a queue append on the caller's thread (the event loop);
+    a daemon thread drains whatever has accumulated and writes it with one write + flush,
+    so a slow or blocked stdout never stalls the loop. Past `max_pending` queued lines new
+    ones are dropped and counted (reported in the next batch) instead of growing memory."""
+
+    def __init__(self, stream=None, max_batch: int = 512, max_pending: int = 100_000):
+        self.stream = stream or sys.stdout
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.dropped = 0
+        self._q: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+        metrics.gauge_fn("aegon_log_queue_depth", self._q.qsize, "Log lines waiting for the writer thread.")
+
+    def put(self, line: bytes) -> None:
+        if self._q.qsize() >= self.max_pending:
+            self.dropped += 1
+            return
+        self._q.put(line)
+
+    def _run(self) -> None:
+        get, get_nowait = self._q.get, self._q.get_nowait
+        while True:
+            item = get()
+            batch = []
+            while item is not _STOP:
+                batch.append(item)
+                if len(batch) >= self.max_batch:
+                    break
+                try:
+                    item = get_nowait()
+                except queue.Empty:
+                    break
+            if self.dropped:
+                n, self.dropped = self.dropped, 0
+                batch.append(codec.dumpb({"event": "Log lines dropped", "dropped": n, "level": "warning"}))
+            if batch:
+                _write(self.stream, b"\n".join(batch) + b"\n")
+            if item is _STOP:
+                return
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Write out everything queued so far (runs at exit)."""
+        if self._thread.is_alive():
+            self._q.put(_STOP)
+            self._thread.join(timeout)
+
+
+class DirectWriter:
+    """Writes each line on the caller's thread (AEGON_LOG_SYNC=1)."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def put(self, line: bytes) -> None:
+        _write(self.stream, line + b"\n")
+
+
+def _write(stream, data: bytes) -> None:
+    try:
+        out = getattr(stream, "buffer", None)
+        if out is not None:
+            out.write(data)
+        else:
+            stream.write(data.decode())
+        stream.flush()
+    except (OSError, ValueError):
+        pass  # closed / broken stdout: nothing to report it to
+
+
+class QueueLogger:
+    """structlog logger whose every method hands the rendered line to a writer."""
+
+    def __init__(self, writer):
+        self._put = writer.put
+
+    def msg(self, message) -> None:
+        self._put(message if isinstance(message, bytes) else message.encode())
+
+    log = debug = info = warn = warning = err = error = critical = exception = fatal = msg
+
+
+class Throttle:
+    """structlog processor: per-event sampling and rate limits for high-frequency events.
+
+    `sample` keeps every Nth occurrence of an event (rate 0.1 -> 1 in 10; 0 drops it);
+    `rate` allows at most N per second (burst of N). The next line that gets through
+    carries `suppressed=<count>` so the volume is still visible.
+    """
+
+    def __init__(self, sample: Optional[Dict[str, float]] = None, rate: Optional[Dict[str, float]] = None,
+                 clock=time.monotonic):
+        self.clock = clock
+        self.every = {ev: (round(1 / r) if r > 0 else 0) for ev, r in (sample or {}).items()}
+        self.rate = dict(rate or {})
+        self._seen: Dict[str, int] = {}
+        self._buckets: Dict[str, Tuple[float, float]] = {}  # event -> (tokens, last refill)
+        self._suppressed: Dict[str, int] = {}
+
+    def __call__(self, logger, method_name: str, event_dict: dict) -> dict:
+        ev = event_dict.get("event")
+        if ev not in self.every and ev not in self.rate:
+            return event_dict
+        if not self._allow(ev):
+            self._suppressed[ev] = self._suppressed.get(ev, 0) + 1
+            raise structlog.DropEvent
+        n = self._suppressed.pop(ev, 0)
+        if n:
+            event_dict["suppressed"] = n
+        return event_dict
+
+    def _allow(self, ev: str) -> bool:
+        every = self.every.get(ev)
+        if every is not None:
+            if every == 0:
+                return False
+            seen = self._seen[ev] = self._seen.get(ev, 0) + 1
+            if (seen - 1) % every:
+                return False
+        rate = self.rate.get(ev)
+        if rate is not None:
+            now = self.clock()
+            tokens, ts = self._buckets.get(ev, (rate, now))
+            tokens = min(rate, tokens + (now - ts) * rate)
+            if tokens < 1.0:
+                self._buckets[ev] = (tokens, now)
+                return False
+            self._buckets[ev] = (tokens - 1.0, now)
+        return True
+
+
+def _str_keys(obj):
+    if isinstance(obj, dict):
+        return {str(k): _str_keys(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_str_keys(v) for v in obj]
+    return obj
+
+
+def render(obj, **kw) -> bytes:
+    """JSONRenderer serializer: codec.dumpb, or, for what it rejects (tuple keys, overflowing
+    ints, ...), json with every key and unknown value as str. A log call never raises."""
+    try:
+        return codec.dumpb(obj)
+    except (TypeError, ValueError):
+        return json.dumps(_str_keys(obj), separators=(",", ":"), default=str).encode()
+
+
+def parse_rules(spec: str) -> Dict[str, float]:
+    """"Event A=0.1,Event B=5" -> {"Event A": 0.1, "Event B": 5.0}."""
+    out = {}
+    for part in filter(None, (p.strip() for p in (spec or "").split(","))):
+        ev, _, v = part.rpartition("=")
+        out[ev.strip()] = float(v)
+    return out
+
+
+# hot-loop events: one per requote / pulse (the MM pulse and sleep lines are at debug level)
+DEFAULT_RATE = {"Requoted": 5.0, "Pulse completed": 1.0, "Pulse completed with no result": 1.0}
+
+_WRITER: Optional[LogWriter] = None
+
+
+def setup_logging(level: Optional[str] = None, sample: Optional[Dict[str, float]] = None,
+                  rate: Optional[Dict[str, float]] = None, sync: Optional[bool] = None):
+    """JSON lines on stdout. Defaults from the environment:
+    AEGON_LOG_LEVEL (info; disabled levels are no-ops, processors never run),
+    AEGON_LOG_SAMPLE / AEGON_LOG_RATE ("event=value,..."; merged over DEFAULT_RATE),
+    AEGON_LOG_SYNC=1 to write on the caller's thread (the old behaviour)."""
+    global _WRITER
+    level = (level or os.environ.get("AEGON_LOG_LEVEL") or "info").upper()
+    sample = sample if sample is not None else parse_rules(os.environ.get("AEGON_LOG_SAMPLE", ""))
+    rate = rate if rate is not None else {**DEFAULT_RATE, **parse_rules(os.environ.get("AEGON_LOG_RATE", ""))}
+    if sync is None:
+        sync = os.environ.get("AEGON_LOG_SYNC", "") not in ("", "0")
+    processors = [structlog.processors.TimeStamper(fmt="iso"),
+                  structlog.processors.add_log_level,
+                  structlog.processors.JSONRenderer(serializer=render)]
+    if sample or rate:
+        processors.insert(0, Throttle(sample, rate))
+    if sync:
+        writer = DirectWriter()
+    else:
+        writer = _WRITER = _WRITER or LogWriter()
     structlog.configure(
-        processors=[structlog.processors.TimeStamper(fmt="iso"),
-                    structlog.processors.add_log_level,
-                    structlog.processors.JSONRenderer()],
-        logger_factory=structlog.PrintLoggerFactory(file=sys.stdout),
+        processors=processors,
+        wrapper_class=structlog.make_filtering_bound_logger(getattr(logging, level, logging.INFO)),
+        logger_factory=lambda *args: QueueLogger(writer),
+        cache_logger_on_first_use=True,
     )
-    return structlog.get_logger()
+    return structlog.get_logger().bind()  # the concrete logger: disabled levels are a bare no-op call
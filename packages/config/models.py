@@ -0,0 +1,97 @@
+# typed, immutable views of configs/copy.yml and configs/risk.yml (see packages/config/service.py)
+from typing import Dict, Mapping, Optional, Tuple
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class Frozen(BaseModel):
+    # unknown keys are typos until proven otherwise: reject them instead of silently using defaults
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+
+# --- copy.yml ---
+class Selection(Frozen):
+    min_equity_usdc: float = Field(50.0, ge=0)
+    min_trades_7d: int = Field(5, ge=0)
+    max_drawdown_30d_pct: float = Field(35.0, ge=0)
+
+
+class Leaderboard(Frozen):
+    refresh_sec: float = Field(30.0, gt=0)
+    lookback_blocks: int = Field(200, gt=0)
+    max_accounts: int = Field(100, gt=0)
+    rps: float = Field(1.0, gt=0)
+    follow_slots: int = Field(3, ge=0)
+    sort_by: str = "sharpe_30d"
+    selection: Selection = Selection()
+
+
+class CopyDefaults(Frozen):
+    copy_mode: str = "risk"
+    copy_param: float = Field(0.5, gt=0)
+    slippage_bps: float = Field(20.0, ge=0)
+    max_leverage: float = Field(5.0, gt=0)
+    max_positions: int = Field(3, ge=0)
+    markets_allow: Tuple[str, ...] = ()
+
+
+class Poll(Frozen):
+    interval_sec: float = Field(5.0, gt=0)
+    account_sync_sec: float = Field(30.0, gt=0)  # account snapshots -> in-memory risk state, off the order path
+
+
+class Alerts(Frozen):
+    type: str = "console"
+
+
+class CopyConfig(Frozen):
+    leaderboard: Leaderboard = Leaderboard()
+    copy_defaults: CopyDefaults = CopyDefaults()
+    poll: Poll = Poll()
+    alerts: Alerts = Alerts()
+
+    def leader(self, t: Mapping) -> dict:
+        """Leader dict for the poller / CopyEngine: scanner row + copy_defaults."""
+        return {"name": t["name"], "l1_address": t["l1_address"], "account_index": int(t["account_index"]),
+                **self.copy_defaults.model_dump(), "markets_allow": list(self.copy_defaults.markets_allow),
+                "enabled": True}
+
+
+# --- risk.yml ---
+class LimitOverrides(Frozen):
+    # None: keep the Cfg / RiskLimits default
+    max_leverage: Optional[float] = Field(None, gt=0)
+    max_concurrent: Optional[int] = Field(None, ge=0)
+    daily_dd_stop_pct: Optional[float] = Field(None, ge=0)
+    max_risk_pct: Optional[float] = Field(None, ge=0)
+    max_order_notional: Optional[float] = Field(None, ge=0)
+    max_market_notional: Optional[float] = Field(None, ge=0)
+    max_total_notional: Optional[float] = Field(None, ge=0)
+    max_open_orders: Optional[int] = Field(None, ge=0)
+    max_open_orders_per_market: Optional[int] = Field(None, ge=0)
+    price_band_bps: Optional[float] = Field(None, ge=0)
+
+
+class MarketOverrides(Frozen):
+    max_market_notional: Optional[float] = Field(None, ge=0)
+    max_open_orders_per_market: Optional[int] = Field(None, ge=0)
+
+
+class Watch(Frozen):
+    position_stop_pct: float = Field(5.0, ge=0)
+    liq_buffer_pct: float = Field(2.0, ge=0)
+    max_margin_usage: float = Field(0.8, gt=0)
+    close_all_on_daily_stop: bool = True
+    closeout_budget_ms: float = Field(250.0, gt=0)
+    retry_sec: float = Field(5.0, ge=0)
+
+
+class RiskConfig(Frozen):
+    limits: LimitOverrides = LimitOverrides()
+    markets: Dict[str, Optional[MarketOverrides]] = {}
+    watch: Watch = Watch()
+
+    def data(self) -> dict:
+        """risk.yml as RiskLimits.from_cfg reads it (unset fields dropped)."""
+        return {"limits": self.limits.model_dump(exclude_none=True),
+                "markets": {k: v.model_dump(exclude_none=True) if v else {} for k, v in self.markets.items()}}
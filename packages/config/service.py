@@ -0,0 +1,127 @@
+# config service: yaml files -> validated immutable snapshots, swapped in when a file changes on disk
+import asyncio
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import yaml
+from pydantic import ValidationError
+
+Parser = Callable[[dict], Any]
+Listener = Callable[[Any, Any], None]
+
+
+class ConfigError(ValueError):
+    """A config file that does not parse or validate."""
+
+
+class _Source:
+    __slots__ = ("path", "parse", "stamp", "snapshot", "version", "listeners")
+
+    def __init__(self, path: str, parse: Parser):
+        self.path = path
+        self.parse = parse
+        self.stamp: Optional[Tuple[int, int, int]] = None
+        self.snapshot: Any = None
+        self.version = 0
+        self.listeners: List[Listener] = []
+
+
+def load_yaml(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+    if not isinstance(data, dict):
+        raise ConfigError(f"{path}: expected a mapping at the top level")
+    return data
+
+
+def model(cls) -> Parser:
+    """Parser for a pydantic model (packages/config/models.py)."""
+    return cls.model_validate
+
+
+class ConfigService:
+    """Named config files, each parsed once per change into an immutable snapshot.
+
+    `get(name)` returns the current snapshot; a reload replaces it with one assignment, so a
+    caller that reads it once per tick/decision sees a consistent config. A file that fails
+    to parse or validate keeps the previous snapshot (logged) — except at `register`, where
+    the error is raised. Listeners run after each swap with (new, old).
+    """
+
+    def __init__(self, log=None, interval_sec: float = 2.0):
+        self.log = log
+        self.interval_sec = interval_sec
+        self._sources: Dict[str, _Source] = {}
+
+    def register(self, name: str, path: str, parse: Parser) -> Any:
+        src = self._sources[name] = _Source(path, parse)
+        src.stamp = _stamp(path)
+        src.snapshot = self._parse(src)
+        src.version = 1
+        return src.snapshot
+
+    def get(self, name: str) -> Any:
+        return self._sources[name].snapshot
+
+    def version(self, name: str) -> int:
+        return self._sources[name].version
+
+    def subscribe(self, name: str, fn: Listener) -> None:
+        self._sources[name].listeners.append(fn)
+
+    def reload(self, force: bool = False) -> List[str]:
+        """Re-parse files whose (mtime, size, inode) changed; names that were swapped."""
+        changed = []
+        for name, src in self._sources.items():
+            stamp = _stamp(src.path)
+            if stamp is None or (stamp == src.stamp and not force):
+                continue
+            src.stamp = stamp
+            try:
+                new = self._parse(src)
+            except ConfigError as e:
+                if self.log:
+                    self.log.warn("Config rejected, keeping previous", name=name, path=src.path,
+                                  version=src.version, err=str(e))
+                continue
+            if new == src.snapshot:
+                continue  # touched / reformatted only
+            old, src.snapshot = src.snapshot, new
+            src.version += 1
+            changed.append(name)
+            if self.log:
+                self.log.info("Config reloaded", name=name, path=src.path, version=src.version)
+            for fn in src.listeners:
+                try:
+                    fn(new, old)
+                except Exception as e:
+                    if self.log:
+                        self.log.warn("Config listener failed", name=name, err=str(e))
+        return changed
+
+    async def watch(self, stop: Optional[asyncio.Event] = None) -> None:
+        while stop is None or not stop.is_set():
+            await asyncio.sleep(self.interval_sec)
+            self.reload()
+
+    def _parse(self, src: _Source) -> Any:
+        try:
+            data = load_yaml(src.path)
+            if not data:
+                # most likely caught mid-save (truncated, not yet rewritten): never swap to all-defaults
+                raise ConfigError(f"{src.path}: empty")
+            return src.parse(data)
+        except ConfigError:
+            raise
+        except (OSError, yaml.YAMLError, ValidationError, TypeError, ValueError) as e:
+            raise ConfigError(f"{src.path}: {e}") from e
+
+
+def _stamp(path: str) -> Optional[Tuple[int, int, int]]:
+    # editors and `mv` replace the file (new inode); in-place writes change mtime/size
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
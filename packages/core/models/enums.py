@@ -3,3 +3,4 @@ ORDER_TYPE_MARKET = "ORDER_TYPE_MARKET"
 ORDER_TYPE_STOP_LOSS = "ORDER_TYPE_STOP_LOSS"
 ORDER_TYPE_TAKE_PROFIT = "ORDER_TYPE_TAKE_PROFIT"
 TIF_GTT = "ORDER_TIME_IN_FORCE_GOOD_TILL_TIME"
+TIF_IOC = "ORDER_TIME_IN_FORCE_IMMEDIATE_OR_CANCEL"
@@ -3,6 +3,8 @@ from .models.order import OrderIntent
 
 class ExchangePort(Protocol):
     async def place_bracket(self, intent: OrderIntent) -> Any: ...
-    async def close_market(self, market: str, side: str, base_amount: str) -> Any: ...
+    async def close_market(self, market: str, side: str, base_amount: str, mark_px: Optional[float] = None) -> Any: ...
+    async def cancel(self, market: str, order_index: int) -> Any: ...
     async def cancel_all(self, market: Optional[str] = None) -> Any: ...
+    async def cancel_replace(self, market: str, cancel_indices: list[int], quotes: list[dict]) -> dict: ...
     async def list_open_orders(self, market: Optional[str] = None) -> list[dict]: ...
@@ -1 +1,40 @@
-# (stub)
+from typing import Iterable, Optional
+
+
+def build_cancel(market: str, order_index: int) -> dict:
+    # Lighter accepts either the exchange order index or our client_order_index here
+    return {
+        "action": "cancel",
+        "market": market,
+        "order_index": int(order_index),
+    }
+
+def build_cancels(market: str, order_indices: Iterable[int]) -> list[dict]:
+    return [build_cancel(market, oi) for oi in order_indices]
+
+def build_cancel_all(time_in_force: str = "CANCEL_ALL_TIF_IMMEDIATE", time: int = 0) -> dict:
+    return {
+        "action": "cancel_all",
+        "time_in_force": time_in_force,
+        "time": int(time),
+    }
+
+def order_indices_for_market(open_orders: list[dict], market: Optional[str] = None,
+                             market_index: Optional[int] = None) -> list[int]:
+    """Pick cancellable indices out of an open-orders payload, optionally filtered by market."""
+    out: list[int] = []
+    for o in open_orders:
+        if market_index is not None:
+            mi = o.get("market_index", o.get("market_id"))
+            if mi is not None and int(mi) != market_index:
+                continue
+        elif market and o.get("market") not in (None, market):
+            continue
+        oi = o.get("order_index", o.get("client_order_index"))
+        if oi is not None:
+            out.append(int(oi))
+    return out
+
+def build_cancel_replace(market: str, cancel_indices: Iterable[int], creates: list[dict]) -> list[dict]:
+    """Cancels first, then the new orders, so the batch never leaves both quote sets resting."""
+    return build_cancels(market, cancel_indices) + list(creates)
@@ -1,9 +1,38 @@
-from ..models.enums import ORDER_TYPE_MARKET
-def build_market_close(market: str, current_side: str, base_amount: int):
+from typing import Optional
+
+from packages.utils.ids import next_client_order_index
+
+from ..models.enums import ORDER_TYPE_MARKET, TIF_IOC
+
+DEFAULT_MAX_SLIPPAGE_BPS = 50.0
+
+def protection_price(side: str, mark_px: Optional[float], max_slippage_bps: float = DEFAULT_MAX_SLIPPAGE_BPS) -> float:
+    """Worst price a market `side` order may fill at: the mark moved `max_slippage_bps` against it."""
+    if not mark_px or mark_px <= 0:
+        raise ValueError("a market order needs a mark to bound its price")
+    slip = max_slippage_bps / 1e4
+    return mark_px * (1 + slip) if side == "BUY" else mark_px * (1 - slip)
+
+def build_market_order(market: str, side: str, base_amount, mark_px: Optional[float],
+                       max_slippage_bps: float = DEFAULT_MAX_SLIPPAGE_BPS,
+                       client_order_index: Optional[int] = None) -> dict:
+    """IOC with no expiry and a protection price, so a thin book cannot fill it arbitrarily far away."""
     return {
         "market": market,
-        "side": "SELL" if current_side=="BUY" else "BUY",
+        "side": side,
         "order_type": ORDER_TYPE_MARKET,
+        "time_in_force": TIF_IOC,
+        "order_expiry": 0,
+        "price": str(protection_price(side, mark_px, max_slippage_bps)),
         "base_amount": str(base_amount),
-        "client_order_index": f"close-{market}"
+        "client_order_index": client_order_index if client_order_index is not None else next_client_order_index(),
     }
+
+def build_market_close(market: str, current_side: str, base_amount: int, mark_px: Optional[float],
+                       max_slippage_bps: float = DEFAULT_MAX_SLIPPAGE_BPS, reduce_only: bool = False,
+                       client_order_index: Optional[int] = None):
+    body = build_market_order(market, "SELL" if current_side=="BUY" else "BUY", base_amount, mark_px,
+                              max_slippage_bps, client_order_index)
+    if reduce_only:
+        body["reduce_only"] = True
+    return body
@@ -1,5 +1,6 @@
 from decimal import Decimal
-from datetime import datetime
+
+from packages.utils.ids import next_client_order_index
 
 from ..models.order import OrderIntent
 from ..models.enums import *
@@ -7,8 +8,8 @@ from ..models.enums import *
 def _decimal_str(value: float) -> str:
     return format(Decimal(str(value)).normalize(), "f")
 
-def coi(prefix: str) -> str:
-    return f"{prefix}-{int(datetime.utcnow().timestamp()*1000)}"
+def coi() -> int:
+    return next_client_order_index()
 
 def build_create_orders(intent: OrderIntent) -> list[dict]:
     txs: list[dict] = []
@@ -18,7 +19,7 @@ def build_create_orders(intent: OrderIntent) -> list[dict]:
         "side": intent.side,
         "order_type": ORDER_TYPE_MARKET if intent.entry_px is None else ORDER_TYPE_LIMIT,
         "base_amount": str(intent.base_amount),
-        "client_order_index": coi("e"),
+        "client_order_index": coi(),
         "time_in_force": intent.tif
     }
     if intent.entry_px is not None:
@@ -32,7 +33,7 @@ def build_create_orders(intent: OrderIntent) -> list[dict]:
             "order_type": ORDER_TYPE_TAKE_PROFIT,
             "base_amount": str(intent.base_amount),
             "price": _decimal_str(intent.tp_px),
-            "client_order_index": coi("tp"),
+            "client_order_index": coi(),
         })
 
     if intent.stop_px is not None:
@@ -42,7 +43,7 @@ def build_create_orders(intent: OrderIntent) -> list[dict]:
             "order_type": ORDER_TYPE_STOP_LOSS,
             "base_amount": str(intent.base_amount),
             "price": _decimal_str(intent.stop_px),
-            "client_order_index": coi("sl"),
+            "client_order_index": coi(),
         })
 
     return txs
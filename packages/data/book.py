@@ -0,0 +1,73 @@
+# local L2 book maintained from order_book snapshots + deltas
+import time
+from typing import Dict, Iterable, Optional
+
+
+class LocalBook:
+    """price -> size per side. Deltas carry absolute level sizes; size 0 removes the level.
+
+    Best prices are cached and only rescanned when the best level itself is removed, so
+    a typical delta is O(levels in the message).
+    """
+
+    __slots__ = ("bids", "asks", "offset", "updated", "_best_bid", "_best_ask")
+
+    def __init__(self) -> None:
+        self.bids: Dict[float, float] = {}
+        self.asks: Dict[float, float] = {}
+        self.offset = 0
+        self.updated: Optional[float] = None  # monotonic time of the last snapshot / delta
+        self._best_bid: Optional[float] = None
+        self._best_ask: Optional[float] = None
+
+    def reset(self, payload: dict) -> None:
+        self.bids.clear()
+        self.asks.clear()
+        self._best_bid = self._best_ask = None
+        self.apply(payload)
+
+    def apply(self, payload: dict) -> None:
+        self._apply_side(self.bids, payload.get("bids") or [], False)
+        self._apply_side(self.asks, payload.get("asks") or [], True)
+        off = payload.get("offset")
+        if off is not None:
+            self.offset = int(off)
+        self.updated = time.monotonic()
+
+    def age(self) -> float:
+        """Seconds since the last snapshot / delta (inf before the first one)."""
+        return float("inf") if self.updated is None else time.monotonic() - self.updated
+
+    def _apply_side(self, side: Dict[float, float], levels: Iterable, is_ask: bool) -> None:
+        best = self._best_ask if is_ask else self._best_bid
+        rescan = False
+        for lvl in levels:
+            if isinstance(lvl, dict):
+                px, sz = float(lvl.get("price")), float(lvl.get("size", lvl.get("qty", 0)))
+            else:
+                px, sz = float(lvl[0]), float(lvl[1])
+            if sz > 0:
+                side[px] = sz
+                if best is None or (px < best if is_ask else px > best):
+                    best = px
+            elif side.pop(px, None) is not None and px == best:
+                rescan = True
+        if rescan:
+            best = (min(side) if is_ask else max(side)) if side else None
+        if is_ask:
+            self._best_ask = best
+        else:
+            self._best_bid = best
+
+    @property
+    def best_bid(self) -> Optional[float]:
+        return self._best_bid
+
+    @property
+    def best_ask(self) -> Optional[float]:
+        return self._best_ask
+
+    def mid(self) -> Optional[float]:
+        if self._best_bid is None or self._best_ask is None:
+            return None
+        return (self._best_bid + self._best_ask) / 2.0
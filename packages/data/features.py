@@ -0,0 +1,132 @@
+# rolling per-market microstructure features, updated O(1) per trade / book message
+import math
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, Optional, Set
+
+from .book import LocalBook
+
+
+class SeenTrades:
+    """The last `keep` trade ids. A resubscribe snapshot after a reconnect repeats prints
+    already counted, and several prints can share one millisecond, so ids (not timestamps)
+    decide what is new. Trades without an id always count."""
+
+    def __init__(self, keep: int = 1024):
+        self._ids: Set[int] = set()
+        self._order: Deque[int] = deque()
+        self.keep = keep
+
+    def fresh(self, trade: dict) -> bool:
+        tid = trade.get("trade_id")
+        if tid is None or int(tid) < 0:  # -1: recorded without an id
+            return True
+        tid = int(tid)
+        if tid in self._ids:
+            return False
+        self._ids.add(tid)
+        self._order.append(tid)
+        if len(self._order) > self.keep:
+            self._ids.discard(self._order.popleft())
+        return True
+
+
+class MarketFeatures:
+    """Exponentially time-decayed trade statistics plus top-of-book imbalance.
+
+    Every accumulator decays with time constant `tau` seconds, so an update is a
+    couple of multiplies regardless of how many trades came before, and reads decay
+    to "now" on the fly. Readers are synchronous (no awaits, no REST).
+    """
+
+    def __init__(self, tau: float = 60.0, book: Optional[LocalBook] = None,
+                 clock: Callable[[], float] = time.time):
+        self.tau = tau
+        self.clock = clock  # replaced by a simulated clock in backtests
+        self.book = book or LocalBook()
+        self.last_px: Optional[float] = None
+        self.last_ts: Optional[float] = None
+        self.trades = 0           # lifetime count
+        self.seen = SeenTrades()
+        self._rate = 0.0          # decayed trades / second
+        self._var = 0.0           # decayed sum of squared log returns (~variance over tau)
+        self._buy_vol = 0.0       # decayed taker-buy base volume
+        self._sell_vol = 0.0
+
+    def _decay(self, ts: float) -> float:
+        if self.last_ts is None or ts <= self.last_ts:
+            return 1.0
+        return math.exp(-(ts - self.last_ts) / self.tau)
+
+    def on_trade(self, price: float, size: float, taker_buy: bool, ts: Optional[float] = None) -> None:
+        ts = ts if ts is not None else self.clock()
+        k = self._decay(ts)
+        self._rate = self._rate * k + 1.0 / self.tau
+        self._buy_vol *= k
+        self._sell_vol *= k
+        if taker_buy:
+            self._buy_vol += size
+        else:
+            self._sell_vol += size
+        self._var *= k
+        if self.last_px and price > 0:
+            r = math.log(price / self.last_px)
+            self._var += r * r
+        self.last_px = price
+        self.last_ts = max(ts, self.last_ts or ts)
+        self.trades += 1
+
+    def on_trades(self, trades: Iterable[dict]) -> None:
+        """Lighter trade payloads: price/size strings, ms timestamp, is_maker_ask."""
+        for t in trades:
+            ts = t.get("timestamp")
+            self.on_trade(float(t["price"]), float(t.get("size", 0) or 0),
+                          bool(t.get("is_maker_ask")),  # maker sold -> taker bought
+                          ts / 1000.0 if ts else None)
+
+    # --- readers ---
+    def _k_now(self, now: Optional[float]) -> float:
+        return self._decay(now if now is not None else self.clock())
+
+    def trade_rate(self, now: Optional[float] = None) -> float:
+        """Trades per second over roughly the last `tau` seconds."""
+        return self._rate * self._k_now(now)
+
+    def recent_trades(self, window: float = 60.0, now: Optional[float] = None) -> int:
+        return int(round(self.trade_rate(now) * window))
+
+    def volatility(self, now: Optional[float] = None) -> float:
+        """Realized volatility (fractional, log-return) over roughly the last `tau` seconds."""
+        return math.sqrt(self._var * self._k_now(now))
+
+    def flow_imbalance(self) -> float:
+        """(taker buy - taker sell) / total volume, in [-1, 1]; decay cancels in the ratio."""
+        tot = self._buy_vol + self._sell_vol
+        return (self._buy_vol - self._sell_vol) / tot if tot > 0 else 0.0
+
+    def book_imbalance(self) -> float:
+        """Top-of-book (bid size - ask size) / (bid size + ask size), in [-1, 1]."""
+        bb, ba = self.book.best_bid, self.book.best_ask
+        if bb is None or ba is None:
+            return 0.0
+        b, a = self.book.bids.get(bb, 0.0), self.book.asks.get(ba, 0.0)
+        return (b - a) / (b + a) if b + a > 0 else 0.0
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Optional[float]]:
+        return {"last_px": self.last_px, "mid": self.book.mid(), "trades": self.trades,
+                "trade_rate": self.trade_rate(now), "volatility": self.volatility(now),
+                "flow_imbalance": self.flow_imbalance(), "book_imbalance": self.book_imbalance()}
+
+    # --- stream feed ---
+    def on_stream(self, msg: dict) -> None:
+        """Handles /stream trade and order_book messages for this market."""
+        kind = msg.get("type", "")
+        if kind.endswith("/trade"):
+            # a resubscribe snapshot after a reconnect repeats prints we already counted
+            self.on_trades([t for t in msg.get("trades") or [] if self.seen.fresh(t)])
+        elif kind.endswith("/order_book"):
+            ob = msg.get("order_book") or {}
+            if kind.startswith("subscribed"):
+                self.book.reset(ob)
+            else:
+                self.book.apply(ob)
@@ -1 +1,242 @@
-# backtest feeds (stub)
+# backtest feeds: memory-mapped reads of recordings written by packages.data.recorder
+import bisect
+import glob
+import heapq
+import json
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:  # optional dependencies: pip install pyarrow numpy
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pragma: no cover
+    np = pa = pc = None
+
+from .book import LocalBook
+
+
+class RecordingFile:
+    """One Arrow IPC file, memory-mapped. Record batches are only touched when asked for;
+    uncompressed files are read with zero copies, compressed ones decompress per batch."""
+
+    def __init__(self, root: str, entry: dict):
+        self.path = os.path.join(root, entry["path"])
+        self.kind = entry["kind"]
+        self.entry = entry
+        self._reader = None
+        self._index: Optional[List[Tuple[int, int]]] = [tuple(x) for x in entry["index"]] if entry.get("index") else None
+
+    @property
+    def reader(self):
+        if self._reader is None:
+            self._reader = pa.ipc.open_file(pa.memory_map(self.path, "r"))
+        return self._reader
+
+    @property
+    def metadata(self) -> dict:
+        raw = (self.reader.schema.metadata or {}).get(b"aegon.recording")
+        return json.loads(raw) if raw else {}
+
+    @property
+    def num_batches(self) -> int:
+        return self.reader.num_record_batches
+
+    def batch(self, i: int):
+        return self.reader.get_batch(i)
+
+    @property
+    def index(self) -> List[Tuple[int, int]]:
+        """(first recv_ns, last recv_ns) per record batch; from the manifest, else a cached sidecar."""
+        if self._index is None:
+            side = self.path + ".idx.json"
+            try:
+                with open(side, "r", encoding="utf-8") as f:
+                    self._index = [tuple(x) for x in json.load(f)]
+            except (FileNotFoundError, ValueError):
+                idx = []
+                for i in range(self.num_batches):
+                    col = self.batch(i).column("recv_ns")
+                    idx.append((col[0].as_py(), col[-1].as_py()) if len(col) else (0, 0))
+                self._index = idx
+                try:
+                    with open(side, "w", encoding="utf-8") as f:
+                        json.dump(idx, f)
+                except OSError:
+                    pass
+        return self._index
+
+    @property
+    def start_ns(self) -> int:
+        return self.index[0][0] if self.index else 0
+
+    @property
+    def end_ns(self) -> int:
+        return self.index[-1][1] if self.index else 0
+
+    def batches(self, start_ns: Optional[int] = None, end_ns: Optional[int] = None) -> Iterator:
+        """Record batches overlapping [start_ns, end_ns), trimmed to it (zero-copy slices)."""
+        lo = 0
+        if start_ns is not None:
+            lo = max(0, bisect.bisect_left([b[1] for b in self.index], start_ns))
+        for i in range(lo, self.num_batches):
+            first, last = self.index[i]
+            if end_ns is not None and first >= end_ns:
+                return
+            b = self.batch(i)
+            if (start_ns is not None and first < start_ns) or (end_ns is not None and last >= end_ns):
+                ts = b.column("recv_ns").to_numpy()
+                a = int(np.searchsorted(ts, start_ns, "left")) if start_ns is not None else 0
+                z = int(np.searchsorted(ts, end_ns, "left")) if end_ns is not None else len(ts)
+                b = b.slice(a, max(0, z - a))
+            if b.num_rows:
+                yield b
+
+
+class Recording:
+    """A recorder output directory: `manifest.json` plus `<kind>/*.arrow`.
+
+        rec = Recording("data/recordings")
+        trades = rec.table("trade", markets=[0], start_ns=t0, end_ns=t1)   # pyarrow.Table
+        cols = rec.arrays("trade", ["recv_ns", "price", "size"], markets=[0])  # numpy views
+        for ts, kind, row in rec.events(markets=[0, 1]): ...               # time-ordered, lazy
+        book = rec.book_at(0, ts)                                          # LocalBook as of ts
+    """
+
+    def __init__(self, root: str):
+        if pa is None:
+            raise RuntimeError("Recording needs pyarrow and numpy (pip install pyarrow numpy)")
+        self.root = root
+        entries: List[dict] = []
+        try:
+            with open(os.path.join(root, "manifest.json"), "r", encoding="utf-8") as f:
+                entries = json.load(f).get("files", [])
+        except FileNotFoundError:
+            pass
+        known = {e["path"] for e in entries}
+        for path in sorted(glob.glob(os.path.join(root, "*", "*.arrow"))):
+            rel = os.path.relpath(path, root)
+            if rel not in known:  # not in the manifest (e.g. copied in); closed files only
+                entries.append({"path": rel, "kind": os.path.basename(os.path.dirname(path))})
+        self._files: Dict[str, List[RecordingFile]] = {}
+        for e in entries:
+            f = RecordingFile(root, e)
+            try:
+                f.index
+            except (OSError, pa.ArrowInvalid):
+                continue  # still being written (no footer yet)
+            self._files.setdefault(e["kind"], []).append(f)
+        for fs in self._files.values():
+            fs.sort(key=lambda f: f.start_ns)
+        self._starts = {k: [f.start_ns for f in fs] for k, fs in self._files.items()}
+
+    def kinds(self) -> List[str]:
+        return sorted(self._files)
+
+    def files(self, kind: str, start_ns: Optional[int] = None, end_ns: Optional[int] = None) -> List[RecordingFile]:
+        return [f for f in self._files.get(kind, [])
+                if (start_ns is None or f.end_ns >= start_ns) and (end_ns is None or f.start_ns < end_ns)]
+
+    def markets(self) -> Dict[int, dict]:
+        out: Dict[int, dict] = {}
+        for fs in self._files.values():
+            for f in fs[:1]:
+                out.update({int(k): v for k, v in f.metadata.get("markets", {}).items()})
+        return out
+
+    # --- slicing ---
+    def batches(self, kind: str, markets: Optional[Sequence[int]] = None,
+                start_ns: Optional[int] = None, end_ns: Optional[int] = None) -> Iterator:
+        mask_vals = pa.array(list(markets), pa.int32()) if markets is not None else None
+        for f in self.files(kind, start_ns, end_ns):
+            for b in f.batches(start_ns, end_ns):
+                if mask_vals is not None and "market_id" in b.schema.names:
+                    b = b.filter(pc.is_in(b.column("market_id"), value_set=mask_vals))
+                if b.num_rows:
+                    yield b
+
+    def table(self, kind: str, markets: Optional[Sequence[int]] = None,
+              start_ns: Optional[int] = None, end_ns: Optional[int] = None):
+        bs = list(self.batches(kind, markets, start_ns, end_ns))
+        if not bs:
+            return self._files[kind][0].reader.schema.empty_table() if self._files.get(kind) else None
+        return pa.Table.from_batches(bs)
+
+    def arrays(self, kind: str, columns: Iterable[str], markets: Optional[Sequence[int]] = None,
+               start_ns: Optional[int] = None, end_ns: Optional[int] = None) -> Dict[str, "np.ndarray"]:
+        """Numpy columns; a single-chunk, unfiltered slice of an uncompressed file is a view."""
+        t = self.table(kind, markets, start_ns, end_ns)
+        out = {}
+        for c in columns:
+            col = t.column(c)
+            out[c] = col.chunk(0).to_numpy(zero_copy_only=False) if col.num_chunks == 1 else col.to_numpy()
+        return out
+
+    # --- lazy, time-ordered iteration ---
+    def _rows(self, kind: str, markets, start_ns, end_ns) -> Iterator[Tuple[int, str, dict]]:
+        for b in self.batches(kind, markets, start_ns, end_ns):
+            for row in b.to_pylist():  # one record batch in memory at a time
+                yield row["recv_ns"], kind, row
+
+    def events(self, kinds: Sequence[str] = ("book", "trade"), markets: Optional[Sequence[int]] = None,
+               start_ns: Optional[int] = None, end_ns: Optional[int] = None) -> Iterator[Tuple[int, str, dict]]:
+        """(recv_ns, kind, row) across kinds and markets, merged in receive order."""
+        streams = [self._rows(k, markets, start_ns, end_ns) for k in kinds if k in self._files]
+        return heapq.merge(*streams, key=lambda e: e[0])
+
+    # --- random access ---
+    def locate(self, kind: str, ts_ns: int) -> Optional[Tuple[RecordingFile, int]]:
+        """(file, batch number) holding the last row at or before ts_ns."""
+        fs = self._files.get(kind)
+        if not fs:
+            return None
+        fi = bisect.bisect_right(self._starts[kind], ts_ns) - 1
+        if fi < 0:
+            return None
+        f = fs[fi]
+        bi = bisect.bisect_right([b[0] for b in f.index], ts_ns) - 1
+        return (f, bi) if bi >= 0 else None
+
+    def book_at(self, market_id: int, ts_ns: int) -> LocalBook:
+        """Rebuild the book as of ts_ns: seek to the last batch holding a snapshot of the
+        market at or before ts_ns (`locate`, then back over the batch index) and replay
+        from there, so a lookup costs the batches since that snapshot, not the file."""
+        book = LocalBook()
+        loc = self.locate("book", ts_ns)
+        if loc is None:
+            return book
+        f, bi = loc
+        lo = self._last_snapshot_batch(f, bi, market_id, ts_ns)
+        msg: Dict[str, list] = {"bids": [], "asks": []}
+        seq, snap = None, False
+
+        def apply():
+            if seq is not None:
+                book.reset(msg) if snap else book.apply(msg)
+
+        for i in range(lo, bi + 1):
+            cols = f.batch(i).to_pydict()
+            for j in range(len(cols["recv_ns"])):
+                if cols["recv_ns"][j] > ts_ns:
+                    break
+                if cols["market_id"][j] != market_id:
+                    continue
+                if cols["msg_seq"][j] != seq:
+                    apply()
+                    seq, snap = cols["msg_seq"][j], cols["is_snapshot"][j]
+                    msg = {"bids": [], "asks": [], "offset": cols["offset"][j]}
+                if cols["size"][j] > 0 or not snap:
+                    msg["asks" if cols["is_ask"][j] else "bids"].append((cols["price"][j], cols["size"][j]))
+        apply()
+        return book
+
+    @staticmethod
+    def _last_snapshot_batch(f: RecordingFile, bi: int, market_id: int, ts_ns: int) -> int:
+        # the recorder flushes whole messages, so a snapshot never straddles two batches
+        for i in range(bi, -1, -1):
+            b = f.batch(i)
+            hit = pc.and_(pc.and_(b.column("is_snapshot"), pc.equal(b.column("market_id"), market_id)),
+                          pc.less_equal(b.column("recv_ns"), ts_ns))
+            if pc.any(hit).as_py():
+                return i
+        return 0  # no snapshot in this file: deltas from its start
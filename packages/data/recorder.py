@@ -0,0 +1,266 @@
+# market data recorder: /stream book deltas, trades and account events -> Arrow IPC (zstd) files
+import asyncio
+import json
+import os
+import socket
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+try:  # optional dependency: pip install pyarrow
+    import pyarrow as pa
+except ImportError:  # pragma: no cover
+    pa = None
+
+from packages.lighter_sdk_adapter.codec import dumps
+
+from .book import LocalBook
+
+FORMAT_VERSION = 1
+KINDS = ("book", "trade", "account")
+
+# book: one row per price level; rows sharing `msg_seq` come from one venue message and are
+# applied together. `size` is the absolute level size after the message (0 removes the level).
+# A snapshot (is_snapshot) replaces the whole book: on (re)subscribe and at the top of every
+# file, so each file rebuilds on its own.
+if pa is not None:
+    SCHEMAS = {
+        "book": pa.schema([
+            ("recv_ns", pa.int64()), ("msg_seq", pa.int64()), ("market_id", pa.int32()),
+            ("offset", pa.int64()), ("is_snapshot", pa.bool_()), ("is_ask", pa.bool_()),
+            ("price", pa.float64()), ("size", pa.float64()),
+        ]),
+        "trade": pa.schema([
+            ("recv_ns", pa.int64()), ("ts_ms", pa.int64()), ("market_id", pa.int32()), ("trade_id", pa.int64()),
+            ("price", pa.float64()), ("size", pa.float64()), ("taker_buy", pa.bool_()),
+            ("ask_id", pa.int64()), ("bid_id", pa.int64()),
+        ]),
+        "account": pa.schema([
+            ("recv_ns", pa.int64()), ("account_index", pa.int64()), ("type", pa.string()), ("payload", pa.string()),
+        ]),
+    }
+
+
+def _int(v: Any, default: int = -1) -> int:
+    try:
+        return int(v)
+    except (TypeError, ValueError):
+        return default
+
+
+class _Buffer:
+    __slots__ = ("cols", "rows")
+
+    def __init__(self, names: List[str]) -> None:
+        self.cols: Dict[str, list] = {n: [] for n in names}
+        self.rows = 0
+
+    def take(self) -> Dict[str, list]:
+        cols, self.cols = self.cols, {n: [] for n in self.cols}
+        self.rows = 0
+        return cols
+
+
+class MarketRecorder:
+    """Buffers stream messages in column lists on the event loop; a single writer thread
+    turns them into zstd-compressed Arrow IPC record batches (`compression=None` writes
+    uncompressed files that loaders can memory-map with zero copies).
+
+    Files rotate every `rotate_sec` into `<out_dir>/<kind>/<kind>-<start>.arrow`. Each file
+    carries the recording metadata (markets + decimals, book semantics) in its schema,
+    and `manifest.json` indexes closed files by kind, time range and row count.
+    """
+
+    def __init__(self, out_dir: str, markets: Dict[int, dict], account_index: Optional[int] = None,
+                 rotate_sec: float = 3600.0, flush_rows: int = 50_000, flush_sec: float = 5.0,
+                 compression: Optional[str] = "zstd"):
+        if pa is None:
+            raise RuntimeError("MarketRecorder needs pyarrow (pip install pyarrow)")
+        self.out_dir = out_dir
+        self.markets = markets  # market_id -> {"symbol", "price_decimals", "size_decimals", ...}
+        self.account_index = account_index
+        self.rotate_sec = rotate_sec
+        self.flush_rows = flush_rows
+        self.flush_sec = flush_sec
+        self._opts = pa.ipc.IpcWriteOptions(compression=compression)
+        self._bufs = {k: _Buffer(SCHEMAS[k].names) for k in KINDS}
+        self._books = {mid: LocalBook() for mid in markets}
+        self._msg_seq = 0
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="recorder")  # keeps write order
+        self._pending: List[Future] = []  # writer-thread jobs not yet checked
+        self.error: Optional[BaseException] = None  # first writer failure; later flushes raise it
+        self._writers: Dict[str, Any] = {}
+        self._files: Dict[str, dict] = {}
+        self._manifest: List[dict] = self._load_manifest()
+        self._file_start = time.time()
+        self._last_flush = time.monotonic()
+        self.stats = {k: 0 for k in KINDS}
+
+    # --- stream feed (event loop) ---
+    def channels(self) -> List[str]:
+        chans = [f"{kind}/{mid}" for mid in self.markets for kind in ("order_book", "trade")]
+        if self.account_index is not None:
+            chans.append(f"account_all/{self.account_index}")
+        return chans
+
+    def on_stream(self, msg: dict) -> None:
+        kind = msg.get("type", "")
+        recv_ns = time.time_ns()
+        mid = _int(str(msg.get("channel", "")).replace("/", ":").partition(":")[2])
+        if kind.endswith("/order_book") and mid in self._books:
+            ob = msg.get("order_book") or {}
+            snap = kind.startswith("subscribed")
+            book = self._books[mid]
+            book.reset(ob) if snap else book.apply(ob)
+            self._book_rows(recv_ns, mid, _int(ob.get("offset"), 0), snap, ob.get("bids") or [], ob.get("asks") or [])
+        elif kind.endswith("/trade"):
+            b = self._bufs["trade"]
+            c = b.cols
+            for t in msg.get("trades") or []:
+                c["recv_ns"].append(recv_ns); c["ts_ms"].append(_int(t.get("timestamp"), 0))
+                c["market_id"].append(_int(t.get("market_id"), mid)); c["trade_id"].append(_int(t.get("trade_id")))
+                c["price"].append(float(t["price"])); c["size"].append(float(t.get("size") or 0))
+                c["taker_buy"].append(bool(t.get("is_maker_ask"))); c["ask_id"].append(_int(t.get("ask_id")))
+                c["bid_id"].append(_int(t.get("bid_id")))
+                b.rows += 1
+        elif kind.endswith("/account_all"):
+            b = self._bufs["account"]
+            b.cols["recv_ns"].append(recv_ns); b.cols["account_index"].append(mid)
+            b.cols["type"].append(kind); b.cols["payload"].append(dumps(msg))
+            b.rows += 1
+        else:
+            return
+        self._maybe_flush()
+
+    def _book_rows(self, recv_ns: int, mid: int, offset: int, snap: bool, bids, asks) -> None:
+        b = self._bufs["book"]
+        c = b.cols
+        self._msg_seq += 1
+        for is_ask, levels in ((False, bids), (True, asks)):
+            for lvl in levels:
+                if isinstance(lvl, dict):
+                    px, sz = float(lvl["price"]), float(lvl.get("size", 0))
+                else:
+                    px, sz = float(lvl[0]), float(lvl[1])
+                c["recv_ns"].append(recv_ns); c["msg_seq"].append(self._msg_seq); c["market_id"].append(mid)
+                c["offset"].append(offset); c["is_snapshot"].append(snap); c["is_ask"].append(is_ask)
+                c["price"].append(px); c["size"].append(sz)
+                b.rows += 1
+        if snap and not bids and not asks:  # empty book snapshot still needs a marker row
+            c["recv_ns"].append(recv_ns); c["msg_seq"].append(self._msg_seq); c["market_id"].append(mid)
+            c["offset"].append(offset); c["is_snapshot"].append(True); c["is_ask"].append(False)
+            c["price"].append(0.0); c["size"].append(0.0)
+            b.rows += 1
+
+    def _snapshot_books(self) -> None:
+        """Synthetic snapshots so a freshly rotated file rebuilds without its predecessors."""
+        now = time.time_ns()
+        for mid, book in self._books.items():
+            if book.bids or book.asks:
+                self._book_rows(now, mid, book.offset, True, list(book.bids.items()), list(book.asks.items()))
+
+    # --- flushing ---
+    def _maybe_flush(self) -> None:
+        if time.time() - self._file_start >= self.rotate_sec:
+            self.rotate()
+        elif (any(b.rows >= self.flush_rows for b in self._bufs.values())
+              or time.monotonic() - self._last_flush >= self.flush_sec):
+            self.flush()
+
+    def flush(self) -> None:
+        """Hand buffered rows to the writer thread (never blocks the loop on I/O).
+        Raises if an earlier write failed: rows would be lost silently otherwise."""
+        self._check()
+        self._last_flush = time.monotonic()
+        for kind, buf in self._bufs.items():
+            if buf.rows:
+                self.stats[kind] += buf.rows
+                self._submit(self._write, kind, buf.take(), self._file_start)
+
+    def rotate(self) -> None:
+        self.flush()
+        self._submit(self._close_all)
+        self._file_start = time.time()
+        self._snapshot_books()
+
+    async def aclose(self) -> None:
+        try:
+            self.flush()
+        finally:
+            # close the files even after a failure: what was written stays readable
+            await asyncio.get_running_loop().run_in_executor(self._pool, self._close_all)
+            self._pool.shutdown(wait=True)
+        self._check()
+
+    def _submit(self, fn, *args) -> None:
+        self._pending.append(self._pool.submit(fn, *args))
+
+    def _check(self) -> None:
+        if self._pending:
+            pending = []
+            for fut in self._pending:
+                if not fut.done():
+                    pending.append(fut)
+                elif self.error is None and fut.exception() is not None:
+                    self.error = fut.exception()
+            self._pending = pending
+        if self.error is not None:
+            raise RuntimeError(f"recorder write failed: {self.error!r}") from self.error
+
+    # --- writer thread ---
+    def _metadata(self, kind: str, started_at: float) -> Dict[bytes, bytes]:
+        meta = {
+            "format_version": FORMAT_VERSION, "kind": kind, "host": socket.gethostname(),
+            "started_at": started_at, "account_index": self.account_index,
+            "markets": {str(k): v for k, v in self.markets.items()},
+            "book_semantics": "absolute level size per row; size 0 removes; is_snapshot replaces the book; "
+                              "apply rows grouped by msg_seq",
+        }
+        return {b"aegon.recording": json.dumps(meta).encode()}
+
+    def _write(self, kind: str, cols: Dict[str, list], started_at: float) -> None:
+        schema = SCHEMAS[kind]
+        batch = pa.RecordBatch.from_pydict(cols, schema=schema)
+        w = self._writers.get(kind)
+        if w is None:
+            d = os.path.join(self.out_dir, kind)
+            os.makedirs(d, exist_ok=True)
+            stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime(started_at))
+            path = os.path.join(d, f"{kind}-{stamp}.arrow")
+            n = 1
+            while os.path.exists(path):
+                path = os.path.join(d, f"{kind}-{stamp}-{n}.arrow"); n += 1
+            w = self._writers[kind] = pa.ipc.new_file(path, schema.with_metadata(self._metadata(kind, started_at)),
+                                                      options=self._opts)
+            self._files[kind] = {"kind": kind, "path": os.path.relpath(path, self.out_dir), "rows": 0,
+                                 "batches": 0, "start_ns": cols["recv_ns"][0], "end_ns": 0,
+                                 "markets": sorted(self.markets), "compression": self._opts.compression,
+                                 "index": []}
+        w.write_batch(batch)
+        f = self._files[kind]
+        f["index"].append([cols["recv_ns"][0], cols["recv_ns"][-1]])  # per record batch, for loaders
+        f["rows"] += batch.num_rows
+        f["batches"] += 1
+        f["end_ns"] = max(f["end_ns"], cols["recv_ns"][-1])
+
+    def _close_all(self) -> None:
+        for kind, w in list(self._writers.items()):
+            w.close()
+            self._manifest.append(self._files.pop(kind))
+        self._writers.clear()
+        self._save_manifest()
+
+    def _load_manifest(self) -> List[dict]:
+        try:
+            with open(os.path.join(self.out_dir, "manifest.json"), "r", encoding="utf-8") as f:
+                return json.load(f).get("files", [])
+        except (FileNotFoundError, ValueError):
+            return []
+
+    def _save_manifest(self) -> None:
+        os.makedirs(self.out_dir, exist_ok=True)
+        path = os.path.join(self.out_dir, "manifest.json")
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"format_version": FORMAT_VERSION, "files": self._manifest}, f, indent=1)
+        os.replace(tmp, path)
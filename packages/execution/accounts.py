@@ -0,0 +1,57 @@
+# multi-account: one signer, nonce stream, order ids, risk engine and exchange per sub-account.
+# Read-only infrastructure is already per process: rest.py keys HTTP sessions by base url and
+# caches markets by symbol, so every account (and the leader poller) shares them.
+import asyncio
+import os
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from packages.config.env import PRIMARY, Cfg
+from packages.execution.exchange_impl import LighterExchange
+from packages.lighter_sdk_adapter.signer import make_signer
+from packages.risk.engine import RiskEngine, RiskLimits
+from packages.utils.ids import ClientOrderIdAllocator, default_allocator
+
+
+@dataclass
+class Account:
+    name: str
+    cfg: Cfg
+    client: Any
+    exchange: LighterExchange
+    risk: RiskEngine
+
+    @property
+    def index(self) -> int:
+        return self.cfg.account_index
+
+
+def state_dir(name: str) -> Optional[str]:
+    # the main account keeps $COI_STATE_DIR itself (same files as single-account runs); others get a subdir
+    root = os.environ.get("COI_STATE_DIR", ".state")
+    if not root or name == PRIMARY:
+        return root
+    return os.path.join(root, name)
+
+
+def build_account(name: str, cfg: Cfg, risk_data: Optional[dict] = None) -> Account:
+    sdir = state_dir(name)
+    if name == PRIMARY:
+        ids = default_allocator()
+    else:
+        shard = int(os.environ.get("COI_SHARD", "0"))
+        ids = ClientOrderIdAllocator(shard=shard, state_path=os.path.join(sdir, f"coi-{shard}.json") if sdir else None)
+    client = make_signer(cfg.base_url, cfg.account_index, cfg.api_key_index, cfg.api_pk, cfg.eth_pk)
+    return Account(name, cfg, client, LighterExchange(client, cfg.account_index, ids=ids),
+                   RiskEngine(RiskLimits.from_cfg(cfg, data=risk_data), state_dir=sdir))
+
+
+def build_accounts(cfgs: Dict[str, Cfg], risk_data: Optional[dict] = None) -> List[Account]:
+    return [build_account(name, cfg, risk_data) for name, cfg in cfgs.items()]
+
+
+async def fan_out(accounts: List[Account], fn: Callable[[Account], Awaitable[Any]]) -> Dict[str, Any]:
+    """fn(account) for every account concurrently; name -> result, or the exception it raised
+    (one account failing never holds up or cancels the others)."""
+    res = await asyncio.gather(*(fn(a) for a in accounts), return_exceptions=True)
+    return {a.name: r for a, r in zip(accounts, res)}
@@ -1,6 +1,6 @@
 from .orders import place_single
 from packages.core.usecases.close_position import build_market_close
 
-async def close_market(client, market: str, current_side: str, base_amount: int):
-    body = build_market_close(market, current_side, base_amount)
+async def close_market(client, market: str, current_side: str, base_amount: int, mark_px: float):
+    body = build_market_close(market, current_side, base_amount, mark_px)
     return await place_single(client, body)
@@ -2,51 +2,118 @@
 from typing import Any, Optional
 from lighter import SignerClient
 from packages.core.models.order import OrderIntent
-from packages.core.models.enums import ORDER_TYPE_MARKET
 from packages.core.usecases.place_bracket import build_create_orders
+from packages.core.usecases.close_position import DEFAULT_MAX_SLIPPAGE_BPS, build_market_close, build_market_order
+from packages.core.usecases.cancel_orders import build_cancel, build_cancel_all, build_cancel_replace, order_indices_for_market
 from packages.lighter_sdk_adapter.rest import send_tx, send_tx_batch, get_open_orders_by_index
 from packages.lighter_sdk_adapter import rest
-from packages.lighter_sdk_adapter.signer import sign_create_order
+from packages.lighter_sdk_adapter.sign_pool import signing_pool
+from packages.lighter_sdk_adapter.signer import sign_tx
+from packages.telemetry.latency import timed
+from packages.utils.ids import ClientOrderIdAllocator, default_allocator
 import asyncio
 import inspect
 
 class LighterExchange:
-    def __init__(self, client: SignerClient, account_index: int):
+    def __init__(self, client: SignerClient, account_index: int, ids: Optional[ClientOrderIdAllocator] = None,
+                 max_slippage_bps: float = DEFAULT_MAX_SLIPPAGE_BPS):
         self.client = client
         self.account_index = account_index
+        self.max_slippage_bps = max_slippage_bps  # market orders are IOC, bounded this far past the mark
+        self.pool = signing_pool(client)  # $AEGON_SIGN_WORKERS: sign on worker threads, off the loop
+        self.ids = ids or default_allocator()  # also maps client_order_index -> intent for fills
+        rest.expect_markets()  # registered at startup, not on the first cache miss
+        # nonces are handed out at sign time, so sign+send must not interleave between
+        # coroutines sharing this exchange (e.g. several market makers on one account); with a
+        # pool the lock is the pool's, so every exchange on the client sends through one sequence
+        self._seq = self.pool.seq if self.pool is not None else asyncio.Lock()
 
+    @timed("exchange.place_bracket")
     async def place_bracket(self, intent: OrderIntent) -> Any:
         creates = build_create_orders(intent)
-        tx_types, tx_infos, api_keys = [], [], []
         for body in creates:
+            self.ids.remember(body["client_order_index"], intent)
             # Add market_index to each order in the bracket
             market_id = await self.resolve_market_id(intent.market)
             if market_id is None:
                 raise ValueError(f"Could not resolve market ID for {intent.market}")
             body["market_index"] = market_id
-            signed = await sign_create_order(self.client, body)
-            tx_types.append(signed["tx_type"]); tx_infos.append(signed["tx_info"]); api_keys.append(signed["api_key_index"])
-        return await send_tx_batch(self.client, tx_types, tx_infos, api_key_indices=api_keys)
+        return await self._sign_send(creates)
 
-    async def close_market(self, market: str, side: str, base_amount: str) -> Any:
-        # Get market ID for the market
-        market_id = await self.resolve_market_id(market)
-        if market_id is None:
-            raise ValueError(f"Could not resolve market ID for {market}")
-            
-        body = {
-            "market": market,
-            "market_index": market_id,  # Add market_index to the body
-            "side": "SELL" if side=="BUY" else "BUY",
-            "order_type": ORDER_TYPE_MARKET,
-            "base_amount": base_amount,
-            "client_order_index": int(__import__('time').time()*1000),  # Use integer for client_order_index
-        }
-        signed = await sign_create_order(self.client, body)
-        return await send_tx(self.client, signed["tx_type"], signed["tx_info"], api_key_index=signed["api_key_index"])
+    @timed("exchange.close_market")
+    async def close_market(self, market: str, side: str, base_amount: str, mark_px: Optional[float] = None) -> Any:
+        # `side` is the side of the position being closed
+        return await self.place_market(market, "SELL" if side=="BUY" else "BUY", base_amount, mark_px=mark_px)
+
+    @timed("exchange.place_market")
+    async def place_market(self, market: str, side: str, base_amount: str, tag: Optional[dict] = None,
+                           mark_px: Optional[float] = None) -> Any:
+        """IOC market order priced at most max_slippage_bps past `mark_px` (the book mid when None)."""
+        market_id = await self._market_id(market)
+        mark_px = mark_px or await self._mark(market)
+        body = build_market_order(market, side, base_amount, mark_px, self.max_slippage_bps, self.ids.next())
+        body["market_index"] = market_id
+        if tag:
+            self.ids.tag(body["client_order_index"], **tag)
+        return await self._sign_send([body], batch=False)
 
+    @timed("exchange.close_positions")
+    async def close_positions(self, closes: list[tuple]) -> Any:
+        """Reduce-only IOC market closes [(market, current_side, base_amount[, mark_px]), ...] for any
+        markets, signed in list order (= priority) and sent as one batch. A missing mark is read
+        from the book."""
+        bodies = []
+        for market, current_side, base_amount, *mark in closes:
+            mark_px = (mark[0] if mark else None) or await self._mark(market)
+            body = build_market_close(market, current_side, base_amount, mark_px, self.max_slippage_bps,
+                                      reduce_only=True, client_order_index=self.ids.next())
+            body["market_index"] = await self._market_id(market)
+            bodies.append(body)
+        return await self._sign_send(bodies)
+
+    async def _mark(self, market: str) -> Optional[float]:
+        bid, ask, _ = await rest.get_spread(self.client, market)
+        if bid is not None and ask is not None:
+            return (bid + ask) / 2
+        return bid if bid is not None else ask
+
+    @timed("exchange.cancel")
+    async def cancel(self, market: str, order_index: int) -> Any:
+        market_id = await self._market_id(market)
+        body = build_cancel(market, order_index)
+        body["market_index"] = market_id
+        return await self._sign_send([body], batch=False)
+
+    @timed("exchange.cancel_all")
     async def cancel_all(self, market: Optional[str] = None) -> Any:
-        raise NotImplementedError  # add when cancel endpoint is exposed
+        if market is None:
+            return await self._sign_send([build_cancel_all()], batch=False)
+        # Per-market: cancel every resting order on that book in one batch
+        market_id = await self._market_id(market)
+        orders = await get_open_orders_by_index(self.client, self.account_index, limit=200)
+        indices = order_indices_for_market(orders, market=market, market_index=market_id)
+        if not indices:
+            return None
+        return await self._send_batch(build_cancel_replace(market, indices, []), market_id)
+
+    @timed("exchange.cancel_replace")
+    async def cancel_replace(self, market: str, cancel_indices: list[int], quotes: list[dict]) -> dict:
+        """Cancel `cancel_indices` and place `quotes` ({side, price, base_amount}) in one sendTxBatch.
+
+        Cancels are signed and sequenced ahead of the new orders. Returns the new
+        client order indices (in quote order) together with the batch response.
+        """
+        market_id = await self._market_id(market)
+        creates = [self._limit_body(market, market_id, q["side"], q["price"], q["base_amount"]) for q in quotes]
+        bodies = build_cancel_replace(market, cancel_indices, creates)
+        if not bodies:
+            return {"placed": [], "cancelled": [], "result": None}
+        res = await self._send_batch(bodies, market_id)
+        return {
+            "placed": [b["client_order_index"] for b in creates],
+            "cancelled": [int(i) for i in cancel_indices],
+            "result": res,
+        }
 
     async def list_open_orders(self, market: Optional[str] = None) -> list[dict]:
         return await get_open_orders_by_index(self.client, self.account_index, market=market, limit=200)
@@ -55,12 +122,14 @@ class LighterExchange:
     async def get_spread(self, market: str):
         return await rest.get_spread(self.client, market)
 
+    @timed("exchange.place_limit")
     async def place_limit(self, market: str, side: str, price: float, base_amount: float) -> str:
-        # Get market ID for the market
-        market_id = await self.resolve_market_id(market)
-        if market_id is None:
-            raise ValueError(f"Could not resolve market ID for {market}")
-            
+        market_id = await self._market_id(market)
+        body = self._limit_body(market, market_id, side, price, base_amount)
+        await self._sign_send([body], batch=False)
+        return body["client_order_index"]
+
+    def _limit_body(self, market: str, market_id: int, side: str, price: float, base_amount: float) -> dict:
         body = {
             "market": market,
             "market_index": market_id,  # Add market_index to the body
@@ -68,12 +137,43 @@ class LighterExchange:
             "order_type": "ORDER_TYPE_LIMIT",
             "base_amount": str(base_amount),
             "price": str(price),
-            "client_order_index": int(__import__('time').time()*1000),  # Use integer for client_order_index
+            "client_order_index": self.ids.next(),
         }
-        signed = await sign_create_order(self.client, body)
-        await send_tx(self.client, signed["tx_type"], signed["tx_info"], api_key_index=signed["api_key_index"])
-        return body["client_order_index"]
+        self.ids.remember(body["client_order_index"], body)
+        return body
+
+    async def _send_batch(self, bodies: list[dict], market_id: int) -> Any:
+        # Nonces are taken strictly in list order so sequencing follows it (also with the pool)
+        for body in bodies:
+            body["market_index"] = market_id
+        return await self._sign_send(bodies)
+
+    async def _sign_send(self, bodies: list[dict], batch: bool = True) -> Any:
+        """Sign and send under `_seq`: nonces are taken at sign time, so the next sign must
+        wait until this send is out or the venue can see a later nonce first."""
+        async with self._seq:
+            signed = await self._sign_all(bodies)
+            if not batch:
+                s, = signed
+                return await send_tx(self.client, s["tx_type"], s["tx_info"], api_key_index=s["api_key_index"])
+            tx_types, tx_infos, api_keys = _columns(signed)
+            return await send_tx_batch(self.client, tx_types, tx_infos, api_key_indices=api_keys)
+
+    async def _sign_all(self, bodies: list[dict]) -> list[dict]:
+        if self.pool is not None:
+            return await self.pool.sign_batch(bodies)
+        return [await sign_tx(self.client, body) for body in bodies]
+
+    async def _market_id(self, market: str) -> int:
+        market_id = await self.resolve_market_id(market)
+        if market_id is None:
+            raise ValueError(f"Could not resolve market ID for {market}")
+        return market_id
 
     async def resolve_market_id(self, symbol: str):
         from packages.lighter_sdk_adapter.rest import resolve_market_id
         return await resolve_market_id(self.client, symbol)
+
+
+def _columns(signed: list[dict]) -> tuple[list, list, list]:
+    return [s["tx_type"] for s in signed], [s["tx_info"] for s in signed], [s["api_key_index"] for s in signed]
@@ -1,12 +1,12 @@
 from typing import Any, Tuple
 from lighter import SignerClient
-from packages.lighter_sdk_adapter.signer import sign_create_order
+from packages.lighter_sdk_adapter.signer import sign_create_order, sign_tx
 from packages.lighter_sdk_adapter.rest import send_tx, send_tx_batch
 
 async def sign_all(client: SignerClient, create_orders: list[dict]) -> Tuple[list[int], list[Any], list[int]]:
     tx_types, tx_infos, api_keys = [], [], []
     for body in create_orders:
-        signed = await sign_create_order(client, body)
+        signed = await sign_tx(client, body)
         tx_types.append(signed["tx_type"]); tx_infos.append(signed["tx_info"]); api_keys.append(signed["api_key_index"])
     return tx_types, tx_infos, api_keys
 
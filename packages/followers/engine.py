@@ -1,12 +1,29 @@
-from typing import Any, Callable, Awaitable
+from typing import Any, Callable, Awaitable, Iterable, Optional, Tuple
 from packages.signals.models import Signal
 
 
 class CopyEngine:
-    def __init__(self, copy_cfg: dict, exchange: Any, equity_provider: Callable[[], Any]):
+    def __init__(self, copy_cfg: Any, exchange: Any, equity_provider: Callable[[], Any], risk: Any = None):
         self.copy_cfg = copy_cfg
         self.exchange = exchange
         self.equity_provider = equity_provider
+        self.risk = risk  # packages.risk.engine.RiskEngine (pre-trade checks, in memory)
+
+    @staticmethod
+    def copy_qty(signal: Signal, leader_cfg: dict) -> float:
+        return float(signal.size) * float(leader_cfg.get("copy_param", 1.0))
+
+    @staticmethod
+    def order_tag(leader_cfg: dict) -> dict:
+        """Labels for the tags journal (exchange.place_market(tag=...)), so the rollup's
+        leader column attributes copy fills to the leader they followed."""
+        return {"strategy": "copy", "leader": leader_cfg.get("name")}
+
+    def check_batch(self, signals: Iterable[Tuple[Signal, dict]]) -> Tuple[bool, str]:
+        """One poll tick of (signal, leader_cfg) pairs, checked together."""
+        if self.risk is None:
+            return (True, "")
+        return self.risk.check_batch([(s.market, s.side, self.copy_qty(s, l), s.price) for s, l in signals])
 
     async def on_signal(self, signal: Signal, leader_cfg: dict) -> dict:
         try:
@@ -15,7 +32,7 @@ class CopyEngine:
                 eq = await eq
         except Exception:
             eq = None
-        return {
+        res = {
             "engine": "CopyEngine",
             "handled": True,
             "leader": leader_cfg.get("name"),
@@ -23,6 +40,11 @@ class CopyEngine:
             "side": signal.side,
             "type": signal.type,
             "equity": eq,
+            "tag": self.order_tag(leader_cfg),  # pass to place_market once execution is wired
             "note": "stub execution (no orders placed)"
         }
-
+        if self.risk is not None:
+            ok, reason = self.risk.check(signal.market, signal.side, self.copy_qty(signal, leader_cfg), signal.price)
+            if not ok:
+                res.update(handled=False, note=f"risk blocked: {reason}")
+        return res
@@ -3,11 +3,7 @@ from collections import Counter, defaultdict
 from typing import Iterable, List, Dict, Any, Tuple, Optional
 import lighter
 
-# ---- helpers: safe model -> dict ----
-def _to_dict(x):
-    if hasattr(x, "model_dump"): return x.model_dump()
-    if hasattr(x, "dict"): return x.dict()
-    return x
+from packages.lighter_sdk_adapter.codec import to_dict as _to_dict  # SDK model -> dict
 
 def _unixts() -> float: return time.time()
 
@@ -20,9 +16,12 @@ class OnchainScanner:
         self.base_url = base_url
         self.lookback_blocks = lookback_blocks
         self.max_accounts = max_accounts
+        self._last_req_ts = 0.0
+        self.set_rate(rps)
+
+    def set_rate(self, rps: float) -> None:
         # Simple rate limiter: at most rps requests/second
         self._min_interval = 1.0 / max(0.1, rps)
-        self._last_req_ts = 0.0
 
     async def _client(self):
         return lighter.ApiClient(configuration=lighter.Configuration(host=self.base_url))
@@ -107,7 +106,8 @@ class OnchainScanner:
                     sharpe30 = pnl_d.get("sharpe_30d") or pnl_d.get("sharpe30d") or 0.0
 
                     acc = await self._with_backoff(lambda: accapi.account(by="index", value=str(idx)))
-                    acc_d = _to_dict(acc).get("account", _to_dict(acc))
+                    acc_d = _to_dict(acc)
+                    acc_d = acc_d.get("account", acc_d)  # one model_dump, not two
                     eq = float(acc_d.get("total_asset_value") or acc_d.get("collateral") or 0.0)
                     l1 = acc_d.get("l1_address") or ""
 
@@ -173,7 +173,8 @@ class OnchainScanner:
                 for idx in limited:
                     try:
                         acc = await self._with_backoff(lambda: accapi.account(by="index", value=str(idx)))
-                        acc_d = _to_dict(acc).get("account", _to_dict(acc))
+                        acc_d = _to_dict(acc)
+                        acc_d = acc_d.get("account", acc_d)
                         eq = float(acc_d.get("total_asset_value") or acc_d.get("collateral") or 0.0)
                         l1 = acc_d.get("l1_address") or ""
                         basics.append({
@@ -0,0 +1,104 @@
+# wire codec: orjson when installed (json otherwise), plus typed records for the venue's aliased payloads
+import dataclasses
+import datetime
+import enum
+import json
+from typing import Any, Dict, Optional, Tuple
+
+try:  # optional dependency: pip install orjson (~3-5x faster decode on stream messages)
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+_ORJSON_OPTS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY if orjson is not None else 0
+
+
+def loads(raw: Any) -> Any:
+    """str / bytes / bytearray / memoryview -> Python objects."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(bytes(raw) if isinstance(raw, memoryview) else raw)
+
+
+def _default(o: Any) -> Any:
+    # the json fallback spelled the way orjson writes these natively, so both backends emit the same bytes
+    if type(o).__module__ == "numpy" and hasattr(o, "tolist"):
+        return o.tolist()
+    if isinstance(o, (datetime.datetime, datetime.date, datetime.time)):
+        return o.isoformat()
+    if isinstance(o, enum.Enum):
+        return o.value
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    return str(o)
+
+
+def dumpb(obj: Any) -> bytes:
+    """Compact JSON bytes, identical on both backends: non-str dict keys (int, float, bool)
+    as strings, numpy scalars / arrays as numbers / lists, other non-JSON values
+    (Decimal, ...) as str."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTS)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=_default).encode()
+
+
+def dumps(obj: Any) -> str:
+    return dumpb(obj).decode()
+
+
+def to_dict(x: Any) -> dict:
+    """SDK model (pydantic v2 / v1 / plain object) or dict -> dict."""
+    if isinstance(x, dict):
+        return x
+    if hasattr(x, "model_dump"):
+        return x.model_dump()
+    if hasattr(x, "dict"):
+        return x.dict()
+    return getattr(x, "__dict__", {}) or {}
+
+
+# --- field aliases: the venue / SDK spell the same field several ways; resolved here, in one place ---
+MARKET_ID = ("market_id", "marketId", "id")
+SYMBOL = ("symbol", "market", "name")
+MARKET_INT_FIELDS = {
+    "price_decimals": ("supported_price_decimals", "price_decimals"),
+    "size_decimals": ("supported_size_decimals", "size_decimals"),
+    "quote_decimals": ("supported_quote_decimals", "quote_decimals"),
+    "quote_multiplier": ("quote_multiplier", "quoteMultiplier"),
+}
+MARKET_FLOAT_FIELDS = {
+    "min_base_amount": ("min_base_amount", "minBaseAmount"),
+    "min_quote_amount": ("min_quote_amount", "minQuoteAmount"),
+}
+
+
+def first(d: Dict[str, Any], keys: Tuple[str, ...]) -> Any:
+    # like `a or b or c` but keeps falsy-but-valid values such as market_id 0
+    for k in keys:
+        v = d.get(k)
+        if v is not None:
+            return v
+    return None
+
+
+# symbol_of / market_id_of unroll SYMBOL / MARKET_ID: they run per market row and per payload
+def symbol_of(d: Dict[str, Any]) -> Optional[str]:
+    v = d.get("symbol") or d.get("market") or d.get("name")
+    return v if isinstance(v, str) else None  # a nested {"market": {...}} is not a symbol
+
+
+def market_id_of(d: Dict[str, Any]) -> Optional[int]:
+    v = d.get("market_id")
+    if v is None:
+        v = d.get("marketId")
+        if v is None:
+            v = d.get("id")
+            if v is None:
+                return None
+    if type(v) is int:
+        return v
+    try:
+        return int(v)
+    except (TypeError, ValueError):
+        return None
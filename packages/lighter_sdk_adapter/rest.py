@@ -1,26 +1,83 @@
-from typing import Any, Optional, List, Tuple, Dict, Union
-from lighter import SignerClient
-import lighter
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Optional, List, Tuple, Dict, Union
 import httpx
 import asyncio
 
+from contextlib import asynccontextmanager
+
+from packages.telemetry.latency import timed
+from packages.telemetry import health, metrics
+
+from .codec import MARKET_FLOAT_FIELDS, MARKET_INT_FIELDS, first, loads, market_id_of, symbol_of, to_dict
+
+if TYPE_CHECKING:  # the SDK is imported by the calls that use it (~1s), not by importers of this module
+    from lighter import SignerClient
+
+# One pooled httpx client per (event loop, base url), shared by every caller in the process
+_SESSIONS: Dict[Tuple[int, str], httpx.AsyncClient] = {}
+
+def shared_http(base_url: str) -> httpx.AsyncClient:
+    key = (id(asyncio.get_running_loop()), base_url)
+    h = _SESSIONS.get(key)
+    if h is None or h.is_closed:
+        h = _SESSIONS[key] = httpx.AsyncClient(base_url=base_url, timeout=15.0,
+                                               limits=httpx.Limits(max_keepalive_connections=20),
+                                               event_hooks={"response": [_count_response]})
+    return h
+
+async def _count_response(r: httpx.Response) -> None:
+    # request rate and 429s per endpoint (paths are fixed; ids travel in the query string)
+    metrics.inc("aegon_http_responses_total", code=r.status_code, path=r.request.url.path)
+
+def _count_send_failure(path: str, n: int, e: Exception) -> None:
+    # the SDK posts sendTx on its own ApiClient, past _count_response: take the status off the error
+    status = getattr(e, "status", None) or getattr(getattr(e, "response", None), "status_code", None)
+    metrics.inc("aegon_send_failures_total", n, path=path, status=status or type(e).__name__)
+
+metrics.describe("aegon_send_failures_total", "Transactions whose send raised, by HTTP status (429 = rate limited).")
+
+def _count_orders(n: int, res: Any) -> None:
+    code = getattr(res, "code", None)
+    metrics.inc("aegon_orders_total", n, outcome="accepted" if code in (None, 200) else "rejected")
+
+@asynccontextmanager
+async def _session(client: SignerClient):
+    yield shared_http(client.url)  # not closed on exit; see close_sessions()
+
+async def close_sessions() -> None:
+    loop_id = id(asyncio.get_running_loop())
+    for key in [k for k in _SESSIONS if k[0] == loop_id]:
+        await _SESSIONS.pop(key).aclose()
+
+@timed("rest.send_tx")
 async def send_tx(client: SignerClient, tx_type: int, tx_info: Any, api_key_index: Optional[int] = None):
     try:
-        return await client.send_tx(tx_type, tx_info)
-    except Exception:
+        res = await client.send_tx(tx_type, tx_info)
+    except Exception as e:
+        metrics.inc("aegon_orders_total", outcome="error")
+        _count_send_failure("sendTx", 1, e)
         if api_key_index is not None:
             client.nonce_manager.acknowledge_failure(api_key_index)
         raise
+    _count_orders(1, res)
+    return res
 
+@timed("rest.send_tx_batch")
 async def send_tx_batch(client: SignerClient, tx_types: list[int], tx_infos: list[Any], api_key_indices: Optional[List[int]] = None):
     try:
-        return await client.send_tx_batch(tx_types, tx_infos)
-    except Exception:
+        res = await client.send_tx_batch(tx_types, tx_infos)
+    except Exception as e:
+        metrics.inc("aegon_orders_total", len(tx_types), outcome="error")
+        _count_send_failure("sendTxBatch", len(tx_types), e)
         if api_key_indices:
             for idx in api_key_indices:
                 client.nonce_manager.acknowledge_failure(idx)
         raise
+    _count_orders(len(tx_types), res)
+    return res
 
+@timed("rest.get_account")
 async def get_account_by_index(client: SignerClient, index: int):
     # SDK helper if available:
     try:
@@ -28,10 +85,10 @@ async def get_account_by_index(client: SignerClient, index: int):
     except Exception:
         pass
     # REST fallback
-    async with httpx.AsyncClient(base_url=client.url, timeout=15.0) as h:
+    async with _session(client) as h:
         r = await h.get("/api/v1/account", params={"by":"index","value":str(index)})
         r.raise_for_status()
-        return r.json()
+        return loads(r.content)
 
 def _normalize_orders(obj: Any) -> list[dict]:
     if isinstance(obj, list): return obj
@@ -50,10 +107,15 @@ async def get_open_orders_by_index(client: SignerClient, index: int,
         acc = await client.api.get_account(by="index", value=str(index))
         orders = _normalize_orders(acc)
     except Exception:
-        async with httpx.AsyncClient(base_url=client.url, timeout=15.0) as h:
-            r = await h.get("/api/v1/account", params={"by":"index","value":str(index)})
-            r.raise_for_status()
-            orders = _normalize_orders(r.json())
+        async with _session(client) as h:
+            # market_id 255: every market
+            r = await h.get("/api/v1/accountActiveOrders", params={"account_index": str(index), "market_id": "255"})
+            if r.status_code == 200:
+                orders = _normalize_orders(loads(r.content))
+            else:
+                r = await h.get("/api/v1/account", params={"by":"index","value":str(index)})
+                r.raise_for_status()
+                orders = _normalize_orders(loads(r.content))
 
     if market:
         orders = [o for o in orders if o.get("market")==market]
@@ -61,6 +123,11 @@ async def get_open_orders_by_index(client: SignerClient, index: int,
 
 _MARKET_ID_CACHE: Dict[str, int] = {}
 _MARKET_META_CACHE: Dict[str, Dict[str, Any]] = {}
+_MARKET_DETAILS: Dict[str, Dict[str, Any]] = {}  # get_market_meta results (decimals never change)
+
+def expect_markets() -> None:
+    """Readiness: not ready until the market registry has loaded (first resolve_market_id)."""
+    health.check("markets", lambda: bool(_MARKET_ID_CACHE))
 
 def _norm_symbol(sym: str) -> str:
     s = (sym or "").upper()
@@ -92,33 +159,25 @@ def _maybe_float(value: Any) -> Optional[float]:
 def _cache_market_entry(data: Any) -> None:
     if not isinstance(data, dict):
         return
-    sym_raw = data.get("symbol") or data.get("market") or data.get("name")
+    sym_raw = symbol_of(data)
     if not sym_raw:
         return
     ns = _norm_symbol(sym_raw)
-    market_id = _maybe_int(data.get("market_id") or data.get("marketId") or data.get("id"))
+    market_id = market_id_of(data)
     if market_id is not None:
         _MARKET_ID_CACHE[ns] = market_id
     meta = _MARKET_META_CACHE.get(ns, {}).copy()
     if market_id is not None:
         meta["market_id"] = market_id
     meta["symbol"] = sym_raw
-    for meta_key, source_keys in (
-        ("price_decimals", ("supported_price_decimals", "price_decimals")),
-        ("size_decimals", ("supported_size_decimals", "size_decimals")),
-        ("quote_decimals", ("supported_quote_decimals", "quote_decimals")),
-        ("quote_multiplier", ("quote_multiplier", "quoteMultiplier")),
-    ):
+    for meta_key, source_keys in MARKET_INT_FIELDS.items():
         if meta_key not in meta or meta[meta_key] is None:
             for sk in source_keys:
                 val = _maybe_int(data.get(sk))
                 if val is not None:
                     meta[meta_key] = val
                     break
-    for meta_key, source_keys in (
-        ("min_base_amount", ("min_base_amount", "minBaseAmount")),
-        ("min_quote_amount", ("min_quote_amount", "minQuoteAmount")),
-    ):
+    for meta_key, source_keys in MARKET_FLOAT_FIELDS.items():
         if meta_key not in meta or meta[meta_key] is None:
             for sk in source_keys:
                 val = _maybe_float(data.get(sk))
@@ -127,12 +186,14 @@ def _cache_market_entry(data: Any) -> None:
                     break
     _MARKET_META_CACHE[ns] = meta
 
+@timed("rest.resolve_market_id")
 async def resolve_market_id(client: SignerClient, symbol: str) -> Optional[int]:
     """Resolve market_id for a human symbol using OrderApi.order_books(), with in-memory cache."""
     key = _norm_symbol(symbol)
     if key in _MARKET_ID_CACHE:
         return _MARKET_ID_CACHE[key]
 
+    import lighter
     async with lighter.ApiClient(configuration=lighter.Configuration(host=client.url)) as api_client:
         order_api = lighter.OrderApi(api_client)
         # First try SDK order_books()
@@ -140,10 +201,6 @@ async def resolve_market_id(client: SignerClient, symbol: str) -> Optional[int]:
             books = await order_api.order_books()
             # Attempt to extract iterable from possible SDK model shapes
             sym_map: Dict[str, int] = {}
-            def to_dict(x):
-                if hasattr(x, "model_dump"): return x.model_dump()
-                if hasattr(x, "dict"): return x.dict()
-                return getattr(x, "__dict__", {})
             buckets = []
             bd = to_dict(books)
             for k in ("order_books", "data", "books", "items"):
@@ -154,15 +211,15 @@ async def resolve_market_id(client: SignerClient, symbol: str) -> Optional[int]:
             # Flatten potential nested containers
             for row in buckets or []:
                 d = to_dict(row)
-                market_id = d.get("market_id") or d.get("marketId")
-                sym = d.get("symbol") or d.get("market") or d.get("name") or ""
+                market_id = first(d, ("market_id", "marketId"))
+                sym = symbol_of(d) or ""
                 # Sometimes nested under 'market' or 'info'
                 if market_id is None:
                     for nk in ("market", "info", "details"):
                         if isinstance(d.get(nk), dict):
                             md = d[nk]
-                            market_id = md.get("market_id") or md.get("marketId")
-                            sym = sym or md.get("symbol") or md.get("market") or md.get("name") or ""
+                            market_id = first(md, ("market_id", "marketId"))
+                            sym = sym or symbol_of(md) or ""
                             _cache_market_entry(md)
                 if market_id is not None:
                     ns = _norm_symbol(sym)
@@ -195,19 +252,17 @@ async def resolve_market_id(client: SignerClient, symbol: str) -> Optional[int]:
             pass
 
     # REST fallbacks: exchangeStats and orderBooks (plural)
-    async with httpx.AsyncClient(base_url=client.url, timeout=15.0) as h:
+    async with _session(client) as h:
         # exchangeStats
         try:
             r = await h.get("/api/v1/exchangeStats")
             r.raise_for_status()
-            data = r.json()
+            data = loads(r.content)
             if isinstance(data, list):
                 for it in data:
-                    sym = (it.get("symbol") or it.get("market") or it.get("name") or "").upper()
-                    mid = it.get("market_id") or it.get("marketId") or it.get("id")
+                    sym, mid = symbol_of(it), market_id_of(it)
                     if sym and mid is not None:
-                        ns = _norm_symbol(sym)
-                        _MARKET_ID_CACHE[ns] = int(mid)
+                        _MARKET_ID_CACHE[_norm_symbol(sym)] = mid
                         _cache_market_entry(it)
             if key in _MARKET_ID_CACHE:
                 return _MARKET_ID_CACHE[key]
@@ -218,15 +273,13 @@ async def resolve_market_id(client: SignerClient, symbol: str) -> Optional[int]:
         try:
             r = await h.get("/api/v1/orderBooks")
             r.raise_for_status()
-            data = r.json()
+            data = loads(r.content)
             rows = data.get("order_books") if isinstance(data, dict) else (data if isinstance(data, list) else [])
             for it in rows:
                 if isinstance(it, dict):
-                    sym = (it.get("symbol") or it.get("market") or it.get("name") or "").upper()
-                    mid = it.get("market_id") or it.get("marketId") or it.get("id")
+                    sym, mid = symbol_of(it), market_id_of(it)
                     if sym and mid is not None:
-                        ns = _norm_symbol(sym)
-                        _MARKET_ID_CACHE[ns] = int(mid)
+                        _MARKET_ID_CACHE[_norm_symbol(sym)] = mid
                         _cache_market_entry(it)
             return _MARKET_ID_CACHE.get(key)
         except Exception:
@@ -241,6 +294,7 @@ async def get_market_meta(client: SignerClient, symbol: str) -> Optional[Dict[st
     if market_id is None:
         return None
 
+    import lighter
     async with lighter.ApiClient(configuration=lighter.Configuration(host=client.url)) as api_client:
         order_api = lighter.OrderApi(api_client)
         try:
@@ -255,31 +309,28 @@ async def get_market_meta(client: SignerClient, symbol: str) -> Optional[Dict[st
             elif detail_obj:
                 details = [detail_obj]
         for detail in details:
-            if hasattr(detail, "model_dump"):
-                data = detail.model_dump()
-            elif hasattr(detail, "dict"):
-                data = detail.dict()
-            else:
-                data = getattr(detail, "__dict__", {}) or detail
+            data = to_dict(detail) or detail
             if isinstance(data, dict):
                 _cache_market_entry(data)
-                ns = _norm_symbol(data.get("symbol") or data.get("market") or data.get("name") or symbol)
+                ns = _norm_symbol(symbol_of(data) or symbol)
                 if ns in _MARKET_META_CACHE:
                     return _MARKET_META_CACHE[ns]
     return _MARKET_META_CACHE.get(key)
 
 # ------------------- Orderbook helpers (SDK via market_id) -------------------
+@timed("rest.get_orderbook")
 async def get_orderbook(client: SignerClient, symbol: str, depth: int = 20) -> dict:
     """Fetch orderbook for a symbol via SDK OrderApi using market_id. Returns {bids, asks}."""
     market_id = await resolve_market_id(client, symbol)
     if market_id is None:
         raise ValueError(f"Unknown market symbol: {symbol}")
 
+    import lighter
     async with lighter.ApiClient(configuration=lighter.Configuration(host=client.url)) as api_client:
         order_api = lighter.OrderApi(api_client)
         ob = await order_api.order_book_details(market_id=market_id)
     
-    d = ob.model_dump() if hasattr(ob, "model_dump") else (ob.dict() if hasattr(ob, "dict") else getattr(ob, "__dict__", {}))
+    d = to_dict(ob)
     bids = d.get("bids") or d.get("buy") or []
     asks = d.get("asks") or d.get("sell") or []
     return {"bids": bids, "asks": asks}
@@ -311,19 +362,24 @@ async def get_spread(client: SignerClient, market: str, depth: int = 20) -> Tupl
     spr = (ask - bid) if (ask is not None and bid is not None) else None
     return bid, ask, spr
 
+@timed("rest.get_market_meta")
 async def get_market_meta(client: SignerClient, symbol: str) -> Optional[dict]:
-    """Get market metadata (decimals, min sizes, etc.) for a symbol."""
+    """Get market metadata (decimals, min sizes, etc.) for a symbol; cached per process."""
+    key = _norm_symbol(symbol)
+    if key in _MARKET_DETAILS:
+        return _MARKET_DETAILS[key]
     try:
         market_id = await resolve_market_id(client, symbol)
         if market_id is None:
             return None
             
+        import lighter
         async with lighter.ApiClient(configuration=lighter.Configuration(host=client.url)) as api_client:
             order_api = lighter.OrderApi(api_client)
             ob = await order_api.order_book_details(market_id=market_id)
             details = ob.order_book_details[0] if ob.order_book_details else None
             if details:
-                return {
+                meta = _MARKET_DETAILS[key] = {
                     "market_id": getattr(details, "market_id", market_id),
                     "symbol": getattr(details, "symbol", symbol),
                     "price_decimals": getattr(details, "price_decimals", 0),
@@ -331,6 +387,7 @@ async def get_market_meta(client: SignerClient, symbol: str) -> Optional[dict]:
                     "min_base_amount": getattr(details, "min_base_amount", "0"),
                     "min_quote_amount": getattr(details, "min_quote_amount", "0"),
                 }
+                return meta
     except Exception as e:
         print(f"Error fetching market metadata for {symbol}: {e}")
     return None
@@ -344,18 +401,12 @@ async def list_markets(client: SignerClient) -> List[str]:
             api = OrderApi(cli)
             
             ob = await api.order_books()
-            def to_dict(x):
-                if hasattr(x,'model_dump'): return x.model_dump()
-                if hasattr(x,'dict'): return x.dict()
-                return getattr(x,'__dict__', {})
-            
             d = to_dict(ob)
             rows = d.get('order_books') or d.get('data') or []
             
             symbols = []
             for row in rows:
-                rd = to_dict(row)
-                symbol = rd.get("symbol") or rd.get("market") or rd.get("name")
+                symbol = symbol_of(to_dict(row))
                 if symbol and symbol not in symbols:
                     symbols.append(symbol)
             
@@ -363,3 +414,41 @@ async def list_markets(client: SignerClient) -> List[str]:
     except Exception as e:
         print(f"Error listing markets via SDK: {e}")
         return []
+
+# ------------------- Plain REST snapshots (no SDK models) -------------------
+@timed("rest.get_order_books")
+async def get_order_books(client: SignerClient) -> List[dict]:
+    """Every market's metadata row from /orderBooks (symbol, market_id, status, decimals...)."""
+    async with _session(client) as h:
+        r = await h.get("/api/v1/orderBooks")
+        r.raise_for_status()
+        rows = loads(r.content).get("order_books") or []
+    for it in rows:
+        _cache_market_entry(it)
+    return rows
+
+@timed("rest.get_exchange_stats")
+async def get_exchange_stats(client: SignerClient) -> Dict[int, dict]:
+    """market_id -> daily stats (last_trade_price, volumes) for all markets in one request."""
+    async with _session(client) as h:
+        r = await h.get("/api/v1/exchangeStats")
+        r.raise_for_status()
+        data = loads(r.content)
+    rows = data.get("order_book_stats") if isinstance(data, dict) else data
+    return {int(it["market_id"]): it for it in rows or [] if it.get("market_id") is not None}
+
+@timed("rest.get_book_orders")
+async def get_book_orders(client: SignerClient, market_id: int, limit: int = 50) -> dict:
+    """Resting orders from /orderBookOrders folded into [price, size] levels, best first."""
+    async with _session(client) as h:
+        r = await h.get("/api/v1/orderBookOrders", params={"market_id": market_id, "limit": limit})
+        r.raise_for_status()
+        data = loads(r.content)
+    out = {}
+    for side in ("bids", "asks"):
+        levels: Dict[float, float] = {}
+        for o in data.get(side) or []:
+            px = float(o["price"])
+            levels[px] = levels.get(px, 0.0) + float(o.get("remaining_base_amount") or o.get("size") or 0)
+        out[side] = [[px, sz] for px, sz in sorted(levels.items(), reverse=side == "bids")]
+    return out
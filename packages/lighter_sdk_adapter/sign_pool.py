@@ -0,0 +1,100 @@
+# signing executor: native sign_* calls on worker threads so bursts don't stall the event loop
+import asyncio
+import inspect
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, List, Optional, Sequence
+
+from packages.telemetry import metrics
+from packages.telemetry.latency import timed
+
+from .signer import _signed_tx_info, next_nonce, prepare_tx, switch_api_key
+
+_POOLS: Dict[int, "SigningPool"] = {}
+_NATIVE = asyncio.Lock()  # one native signer (and "current" key) per process, whatever the client
+metrics.gauge_fn("aegon_sign_queue_depth", lambda: sum(p._executor._work_queue.qsize() for p in _POOLS.values()),
+                 "Signatures waiting for a signing worker thread.")
+
+
+class SigningPool:
+    """Signs batches on a thread pool and returns them in input order.
+
+    The lighter signer is a ctypes call into a Go library, which releases the GIL, so threads
+    sign in parallel while the loop keeps handling market data. Everything else stays on the
+    loop, in list order: preparing the body (market decimals, scaling) and taking nonces from
+    the client's nonce manager. The native library signs with one "current" api key, so a
+    batch runs one api key at a time, with one switch per run of equal keys. A process-wide lock
+    keeps two batches (also of different accounts' clients) from switching keys under each other.
+
+    Nonces are taken at sign time but `_NATIVE` is released before the send, so the pool does
+    not order sends by itself: callers hold `seq` (one per client) from `sign_batch` through
+    the send, or two batches can reach the venue out of nonce order.
+    """
+
+    def __init__(self, client, workers: Optional[int] = None):
+        self.client = client
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="signer")
+        self.seq = asyncio.Lock()  # sign -> send sequence for this client (see LighterExchange._sign_send)
+
+    async def sign(self, body: dict) -> dict:
+        return (await self.sign_batch([body]))[0]
+
+    @timed("signer.pool_batch")
+    async def sign_batch(self, bodies: Sequence[dict]) -> List[dict]:
+        """Signed {tx_type, api_key_index, tx_info} per body, in order. Hold `seq` across this
+        call and the send that follows it."""
+        client = self.client
+        prepared = [await prepare_tx(client, b) for b in bodies]
+        loop = asyncio.get_running_loop()
+        async with _NATIVE:
+            keys = [next_nonce(client, b) for b in bodies]  # parent's nonce manager, list order
+            results: List[Any] = [None] * len(bodies)
+            i = 0
+            while i < len(bodies):
+                api_key = keys[i][0]
+                j = i
+                while j < len(bodies) and keys[j][0] == api_key:
+                    j += 1
+                switch_api_key(client, api_key)
+                jobs = []
+                for k in range(i, j):
+                    method, kwargs, _ = prepared[k]
+                    fn = partial(getattr(client, method), **kwargs, nonce=keys[k][1])
+                    if inspect.iscoroutinefunction(getattr(client, method)):
+                        jobs.append(fn())  # an async SDK signer signs on the loop anyway
+                    else:
+                        jobs.append(loop.run_in_executor(self._executor, fn))
+                results[i:j] = await asyncio.gather(*jobs, return_exceptions=True)
+                i = j
+        out, failed = [], None
+        for (_, _, tx_type), (api_key, _), res in zip(prepared, keys, results):
+            try:
+                if isinstance(res, BaseException):
+                    client.nonce_manager.acknowledge_failure(api_key)
+                    raise res
+                out.append({"tx_type": tx_type, "api_key_index": api_key,
+                            "tx_info": await _signed_tx_info(client, res, api_key, "sign_batch")})
+            except Exception as e:
+                failed = failed or e  # later nonces in the batch were taken too: fail the whole batch
+        if failed is not None:
+            raise failed
+        return out
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def signing_pool(client, workers: Optional[int] = None) -> Optional[SigningPool]:
+    """The pool for this client when signing workers are enabled, else None (sign inline).
+    Enabled by `workers` or $AEGON_SIGN_WORKERS; exchanges sharing a client share its pool
+    (and its `seq` lock)."""
+    if workers is None:
+        workers = int(os.environ.get("AEGON_SIGN_WORKERS") or 0)
+    if workers <= 0:
+        return None
+    pool = _POOLS.get(id(client))
+    if pool is None or pool.client is not client:
+        pool = _POOLS[id(client)] = SigningPool(client, workers)
+    return pool
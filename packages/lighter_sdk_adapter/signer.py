@@ -3,10 +3,12 @@ from __future__ import annotations
 import inspect
 import json
 from decimal import Decimal, ROUND_HALF_UP, InvalidOperation
-from typing import Any, Optional
+from typing import Any, Optional, Tuple
 
 from lighter import SignerClient
 
+from packages.telemetry.latency import span, timed
+
 from .rest import get_market_meta
  
 def make_signer(base_url: str, account_index: int, api_key_index: int,
@@ -42,27 +44,20 @@ def _scale(value: Any, scale: Decimal) -> int:
     scaled = (dec_value * scale).quantize(Decimal("1"), rounding=ROUND_HALF_UP)
     return int(scaled)
 
-async def sign_create_order(client: SignerClient, body: dict) -> dict[str, Any]:
-    # Map string order types to integer enum values
-    order_type_map = {
-        "ORDER_TYPE_LIMIT": client.ORDER_TYPE_LIMIT,
-        "ORDER_TYPE_MARKET": client.ORDER_TYPE_MARKET,
-        "ORDER_TYPE_STOP_LOSS": client.ORDER_TYPE_STOP_LOSS,
-        "ORDER_TYPE_TAKE_PROFIT": client.ORDER_TYPE_TAKE_PROFIT,
-        "ORDER_TYPE_STOP_LOSS_LIMIT": client.ORDER_TYPE_STOP_LOSS_LIMIT,
-        "ORDER_TYPE_TAKE_PROFIT_LIMIT": client.ORDER_TYPE_TAKE_PROFIT_LIMIT,
-        "ORDER_TYPE_TWAP": client.ORDER_TYPE_TWAP,
-    }
-
-    # Map string time in force to integer enum values
-    time_in_force_map = {
-        "ORDER_TIME_IN_FORCE_IMMEDIATE_OR_CANCEL": client.ORDER_TIME_IN_FORCE_IMMEDIATE_OR_CANCEL,
-        "ORDER_TIME_IN_FORCE_GOOD_TILL_TIME": client.ORDER_TIME_IN_FORCE_GOOD_TILL_TIME,
-        "ORDER_TIME_IN_FORCE_POST_ONLY": client.ORDER_TIME_IN_FORCE_POST_ONLY,
-    }
+ORDER_TYPES = ("ORDER_TYPE_LIMIT", "ORDER_TYPE_MARKET", "ORDER_TYPE_STOP_LOSS", "ORDER_TYPE_TAKE_PROFIT",
+               "ORDER_TYPE_STOP_LOSS_LIMIT", "ORDER_TYPE_TAKE_PROFIT_LIMIT", "ORDER_TYPE_TWAP")
+TIME_IN_FORCE = ("ORDER_TIME_IN_FORCE_IMMEDIATE_OR_CANCEL", "ORDER_TIME_IN_FORCE_GOOD_TILL_TIME",
+                 "ORDER_TIME_IN_FORCE_POST_ONLY")
 
+# A signature is prepared (market decimals, scaling, enums) on the loop, takes its nonce from the
+# client's nonce manager on the loop, and only the native client.sign_* call may run elsewhere
+# (see sign_pool.SigningPool). Prepared = (client method, kwargs without nonce, tx type).
+Prepared = Tuple[str, dict, int]
+
+async def prepare_create_order(client: SignerClient, body: dict) -> Prepared:
     market = body.get("market")
-    meta = await get_market_meta(client, market) if market else None
+    with span("signer.market_meta"):
+        meta = await get_market_meta(client, market) if market else None
     price_decimals = meta.get("price_decimals") if isinstance(meta, dict) else None
     size_decimals = meta.get("size_decimals") if isinstance(meta, dict) else None
     try:
@@ -80,18 +75,6 @@ async def sign_create_order(client: SignerClient, body: dict) -> dict[str, Any]:
     if order_expiry is not None:
         order_expiry = int(order_expiry)
 
-    provided_api_key = body.get("api_key_index")
-    provided_nonce = body.get("nonce")
-    if provided_api_key is not None and provided_nonce is not None:
-        api_key_index = int(provided_api_key)
-        nonce_val = int(provided_nonce)
-    else:
-        api_key_index, nonce_val = client.nonce_manager.next_nonce()
-    switch_err = client.switch_api_key(api_key_index)
-    if switch_err:
-        client.nonce_manager.acknowledge_failure(api_key_index)
-        raise ValueError(f"switch_api_key failed: {switch_err}")
-
     base_amount_raw = body.get("base_amount")
     if base_amount_raw is None:
         raise ValueError("base_amount is required for create_order")
@@ -103,17 +86,22 @@ async def sign_create_order(client: SignerClient, body: dict) -> dict[str, Any]:
     trigger_price_raw = body.get("trigger_price")
     trigger_price = _scale(trigger_price_raw, price_scale) if trigger_price_raw is not None else 0
 
+    # Map string time in force / order types to the client's integer enum values
     time_in_force_val = body.get("time_in_force", "ORDER_TIME_IN_FORCE_GOOD_TILL_TIME")
     if isinstance(time_in_force_val, int):
         tif = time_in_force_val
+    elif str(time_in_force_val) in TIME_IN_FORCE:
+        tif = getattr(client, str(time_in_force_val))
     else:
-        tif = time_in_force_map.get(str(time_in_force_val), client.ORDER_TIME_IN_FORCE_GOOD_TILL_TIME)
+        tif = client.ORDER_TIME_IN_FORCE_GOOD_TILL_TIME
 
     order_type_val = body.get("order_type", "ORDER_TYPE_LIMIT")
     if isinstance(order_type_val, int):
         order_type = order_type_val
+    elif str(order_type_val) in ORDER_TYPES:
+        order_type = getattr(client, str(order_type_val))
     else:
-        order_type = order_type_map.get(str(order_type_val), client.ORDER_TYPE_LIMIT)
+        order_type = client.ORDER_TYPE_LIMIT
 
     reduce_only_raw = body.get("reduce_only", False)
     if isinstance(reduce_only_raw, str):
@@ -121,27 +109,96 @@ async def sign_create_order(client: SignerClient, body: dict) -> dict[str, Any]:
     else:
         reduce_only = bool(reduce_only_raw)
 
-    # Extract parameters from body dict and call sign_create_order with individual parameters
-    result = client.sign_create_order(
-        market_index=int(body.get("market_index", 0)),  # Ensure market_index is an integer
-        client_order_index=int(body.get("client_order_index", "0")),  # Ensure client_order_index is an integer
-        base_amount=base_amount,
-        price=price,
-        is_ask=body.get("side") == "SELL",
-        order_type=order_type,
-        time_in_force=tif,
-        reduce_only=reduce_only,
-        trigger_price=trigger_price,
-        order_expiry=order_expiry if order_expiry is not None else client.DEFAULT_28_DAY_ORDER_EXPIRY,
-        nonce=nonce_val,
-    )
+    return "sign_create_order", {
+        "market_index": int(body.get("market_index", 0)),  # Ensure market_index is an integer
+        "client_order_index": int(body.get("client_order_index", "0")),
+        "base_amount": base_amount,
+        "price": price,
+        "is_ask": body.get("side") == "SELL",
+        "order_type": order_type,
+        "time_in_force": tif,
+        "reduce_only": reduce_only,
+        "trigger_price": trigger_price,
+        "order_expiry": order_expiry if order_expiry is not None else client.DEFAULT_28_DAY_ORDER_EXPIRY,
+    }, client.TX_TYPE_CREATE_ORDER
+
+def prepare_cancel_order(client: SignerClient, body: dict) -> Prepared:
+    order_index = body.get("order_index")
+    if order_index is None:
+        raise ValueError("order_index is required for cancel_order")
+    market_index = body.get("market_index")
+    if market_index is None:
+        raise ValueError("market_index is required for cancel_order")  # never default: 0 is a real market
+    return "sign_cancel_order", {"market_index": int(market_index),
+                                 "order_index": int(order_index)}, client.TX_TYPE_CANCEL_ORDER
+
+def prepare_cancel_all_orders(client: SignerClient, body: dict) -> Prepared:
+    tif_val = body.get("time_in_force", "CANCEL_ALL_TIF_IMMEDIATE")
+    tif = tif_val if isinstance(tif_val, int) else getattr(client, str(tif_val), client.CANCEL_ALL_TIF_IMMEDIATE)
+    return "sign_cancel_all_orders", {"time_in_force": tif, "time": int(body.get("time", 0))}, \
+        client.TX_TYPE_CANCEL_ALL_ORDERS
+
+async def prepare_tx(client: SignerClient, body: dict) -> Prepared:
+    """Dispatch on body["action"] ("create" by default, "cancel", "cancel_all")."""
+    action = body.get("action", "create")
+    if action == "cancel":
+        return prepare_cancel_order(client, body)
+    if action == "cancel_all":
+        return prepare_cancel_all_orders(client, body)
+    return await prepare_create_order(client, body)
+
+async def _sign_prepared(client: SignerClient, body: dict, prepared: Prepared) -> dict[str, Any]:
+    method, kwargs, tx_type = prepared
+    api_key_index, nonce_val = _acquire_nonce(client, body)
+    with span("signer.sign"):
+        result = getattr(client, method)(**kwargs, nonce=nonce_val)
+    tx_info = await _signed_tx_info(client, result, api_key_index, method)
+    return {"tx_type": tx_type, "tx_info": tx_info, "api_key_index": api_key_index}
+
+@timed("signer.sign_create_order")
+async def sign_create_order(client: SignerClient, body: dict) -> dict[str, Any]:
+    return await _sign_prepared(client, body, await prepare_create_order(client, body))
+
+async def sign_cancel_order(client: SignerClient, body: dict) -> dict[str, Any]:
+    """Sign a single-order cancel. `order_index` may be the exchange or client order index."""
+    return await _sign_prepared(client, body, prepare_cancel_order(client, body))
+
+async def sign_cancel_all_orders(client: SignerClient, body: dict) -> dict[str, Any]:
+    """Sign an account-wide cancel-all (immediate unless `time_in_force`/`time` say otherwise)."""
+    return await _sign_prepared(client, body, prepare_cancel_all_orders(client, body))
+
+async def sign_tx(client: SignerClient, body: dict) -> dict[str, Any]:
+    """Dispatch on body["action"] ("create" by default, "cancel", "cancel_all")."""
+    return await _sign_prepared(client, body, await prepare_tx(client, body))
+
+def next_nonce(client: SignerClient, body: dict) -> tuple[int, int]:
+    """(api_key_index, nonce): the body's own pair when it carries one, else the nonce manager's."""
+    provided_api_key = body.get("api_key_index")
+    provided_nonce = body.get("nonce")
+    if provided_api_key is not None and provided_nonce is not None:
+        return int(provided_api_key), int(provided_nonce)
+    with span("signer.nonce"):
+        return client.nonce_manager.next_nonce()
+
+def switch_api_key(client: SignerClient, api_key_index: int) -> None:
+    switch_err = client.switch_api_key(api_key_index)
+    if switch_err:
+        client.nonce_manager.acknowledge_failure(api_key_index)
+        raise ValueError(f"switch_api_key failed: {switch_err}")
+
+def _acquire_nonce(client: SignerClient, body: dict) -> tuple[int, int]:
+    api_key_index, nonce_val = next_nonce(client, body)
+    switch_api_key(client, api_key_index)
+    return api_key_index, nonce_val
+
+async def _signed_tx_info(client: SignerClient, result: Any, api_key_index: int, what: str) -> str:
     if inspect.isawaitable(result):
         result = await result
 
     tx_info, error = result if isinstance(result, (list, tuple)) and len(result) >= 2 else (result, None)
     if error:
         client.nonce_manager.acknowledge_failure(api_key_index)
-        raise ValueError(f"sign_create_order failed: {error}")
+        raise ValueError(f"{what} failed: {error}")
     if not isinstance(tx_info, str):
         tx_info = json.dumps(tx_info)
-    return {"tx_type": client.TX_TYPE_CREATE_ORDER, "tx_info": tx_info, "api_key_index": api_key_index}
+    return tx_info
@@ -1,4 +1,5 @@
-# pydantic models (OrderCreate, etc.)from pydantic import BaseModel
+# pydantic models (OrderCreate, etc.)
+from pydantic import BaseModel
 from typing import Optional, Literal
 
 Side = Literal["BUY","SELL"]
@@ -10,4 +11,4 @@ class OrderCreate(BaseModel):
     base_amount: str
     price: Optional[str] = None
     time_in_force: Optional[str] = None
-    client_order_index: str
+    client_order_index: int
@@ -1,17 +1,92 @@
-import json, websockets
-from .signer import create_auth_token
+import asyncio, inspect, websockets
+from packages.telemetry import health, metrics
+from .codec import dumps, loads
+
+def ws_url(base_url: str) -> str:
+    # https -> wss, http -> ws (the local simulator serves plain http)
+    if base_url.startswith("https"):
+        return "wss" + base_url[len("https"):]
+    return base_url.replace("http", "ws", 1)
 
 async def account_stream(client, on_msg, ttl=60):
+    from .signer import create_auth_token  # public streams don't pay for the SDK import
     token = await create_auth_token(client, ttl)
-    url = client.url.replace("https","wss") + f"/ws/account?auth={token}"
+    url = ws_url(client.url) + f"/ws/account?auth={token}"
     async with websockets.connect(url) as ws:
         async for raw in ws:
-            on_msg(json.loads(raw))
+            on_msg(loads(raw))
 
 async def send_batch_ws(client, tx_types, tx_infos, ttl=60):
+    from .signer import create_auth_token
     token = await create_auth_token(client, ttl)
-    url = client.url.replace("https","wss") + f"/ws/jsonapi?auth={token}"
+    url = ws_url(client.url) + f"/ws/jsonapi?auth={token}"
     payload = {"type":"jsonapi/sendtxbatch","data":{"tx_types":tx_types,"tx_infos":tx_infos}}
     async with websockets.connect(url) as ws:
-        await ws.send(json.dumps(payload))
-        return json.loads(await ws.recv())
+        await ws.send(dumps(payload))
+        return loads(await ws.recv())
+
+async def subscribe_stream(base_url, channels, on_msg, reconnect_delay=1.0, stop=None, log=None):
+    """Venue /stream: subscribe to e.g. ["order_book/0", "account_all/12"] and feed every
+    message to on_msg (sync or async). Reconnects (and resubscribes) until `stop` is set;
+    the fresh `subscribed/*` snapshot after a reconnect resyncs any local state. A message
+    that fails to decode or whose handler raises also reconnects (logged): the local state
+    it was meant to update is suspect, and a silently dead feed would freeze it."""
+    url = ws_url(base_url) + "/stream"
+    health.track("ws")  # readiness: every running stream connected
+    try:
+        while stop is None or not stop.is_set():
+            try:
+                async with websockets.connect(url) as ws:
+                    health.up("ws")
+                    try:
+                        for ch in channels:
+                            await ws.send(dumps({"type": "subscribe", "channel": ch}))
+                        async for raw in ws:
+                            try:
+                                res = on_msg(loads(raw))
+                                if inspect.isawaitable(res):
+                                    await res
+                            except Exception as e:
+                                metrics.inc("aegon_ws_reconnects_total", reason="handler")
+                                if log:
+                                    log.warn("Stream handler failed, resubscribing", channels=channels, err=str(e))
+                                break
+                            if stop is not None and stop.is_set():
+                                return
+                    finally:
+                        health.down("ws")
+            except (OSError, websockets.WebSocketException) as e:
+                metrics.inc("aegon_ws_reconnects_total", reason="transport")
+                if log:
+                    log.warn("Stream disconnected, reconnecting", channels=channels, err=str(e))
+            if stop is not None and stop.is_set():
+                return
+            await asyncio.sleep(reconnect_delay)
+    finally:
+        health.untrack("ws")
+
+class StreamHub:
+    """One /stream connection shared by many consumers. Handlers are keyed by the
+    subscribe form ("order_book/0"); a failing handler is dropped from that message
+    only, so one consumer cannot take the feed down for the rest."""
+
+    def __init__(self, base_url, on_error=None):
+        self.base_url = base_url
+        self.on_error = on_error
+        self._handlers = {}
+
+    def subscribe(self, channel, handler):
+        self._handlers.setdefault(channel, []).append(handler)
+
+    def _dispatch(self, msg):
+        # messages name channels as "order_book:0"; subscriptions use "order_book/0"
+        handlers = self._handlers.get(str(msg.get("channel", "")).replace(":", "/", 1))
+        for h in handlers or ():
+            try:
+                h(msg)
+            except Exception as e:
+                if self.on_error:
+                    self.on_error(h, e)
+
+    async def run(self, stop=None, reconnect_delay=1.0, log=None):
+        await subscribe_stream(self.base_url, list(self._handlers), self._dispatch, reconnect_delay, stop, log)
@@ -1 +1,85 @@
-# portfolio report
+# portfolio report: columnar rollup parts (apps/trader/tasks/rollup.py) -> grouped PnL / turnover
+import glob
+import os
+from datetime import date
+from typing import List, Optional, Sequence, Tuple
+
+try:  # optional dependency: pip install pyarrow
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pragma: no cover
+    pa = pc = None
+
+KEYS = ("day", "market", "strategy", "leader")
+METRICS = ("fills", "volume", "turnover", "realized", "fees", "funding")
+
+SCHEMA = pa.schema([
+    ("day", pa.date32()), ("market", pa.string()), ("strategy", pa.string()), ("leader", pa.string()),
+    ("fills", pa.int64()), ("volume", pa.float64()), ("turnover", pa.float64()),
+    ("realized", pa.float64()), ("fees", pa.float64()), ("funding", pa.float64()),
+]) if pa is not None else None
+
+
+# --- parts: one small Arrow file per rollup run, named by the recv_ns range it covers ---
+def parts(root: str) -> List[Tuple[int, int, str]]:
+    out = []
+    for path in glob.glob(os.path.join(root, "parts", "part-*.arrow")):
+        lo, hi = os.path.basename(path)[5:-6].split("-")
+        out.append((int(lo), int(hi), path))
+    # a compaction interrupted before deleting its inputs leaves them inside the merged range
+    return sorted(p for p in out if not any(q[0] <= p[0] and p[1] <= q[1] and q != p for q in out))
+
+
+def write_part(root: str, table, lo: int, hi: int) -> str:
+    os.makedirs(os.path.join(root, "parts"), exist_ok=True)
+    path = os.path.join(root, "parts", f"part-{lo:020d}-{hi:020d}.arrow")
+    tmp = path + ".tmp"
+    with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, SCHEMA) as w:
+        w.write_table(table.cast(SCHEMA))
+    os.replace(tmp, path)
+    return path
+
+
+def load(root: str, start: Optional[date] = None, end: Optional[date] = None):
+    """Every part as one table (not yet grouped), optionally limited to days in [start, end)."""
+    tables = [pa.ipc.open_file(pa.memory_map(p, "r")).read_all() for _, _, p in parts(root)]
+    t = pa.concat_tables(tables) if tables else SCHEMA.empty_table()
+    if start is not None:
+        t = t.filter(pc.greater_equal(t["day"], pa.scalar(start, pa.date32())))
+    if end is not None:
+        t = t.filter(pc.less(t["day"], pa.scalar(end, pa.date32())))
+    return t
+
+
+def summarize(table, by: Sequence[str] = ("day",)):
+    """Sum the metrics per `by` key and add pnl = realized - fees + funding."""
+    by = list(by)
+    g = table.group_by(by).aggregate([(m, "sum") for m in METRICS])
+    g = g.rename_columns([c[:-4] if c.endswith("_sum") else c for c in g.column_names])
+    g = g.append_column("pnl", pc.add(pc.subtract(g["realized"], g["fees"]), g["funding"]))
+    g = g.select(by + list(METRICS) + ["pnl"])
+    return g.sort_by([(k, "ascending") for k in by]) if by else g
+
+
+def compact(root: str, max_parts: int = 64) -> None:
+    """Merge the parts into one once there are more than max_parts."""
+    ps = parts(root)
+    if len(ps) <= max_parts:
+        return
+    merged = summarize(load(root), KEYS).drop_columns(["pnl"])
+    write_part(root, merged, ps[0][0], ps[-1][1])
+    for _, _, p in ps:
+        os.remove(p)
+
+
+def render(table) -> str:
+    cols = table.column_names
+    rows = [[_fmt(v) for v in r.values()] for r in table.to_pylist()]
+    width = [max([len(c)] + [len(r[i]) for r in rows]) for i, c in enumerate(cols)]
+    lines = ["  ".join(c.rjust(w) for c, w in zip(cols, width))]
+    lines += ["  ".join(v.rjust(w) for v, w in zip(r, width)) for r in rows]
+    return "\n".join(lines)
+
+
+def _fmt(v) -> str:
+    return f"{v:,.2f}" if isinstance(v, float) else str(v)
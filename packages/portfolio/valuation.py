@@ -1 +1,191 @@
-# portfolio valuation
+# portfolio valuation: positions x live marks, revalued incrementally per tick
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from packages.risk.engine import market_key
+
+_COLUMNS = (("qty", 0.0), ("avg_px", 0.0), ("mark", np.nan), ("imf", None), ("upnl", 0.0),
+            ("value", 0.0), ("notional", 0.0), ("margin", 0.0), ("realized", 0.0))
+
+
+class Valuation:
+    """Per-market position, mark, unrealized PnL, signed value, notional and initial
+    margin in numpy arrays (one slot per market) plus running totals.
+
+    A single mark change touches one slot and adjusts the totals by its delta; a batch of
+    marks (on_marks / mark_all) is revalued with array ops across all markets at once.
+    Equity = collateral (incl. realized PnL) + unrealized PnL, as on the venue.
+
+    Fills and positions are not booked here: `load` takes them from a RiskEngine.
+    """
+
+    def __init__(self, collateral: float = 0.0, default_imf: float = 0.2, capacity: int = 32):
+        self.collateral = float(collateral)
+        self.default_imf = default_imf      # used until a position payload says otherwise
+        self.index: Dict[str, int] = {}
+        self.names: List[str] = []
+        for name, fill in _COLUMNS:
+            setattr(self, name, np.full(capacity, default_imf if fill is None else fill))
+        self._upnl = 0.0
+        self._net = 0.0
+        self._gross = 0.0
+        self._margin = 0.0
+
+    # --- slots ---
+    def slot(self, market: Any) -> int:
+        k = market_key(market)
+        i = self.index.get(k)
+        if i is None:
+            i = self.index[k] = len(self.names)
+            self.names.append(k)
+            if i >= len(self.qty):
+                n = len(self.qty)
+                for name, fill in _COLUMNS:
+                    extra = np.full(n, self.default_imf if fill is None else fill)
+                    setattr(self, name, np.concatenate([getattr(self, name), extra]))
+        return i
+
+    def _revalue(self, i: int) -> None:
+        q, m = float(self.qty[i]), float(self.mark[i])
+        if m != m:  # no mark yet: value at entry until the first tick
+            m = float(self.avg_px[i])
+        v = q * m
+        n = abs(v)
+        u = v - q * float(self.avg_px[i])
+        g = n * float(self.imf[i])
+        self._upnl += u - float(self.upnl[i])
+        self._net += v - float(self.value[i])
+        self._gross += n - float(self.notional[i])
+        self._margin += g - float(self.margin[i])
+        self.upnl[i], self.value[i], self.notional[i], self.margin[i] = u, v, n, g
+
+    def revalue(self) -> None:
+        """Recompute every slot and total with array ops (also clears float drift)."""
+        k = len(self.names)
+        q, avg = self.qty[:k], self.avg_px[:k]
+        m = np.where(np.isnan(self.mark[:k]), avg, self.mark[:k])
+        self.value[:k] = q * m
+        self.notional[:k] = np.abs(self.value[:k])
+        self.upnl[:k] = self.value[:k] - q * avg
+        self.margin[:k] = self.notional[:k] * self.imf[:k]
+        self._upnl = float(self.upnl[:k].sum())
+        self._net = float(self.value[:k].sum())
+        self._gross = float(self.notional[:k].sum())
+        self._margin = float(self.margin[:k].sum())
+
+    # --- updates ---
+    def on_mark(self, market: Any, price: float) -> None:
+        i = self.slot(market)
+        self.mark[i] = price
+        if self.qty[i]:
+            self._revalue(i)
+
+    def slots(self, markets: Iterable[Any]) -> np.ndarray:
+        """Slot indices for on_marks; resolve once, reuse for every batch."""
+        return np.fromiter((self.slot(m) for m in markets), dtype=np.int64)
+
+    def on_marks(self, markets: Any, prices: Any) -> None:
+        """Many marks at once (e.g. one poll of all books): one vectorized revalue.
+        `markets` is a sequence of names or an int array from `slots` (unique)."""
+        if isinstance(markets, np.ndarray) and markets.dtype.kind == "i":
+            idx, px = markets, np.asarray(prices, dtype=float)
+        else:
+            latest = dict(zip((self.slot(m) for m in markets), prices))  # last price per slot wins
+            idx = np.fromiter(latest, dtype=np.int64, count=len(latest))
+            px = np.fromiter(latest.values(), dtype=float, count=len(latest))
+        self.mark[idx] = px
+        q, avg = self.qty[idx], self.avg_px[idx]
+        v = q * px
+        n = np.abs(v)
+        u = v - q * avg
+        g = n * self.imf[idx]
+        self._upnl += float((u - self.upnl[idx]).sum())
+        self._net += float((v - self.value[idx]).sum())
+        self._gross += float((n - self.notional[idx]).sum())
+        self._margin += float((g - self.margin[idx]).sum())
+        self.upnl[idx], self.value[idx], self.notional[idx], self.margin[idx] = u, v, n, g
+
+    def mark_all(self, prices) -> None:
+        """Marks for every slot, aligned with `names`."""
+        k = len(self.names)
+        self.mark[:k] = np.asarray(prices, dtype=float)[:k]
+        self.revalue()
+
+    def set_position(self, market: Any, qty: float, avg_px: float, imf: Optional[float] = None) -> None:
+        i = self.slot(market)
+        self.qty[i], self.avg_px[i] = qty, avg_px
+        if imf:
+            self.imf[i] = imf
+        self._revalue(i)
+
+    def set_imf(self, market: Any, imf: float) -> None:
+        i = self.slot(market)
+        self.imf[i] = imf
+        self._revalue(i)
+
+    def sync_imf(self, positions: Any) -> None:
+        """Initial margin fractions from Lighter position payloads (list, or dict keyed by market id)."""
+        for p in (positions.values() if isinstance(positions, dict) else positions):
+            market = p.get("symbol") or p.get("market") or p.get("market_id")
+            imf = float(p.get("initial_margin_fraction") or 0) / 100.0
+            if market is not None and imf:
+                self.set_imf(market, imf)
+
+    def load(self, risk: Any) -> None:
+        """Positions, entries, marks and equity from a RiskEngine (packages.risk.engine), which
+        is the one book of fills, positions and cash; this adds margin and per-slot values.
+        Call after every account update; marks in between go to both (on_mark)."""
+        self.qty[:] = 0.0
+        for k, e in risk.markets.items():
+            i = self.slot(k)
+            self.qty[i], self.avg_px[i], self.realized[i] = e.qty, e.avg_px, e.realized
+            self.mark[i] = np.nan if e.mark is None else e.mark
+        self.revalue()
+        self.collateral = risk.equity - self._upnl
+
+    # --- readers ---
+    @property
+    def unrealized(self) -> float:
+        return self._upnl
+
+    @property
+    def equity(self) -> float:
+        return self.collateral + self._upnl
+
+    @property
+    def gross_exposure(self) -> float:
+        return self._gross
+
+    @property
+    def net_exposure(self) -> float:
+        return self._net
+
+    @property
+    def leverage(self) -> float:
+        eq = self.equity
+        return self._gross / eq if eq > 0 else (float("inf") if self._gross else 0.0)
+
+    @property
+    def margin_used(self) -> float:
+        return self._margin
+
+    @property
+    def margin_usage(self) -> float:
+        eq = self.equity
+        return self._margin / eq if eq > 0 else (float("inf") if self._margin else 0.0)
+
+    def position(self, market: Any) -> dict:
+        i = self.slot(market)
+        return {"market": self.names[i], "qty": float(self.qty[i]), "avg_px": float(self.avg_px[i]),
+                "mark": None if np.isnan(self.mark[i]) else float(self.mark[i]), "upnl": float(self.upnl[i]),
+                "notional": float(self.notional[i]), "margin": float(self.margin[i]),
+                "realized": float(self.realized[i])}
+
+    def snapshot(self) -> dict:
+        return {
+            "equity": self.equity, "collateral": self.collateral, "unrealized": self._upnl,
+            "gross_exposure": self._gross, "net_exposure": self._net, "leverage": self.leverage,
+            "margin_usage": self.margin_usage,
+            "positions": [self.position(n) for i, n in enumerate(self.names) if self.qty[i]],
+        }
@@ -0,0 +1,322 @@
+# pre-trade risk: in-memory exposure state, O(1) checks against configs/risk.yml + Cfg limits
+import json
+import os
+import time
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import yaml
+
+Check = Tuple[bool, str]
+OK: Check = (True, "")
+
+
+@dataclass
+class RiskLimits:
+    max_leverage: float = 5.0            # Cfg.risk_lev_cap
+    max_concurrent: int = 2              # Cfg.max_concurrent: markets with a position
+    daily_dd_stop_pct: float = 2.0       # Cfg.risk_daily_dd_stop: % of day-start equity
+    max_risk_pct: float = 0.5            # Cfg.risk_max_risk_pct: % of equity lost at the stop
+    max_order_notional: float = 0.0      # 0 disables
+    max_market_notional: float = 0.0
+    max_total_notional: float = 0.0
+    max_open_orders: int = 0
+    max_open_orders_per_market: int = 0
+    price_band_bps: float = 0.0          # reject limit prices this far from the mark
+    markets: Dict[str, dict] = field(default_factory=dict)  # per-market overrides
+
+    @classmethod
+    def from_cfg(cls, cfg: Any, path: Optional[str] = "configs/risk.yml", data: Optional[dict] = None) -> "RiskLimits":
+        """`data` is risk.yml already loaded (packages.config.models.RiskConfig.data()); path is then ignored."""
+        if data is None and path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = yaml.safe_load(f) or {}
+        data = data or {}
+        kw = {}
+        if cfg is not None:
+            kw = {"max_leverage": cfg.risk_lev_cap, "max_concurrent": cfg.max_concurrent,
+                  "daily_dd_stop_pct": cfg.risk_daily_dd_stop, "max_risk_pct": cfg.risk_max_risk_pct}
+        names = {f.name for f in fields(cls)}
+        kw.update({k: v for k, v in (data.get("limits") or {}).items() if k in names})
+        kw["markets"] = {market_key(k): v or {} for k, v in (data.get("markets") or {}).items()}
+        return cls(**kw)
+
+
+def market_key(market: Any) -> str:
+    s = str(market).upper()
+    for ch in ("-", "/", ":", "_"):
+        s = s.replace(ch, "")
+    return s[:-4] if s.endswith("USDC") and len(s) > 4 else s
+
+
+def bracket_legs(intent: Any) -> int:
+    return 1 + (intent.tp_px is not None) + (intent.stop_px is not None)
+
+
+class Exposure:
+    __slots__ = ("qty", "avg_px", "mark", "realized", "open_orders", "max_notional", "max_orders")
+
+    def __init__(self, max_notional: float, max_orders: int):
+        self.qty = 0.0
+        self.avg_px = 0.0
+        self.mark: Optional[float] = None
+        self.realized = 0.0
+        self.open_orders = 0
+        self.max_notional = max_notional
+        self.max_orders = max_orders
+
+
+class RiskEngine:
+    """Live exposure per market, total notional, leverage, open-order counts and intraday
+    PnL, kept in memory and updated from fills / marks / order events. `check*` never
+    awaits: seed it from an account snapshot (sync_account) off the order path.
+
+    Intraday PnL is equity now minus equity at the first sync of the UTC day, which is
+    persisted in `state_dir` (default $COI_STATE_DIR or .state; "" disables) so restarts
+    during the day keep the same baseline.
+    """
+
+    def __init__(self, limits: Optional[RiskLimits] = None, state_dir: Optional[str] = None,
+                 clock=time.time):
+        self.limits = limits or RiskLimits()
+        self.clock = clock
+        if state_dir is None:
+            state_dir = os.environ.get("COI_STATE_DIR", ".state")
+        self.state_path = os.path.join(state_dir, "risk-day.json") if state_dir else None
+        self.markets: Dict[str, Exposure] = {}
+        self.cash = 0.0            # equity = cash + sum(qty * mark)
+        self.day: Optional[str] = None
+        self.day_start_equity: Optional[float] = None
+        self._day_end = 0.0
+        self.synced = False
+        self._mtm = 0.0            # sum(qty * mark)
+        self._gross = 0.0          # sum(|qty| * mark)
+        self._open_orders = 0
+        self._positions = 0
+
+    # --- state ---
+    def exposure(self, market: Any) -> Exposure:
+        key = market_key(market)
+        e = self.markets.get(key)
+        if e is None:
+            e = self.markets[key] = Exposure(*self._market_caps(key))
+        return e
+
+    def _market_caps(self, key: str) -> Tuple[float, int]:
+        o = self.limits.markets.get(key, {})
+        return (float(o.get("max_market_notional", self.limits.max_market_notional)),
+                int(o.get("max_open_orders_per_market", self.limits.max_open_orders_per_market)))
+
+    def set_limits(self, limits: RiskLimits) -> None:
+        """Swap in new limits (config reload); exposure state is kept."""
+        self.limits = limits
+        for key, e in self.markets.items():
+            e.max_notional, e.max_orders = self._market_caps(key)
+
+    def _set(self, e: Exposure, qty: float, mark: Optional[float]) -> None:
+        if e.mark is not None:
+            self._mtm -= e.qty * e.mark
+            self._gross -= abs(e.qty) * e.mark
+        self._positions += (qty != 0) - (e.qty != 0)
+        e.qty, e.mark = qty, mark
+        if mark is not None:
+            self._mtm += qty * mark
+            self._gross += abs(qty) * mark
+
+    @property
+    def equity(self) -> float:
+        return self.cash + self._mtm
+
+    @property
+    def total_notional(self) -> float:
+        return self._gross
+
+    @property
+    def leverage(self) -> float:
+        eq = self.equity
+        return self._gross / eq if eq > 0 else float("inf") if self._gross else 0.0
+
+    @property
+    def intraday_pnl(self) -> float:
+        self._roll_day()
+        return self.equity - self.day_start_equity if self.day_start_equity is not None else 0.0
+
+    @property
+    def open_positions(self) -> int:
+        return self._positions
+
+    def _today(self) -> str:
+        return time.strftime("%Y-%m-%d", time.gmtime(self.clock()))
+
+    def _roll_day(self) -> None:
+        now = self.clock()
+        if now < self._day_end or not self.synced:
+            return
+        self._day_end = (now // 86400 + 1) * 86400
+        today = self._today()
+        if self.day == today:
+            return
+        self.day, self.day_start_equity = today, self.equity
+        if self.state_path:
+            os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+            with open(self.state_path, "w", encoding="utf-8") as f:
+                json.dump({"day": today, "equity": self.day_start_equity}, f)
+
+    def sync_account(self, payload: dict) -> None:
+        """Replace positions / equity with an account snapshot (get_account_by_index)."""
+        root = payload.get("account", payload)
+        if isinstance(root.get("accounts"), list) and root["accounts"]:
+            root = root["accounts"][0]
+        self.sync_positions(root.get("positions") or [], replace=True)
+        equity = root.get("total_asset_value") or root.get("collateral")
+        if equity is not None:
+            self.cash = float(equity) - self._mtm
+        if not self.synced:
+            self.synced = True
+            self._load_day()
+        self._roll_day()
+
+    def sync_positions(self, positions: Any, replace: bool = False) -> None:
+        """Apply position payloads (list, or dict keyed by market id as in account_all);
+        replace=True zeroes markets missing from the list first."""
+        if isinstance(positions, dict):
+            positions = list(positions.values())
+        if replace:
+            for e in self.markets.values():
+                self._set(e, 0.0, e.mark)
+                e.open_orders = 0
+        for p in positions:
+            qty = float(p.get("position") or 0) * (-1 if int(p.get("sign", 1) or 1) < 0 else 1)
+            market = p.get("symbol") or p.get("market") or p.get("market_id")
+            if market is None:
+                continue
+            e = self.exposure(market)
+            value = float(p.get("position_value") or 0)
+            mark = value / abs(qty) if qty and value else e.mark
+            e.avg_px = float(p.get("avg_entry_price") or 0)
+            e.open_orders = int(p.get("open_order_count", e.open_orders) or 0)
+            self._set(e, qty, mark if mark is not None else e.avg_px or None)
+        self._open_orders = sum(e.open_orders for e in self.markets.values())
+
+    def _load_day(self) -> None:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("day") == self._today():
+            self.day, self.day_start_equity = data["day"], float(data["equity"])
+
+    def on_mark(self, market: Any, price: float) -> None:
+        e = self.exposure(market)
+        self._set(e, e.qty, price)
+
+    def on_fill(self, market: Any, side: str, qty: float, price: float, fee: float = 0.0) -> None:
+        e = self.exposure(market)
+        signed = qty if side == "BUY" else -qty
+        new = e.qty + signed
+        if e.qty == 0 or (e.qty > 0) == (signed > 0):
+            e.avg_px = (e.avg_px * abs(e.qty) + price * qty) / abs(new) if new else 0.0
+        else:
+            closed = min(abs(signed), abs(e.qty))
+            e.realized += closed * (price - e.avg_px) * (1 if e.qty > 0 else -1)
+            if abs(signed) > abs(e.qty):
+                e.avg_px = price  # flipped
+            elif not new:
+                e.avg_px = 0.0
+        self.cash -= signed * price + fee
+        self._set(e, new if abs(new) > 1e-12 else 0.0, price)
+
+    def on_order_open(self, market: Any, n: int = 1) -> None:
+        """Orders just placed; they count until the next account snapshot replaces the counts."""
+        self.exposure(market).open_orders += n
+        self._open_orders += n
+
+    # --- checks ---
+    def check(self, market: Any, side: str, qty: float, price: Optional[float] = None,
+              stop_px: Optional[float] = None, orders: int = 1) -> Check:
+        return self._check(self.exposure(market), side, qty, price, stop_px, orders, 0.0, 0.0, 0, 0, 0)
+
+    def _check(self, e: Exposure, side: str, qty: float, price: Optional[float], stop_px: Optional[float],
+               orders: int, pending_qty: float, pending_gross: float, pending_orders: int,
+               pending_mkt_orders: int, pending_positions: int) -> Check:
+        lim = self.limits
+        if qty <= 0:
+            return (False, "BAD_QTY")
+        if not self.synced:
+            return (False, "NOT_SYNCED")
+        mark = e.mark if e.mark is not None else price
+        px = price if price is not None else mark
+        if px is None or px <= 0:
+            return (False, "NO_PRICE")
+        if price is not None and mark and lim.price_band_bps and abs(price - mark) / mark * 1e4 > lim.price_band_bps:
+            return (False, "PRICE_BAND")
+        if lim.max_open_orders and self._open_orders + pending_orders + orders > lim.max_open_orders:
+            return (False, "OPEN_ORDERS")
+        if e.max_orders and e.open_orders + pending_mkt_orders + orders > e.max_orders:
+            return (False, "MARKET_OPEN_ORDERS")
+
+        cur = e.qty + pending_qty
+        new = cur + (qty if side == "BUY" else -qty)
+        if abs(new) <= abs(cur) and (new == 0 or (new > 0) == (cur > 0)):
+            return OK  # reduces exposure: always allowed
+        equity = self.equity
+        if equity <= 0:
+            return (False, "NO_EQUITY")
+        if self.day_start_equity and self.intraday_pnl <= -self.day_start_equity * lim.daily_dd_stop_pct / 100.0:
+            return (False, "DAILY_STOP")
+        if cur == 0 and self._positions + pending_positions >= lim.max_concurrent:
+            return (False, "MAX_CONCURRENT")
+        notional = qty * px
+        if lim.max_order_notional and notional > lim.max_order_notional:
+            return (False, "ORDER_NOTIONAL")
+        new_mkt = abs(new) * px
+        if e.max_notional and new_mkt > e.max_notional:
+            return (False, "MARKET_NOTIONAL")
+        gross = self._gross + pending_gross + (abs(new) - abs(cur)) * px
+        if lim.max_total_notional and gross > lim.max_total_notional:
+            return (False, "TOTAL_NOTIONAL")
+        if gross / equity > lim.max_leverage:
+            return (False, "LEV_CAP")
+        if stop_px is not None and lim.max_risk_pct and \
+                abs(px - stop_px) * qty > equity * lim.max_risk_pct / 100.0:
+            return (False, "RISK_PCT")
+        return OK
+
+    def check_batch(self, orders: Iterable[Tuple[Any, str, float, Optional[float]]]) -> Check:
+        """All-or-nothing check of (market, side, qty, price[, stop_px]) orders taken
+        together, e.g. one copy tick across several markets."""
+        pending: Dict[str, list] = {}  # key -> [qty, orders]
+        gross, n_orders, n_new = 0.0, 0, 0
+        for o in orders:
+            market, side, qty, price = o[:4]
+            e = self.exposure(market)
+            p = pending.setdefault(market_key(market), [0.0, 0])
+            ok, reason = self._check(e, side, qty, price, o[4] if len(o) > 4 else None, 1,
+                                     p[0], gross, n_orders, p[1], n_new)
+            if not ok:
+                return (False, f"{reason}:{market}")
+            px = price if price is not None else e.mark
+            before = e.qty + p[0]
+            p[0] += qty if side == "BUY" else -qty
+            p[1] += 1
+            n_orders += 1
+            gross += (abs(e.qty + p[0]) - abs(before)) * px
+            n_new += (e.qty + p[0] != 0) - (before != 0)
+        return OK
+
+    def check_intent(self, intent: Any, price: Optional[float] = None) -> Check:
+        """Whole bracket (packages.core.models.order.OrderIntent): the entry leg is sized
+        against the limits and its stop; TP/SL legs only count toward open orders."""
+        px = intent.entry_px if intent.entry_px is not None else price
+        return self.check(intent.market, intent.side, float(intent.base_amount), px, intent.stop_px, bracket_legs(intent))
+
+    def snapshot(self) -> dict:
+        return {
+            "equity": self.equity, "intraday_pnl": self.intraday_pnl, "total_notional": self._gross,
+            "leverage": self.leverage, "open_positions": self._positions, "open_orders": self._open_orders,
+            "markets": {k: {"qty": e.qty, "avg_px": e.avg_px, "mark": e.mark, "realized": e.realized,
+                            "open_orders": e.open_orders} for k, e in self.markets.items() if e.qty or e.open_orders},
+        }
@@ -1 +1,146 @@
-# base strategy
+# base strategy: one event interface for live trading and backtests
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from packages.data.book import LocalBook
+from packages.data.features import SeenTrades
+
+
+@dataclass
+class Bar:
+    ts: float          # bar open, unix seconds
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float = 0.0
+    trades: int = 0
+
+
+@dataclass
+class Fill:
+    ts: float
+    side: int          # +1 bought, -1 sold
+    qty: float
+    price: float
+
+
+class BarBuilder:
+    """Aggregates trades into fixed-interval OHLCV bars; a bar is emitted when the first
+    print of a later interval arrives, or from `roll` once its interval has passed."""
+
+    def __init__(self, interval_sec: float = 60.0):
+        self.interval_sec = interval_sec
+        self.bar: Optional[Bar] = None
+
+    def _start(self, ts: float) -> float:
+        return ts - ts % self.interval_sec
+
+    def on_trade(self, price: float, size: float, ts: float) -> Optional[Bar]:
+        start = self._start(ts)
+        b, done = self.bar, None
+        if b is not None and start > b.ts:
+            done, b = b, None
+        if b is None:
+            self.bar = Bar(start, price, price, price, price, size, 1)
+        else:
+            b.high = max(b.high, price)
+            b.low = min(b.low, price)
+            b.close = price
+            b.volume += size
+            b.trades += 1
+        return done
+
+    def roll(self, now: float) -> Optional[Bar]:
+        b = self.bar
+        if b is not None and now >= b.ts + self.interval_sec:
+            self.bar = None
+            return b
+        return None
+
+
+class Strategy:
+    """Subclasses keep incremental indicators in their event hooks and express their
+    decision as `target` (signed base units). A runner -- live (apps.trader.tasks.strategy_run)
+    or backtest (run_bars) -- moves the position to the target and reports fills back.
+    """
+
+    name = "base"
+
+    def __init__(self, interval_sec: float = 60.0):
+        self.bars = BarBuilder(interval_sec)
+        self.target = 0.0
+        self.position = 0.0
+        self.entry_px: Optional[float] = None
+        self.book = LocalBook()
+        self.last_px: Optional[float] = None
+        self.last_trade_ts: Optional[float] = None
+        self.seen = SeenTrades()
+
+    # --- event hooks ---
+    def on_book(self, book: LocalBook, ts: float) -> None:
+        self.book = book
+
+    def on_trade(self, price: float, size: float, taker_buy: bool, ts: float) -> None:
+        self.last_px, self.last_trade_ts = price, ts
+        bar = self.bars.on_trade(price, size, ts)
+        if bar is not None:
+            self.on_bar(bar)
+
+    def on_bar(self, bar: Bar) -> None:
+        pass
+
+    def on_fill(self, fill: Fill) -> None:
+        prev = self.position
+        self.position = prev + fill.side * fill.qty
+        if abs(self.position) < 1e-12:
+            self.position, self.entry_px = 0.0, None
+        elif prev == 0 or (prev > 0) != (self.position > 0):
+            self.entry_px = fill.price
+        elif abs(self.position) > abs(prev):
+            self.entry_px = (self.entry_px * abs(prev) + fill.price * fill.qty) / abs(self.position)
+
+    def on_timer(self, ts: float) -> None:
+        bar = self.bars.roll(ts)
+        if bar is not None:
+            self.on_bar(bar)
+
+    # --- helpers ---
+    def on_stream(self, msg: dict, ts: float) -> None:
+        """Dispatch a /stream message (trade/N, order_book/N) to the hooks."""
+        kind = msg.get("type", "")
+        if kind.endswith("/trade"):
+            for t in msg.get("trades") or []:
+                if not self.seen.fresh(t):
+                    continue  # resubscribe snapshot: already seen
+                t_ts = (t.get("timestamp") or 0) / 1000.0 or ts
+                self.on_trade(float(t["price"]), float(t.get("size", 0) or 0), bool(t.get("is_maker_ask")), t_ts)
+        elif kind.endswith("/order_book"):
+            ob = msg.get("order_book") or {}
+            if kind.startswith("subscribed"):
+                self.book.reset(ob)
+            else:
+                self.book.apply(ob)
+            self.on_book(self.book, ts)
+
+    def state(self) -> dict:
+        return {"name": self.name, "target": self.target, "position": self.position, "entry_px": self.entry_px}
+
+
+def run_bars(strategy: Strategy, bars: Any):
+    """Feed a Bars dict (packages.backtest.vectorized) through on_bar and return the
+    target after each bar. Targets are assumed filled at that bar's close."""
+    import numpy as np
+    n = len(bars["close"])
+    out = np.zeros(n)
+    interval = float(bars.get("interval_sec") or 60.0)
+    t = (np.asarray(bars["t"], dtype=np.int64) / 1e9).tolist()  # ns -> s
+    o, h, lo, c = (np.asarray(bars[k], dtype=float).tolist() for k in ("open", "high", "low", "close"))
+    v = np.asarray(bars["volume"]).tolist() if "volume" in bars else [0.0] * n
+    for i in range(n):
+        strategy.on_bar(Bar(t[i], o[i], h[i], lo[i], c[i], v[i]))
+        delta = strategy.target - strategy.position
+        if delta:
+            strategy.on_fill(Fill(t[i] + interval, 1 if delta > 0 else -1, abs(delta), c[i]))
+        out[i] = strategy.target
+    return out
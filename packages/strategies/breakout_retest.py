@@ -1 +1,97 @@
-# breakout retest strategy
+# breakout retest: trade the first pullback to a broken range edge
+from dataclasses import dataclass
+from typing import Optional
+
+from .base import Bar, Strategy, run_bars
+from .indicators import ATR, RollingHigh, RollingLow
+
+
+@dataclass(frozen=True)
+class BRConfig:
+    size: float = 1.0            # base units per position
+    lookback: int = 20           # bars forming the range
+    atr_len: int = 14
+    retest_atr: float = 0.25     # pullback must come within this many ATRs of the broken level
+    arm_bars: int = 10           # bars a breakout waits for its retest
+    stop_atr: float = 1.0        # stop beyond the level
+    tp_atr: float = 2.0          # take profit from entry
+    max_hold_bars: int = 60
+    interval_sec: float = 60.0   # live bar size
+
+
+class BreakoutRetest(Strategy):
+    """A close beyond the prior `lookback`-bar high (low) arms the level; a later bar that
+    trades back to it and closes on the breakout side enters. Exits on stop, target or
+    time. Range edges and ATR are updated incrementally per bar."""
+
+    name = "breakout_retest"
+
+    def __init__(self, cfg: Optional[BRConfig] = None):
+        self.cfg = cfg or BRConfig()
+        super().__init__(self.cfg.interval_sec)
+        self.hi = RollingHigh(self.cfg.lookback)
+        self.lo = RollingLow(self.cfg.lookback)
+        self.atr = ATR(self.cfg.atr_len)
+        self.armed = 0               # +1 long breakout, -1 short breakout
+        self.level: Optional[float] = None
+        self.armed_bars = 0
+        self.held_bars = 0
+        self.stop: Optional[float] = None
+        self.tp: Optional[float] = None
+
+    def on_bar(self, bar: Bar) -> None:
+        cfg = self.cfg
+        ready = self.hi.ready() and self.atr.ready()
+        prior_hi, prior_lo = self.hi.value, self.lo.value  # range before this bar
+        atr = self.atr.update(bar.high, bar.low, bar.close)
+        self.hi.update(bar.high)
+        self.lo.update(bar.low)
+        if not ready:
+            return
+
+        if self.target:
+            self._manage(bar)
+            return
+
+        if self.armed:
+            self.armed_bars += 1
+            tol = cfg.retest_atr * atr
+            if self.armed > 0 and bar.low <= self.level + tol and bar.close > self.level:
+                self._enter(1, bar.close, atr)
+            elif self.armed < 0 and bar.high >= self.level - tol and bar.close < self.level:
+                self._enter(-1, bar.close, atr)
+            elif (self.armed_bars >= cfg.arm_bars
+                  or (self.armed > 0 and bar.close < self.level - tol)
+                  or (self.armed < 0 and bar.close > self.level + tol)):
+                self.armed = 0  # expired or failed back into the range
+        if not self.target and not self.armed:
+            if bar.close > prior_hi:
+                self.armed, self.level, self.armed_bars = 1, prior_hi, 0
+            elif bar.close < prior_lo:
+                self.armed, self.level, self.armed_bars = -1, prior_lo, 0
+
+    def _enter(self, side: int, px: float, atr: float) -> None:
+        cfg = self.cfg
+        self.target = side * cfg.size
+        self.stop = self.level - side * cfg.stop_atr * atr
+        self.tp = px + side * cfg.tp_atr * atr
+        self.armed, self.held_bars = 0, 0
+
+    def _manage(self, bar: Bar) -> None:
+        self.held_bars += 1
+        long = self.target > 0
+        hit_stop = bar.low <= self.stop if long else bar.high >= self.stop
+        hit_tp = bar.high >= self.tp if long else bar.low <= self.tp
+        if hit_stop or hit_tp or self.held_bars >= self.cfg.max_hold_bars:
+            self.target = 0.0
+            self.stop = self.tp = None
+
+    def state(self) -> dict:
+        return {**super().state(), "armed": self.armed, "level": self.level, "stop": self.stop, "tp": self.tp,
+                "atr": self.atr.value}
+
+
+def positions(bars, **params):
+    """Vectorized-backtest entry (apps.backtester.run bars --strategy
+    packages.strategies.breakout_retest:positions)."""
+    return run_bars(BreakoutRetest(BRConfig(**params)), bars)
@@ -0,0 +1,212 @@
+# incremental indicators: O(1) per update on array-backed ring buffers
+import math
+from array import array
+from collections import deque
+from typing import Optional
+
+
+class RingBuffer:
+    """Fixed-capacity float ring on array('d'); push returns the value that fell out (or None)."""
+
+    __slots__ = ("cap", "buf", "n", "i")
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError(f"capacity must be >= 1, got {capacity}")
+        self.cap = capacity
+        self.buf = array("d", bytes(8 * capacity))
+        self.n = 0
+        self.i = 0  # next write slot
+
+    def push(self, x: float) -> Optional[float]:
+        old = self.buf[self.i] if self.n == self.cap else None
+        self.buf[self.i] = x
+        self.i = (self.i + 1) % self.cap
+        if self.n < self.cap:
+            self.n += 1
+        return old
+
+    def __len__(self) -> int:
+        return self.n
+
+    def full(self) -> bool:
+        return self.n == self.cap
+
+    def __getitem__(self, k: int) -> float:
+        """k = 0 oldest .. -1 newest."""
+        if not -self.n <= k < self.n:
+            raise IndexError(k)
+        k %= self.n
+        return self.buf[(self.i - self.n + k) % self.cap]
+
+
+class EMA:
+    __slots__ = ("alpha", "value")
+
+    def __init__(self, length: int):
+        self.alpha = 2.0 / (length + 1)
+        self.value: Optional[float] = None
+
+    def update(self, x: float) -> float:
+        self.value = x if self.value is None else self.value + self.alpha * (x - self.value)
+        return self.value
+
+
+class RollingMean:
+    """Mean / std over the last `length` values from running sums (re-summed every
+    `length` pops to keep float drift bounded, still O(1) amortised)."""
+
+    __slots__ = ("ring", "s", "ss", "_pops")
+
+    def __init__(self, length: int):
+        self.ring = RingBuffer(length)
+        self.s = 0.0
+        self.ss = 0.0
+        self._pops = 0
+
+    def update(self, x: float) -> float:
+        old = self.ring.push(x)
+        self.s += x
+        self.ss += x * x
+        if old is not None:
+            self.s -= old
+            self.ss -= old * old
+            self._pops += 1
+            if self._pops >= self.ring.cap:
+                self._pops = 0
+                vals = self.ring.buf
+                self.s = math.fsum(vals)
+                self.ss = math.fsum(v * v for v in vals)
+        return self.mean
+
+    @property
+    def mean(self) -> float:
+        return self.s / self.ring.n if self.ring.n else 0.0
+
+    @property
+    def std(self) -> float:
+        n = self.ring.n
+        if n < 2:
+            return 0.0
+        var = (self.ss - self.s * self.s / n) / (n - 1)
+        return math.sqrt(var) if var > 0 else 0.0
+
+    def ready(self) -> bool:
+        return self.ring.full()
+
+
+class ZScore:
+    __slots__ = ("stats", "value")
+
+    def __init__(self, length: int):
+        self.stats = RollingMean(length)
+        self.value = 0.0
+
+    def update(self, x: float) -> float:
+        self.stats.update(x)
+        sd = self.stats.std
+        self.value = (x - self.stats.mean) / sd if sd > 0 else 0.0
+        return self.value
+
+    def ready(self) -> bool:
+        return self.stats.ready()
+
+
+class _RollingExtreme:
+    """Monotonic deque of (seq, value): amortised O(1) rolling max/min."""
+
+    __slots__ = ("length", "q", "seq", "sign")
+
+    def __init__(self, length: int, sign: float):
+        self.length = length
+        self.q: deque = deque()
+        self.seq = 0
+        self.sign = sign  # +1 max, -1 min
+
+    def update(self, x: float) -> float:
+        q, v = self.q, x * self.sign
+        while q and q[-1][1] <= v:
+            q.pop()
+        q.append((self.seq, v))
+        if q[0][0] <= self.seq - self.length:
+            q.popleft()
+        self.seq += 1
+        return q[0][1] * self.sign
+
+    @property
+    def value(self) -> Optional[float]:
+        return self.q[0][1] * self.sign if self.q else None
+
+    def ready(self) -> bool:
+        return self.seq >= self.length
+
+
+class RollingHigh(_RollingExtreme):
+    def __init__(self, length: int):
+        super().__init__(length, 1.0)
+
+
+class RollingLow(_RollingExtreme):
+    def __init__(self, length: int):
+        super().__init__(length, -1.0)
+
+
+class ATR:
+    """Wilder's average true range."""
+
+    __slots__ = ("length", "value", "prev_close", "n")
+
+    def __init__(self, length: int = 14):
+        self.length = length
+        self.value: Optional[float] = None
+        self.prev_close: Optional[float] = None
+        self.n = 0
+
+    def update(self, high: float, low: float, close: float) -> float:
+        pc = self.prev_close
+        tr = high - low if pc is None else max(high - low, abs(high - pc), abs(low - pc))
+        self.n += 1
+        if self.value is None:
+            self.value = tr
+        elif self.n <= self.length:
+            self.value += (tr - self.value) / self.n  # simple mean while warming up
+        else:
+            self.value += (tr - self.value) / self.length
+        self.prev_close = close
+        return self.value
+
+    def ready(self) -> bool:
+        return self.n >= self.length
+
+
+class VWAP:
+    """Rolling VWAP over the last `length` updates (length=None: cumulative / session)."""
+
+    __slots__ = ("pv", "v", "ring_pv", "ring_v")
+
+    def __init__(self, length: Optional[int] = None):
+        self.pv = 0.0
+        self.v = 0.0
+        self.ring_pv = RingBuffer(length) if length else None
+        self.ring_v = RingBuffer(length) if length else None
+
+    def update(self, price: float, volume: float) -> Optional[float]:
+        pv = price * volume
+        self.pv += pv
+        self.v += volume
+        if self.ring_pv is not None:
+            old_pv, old_v = self.ring_pv.push(pv), self.ring_v.push(volume)
+            if old_pv is not None:
+                self.pv -= old_pv
+                self.v -= old_v
+        return self.value
+
+    @property
+    def value(self) -> Optional[float]:
+        return self.pv / self.v if self.v > 0 else None
+
+    def reset(self) -> None:
+        self.pv = self.v = 0.0
+        if self.ring_pv is not None:
+            self.ring_pv = RingBuffer(self.ring_pv.cap)
+            self.ring_v = RingBuffer(self.ring_v.cap)
@@ -4,6 +4,11 @@ import inspect
 from dataclasses import dataclass
 from typing import Any, Optional
 
+from packages.data.features import MarketFeatures
+from packages.lighter_sdk_adapter.ws import subscribe_stream
+from packages.telemetry.latency import timed
+from packages.utils.ratelimit import TokenBucket
+
 
 @dataclass
 class MSPConfig:
@@ -17,6 +22,14 @@ class MSPConfig:
     max_consecutive_losses: int = 2
     time_based_exit_sec: int = 3600
     stop_reversion: float = 0.02
+    activity_window_sec: float = 60.0  # window for the trade count fed to the adaptive spread
+    vol_spread_mult: float = 2.0       # spread floor = mult * realized vol (0 disables)
+    # event-driven mode (run_events)
+    requote_bps: float = 5.0       # requote when mid moves this far from the last quoted mid
+    max_requotes_per_sec: float = 2.0
+    requote_burst: int = 4
+    book_stale_sec: float = 10.0   # poll mode: a local book not updated for this long counts as missing
+    stream_idle_sec: float = 15.0  # no stream message for this long: pull the quotes until it resumes (0 = off)
 
 
 class MicroSpreadPulseBot:
@@ -28,17 +41,33 @@ class MicroSpreadPulseBot:
         self.daily_profit = 0.0
         self.last_trade_ts: Optional[float] = None
         self.consecutive_losses = 0
+        self.live_quotes: list[int] = []  # client order indices of our resting bid/ask
+        # event-driven state
+        self.market_id: Optional[int] = None
+        self.features = MarketFeatures()  # fed by the trade/order_book stream
+        self.book = self.features.book
+        self.quoted_mid: Optional[float] = None
+        self._fill_pending = False
+        self._wake = asyncio.Event()
+        self.last_event: Optional[float] = None  # monotonic time of the last stream message
 
     def should_cool(self) -> bool:
         return bool(self.last_trade_ts and (time.time() - self.last_trade_ts) < self.cfg.cooling_sec)
 
+    @timed("mm.get_mid_px")
     async def get_mid_px(self) -> Optional[float]:
-        spread_data = await self.exchange.get_spread(self.market)
-        bid, ask, spr = spread_data
+        # local book from the order_book stream; REST until its snapshot has arrived, or when
+        # it has gone quiet (dead feed or stalled socket: never quote off a frozen book)
+        mid = self.book.mid() if self.book.age() <= self.cfg.book_stale_sec else None
+        if mid is not None:
+            return mid
+        bid, ask, spr = await self.exchange.get_spread(self.market)
         if bid is not None and ask is not None:
             return (bid + ask) / 2.0
-        
-        # Fallback: Use last trade price from market details
+
+        # Fallback: last print from the trade stream, else one REST read of market details
+        if self.features.last_px is not None:
+            return self.features.last_px
         try:
             from lighter import ApiClient, Configuration, OrderApi
             async with ApiClient(Configuration(host=self.exchange.client.url)) as api_client:
@@ -61,14 +90,21 @@ class MicroSpreadPulseBot:
         return None
 
     def _adaptive_spread(self, recent_trades: Optional[int] = None) -> float:
+        if recent_trades is None and self.features.trades:
+            recent_trades = self.features.recent_trades(self.cfg.activity_window_sec)
         if recent_trades is None:
-            return self.cfg.spread
-        if recent_trades >= 5:
-            return 0.002
-        if recent_trades <= 1:
-            return 0.005
-        return self.cfg.spread
+            spr = self.cfg.spread
+        elif recent_trades >= 5:
+            spr = 0.002
+        elif recent_trades <= 1:
+            spr = 0.005
+        else:
+            spr = self.cfg.spread
+        if self.cfg.vol_spread_mult and self.features.trades:
+            spr = max(spr, self.cfg.vol_spread_mult * self.features.volatility())
+        return spr
 
+    @timed("mm.pulse")
     async def pulse(self, recent_trades: Optional[int] = None) -> Optional[dict]:
         if self.active_cycles >= self.cfg.max_active_cycles:
             return None
@@ -78,15 +114,126 @@ class MicroSpreadPulseBot:
         mid = await self.get_mid_px()
         if mid is None:
             return None
+        res = await self.requote(mid, recent_trades)
+        self.active_cycles += 1
+        return res
+
+    async def requote(self, mid: float, recent_trades: Optional[int] = None) -> dict:
         spr = self._adaptive_spread(recent_trades)
         bid_px = mid * (1 - spr / 2)
         ask_px = mid * (1 + spr / 2)
 
         size = self.cfg.order_size
-        # Place symmetric limits (no-op stubs; exchange implements)
-        bid_oid = await self.exchange.place_limit(self.market, side="BUY", price=bid_px, base_amount=size)
-        ask_oid = await self.exchange.place_limit(self.market, side="SELL", price=ask_px, base_amount=size)
+        # Cancel the previous quotes and place the new pair in one batch (cancels first)
+        res = await self.exchange.cancel_replace(self.market, self.live_quotes, [
+            {"side": "BUY", "price": bid_px, "base_amount": size},
+            {"side": "SELL", "price": ask_px, "base_amount": size},
+        ])
+        bid_oid, ask_oid = res["placed"]
+        self.live_quotes = [bid_oid, ask_oid]
+        self.quoted_mid = mid
+        return {"bid": bid_oid, "ask": ask_oid, "cancelled": res["cancelled"], "mid": mid, "spread": spr}
 
-        self.active_cycles += 1
-        return {"bid": bid_oid, "ask": ask_oid, "mid": mid, "spread": spr}
+    async def withdraw_quotes(self) -> Optional[dict]:
+        """Pull our resting quotes (e.g. on shutdown)."""
+        if not self.live_quotes:
+            return None
+        res = await self.exchange.cancel_replace(self.market, self.live_quotes, [])
+        self.live_quotes = []
+        self.quoted_mid = None  # requote on the next book, whatever it moved
+        return res
+
+    # --- event-driven mode ---
+    def _mid_moved(self, mid: float) -> bool:
+        if self.quoted_mid is None:
+            return True
+        return abs(mid - self.quoted_mid) / self.quoted_mid * 1e4 >= self.cfg.requote_bps
+
+    def stream_idle(self) -> bool:
+        """True once the stream has been silent for `stream_idle_sec` (stalled or dead socket)."""
+        idle = self.cfg.stream_idle_sec
+        return bool(idle) and self.last_event is not None and time.monotonic() - self.last_event > idle
+
+    async def _withdraw_if_idle(self, log: Any = None) -> None:
+        if not self.live_quotes or not self.stream_idle():
+            return
+        try:
+            await self.withdraw_quotes()
+            if log:
+                log.warn("Stream idle, quotes withdrawn", market=self.market,
+                         idle_sec=round(time.monotonic() - self.last_event, 1))
+        except Exception as e:
+            if log:
+                log.warn("Failed to withdraw quotes", market=self.market, err=str(e))
+
+    def requote_reason(self) -> Optional[str]:
+        """"fill" or "mid" if the event loop should requote now (consumes a pending fill), else None."""
+        mid = self.book.mid()
+        if mid is None or not (self._fill_pending or self._mid_moved(mid)):
+            return None
+        reason = "fill" if self._fill_pending else "mid"
+        self._fill_pending = False
+        return reason
+
+    def on_stream(self, msg: dict) -> None:
+        """Feed for ws.subscribe_stream: keeps the local book and wakes the quoting loop."""
+        self.last_event = time.monotonic()
+        kind = msg.get("type", "")
+        if kind.endswith("/trade"):
+            self.features.on_stream(msg)
+        elif kind.endswith("/order_book"):
+            self.features.on_stream(msg)
+            mid = self.book.mid()
+            if mid is not None and self._mid_moved(mid):
+                self._wake.set()
+        elif kind == "update/account_all" and self.market_id is not None:
+            # any trade of ours on this market means one of the quotes was (partly) hit
+            if (msg.get("trades") or {}).get(str(self.market_id)):
+                self.active_cycles += 1
+                self._fill_pending = True
+                self._wake.set()
+
+    async def run_events(self, market_id: int, account_index: Optional[int] = None,
+                         stop: Optional[asyncio.Event] = None, log: Any = None) -> None:
+        """Quote from the WS book instead of polling: requote when mid moves `requote_bps`
+        or a quote fills, throttled by a token bucket. In this mode `max_active_cycles`
+        counts fills rather than quote refreshes. Quotes are pulled while the stream is
+        silent for `stream_idle_sec`; the stream itself reconnects on any error."""
+        self.market_id = market_id
+        stop = stop or asyncio.Event()
+        channels = [f"order_book/{market_id}", f"trade/{market_id}"]
+        if account_index is not None:
+            channels.append(f"account_all/{account_index}")
+        feed = asyncio.create_task(subscribe_stream(self.exchange.client.url, channels, self.on_stream, stop=stop,
+                                                    log=log))
+        try:
+            await self.quote_loop(stop, log=log)
+        finally:
+            stop.set()
+            feed.cancel()
 
+    async def quote_loop(self, stop: asyncio.Event, shared_bucket: Optional[TokenBucket] = None,
+                         log: Any = None) -> None:
+        """Event-mode quoting loop; the caller feeds on_stream (own stream or a shared hub).
+        `shared_bucket` additionally caps requotes across all bots on the same account."""
+        bucket = TokenBucket(self.cfg.max_requotes_per_sec, self.cfg.requote_burst)
+        while not stop.is_set() and self.active_cycles < self.cfg.max_active_cycles:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=min(1.0, self.cfg.stream_idle_sec or 1.0))
+            except asyncio.TimeoutError:
+                await self._withdraw_if_idle(log)
+                continue
+            self._wake.clear()
+            await bucket.acquire()
+            if shared_bucket is not None:
+                await shared_bucket.acquire()
+            reason = self.requote_reason()  # re-checked on the latest book after any wait
+            if reason is None:
+                continue
+            try:
+                res = await self.requote(self.book.mid())
+                if log:
+                    log.info("Requoted", market=self.market, reason=reason, **res)
+            except Exception as e:
+                if log:
+                    log.warn("Requote failed", market=self.market, err=str(e))
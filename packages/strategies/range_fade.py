@@ -1 +1,79 @@
-# range fade strategy
+# range fade: mean-revert stretched closes while the market is ranging
+from dataclasses import dataclass
+from typing import Optional
+
+from .base import Bar, Strategy, run_bars
+from .indicators import ATR, EMA, VWAP, RollingHigh, RollingLow, ZScore
+
+
+@dataclass(frozen=True)
+class RFConfig:
+    size: float = 1.0
+    lookback: int = 50            # bars for z-score, range and VWAP
+    z_entry: float = 2.0          # fade closes this many std devs from VWAP
+    z_exit: float = 0.5
+    z_stop: float = 3.5
+    atr_len: int = 14
+    max_range_atr: float = 8.0    # only trade while (range high - low) <= this many ATRs
+    max_trend: float = 0.5        # and |EMA slope| per bar <= this fraction of ATR
+    trend_len: int = 20
+    interval_sec: float = 60.0
+
+
+class RangeFade(Strategy):
+    """Shorts closes stretched above the rolling VWAP and buys those below it, exiting
+    on reversion, on a wider stop, or when the range filter says the market is trending."""
+
+    name = "range_fade"
+
+    def __init__(self, cfg: Optional[RFConfig] = None):
+        self.cfg = cfg or RFConfig()
+        super().__init__(self.cfg.interval_sec)
+        n = self.cfg.lookback
+        self.z = ZScore(n)               # of close - VWAP
+        self.vwap = VWAP(n)
+        self.hi, self.lo = RollingHigh(n), RollingLow(n)
+        self.atr = ATR(self.cfg.atr_len)
+        self.ema = EMA(self.cfg.trend_len)
+        self.prev_ema: Optional[float] = None
+
+    def ranging(self, atr: float) -> bool:
+        if atr <= 0:
+            return False
+        width = (self.hi.value - self.lo.value) / atr
+        slope = abs(self.ema.value - self.prev_ema) / atr if self.prev_ema is not None else 0.0
+        return width <= self.cfg.max_range_atr and slope <= self.cfg.max_trend
+
+    def on_bar(self, bar: Bar) -> None:
+        cfg = self.cfg
+        typical = (bar.high + bar.low + bar.close) / 3.0
+        vwap = self.vwap.update(typical, bar.volume or 1.0)
+        z = self.z.update(bar.close - vwap)
+        atr = self.atr.update(bar.high, bar.low, bar.close)
+        self.hi.update(bar.high)
+        self.lo.update(bar.low)
+        self.prev_ema = self.ema.value
+        self.ema.update(bar.close)
+        if not (self.z.ready() and self.atr.ready()):
+            return
+
+        if self.target:
+            short = self.target < 0
+            reverted = z <= cfg.z_exit if short else z >= -cfg.z_exit
+            stopped = z >= cfg.z_stop if short else z <= -cfg.z_stop
+            if reverted or stopped or not self.ranging(atr):
+                self.target = 0.0
+        elif self.ranging(atr):
+            if cfg.z_entry <= z < cfg.z_stop:
+                self.target = -cfg.size
+            elif -cfg.z_stop < z <= -cfg.z_entry:
+                self.target = cfg.size
+
+    def state(self) -> dict:
+        return {**super().state(), "z": self.z.value, "vwap": self.vwap.value, "atr": self.atr.value}
+
+
+def positions(bars, **params):
+    """Vectorized-backtest entry (apps.backtester.run bars --strategy
+    packages.strategies.range_fade:positions)."""
+    return run_bars(RangeFade(RFConfig(**params)), bars)
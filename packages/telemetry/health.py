@@ -0,0 +1,79 @@
+# liveness / readiness state: components report in, /healthz and /readyz read it
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+# name -> open connections; ready while every tracked one (at least one) is up
+_UP: Dict[str, int] = {}
+_WANT: Dict[str, int] = {}
+_LAST: Dict[str, float] = {}      # name -> last success (monotonic)
+_MAX_AGE: Dict[str, float] = {}   # name -> ready while the last success is at most this old
+# name -> callable evaluated at probe time
+_CHECKS: Dict[str, Callable[[], bool]] = {}
+
+
+def track(name: str) -> None:
+    """One more `name` connection is expected up (not ready until up())."""
+    _WANT[name] = _WANT.get(name, 0) + 1
+    _UP.setdefault(name, 0)
+
+
+def untrack(name: str) -> None:
+    _WANT[name] = max(0, _WANT.get(name, 0) - 1)
+
+
+def up(name: str) -> None:
+    _UP[name] = _UP.get(name, 0) + 1
+
+
+def down(name: str) -> None:
+    _UP[name] = max(0, _UP.get(name, 0) - 1)
+
+
+def expect(name: str, max_age: float) -> None:
+    """Readiness requires beat(name) at least every `max_age` seconds (and at least once)."""
+    _MAX_AGE[name] = float(max_age)
+
+
+def beat(name: str) -> None:
+    """A successful poll / refresh / tick of `name`."""
+    _LAST[name] = time.monotonic()
+
+
+def check(name: str, fn: Callable[[], bool]) -> None:
+    _CHECKS[name] = fn
+
+
+def age(name: str) -> Optional[float]:
+    last = _LAST.get(name)
+    return None if last is None else time.monotonic() - last
+
+
+def readiness() -> Tuple[bool, dict]:
+    out: dict = {}
+    ok = True
+    for name, n in _UP.items():
+        want = _WANT.get(name, 0)
+        out[name] = f"{n}/{want}"
+        if want:
+            ok = ok and n >= want
+    for name in {**_LAST, **_MAX_AGE}:
+        a = age(name)
+        out[f"{name}_age_sec"] = None if a is None else round(a, 3)
+        if name in _MAX_AGE:
+            ok = ok and a is not None and a <= _MAX_AGE[name]
+    for name, fn in _CHECKS.items():
+        try:
+            v = bool(fn())
+        except Exception:
+            v = False
+        out[name] = v
+        ok = ok and v
+    return ok, out
+
+
+def reset() -> None:
+    _UP.clear()
+    _WANT.clear()
+    _LAST.clear()
+    _MAX_AGE.clear()
+    _CHECKS.clear()
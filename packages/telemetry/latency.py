@@ -0,0 +1,200 @@
+# per-stage latency spans aggregated into log-linear (HDR-style) histograms
+import functools
+import inspect
+import json
+import os
+import signal
+import sys
+import time
+from typing import Any, Callable, Dict, Optional
+
+_enabled = os.environ.get("AEGON_LATENCY", "").lower() in ("1", "true", "yes", "on")
+
+# 32 sub-buckets per power of two -> <= ~3% relative error, values in ns up to ~2^41 (~36 min)
+_SUB_BITS = 5
+_SUB_COUNT = 1 << _SUB_BITS
+_MAX_SHIFT = 36
+_NBUCKETS = (_MAX_SHIFT + 2) * _SUB_COUNT
+
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+def _bucket(v: int) -> int:
+    if v < 2 * _SUB_COUNT:
+        return v if v > 0 else 0
+    shift = v.bit_length() - _SUB_BITS - 1
+    if shift > _MAX_SHIFT:
+        return _NBUCKETS - 1
+    return (shift + 1) * _SUB_COUNT + (v >> shift) - _SUB_COUNT
+
+
+def _bucket_high(idx: int) -> int:
+    """Highest value that lands in bucket `idx` (what percentiles report)."""
+    if idx < 2 * _SUB_COUNT:
+        return idx
+    shift = idx // _SUB_COUNT - 1
+    return ((idx % _SUB_COUNT + _SUB_COUNT) << shift) + (1 << shift) - 1
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self) -> None:
+        self.counts = [0] * _NBUCKETS
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def record(self, ns: int) -> None:
+        self.counts[_bucket(ns)] += 1
+        if not self.count or ns < self.min:
+            self.min = ns
+        if ns > self.max:
+            self.max = ns
+        self.count += 1
+        self.total += ns
+
+    def percentile(self, q: float) -> int:
+        if not self.count:
+            return 0
+        target = max(1, int(q * self.count + 0.5))
+        seen = 0
+        for idx, c in enumerate(self.counts):
+            if c:
+                seen += c
+                if seen >= target:
+                    if idx == _NBUCKETS - 1:
+                        return self.max  # clamped overflow: the bucket edge would under-report
+                    return min(_bucket_high(idx), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        ms = 1e-6
+        out = {"count": self.count,
+               "mean_ms": (self.total / self.count * ms) if self.count else 0.0,
+               "min_ms": self.min * ms, "max_ms": self.max * ms}
+        for q in QUANTILES:
+            out[f"p{q * 100:g}_ms"] = self.percentile(q) * ms
+        return out
+
+    def reset(self) -> None:
+        self.__init__()
+
+
+_HISTS: Dict[str, Histogram] = {}
+
+
+def histogram(stage: str) -> Histogram:
+    h = _HISTS.get(stage)
+    if h is None:
+        h = _HISTS[stage] = Histogram()
+    return h
+
+
+class _Span:
+    __slots__ = ("hist", "t0")
+
+    def __init__(self, hist: Histogram) -> None:
+        self.hist = hist
+
+    def __enter__(self):
+        self.t0 = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.record(time.perf_counter_ns() - self.t0)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def span(stage: str):
+    """`with span("signer.sign"): ...` -- a shared no-op object when disabled."""
+    if not _enabled:
+        return _NOOP
+    return _Span(histogram(stage))
+
+
+def record(stage: str, seconds: float) -> None:
+    """Record an externally measured duration (e.g. signal ts -> tx accepted)."""
+    if _enabled:
+        histogram(stage).record(int(seconds * 1e9))
+
+
+def timed(stage: str) -> Callable:
+    """Decorator form of span() for sync and async callables."""
+    def deco(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def awrapper(*a, **kw):
+                if not _enabled:
+                    return await fn(*a, **kw)
+                t0 = time.perf_counter_ns()
+                try:
+                    return await fn(*a, **kw)
+                finally:
+                    histogram(stage).record(time.perf_counter_ns() - t0)
+            return awrapper
+
+        @functools.wraps(fn)
+        def wrapper(*a, **kw):
+            if not _enabled:
+                return fn(*a, **kw)
+            t0 = time.perf_counter_ns()
+            try:
+                return fn(*a, **kw)
+            finally:
+                histogram(stage).record(time.perf_counter_ns() - t0)
+        return wrapper
+    return deco
+
+
+def enable(on: bool = True) -> None:
+    global _enabled
+    _enabled = on
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    _HISTS.clear()
+
+
+def snapshot() -> Dict[str, Dict[str, float]]:
+    return {stage: h.summary() for stage, h in sorted(_HISTS.items())}
+
+
+def dump(file: Any = None) -> None:
+    print(json.dumps({"latency": snapshot()}, indent=2), file=file or sys.stderr, flush=True)
+
+
+def render_prometheus(metric: str = "aegon_stage_latency_seconds") -> str:
+    lines = [f"# HELP {metric} Hot-path stage latency.", f"# TYPE {metric} summary"]
+    for stage, h in sorted(_HISTS.items()):
+        for q in QUANTILES:
+            lines.append(f'{metric}{{stage="{stage}",quantile="{q}"}} {h.percentile(q) / 1e9:.9f}')
+        lines.append(f'{metric}_sum{{stage="{stage}"}} {h.total / 1e9:.9f}')
+        lines.append(f'{metric}_count{{stage="{stage}"}} {h.count}')
+    return "\n".join(lines) + "\n"
+
+
+def install_signal_dump(sig: Optional[int] = None) -> None:
+    """Dump histograms to stderr on SIGUSR1 (kill -USR1 <pid>)."""
+    sig = sig if sig is not None else getattr(signal, "SIGUSR1", None)
+    if sig is None:
+        return
+    signal.signal(sig, lambda *_: dump())
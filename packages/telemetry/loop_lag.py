@@ -0,0 +1,40 @@
+# event-loop lag: how late a periodic wakeup fires is how long something blocked the loop
+import asyncio
+import time
+from typing import Optional
+
+from . import health, latency, metrics
+
+
+class LoopLagMonitor:
+    """Sleeps `interval_sec` in a loop and measures how late each wakeup is. Every sample goes to
+    the `loop.lag` histogram and the aegon_loop_lag_seconds gauge. A lag over `stall_ms` counts
+    as a stall: it is logged with the task count and counted in aegon_loop_stalls_total.
+    Each tick is also the liveness heartbeat ("loop")."""
+
+    def __init__(self, interval_sec: float = 0.25, stall_ms: float = 100.0, log=None):
+        self.interval_sec = interval_sec
+        self.stall_ms = stall_ms
+        self.log = log
+        self.max_lag = 0.0
+        metrics.describe("aegon_loop_lag_seconds", "Event-loop wakeup lateness, last sample.")
+        metrics.describe("aegon_loop_lag_max_seconds", "Largest event-loop wakeup lateness since start.")
+        metrics.describe("aegon_loop_stalls_total", "Event-loop stalls over the threshold.")
+
+    async def run(self, stop: Optional[asyncio.Event] = None) -> None:
+        stall = self.stall_ms / 1e3
+        while stop is None or not stop.is_set():
+            t0 = time.perf_counter()
+            await asyncio.sleep(self.interval_sec)
+            lag = max(0.0, time.perf_counter() - t0 - self.interval_sec)
+            health.beat("loop")
+            latency.histogram("loop.lag").record(int(lag * 1e9))
+            metrics.set_gauge("aegon_loop_lag_seconds", lag)
+            if lag > self.max_lag:
+                self.max_lag = lag
+                metrics.set_gauge("aegon_loop_lag_max_seconds", lag)
+            if lag > stall:
+                metrics.inc("aegon_loop_stalls_total")
+                if self.log:
+                    self.log.warn("Event loop stall", lag_ms=round(lag * 1e3, 1), threshold_ms=self.stall_ms,
+                                  tasks=len(asyncio.all_tasks()))
@@ -0,0 +1,71 @@
+# process counters and gauges for /metrics (packages/telemetry/server.py): a dict update per event
+from typing import Callable, Dict, Tuple
+
+Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+_COUNTERS: Dict[Key, float] = {}
+_GAUGES: Dict[Key, float] = {}
+_GAUGE_FNS: Dict[str, Callable[[], float]] = {}  # sampled at scrape time (task counts, queue depths)
+_HELP: Dict[str, str] = {}
+
+
+def _key(name: str, labels: dict) -> Key:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items())) if labels else ()
+
+
+def inc(name: str, n: float = 1.0, **labels) -> None:
+    k = _key(name, labels)
+    _COUNTERS[k] = _COUNTERS.get(k, 0.0) + n
+
+
+def set_gauge(name: str, value: float, **labels) -> None:
+    _GAUGES[_key(name, labels)] = value
+
+
+def gauge_fn(name: str, fn: Callable[[], float], help: str = "") -> None:
+    _GAUGE_FNS[name] = fn
+    if help:
+        _HELP[name] = help
+
+
+def describe(name: str, help: str) -> None:
+    _HELP[name] = help
+
+
+def counter(name: str, **labels) -> float:
+    return _COUNTERS.get(_key(name, labels), 0.0)
+
+
+def reset() -> None:
+    _COUNTERS.clear()
+    _GAUGES.clear()
+
+
+def _fmt(name: str, labels: Tuple[Tuple[str, str], ...], value: float) -> str:
+    if labels:
+        body = ",".join(f'{k}="{v}"' for k, v in labels)
+        return f"{name}{{{body}}} {value:g}"
+    return f"{name} {value:g}"
+
+
+def render_prometheus() -> str:
+    lines = []
+    for kind, series in (("counter", _COUNTERS), ("gauge", _GAUGES)):
+        by_name: Dict[str, list] = {}
+        for (name, labels), v in series.items():
+            by_name.setdefault(name, []).append((labels, v))
+        for name in sorted(by_name):
+            if name in _HELP:
+                lines.append(f"# HELP {name} {_HELP[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(_fmt(name, labels, v) for labels, v in sorted(by_name[name]))
+    for name, fn in sorted(_GAUGE_FNS.items()):
+        try:
+            v = float(fn())
+        except Exception:
+            continue  # a probe that fails is left out rather than failing the scrape
+        if name in _HELP:
+            lines.append(f"# HELP {name} {_HELP[name]}")
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {v:g}")
+    return "\n".join(lines) + "\n" if lines else ""
@@ -0,0 +1,79 @@
+# embedded HTTP endpoint: /healthz (liveness), /readyz (readiness), /metrics (Prometheus text)
+import asyncio
+import json
+import os
+from typing import Awaitable, Callable, Optional, Tuple
+
+from . import health, latency, metrics
+from .loop_lag import LoopLagMonitor
+
+_REASONS = {200: "OK", 404: "Not Found", 405: "Method Not Allowed", 503: "Service Unavailable"}
+
+
+def liveness(max_age: float = 10.0) -> Tuple[bool, dict]:
+    # the loop-lag monitor ticks every fraction of a second; a stale tick is a wedged loop
+    a = health.age("loop")
+    return a is None or a <= max_age, {"loop_age_sec": None if a is None else round(a, 3), "pid": os.getpid()}
+
+
+def render_metrics() -> str:
+    return metrics.render_prometheus() + latency.render_prometheus()
+
+
+def _route(path: str) -> Tuple[int, str, bytes]:
+    path = path.split("?", 1)[0]
+    if path == "/metrics":
+        return 200, "text/plain; version=0.0.4", render_metrics().encode()
+    if path in ("/healthz", "/livez", "/readyz"):
+        ok, body = liveness() if path != "/readyz" else health.readiness()
+        return (200 if ok else 503), "application/json", json.dumps({"ok": ok, **body}).encode()
+    return 404, "text/plain", b"not found\n"
+
+
+async def serve(host: str, port: int) -> asyncio.AbstractServer:
+    """Minimal HTTP/1.1 (GET only, one request per connection): probes and scrapes, nothing else."""
+
+    async def on_conn(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            line = await asyncio.wait_for(reader.readline(), 5.0)
+            while (await asyncio.wait_for(reader.readline(), 5.0)) not in (b"\r\n", b"\n", b""):
+                pass  # headers: nothing here needs them
+            parts = line.decode("latin-1").split()
+            if len(parts) < 2:
+                return
+            if parts[0] not in ("GET", "HEAD"):
+                status, ctype, body = 405, "text/plain", b"GET only\n"
+            else:
+                status, ctype, body = _route(parts[1])
+            metrics.inc("aegon_telemetry_requests_total", code=status)
+            head = (f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\nContent-Type: {ctype}\r\n"
+                    f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n").encode()
+            writer.write(head if parts[0] == "HEAD" else head + body)
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(on_conn, host, port)
+
+
+async def start(port: int, host: Optional[str] = None, stall_ms: Optional[float] = None,
+                log=None) -> Callable[[], Awaitable[None]]:
+    """Serve the endpoints and run the loop-lag monitor on the running loop; returns `stop()`.
+    /metrics carries the stage histograms only when latency recording is on (--latency / $AEGON_LATENCY).
+    Host / stall threshold default to $AEGON_METRICS_HOST (127.0.0.1) / $AEGON_LOOP_STALL_MS (100)."""
+    host = host or os.environ.get("AEGON_METRICS_HOST", "127.0.0.1")
+    stall_ms = stall_ms if stall_ms is not None else float(os.environ.get("AEGON_LOOP_STALL_MS", "100"))
+    metrics.gauge_fn("aegon_asyncio_tasks", lambda: len(asyncio.all_tasks()), "Tasks alive on the event loop.")
+    server = await serve(host, port)
+    monitor = asyncio.create_task(LoopLagMonitor(stall_ms=stall_ms, log=log).run())
+    if log:
+        log.info("Telemetry listening", host=host, port=port, stall_ms=stall_ms)
+
+    async def stop() -> None:
+        monitor.cancel()
+        server.close()
+        await server.wait_closed()
+
+    return stop
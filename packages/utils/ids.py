@@ -0,0 +1,212 @@
+# client order index allocation
+import atexit
+import glob
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+try:  # POSIX: block reservations are serialized across processes sharing a state file
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+# Lighter caps client_order_index at 48 bits. We split it as shard (8) | sequence (40).
+MAX_CLIENT_ORDER_INDEX = (1 << 48) - 1
+SHARD_BITS = 8
+SEQ_BITS = 48 - SHARD_BITS
+MAX_SHARD = (1 << SHARD_BITS) - 1
+MAX_SEQ = (1 << SEQ_BITS) - 1
+
+_EPOCH_MS = 1_704_067_200_000  # 2024-01-01T00:00:00Z
+_STOP = object()
+
+
+class TagJournal:
+    """Append-only coi -> labels file (tags-<shard>.jsonl). `put()` is a queue append on
+    the caller's thread (the order path); a daemon thread encodes and writes whatever has
+    accumulated with one write + flush. Pending records are written out at exit."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._q: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="coi-tags", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def put(self, rec: dict) -> None:
+        self._q.put(rec)
+
+    def _run(self) -> None:
+        get, get_nowait = self._q.get, self._q.get_nowait
+        with open(self.path, "a", encoding="utf-8") as f:
+            while True:
+                item, lines = get(), []
+                while item is not _STOP:
+                    lines.append(json.dumps(item, separators=(",", ":")))
+                    try:
+                        item = get_nowait()
+                    except queue.Empty:
+                        break
+                if lines:
+                    f.write("\n".join(lines) + "\n")
+                    f.flush()
+                if item is _STOP:
+                    return
+
+    def close(self, timeout: float = 2.0) -> None:
+        if self._thread.is_alive():
+            self._q.put(_STOP)
+            self._thread.join(timeout)
+
+
+class ClientOrderIdAllocator:
+    """Unique integer client order indices from a shard prefix plus a monotonic counter.
+
+    `next()` is a bare `next(itertools.count)` on the hot path (atomic under the GIL),
+    so it is safe from any coroutine or thread without locking. Restarts are covered by
+    seeding the counter from the wall clock and, when `state_path` is set, by persisting
+    a high-water mark one block ahead of what has been handed out.
+
+    Processes sharing a shard's state file (two traders, trader + daemon, ...) reserve
+    blocks under an exclusive `flock` on `<state_path>.lock`: each re-reads the ceiling
+    and takes the next block past it, so their indices never overlap.
+    """
+
+    def __init__(self, shard: int = 0, state_path: Optional[str] = None,
+                 block: int = 100_000, remember: int = 100_000):
+        if not 0 <= shard <= MAX_SHARD:
+            raise ValueError(f"shard must be in [0, {MAX_SHARD}], got {shard}")
+        self.shard = shard
+        self.state_path = state_path
+        self.block = block
+        self._prefix = shard << SEQ_BITS
+        self._lock = threading.Lock()  # only taken when a new block is reserved
+        self._refs: "OrderedDict[int, Any]" = OrderedDict()
+        self._max_refs = remember
+        self._tags: Optional[TagJournal] = None  # opened on first tag()
+
+        self._lo = self._ceiling = 0  # current block [lo, ceiling)
+        self._counter = itertools.count(self._reserve(int(time.time() * 1000) - _EPOCH_MS))
+
+    def next(self) -> int:
+        counter = self._counter
+        seq = next(counter)
+        if not self._lo <= seq < self._ceiling:
+            seq = self._refill(counter, seq)
+        if seq > MAX_SEQ:
+            raise OverflowError(f"client order index space exhausted for shard {self.shard}")
+        return self._prefix | seq
+
+    __call__ = next
+
+    # --- fill -> intent mapping ---
+    def remember(self, coi: int, ref: Any) -> None:
+        self._refs[coi] = ref
+        if len(self._refs) > self._max_refs:
+            self._refs.popitem(last=False)
+
+    def lookup(self, coi: int) -> Any:
+        return self._refs.get(int(coi))
+
+    def owns(self, coi: int) -> bool:
+        return split(coi)[0] == self.shard
+
+    def tag(self, coi: int, **labels: Any) -> None:
+        """Persist labels (strategy, leader) for an order so the rollup can attribute its fills.
+        Callers pass what they know: strategy_run tags `strategy`; copy orders carry
+        `leader` (CopyEngine.order_tag). Written in the background (TagJournal)."""
+        if not self.state_path:
+            return
+        if self._tags is None:
+            os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+            self._tags = TagJournal(os.path.join(os.path.dirname(self.state_path) or ".", f"tags-{self.shard}.jsonl"))
+        self._tags.put({"coi": int(coi), **labels})
+
+    def close(self) -> None:
+        """Write out pending tags (also runs at exit)."""
+        if self._tags is not None:
+            self._tags.close()
+
+    # --- persistence ---
+    def _load_ceiling(self) -> int:
+        if not self.state_path:
+            return 0
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return int(json.load(f).get("ceiling", 0))
+        except (FileNotFoundError, ValueError, json.JSONDecodeError):
+            return 0
+
+    def _refill(self, counter, seq: int) -> int:
+        with self._lock:
+            if counter is not self._counter:  # another thread reserved a block meanwhile
+                seq = next(self._counter)
+                if self._lo <= seq < self._ceiling:
+                    return seq
+            start = self._reserve(seq)
+            self._counter = itertools.count(start + 1)
+            return start
+
+    def _reserve(self, seq: int) -> int:
+        """Take the block [start, start + block) with start >= seq and past every block
+        already persisted for this shard; returns start."""
+        if not self.state_path:
+            self._lo, self._ceiling = seq, seq + self.block
+            return seq
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        with open(f"{self.state_path}.lock", "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)  # released when the file closes
+            start = max(seq, self._load_ceiling())
+            tmp = f"{self.state_path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"shard": self.shard, "ceiling": start + self.block}, f)
+            os.replace(tmp, self.state_path)
+        self._lo, self._ceiling = start, start + self.block
+        return start
+
+
+def load_tags(state_dir: str) -> Dict[int, dict]:
+    """coi -> labels from every shard's tags journal under state_dir."""
+    out: Dict[int, dict] = {}
+    for path in sorted(glob.glob(os.path.join(state_dir, "tags-*.jsonl"))):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue  # torn last line
+                out[int(rec.pop("coi"))] = rec
+    return out
+
+
+def split(coi: int) -> Tuple[int, int]:
+    """Return (shard, sequence) for a client order index we allocated."""
+    coi = int(coi)
+    return coi >> SEQ_BITS, coi & MAX_SEQ
+
+
+_default: Optional[ClientOrderIdAllocator] = None
+_default_lock = threading.Lock()
+
+
+def default_allocator() -> ClientOrderIdAllocator:
+    """Process-wide allocator configured from COI_SHARD / COI_STATE_DIR."""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                shard = int(os.environ.get("COI_SHARD", "0"))
+                state_dir = os.environ.get("COI_STATE_DIR", ".state")
+                path = os.path.join(state_dir, f"coi-{shard}.json") if state_dir else None
+                _default = ClientOrderIdAllocator(shard=shard, state_path=path)
+    return _default
+
+
+def next_client_order_index() -> int:
+    return default_allocator().next()
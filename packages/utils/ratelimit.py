@@ -0,0 +1,41 @@
+# token-bucket rate limiting
+import asyncio
+import time
+from typing import Callable, Optional
+
+
+class TokenBucket:
+    """`rate` tokens/sec refilled continuously, at most `burst` banked.
+
+    Single event loop only (no locking); `acquire()` sleeps just long enough for the
+    next token instead of a fixed interval.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        if rate <= 0:
+            raise ValueError(f"rate must be > 0, got {rate}")
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1.0, rate))
+        self.tokens = self.burst
+        self.clock = clock
+        self._ts = clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self._ts) * self.rate)
+        self._ts = now
+
+    def try_acquire(self, n: float = 1.0) -> bool:
+        self._refill()
+        if self.tokens >= n:
+            self.tokens -= n
+            return True
+        return False
+
+    def wait_time(self, n: float = 1.0) -> float:
+        self._refill()
+        return max(0.0, (n - self.tokens) / self.rate)
+
+    async def acquire(self, n: float = 1.0) -> None:
+        while not self.try_acquire(n):
+            await asyncio.sleep(self.wait_time(n))
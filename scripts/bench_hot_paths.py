@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks for the adapter, signer and signal hot paths.
+
+Usage:
+  python scripts/bench_hot_paths.py                       # table to stdout
+  python scripts/bench_hot_paths.py --json out.json       # machine-readable results
+  python scripts/bench_hot_paths.py --compare base.json   # exit 1 on >20% median regression
+  python scripts/bench_hot_paths.py -k sign --repeat 9    # subset / more samples
+
+Fixtures are generated from a fixed seed so runs are comparable across commits.
+Nothing touches the network: the signer is a fake and market metadata is stubbed.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("COI_STATE_DIR", "")  # in-memory client order ids, no state file
+
+from packages.core.models.order import OrderIntent  # noqa: E402
+from packages.core.usecases.place_bracket import build_create_orders  # noqa: E402
+from packages.leaderboard.models import TraderStats  # noqa: E402
+from packages.leaderboard.ranker import select_leaders  # noqa: E402
+from packages.lighter_sdk_adapter import codec, rest, signer  # noqa: E402
+from packages.lighter_sdk_adapter.sign_pool import SigningPool  # noqa: E402
+from packages.risk.engine import RiskEngine, RiskLimits  # noqa: E402
+from packages.signals.bus import SignalBus  # noqa: E402
+from packages.signals.models import Signal  # noqa: E402
+from packages.signals.sources import diff_positions  # noqa: E402
+
+SEED = 1337
+SYMBOLS = ["ETH", "BTC", "SOL", "HYPE", "ARB", "OP", "DOGE", "AVAX", "LINK", "SUI",
+           "WIF", "PEPE", "TIA", "SEI", "JUP", "NEAR", "APT", "INJ", "BNB", "XRP"]
+
+
+# ------------------- fixtures -------------------
+def market_entries(rng: random.Random, n: int = 100) -> List[dict]:
+    out = []
+    for i in range(n):
+        sym = SYMBOLS[i % len(SYMBOLS)] + ("" if i < len(SYMBOLS) else str(i))
+        out.append({"symbol": sym, "market_id": i, "supported_price_decimals": rng.randint(1, 6),
+                    "supported_size_decimals": rng.randint(0, 5), "min_base_amount": f"{rng.random():.4f}",
+                    "min_quote_amount": "10.0", "quote_multiplier": 1})
+    return out
+
+
+def book_levels(rng: random.Random, depth: int = 20, mid: float = 3000.0) -> dict:
+    bids = [{"price": f"{mid - 0.1 * (i + 1):.2f}", "size": f"{rng.uniform(0.1, 5):.4f}"} for i in range(depth)]
+    asks = [{"price": f"{mid + 0.1 * (i + 1):.2f}", "size": f"{rng.uniform(0.1, 5):.4f}"} for i in range(depth)]
+    rng.shuffle(bids)
+    rng.shuffle(asks)
+    return {"bids": bids, "asks": asks}
+
+
+def account_all_msg(rng: random.Random, n_trades: int = 50, n_positions: int = 20) -> str:
+    """A busy account_all update as it arrives on /stream (JSON text)."""
+    trades = {str(m): [{"trade_id": rng.randint(1, 1 << 40), "market_id": m, "price": f"{rng.uniform(1, 4000):.4f}",
+                        "size": f"{rng.uniform(0.01, 5):.4f}", "bid_account_id": 12, "ask_account_id": rng.randint(1, 999),
+                        "bid_id": rng.randint(1, 1 << 40), "ask_id": rng.randint(1, 1 << 40), "is_maker_ask": True,
+                        "timestamp": 1_700_000_000_000 + i} for i in range(n_trades // 5)] for m in range(5)}
+    pos = {str(i): {"market_id": i, "symbol": SYMBOLS[i], "sign": 1, "position": f"{rng.uniform(0, 10):.4f}",
+                    "avg_entry_price": f"{rng.uniform(1, 4000):.4f}", "position_value": f"{rng.uniform(0, 1e5):.2f}",
+                    "unrealized_pnl": f"{rng.uniform(-1e3, 1e3):.2f}", "liquidation_price": "0",
+                    "open_order_count": rng.randint(0, 5)} for i in range(n_positions)}
+    return json.dumps({"type": "update/account_all", "channel": "account_all:12", "account": 12,
+                       "trades": trades, "positions": pos, "orders": {}, "funding_histories": {}})
+
+
+def positions(rng: random.Random, n: int = 200) -> Tuple[List[dict], List[dict]]:
+    prev, curr = [], []
+    for i in range(n):
+        sym = f"{SYMBOLS[i % len(SYMBOLS)]}{i}"
+        q0 = round(rng.uniform(-10, 10), 4)
+        q1 = q0 if rng.random() < 0.7 else round(q0 + rng.uniform(-2, 2), 4)
+        prev.append({"symbol": sym, "position": str(q0)})
+        curr.append({"symbol": sym, "position": str(q1)})
+    return prev, curr
+
+
+def signals(rng: random.Random, n: int = 1000) -> List[Signal]:
+    return [Signal(leader=f"leader{i % 10}", leader_account_index=i % 10, leader_l1="0x0",
+                   market=rng.choice(SYMBOLS), side=rng.choice(["BUY", "SELL"]), size=rng.uniform(0.01, 2),
+                   type=rng.choice(["OPEN", "CLOSE"]), client_ref=f"{i:024x}", ts=1.7e9 + i) for i in range(n)]
+
+
+def traders(rng: random.Random, n: int = 5000) -> List[TraderStats]:
+    return [TraderStats(name=f"t{i}", l1_address=f"0x{i:040x}", account_index=i,
+                        equity_usdc=rng.uniform(0, 1e6), days_active=rng.randint(0, 400),
+                        pnl_7d_pct=rng.uniform(-30, 30), pnl_30d_pct=rng.uniform(-60, 60),
+                        sharpe_30d=rng.uniform(-2, 4), win_rate_pct=rng.uniform(20, 80),
+                        trades_7d=rng.randint(0, 500), max_drawdown_30d_pct=rng.uniform(0, 60),
+                        avg_position_usd=rng.uniform(0, 5e4)) for i in range(n)]
+
+
+SELECTION = {"min_days": 30, "min_equity_usdc": 10_000, "min_pnl_7d_pct": 0, "min_win_rate": 45,
+             "min_trades_7d": 10, "max_drawdown_30d_pct": 35, "min_avg_position_usd": 500}
+
+
+class _FakeNonceManager:
+    def __init__(self) -> None:
+        self.nonce = 0
+
+    def next_nonce(self) -> Tuple[int, int]:
+        self.nonce += 1
+        return 2, self.nonce
+
+    def acknowledge_failure(self, api_key_index: int) -> None:
+        pass
+
+
+class FakeSigner:
+    """Enough of lighter.SignerClient for signer.sign_* (constants, nonces, a cheap 'signature')."""
+    ORDER_TYPE_LIMIT, ORDER_TYPE_MARKET, ORDER_TYPE_STOP_LOSS, ORDER_TYPE_STOP_LOSS_LIMIT = 0, 1, 2, 3
+    ORDER_TYPE_TAKE_PROFIT, ORDER_TYPE_TAKE_PROFIT_LIMIT, ORDER_TYPE_TWAP = 4, 5, 6
+    ORDER_TIME_IN_FORCE_IMMEDIATE_OR_CANCEL, ORDER_TIME_IN_FORCE_GOOD_TILL_TIME = 0, 1
+    ORDER_TIME_IN_FORCE_POST_ONLY = 2
+    DEFAULT_28_DAY_ORDER_EXPIRY = -1
+    TX_TYPE_CREATE_ORDER = 14
+    url = "http://bench.invalid"
+
+    def __init__(self) -> None:
+        self.nonce_manager = _FakeNonceManager()
+
+    def switch_api_key(self, api_key_index: int):
+        return None
+
+    def sign_create_order(self, **kw):
+        return json.dumps(kw, separators=(",", ":")), None
+
+
+class NativeSigner(FakeSigner):
+    """FakeSigner whose sign call blocks ~200us without the GIL, like the ctypes call into the Go signer."""
+
+    def sign_create_order(self, **kw):
+        time.sleep(0.0002)
+        return super().sign_create_order(**kw)
+
+
+# ------------------- harness -------------------
+def _time_sync(fn: Callable[[], Any], number: int) -> int:
+    t0 = time.perf_counter_ns()
+    for _ in range(number):
+        fn()
+    return time.perf_counter_ns() - t0
+
+
+def _time_async(loop: asyncio.AbstractEventLoop, fn: Callable[[], Any], number: int) -> int:
+    async def run() -> int:
+        t0 = time.perf_counter_ns()
+        for _ in range(number):
+            await fn()
+        return time.perf_counter_ns() - t0
+    return loop.run_until_complete(run())
+
+
+def measure(fn: Callable[[], Any], number: int, repeat: int, is_async: bool,
+            loop: asyncio.AbstractEventLoop) -> Dict[str, float]:
+    timer = (lambda n: _time_async(loop, fn, n)) if is_async else (lambda n: _time_sync(fn, n))
+    timer(max(1, number // 10))  # warm-up
+    samples = [timer(number) / number for _ in range(repeat)]
+    med = statistics.median(samples)
+    return {"number": number, "repeat": repeat, "ns_per_op_median": round(med, 1),
+            "ns_per_op_min": round(min(samples), 1), "ns_per_op_max": round(max(samples), 1),
+            "ops_per_sec": round(1e9 / med, 1) if med else 0.0}
+
+
+def build_cases(rng: random.Random) -> List[Tuple[str, Callable[[], Any], int, bool]]:
+    entries = market_entries(rng)
+    book = book_levels(rng)
+    raw_syms = [f"{s}-USDC" for s in SYMBOLS] + [f"{s.lower()}/usdc" for s in SYMBOLS]
+    prev, curr = positions(rng)
+    sigs = signals(rng)
+    bus = SignalBus()
+    sink: List[Signal] = []
+    for _ in range(3):
+        bus.subscribe(lambda s: None)
+    bus.subscribe(sink.append)
+    pool = traders(rng)
+    intent = OrderIntent(market="ETH", side="BUY", entry_px=3012.5, stop_px=2950.0, tp_px=3100.0, base_amount=5)
+    fake = FakeSigner()
+    body = {"market": "ETH", "market_index": 0, "side": "BUY", "order_type": "ORDER_TYPE_LIMIT",
+            "base_amount": "0.25", "price": "3012.57", "client_order_index": 1,
+            "time_in_force": "ORDER_TIME_IN_FORCE_POST_ONLY"}
+
+    risk = RiskEngine(RiskLimits(max_leverage=5, max_concurrent=10, max_order_notional=1e5, max_market_notional=1e6,
+                                 max_total_notional=5e6, max_open_orders=500, price_band_bps=500), state_dir="")
+    risk.sync_account({"total_asset_value": "1000000", "positions": [
+        {"symbol": s, "sign": 1, "position": "1", "position_value": "100", "open_order_count": 2} for s in SYMBOLS[:5]]})
+    native = NativeSigner()
+    sign_pool = SigningPool(native, workers=4)
+    burst = [dict(body, client_order_index=i) for i in range(16)]
+
+    async def sign_inline():
+        for b in burst:
+            await signer.sign_tx(native, b)
+
+    copy_batch = [(s.market, s.side, s.size, 100.0) for s in sigs[:20]]
+    raw_account = account_all_msg(rng)
+
+    def cache_entries():
+        for e in entries:
+            rest._cache_market_entry(e)
+
+    def norm_symbols():
+        for s in raw_syms:
+            rest._norm_symbol(s)
+
+    def best_px():
+        rest._best_px(book["bids"], "bid")
+        rest._best_px(book["asks"], "ask")
+
+    def publish():
+        sink.clear()
+        bus.publish_many(sigs)
+
+    return [
+        ("rest._cache_market_entry[x100]", cache_entries, 200, False),
+        ("rest._norm_symbol[x40]", norm_symbols, 2000, False),
+        ("json.loads[account_all]", lambda: json.loads(raw_account), 2000, False),
+        (f"codec.loads[account_all,{codec.BACKEND}]", lambda: codec.loads(raw_account), 2000, False),
+        ("rest._best_px[2x20 levels]", best_px, 5000, False),
+        ("rest.get_spread[20 levels]", lambda: rest.get_spread(fake, "ETH"), 5000, True),
+        ("signer.sign_create_order", lambda: signer.sign_create_order(fake, body), 5000, True),
+        ("signer.sign_tx[16,inline,native]", sign_inline, 50, True),
+        ("sign_pool.sign_batch[16,4 workers,native]", lambda: sign_pool.sign_batch(burst), 50, True),
+        ("place_bracket.build_create_orders", lambda: build_create_orders(intent), 5000, False),
+        ("risk.check_intent", lambda: risk.check_intent(intent, 3012.5), 20000, False),
+        ("risk.check_batch[20]", lambda: risk.check_batch(copy_batch), 2000, False),
+        ("sources.diff_positions[200]", lambda: diff_positions(prev, curr, "leader", 1, "0x0"), 200, False),
+        ("bus.publish_many[1000x4 subs]", publish, 100, False),
+        ("ranker.select_leaders[5000]", lambda: select_leaders(pool, 5000, SELECTION, 10, "sharpe_30d"), 50, False),
+    ], book
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              timeout=5).stdout.strip()
+    except Exception:
+        return ""
+
+
+def run(select: str = "", repeat: int = 5, scale: float = 1.0) -> dict:
+    rng = random.Random(SEED)
+    cases, book = build_cases(rng)
+
+    async def fake_meta(client, symbol):
+        return {"market_id": 0, "symbol": symbol, "price_decimals": 2, "size_decimals": 4}
+
+    async def fake_orderbook(client, market, depth=20):
+        return book
+
+    orig_meta, orig_ob = signer.get_market_meta, rest.get_orderbook
+    signer.get_market_meta, rest.get_orderbook = fake_meta, fake_orderbook
+    loop = asyncio.new_event_loop()
+    results: Dict[str, Dict[str, float]] = {}
+    try:
+        for name, fn, number, is_async in cases:
+            if select and select not in name:
+                continue
+            results[name] = measure(fn, max(1, int(number * scale)), repeat, is_async, loop)
+    finally:
+        signer.get_market_meta, rest.get_orderbook = orig_meta, orig_ob
+        loop.close()
+    return {
+        "meta": {"ts": time.time(), "git": _git_rev(), "python": platform.python_version(),
+                 "implementation": platform.python_implementation(), "machine": platform.machine(),
+                 "seed": SEED, "repeat": repeat, "scale": scale},
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[str]:
+    regressions = []
+    for name, cur in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base or not base.get("ns_per_op_median"):
+            continue
+        ratio = cur["ns_per_op_median"] / base["ns_per_op_median"]
+        cur["vs_baseline"] = round(ratio, 3)
+        if ratio > 1 + threshold:
+            regressions.append(f"{name}: {base['ns_per_op_median']:.0f} -> {cur['ns_per_op_median']:.0f} ns/op "
+                               f"({(ratio - 1) * 100:+.1f}%)")
+    return regressions
+
+
+def print_table(report: dict) -> None:
+    print(f"{'benchmark':<38} {'median':>12} {'min':>12} {'ops/s':>12} {'vs base':>8}")
+    for name, r in report["results"].items():
+        vs = f"{r['vs_baseline']:.2f}x" if "vs_baseline" in r else ""
+        print(f"{name:<38} {r['ns_per_op_median'] / 1e3:>10.2f}us {r['ns_per_op_min'] / 1e3:>10.2f}us "
+              f"{r['ops_per_sec']:>12,.0f} {vs:>8}")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Hot-path micro-benchmarks")
+    ap.add_argument("-k", dest="select", default="", help="only run benchmarks whose name contains this")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--scale", type=float, default=1.0, help="multiply iteration counts (e.g. 0.1 for a smoke run)")
+    ap.add_argument("--json", dest="json_out", help="write results to this file ('-' for stdout)")
+    ap.add_argument("--compare", help="baseline JSON from a previous --json run")
+    ap.add_argument("--threshold", type=float, default=0.20, help="allowed median slowdown vs baseline")
+    args = ap.parse_args()
+
+    report = run(args.select, args.repeat, args.scale)
+    regressions: List[str] = []
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.threshold)
+
+    if args.json_out == "-":
+        print(json.dumps(report, indent=2))
+    else:
+        print_table(report)
+        if args.json_out:
+            with open(args.json_out, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
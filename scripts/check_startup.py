@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Import-time budget for the trader CLI.
+
+Usage:
+  python scripts/check_startup.py                      # median of 5 cold imports vs the budget
+  python scripts/check_startup.py --budget-ms 250 --top 15
+  python scripts/check_startup.py --json -             # machine-readable results
+
+Each sample is a fresh `python -X importtime -c "import <module>"`. Exits 1 when the
+median exceeds the budget or when a module that only some subcommands need (the SDK,
+signer crypto, numpy, ...) is imported at module load.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# loaded by the subcommands that use them, never by `import apps.trader.main`
+FORBIDDEN = ("lighter", "eth_account", "py_ecc", "aiohttp", "websockets", "numpy", "pyarrow", "yaml",
+             "apps.trader.tasks", "packages.execution", "packages.strategies", "packages.leaderboard")
+
+
+def sample(module: str) -> Tuple[float, Dict[str, int]]:
+    """(total import ms, cumulative us per imported module) for one cold interpreter."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=ROOT,
+                         capture_output=True, text=True, check=True).stderr
+    mods: Dict[str, int] = {}
+    for line in out.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cum, name = line[len("import time:"):].split("|")
+        if cum.strip().isdigit():
+            mods[name.strip()] = int(cum)
+    return mods.get(module, 0) / 1e3, mods
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="CLI import-time budget")
+    ap.add_argument("--module", default="apps.trader.main")
+    ap.add_argument("--budget-ms", type=float, default=300.0)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--top", type=int, default=10, help="slowest modules to list")
+    ap.add_argument("--json", dest="json_out", help="write results to this file ('-' for stdout)")
+    args = ap.parse_args()
+
+    samples: List[float] = []
+    mods: Dict[str, int] = {}
+    for _ in range(args.repeat):
+        ms, mods = sample(args.module)
+        samples.append(ms)
+    median = statistics.median(samples)
+    leaked = sorted(m for m in mods if any(m == f or m.startswith(f + ".") for f in FORBIDDEN))
+    top = sorted(((n, us / 1e3) for n, us in mods.items() if n != args.module), key=lambda x: -x[1])[:args.top]
+    report = {"module": args.module, "median_ms": round(median, 1), "min_ms": round(min(samples), 1),
+              "budget_ms": args.budget_ms, "forbidden": leaked, "top": [[n, round(ms, 1)] for n, ms in top]}
+
+    if args.json_out == "-":
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{args.module}: median {median:.1f} ms, min {min(samples):.1f} ms (budget {args.budget_ms:.0f} ms)")
+        for name, ms in top:
+            print(f"  {ms:>8.1f} ms  {name}")
+        if args.json_out:
+            with open(args.json_out, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+    failed = False
+    if median > args.budget_ms:
+        print(f"OVER BUDGET {args.module}: {median:.1f} ms > {args.budget_ms:.0f} ms", file=sys.stderr)
+        failed = True
+    if leaked:
+        print(f"EAGER IMPORTS {args.module}: {', '.join(leaked[:10])}", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
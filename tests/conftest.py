@@ -0,0 +1,11 @@
+# shared fixtures
+import pytest
+
+from packages.utils import ids
+
+
+@pytest.fixture(autouse=True)
+def coi_state_dir(tmp_path, monkeypatch):
+    # the process-wide allocator persists its ceiling under COI_STATE_DIR: never the repo's .state/
+    monkeypatch.setenv("COI_STATE_DIR", str(tmp_path / "state"))
+    monkeypatch.setattr(ids, "_default", None)
@@ -1 +1,89 @@
 # test signer send tx
+import json
+
+import httpx
+import pytest
+
+from apps.simulator.engine import TX_TYPE_CANCEL_ORDER, TX_TYPE_CREATE_ORDER
+from apps.simulator.server import FaultConfig, LighterSim
+
+
+def _create(nonce, coi, is_ask, price, base, market=0, account=7, order_type=0, tif=1):
+    return json.dumps({"AccountIndex": account, "ApiKeyIndex": 2, "MarketIndex": market, "ClientOrderIndex": coi,
+                       "BaseAmount": base, "Price": price, "IsAsk": int(is_ask), "Type": order_type,
+                       "TimeInForce": tif, "ReduceOnly": 0, "TriggerPrice": 0, "OrderExpiry": -1, "Nonce": nonce})
+
+
+@pytest.mark.asyncio
+async def test_send_tx_rests_then_cancel_by_client_index():
+    async with LighterSim(port=0, tick_ms=0) as sim:
+        async with httpx.AsyncClient(base_url=sim.base_url) as h:
+            bid = sim.ex.books[0].best(False)
+            r = await h.post("/api/v1/sendTx", data={"tx_type": TX_TYPE_CREATE_ORDER,
+                                                     "tx_info": _create(0, 555, False, bid - 100, 10)})
+            assert r.status_code == 200 and r.json()["code"] == 200
+            orders = (await h.get("/api/v1/accountActiveOrders",
+                                  params={"account_index": "7", "market_id": "255"})).json()["orders"]
+            assert [o["client_order_index"] for o in orders] == [555]
+
+            cancel = json.dumps({"AccountIndex": 7, "ApiKeyIndex": 2, "MarketIndex": 0, "Index": 555, "Nonce": 1})
+            r = await h.post("/api/v1/sendTx", data={"tx_type": TX_TYPE_CANCEL_ORDER, "tx_info": cancel})
+            assert r.status_code == 200
+            assert sim.ex.open_orders(7) == []
+
+            stale = await h.post("/api/v1/sendTx", data={"tx_type": TX_TYPE_CREATE_ORDER,
+                                                         "tx_info": _create(0, 556, False, bid - 100, 10)})
+            assert stale.status_code == 400 and stale.json()["message"] == "invalid nonce"
+
+
+@pytest.mark.asyncio
+async def test_send_tx_batch_is_all_or_nothing():
+    async with LighterSim(port=0, tick_ms=0) as sim:
+        async with httpx.AsyncClient(base_url=sim.base_url) as h:
+            bid = sim.ex.books[0].best(False)
+            batch = [_create(0, 1, False, bid - 100, 10), _create(1, 2, False, bid - 100, 0)]  # second: zero size
+            r = await h.post("/api/v1/sendTxBatch", data={"tx_types": json.dumps([TX_TYPE_CREATE_ORDER] * 2),
+                                                          "tx_infos": json.dumps(batch)})
+            assert r.status_code == 400 and r.json()["message"] == "invalid base amount"
+            assert sim.ex.open_orders(7) == []
+
+            # nothing was applied, so nonce 0 is still unused
+            batch = [_create(0, 1, False, bid - 100, 10), _create(1, 2, False, bid - 200, 10)]
+            r = await h.post("/api/v1/sendTxBatch", data={"tx_types": json.dumps([TX_TYPE_CREATE_ORDER] * 2),
+                                                          "tx_infos": json.dumps(batch)})
+            assert r.status_code == 200
+            assert sorted(o["client_order_index"] for o in sim.ex.open_orders(7)) == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_crossing_order_fills_and_updates_position():
+    async with LighterSim(port=0, tick_ms=0) as sim:
+        async with httpx.AsyncClient(base_url=sim.base_url) as h:
+            ask = sim.ex.books[0].best(True)
+            r = await h.post("/api/v1/sendTx", data={"tx_type": TX_TYPE_CREATE_ORDER,
+                                                     "tx_info": _create(0, 1, False, ask, 5)})
+            assert r.status_code == 200
+            acc = (await h.get("/api/v1/account", params={"by": "index", "value": "7"})).json()["accounts"][0]
+            assert acc["positions"][0]["sign"] == 1
+            assert float(acc["positions"][0]["position"]) == pytest.approx(5 / 10 ** 4)
+
+
+@pytest.mark.asyncio
+async def test_market_order_needs_a_protection_price():
+    async with LighterSim(port=0, tick_ms=0) as sim:
+        async with httpx.AsyncClient(base_url=sim.base_url) as h:
+            ask = sim.ex.books[0].best(True)
+            r = await h.post("/api/v1/sendTx", data={"tx_type": TX_TYPE_CREATE_ORDER,
+                                                     "tx_info": _create(0, 1, False, 0, 5, order_type=1, tif=0)})
+            assert r.status_code == 400 and r.json()["message"] == "market order without a protection price"
+            r = await h.post("/api/v1/sendTx", data={"tx_type": TX_TYPE_CREATE_ORDER,
+                                                     "tx_info": _create(0, 1, False, ask, 5, order_type=1, tif=0)})
+            assert r.status_code == 200 and sim.ex.open_orders(7) == []
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_answers_429():
+    async with LighterSim(port=0, tick_ms=0, faults=FaultConfig(rps=1.0, burst=2.0)) as sim:
+        async with httpx.AsyncClient(base_url=sim.base_url) as h:
+            codes = [(await h.get("/api/v1/orderBooks")).status_code for _ in range(4)]
+    assert codes[:2] == [200, 200] and 429 in codes[2:]
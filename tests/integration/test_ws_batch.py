@@ -1 +1,51 @@
 # test ws batch
+import asyncio
+import json
+
+import httpx
+import pytest
+import websockets
+
+from apps.simulator.engine import TX_TYPE_CANCEL_ORDER, TX_TYPE_CREATE_ORDER
+from apps.simulator.server import LighterSim
+
+
+def _create(nonce, coi, is_ask, price, base=10):
+    return json.dumps({"AccountIndex": 9, "ApiKeyIndex": 2, "MarketIndex": 0, "ClientOrderIndex": coi,
+                       "BaseAmount": base, "Price": price, "IsAsk": int(is_ask), "Type": 0, "TimeInForce": 1,
+                       "Nonce": nonce})
+
+
+def _cancel(nonce, index):
+    return json.dumps({"AccountIndex": 9, "ApiKeyIndex": 2, "MarketIndex": 0, "Index": index, "Nonce": nonce})
+
+
+@pytest.mark.asyncio
+async def test_cancel_replace_batch_applies_cancels_first():
+    async with LighterSim(port=0, tick_ms=0) as sim:
+        bid, ask = sim.ex.books[0].best(False), sim.ex.books[0].best(True)
+        async with httpx.AsyncClient(base_url=sim.base_url) as h:
+            first = [_create(0, 1, False, bid - 50), _create(1, 2, True, ask + 50)]
+            r = await h.post("/api/v1/sendTxBatch", data={"tx_types": json.dumps([TX_TYPE_CREATE_ORDER] * 2),
+                                                          "tx_infos": json.dumps(first)})
+            assert len(r.json()["tx_hash"]) == 2
+
+            batch = [_cancel(2, 1), _cancel(3, 2), _create(4, 3, False, bid - 40), _create(5, 4, True, ask + 40)]
+            types = [TX_TYPE_CANCEL_ORDER] * 2 + [TX_TYPE_CREATE_ORDER] * 2
+            r = await h.post("/api/v1/sendTxBatch", data={"tx_types": json.dumps(types),
+                                                          "tx_infos": json.dumps(batch)})
+            assert r.status_code == 200
+        assert sorted(o["client_order_index"] for o in sim.ex.open_orders(9)) == [3, 4]
+
+
+@pytest.mark.asyncio
+async def test_stream_pushes_book_snapshot_and_deltas():
+    async with LighterSim(port=0, tick_ms=0) as sim:
+        async with websockets.connect(sim.base_url.replace("http", "ws", 1) + "/stream") as ws:
+            assert json.loads(await ws.recv())["type"] == "connected"
+            await ws.send(json.dumps({"type": "subscribe", "channel": "order_book/0"}))
+            snap = json.loads(await ws.recv())
+            assert snap["type"] == "subscribed/order_book" and snap["order_book"]["bids"]
+            sim.ex.step()
+            upd = json.loads(await asyncio.wait_for(ws.recv(), 2))
+            assert upd["type"] == "update/order_book" and upd["order_book"]["offset"] > snap["order_book"]["offset"]
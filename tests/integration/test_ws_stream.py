@@ -0,0 +1,33 @@
+# test ws stream
+import asyncio
+
+import pytest
+
+from apps.simulator.server import LighterSim
+from packages.lighter_sdk_adapter.ws import subscribe_stream
+
+
+class Log:
+    def __init__(self):
+        self.warned = []
+
+    def warn(self, event, **kw):
+        self.warned.append(event)
+
+
+@pytest.mark.asyncio
+async def test_handler_error_resubscribes_instead_of_ending_the_feed():
+    snapshots, stop, log = [], asyncio.Event(), Log()
+
+    def on_msg(msg):
+        if msg.get("type") != "subscribed/order_book":
+            return
+        snapshots.append(msg)
+        if len(snapshots) == 1:
+            raise KeyError("bids")  # e.g. a payload shape the handler does not expect
+        stop.set()
+
+    async with LighterSim(port=0, tick_ms=0) as sim:
+        await asyncio.wait_for(subscribe_stream(sim.base_url, ["order_book/0"], on_msg, reconnect_delay=0.01,
+                                                stop=stop, log=log), 5)
+    assert len(snapshots) == 2 and log.warned == ["Stream handler failed, resubscribing"]
@@ -0,0 +1,80 @@
+# test accounts
+import asyncio
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from packages.config import env
+from packages.config.env import load_accounts, select_accounts
+from packages.execution import accounts
+from packages.execution.accounts import build_accounts, fan_out
+from packages.utils.ids import default_allocator
+
+MAIN = {"BASE_URL": "http://venue", "ACCOUNT_INDEX": "10", "API_KEY_INDEX": "2", "ETH_PRIVATE_KEY": "0xeth",
+        "API_KEY_PRIVATE_KEY": "0xmain", "RISK_LEVERAGE_CAP": "5"}
+SUB1 = {"SUB1_ACCOUNT_INDEX": "11", "SUB1_API_KEY_INDEX": "3", "SUB1_API_KEY_PRIVATE_KEY": "0xsub1",
+        "SUB1_RISK_LEVERAGE_CAP": "2"}
+
+
+@pytest.fixture
+def env_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(env, "_LOADED", {})
+    for k, v in {**MAIN, **SUB1, "ACCOUNTS": "sub1"}.items():
+        monkeypatch.setenv(k, v)
+    return str(tmp_path / ".env.none")  # everything comes from the environment
+
+
+def test_load_accounts_reads_prefixed_blocks_with_main_fallbacks(env_file):
+    cfgs = load_accounts(env_file)
+    assert list(cfgs) == ["main", "sub1"]
+    sub = cfgs["sub1"]
+    assert (sub.account_index, sub.api_key_index, sub.api_pk) == (11, 3, "0xsub1")
+    assert sub.eth_pk == "0xeth" and sub.base_url == "http://venue"  # not set for sub1: the main account's
+    assert (cfgs["main"].risk_lev_cap, sub.risk_lev_cap) == (5.0, 2.0)
+    assert list(select_accounts(cfgs, "all")) == ["main", "sub1"] and list(select_accounts(cfgs, " SUB1 ")) == ["sub1"]
+    with pytest.raises(ValueError, match="unknown account"):
+        select_accounts(cfgs, "main,sub2")
+
+
+def test_load_accounts_rejects_shared_keys_and_missing_fields(env_file, monkeypatch):
+    monkeypatch.setenv("SUB1_API_KEY_INDEX", "2")
+    with pytest.raises(ValueError, match="share api_key_index=2"):
+        load_accounts(env_file)
+    monkeypatch.delenv("SUB1_API_KEY_INDEX")
+    with pytest.raises(ValueError, match="SUB1_API_KEY_INDEX is not set"):
+        load_accounts(env_file)
+
+
+def test_accounts_get_their_own_signer_ids_and_risk(env_file, monkeypatch):
+    monkeypatch.setattr(accounts, "make_signer", lambda url, account, key, api_pk, eth_pk: SimpleNamespace(
+        url=url, account_index=account, api_key_index=key))
+    main, sub = build_accounts(load_accounts(env_file))
+    assert (main.index, sub.index) == (10, 11) and main.client is not sub.client
+    assert main.exchange.client is main.client and sub.exchange.account_index == 11
+    root = os.environ["COI_STATE_DIR"]
+    assert main.exchange.ids is default_allocator()  # single-account runs keep their state files
+    assert sub.exchange.ids.state_path == os.path.join(root, "sub1", "coi-0.json")
+    assert main.risk is not sub.risk and sub.risk.state_path == os.path.join(root, "sub1", "risk-day.json")
+    assert (main.risk.limits.max_leverage, sub.risk.limits.max_leverage) == (5.0, 2.0)
+
+
+@pytest.mark.asyncio
+async def test_fan_out_runs_accounts_concurrently_and_isolates_failures():
+    accts = [SimpleNamespace(name=n) for n in ("main", "sub1", "sub2")]
+    started, release = [], asyncio.Event()
+
+    async def execute(a):
+        started.append(a.name)
+        await release.wait()  # every account must be in flight before any finishes
+        if a.name == "sub1":
+            raise RuntimeError("risk blocked")
+        return a.name.upper()
+
+    task = asyncio.create_task(fan_out(accts, execute))
+    while len(started) < 3:
+        await asyncio.sleep(0)
+    release.set()
+    res = await task
+    assert res["main"] == "MAIN" and res["sub2"] == "SUB2"
+    assert isinstance(res["sub1"], RuntimeError)
@@ -0,0 +1,50 @@
+# test backtest
+import asyncio
+
+import pytest
+
+from packages.backtest.fills import FillModel, SimBroker
+from packages.backtest.vectorized import backtest_copy, run_vectorized
+from packages.data.book import LocalBook
+
+MS = 1_000_000
+
+
+def test_run_vectorized_pnl_and_costs_by_hand():
+    bars = {"close": [100.0, 102.0, 101.0, 105.0], "interval_sec": 60}
+    r = run_vectorized(bars, [1, 1, 0, 0], fee_bps=2.0, slippage_bps=1.0, latency_bars=1)
+    # held one bar late: [0, 1, 1, 0]; entry at 102 and exit at 105 pay 3 bps each
+    fees = (102 + 105) * 3e-4
+    assert r["fees"] == pytest.approx(fees)
+    assert r["pnl"] == pytest.approx(-1 + 4 - fees)
+    assert (r["trades"], r["turnover"], r["exposure"], r["bars"]) == (2, 207.0, 0.5, 4)
+    assert r["max_drawdown"] == pytest.approx(1 + 102 * 3e-4)
+
+
+def test_backtest_copy_skips_signals_past_the_slippage_guard():
+    tape_ts, tape_px = [0, 1000 * MS, 2000 * MS], [100.0, 100.1, 103.0]
+    # the second buy executes 250ms later at 103 vs 100.1 at signal time: ~290 bps adverse
+    r = backtest_copy([0, 1900 * MS], [1, 1], [1.0, 1.0], tape_ts, tape_px, slippage_bps=20.0, latency_ms=250.0,
+                      fee_bps=2.0)
+    assert (r["copied"], r["skipped"], r["position"]) == (1, 1, 1.0)
+    assert r["fees"] == pytest.approx(100 * 2e-4)
+    assert r["pnl"] == pytest.approx(103 - 100 - 100 * 2e-4)
+
+
+def test_sim_broker_fills_only_after_the_queue_ahead_trades_through():
+    book = LocalBook()
+    book.reset({"bids": [(99.0, 5.0)], "asks": [(101.0, 5.0)]})
+    broker = SimBroker(book, FillModel(maker_fee=0.0, latency_ms=50.0))
+    asyncio.run(broker.cancel_replace("ETH", [], [{"side": "BUY", "price": 99.0, "base_amount": 1.0}]))
+    broker.on_trade(99.0, 10.0, taker_buy=False)  # still in flight: not on the book yet
+    broker.advance(50 * MS)
+    (order,) = broker.orders.values()
+    assert order.queue_ahead == 5.0  # joined the back of the level
+    broker.on_trade(99.0, 3.0, taker_buy=False)
+    broker.on_trade(99.0, 2.0, taker_buy=False)
+    assert broker.stats.fills == 0 and order.queue_ahead == 0.0
+    broker.on_trade(99.0, 0.4, taker_buy=False)
+    assert broker.position == pytest.approx(0.4) and order.remaining == pytest.approx(0.6)
+    broker.on_trade(98.5, 0.1, taker_buy=False)  # a print through our price fills the rest
+    assert broker.position == pytest.approx(1.0) and broker.orders == {}
+    assert broker.cash == pytest.approx(-99.0) and broker.stats.log[-1][4] is True
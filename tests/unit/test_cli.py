@@ -0,0 +1,29 @@
+# test cli
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+CODE = """
+import asyncio, json, sys, types
+import apps.trader.main as m
+
+async def daemon_call(args, cmd, **params):
+    return {"placed": True, "result": {"code": 200}} if cmd == "place" else {"code": 200}
+
+m.daemon_call = daemon_call
+args = types.SimpleNamespace(market="ETH", side="BUY", entry=None, stop=1.0, tp=2.0, size=1, lev=2.0,
+                             current_side="BUY")
+asyncio.run(m.run_place(args))
+asyncio.run(m.run_close(args))
+sys.stdout.flush()
+print(json.dumps(sorted(n for n in sys.modules if n.split(".")[0] == "lighter" or n.startswith("packages.execution"))))
+"""
+
+
+def test_daemon_routed_commands_skip_the_sdk_import():
+    out = subprocess.run([sys.executable, "-c", CODE], cwd=ROOT, capture_output=True, text=True, check=True,
+                         env={**os.environ, "AEGON_LOG_SYNC": "1"}).stdout
+    assert json.loads(out.strip().splitlines()[-1]) == []
@@ -0,0 +1,51 @@
+# test codec
+import datetime
+import decimal
+import enum
+
+import numpy as np
+import pytest
+
+from packages.lighter_sdk_adapter import codec
+
+
+class Side(enum.Enum):
+    BUY = "BUY"
+
+
+SAMPLE = {
+    "int_keys": {1: 2, 0: {"nested": True}},
+    "float_key": {1.5: "x"},
+    "np": {"i": np.int64(7), "f": np.float64(0.25), "b": np.bool_(True), "arr": np.array([1.0, 2.5])},
+    "px": decimal.Decimal("2000.10"),
+    "ts": datetime.datetime(2025, 1, 15, 12, 30, 5, 123000),
+    "side": Side.BUY,
+    "text": "é",
+}
+
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request, monkeypatch):
+    if request.param == "orjson":
+        if codec.orjson is None:
+            pytest.skip("orjson not installed")
+    else:
+        monkeypatch.setattr(codec, "orjson", None)
+    return request.param
+
+
+def test_dumpb_round_trips_on_both_backends(backend):
+    out = codec.loads(codec.dumpb(SAMPLE))
+    assert out["int_keys"] == {"1": 2, "0": {"nested": True}}
+    assert out["float_key"] == {"1.5": "x"}
+    assert out["np"] == {"i": 7, "f": 0.25, "b": True, "arr": [1.0, 2.5]}
+    assert out["px"] == "2000.10" and out["ts"] == "2025-01-15T12:30:05.123000"
+    assert out["side"] == "BUY" and out["text"] == "é"
+
+
+def test_backends_emit_identical_bytes(monkeypatch):
+    if codec.orjson is None:
+        pytest.skip("orjson not installed")
+    fast = codec.dumpb(SAMPLE)
+    monkeypatch.setattr(codec, "orjson", None)
+    assert codec.dumpb(SAMPLE) == fast
@@ -0,0 +1,64 @@
+# test config service
+import dataclasses
+import os
+
+import pytest
+
+from apps.trader.tasks.strategy_run import parse_strategy_cfg
+from packages.config.models import CopyConfig
+from packages.config.service import ConfigError, ConfigService, model
+
+
+class Log:
+    def __init__(self):
+        self.lines = []
+
+    def info(self, event, **kw):
+        self.lines.append(("info", event))
+
+    def warn(self, event, **kw):
+        self.lines.append(("warn", event))
+
+
+def _write(path, text):
+    path.write_text(text)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))  # same-size rewrites still restamp
+
+
+def test_reload_swaps_snapshot_and_notifies(tmp_path):
+    path = tmp_path / "strategy.yml"
+    _write(path, "breakout_retest:\n  size: 1.0\n")
+    svc = ConfigService()
+    first = svc.register("strategy", str(path), parse_strategy_cfg)
+    seen = []
+    svc.subscribe("strategy", lambda new, old: seen.append((old["breakout_retest"].size, new["breakout_retest"].size)))
+    assert svc.reload() == []  # unchanged on disk
+    _write(path, "breakout_retest:\n  size: 2.0\n")
+    assert svc.reload() == ["strategy"]
+    assert seen == [(1.0, 2.0)] and svc.version("strategy") == 2
+    assert first["breakout_retest"].size == 1.0  # the old snapshot is untouched
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        svc.get("strategy")["breakout_retest"].size = 3.0
+
+
+def test_invalid_file_is_rejected_and_previous_kept(tmp_path):
+    path = tmp_path / "copy.yml"
+    _write(path, "leaderboard:\n  rps: 2.0\n")
+    log = Log()
+    svc = ConfigService(log)
+    before = svc.register("copy", str(path), model(CopyConfig))
+    for bad in ("leaderboard:\n  rps: [\n", "leaderboard:\n  rps: -1\n", ""):
+        _write(path, bad)
+        assert svc.reload() == []
+        assert svc.get("copy") is before and svc.version("copy") == 1
+    assert [e for lvl, e in log.lines if lvl == "warn"] == ["Config rejected, keeping previous"] * 3
+    _write(path, "leaderboard:\n  rps: 4.0\n")
+    assert svc.reload() == ["copy"] and svc.get("copy").leaderboard.rps == 4.0
+
+
+def test_register_raises_on_a_bad_file(tmp_path):
+    path = tmp_path / "strategy.yml"
+    _write(path, "range_fade:\n  sizee: 1\n")
+    with pytest.raises(ConfigError, match="unknown field"):
+        ConfigService().register("strategy", str(path), parse_strategy_cfg)
@@ -0,0 +1,63 @@
+# test exchange
+import asyncio
+
+import pytest
+
+from packages.execution import exchange_impl
+from packages.execution.exchange_impl import LighterExchange
+from packages.lighter_sdk_adapter import sign_pool
+from packages.utils.ids import ClientOrderIdAllocator
+
+
+def _fake_send(monkeypatch, sent):
+    async def send_tx(client, tx_type, tx_info, api_key_index=None):
+        await asyncio.sleep(0.001 * (tx_info % 3))  # later nonces may finish their HTTP round trip first
+        sent.append(tx_info)
+
+    async def send_tx_batch(client, tx_types, tx_infos, api_key_indices=None):
+        await asyncio.sleep(0)
+        sent.extend(tx_infos)
+
+    monkeypatch.setattr(exchange_impl, "send_tx", send_tx)
+    monkeypatch.setattr(exchange_impl, "send_tx_batch", send_tx_batch)
+
+
+def _fake_sign(ex, nonce):
+    async def sign_all(bodies):
+        out = [{"tx_type": 14, "tx_info": next(nonce), "api_key_index": 0} for _ in bodies]
+        await asyncio.sleep(0)
+        return out
+
+    async def market_id(market):
+        return 0
+
+    ex._sign_all, ex._market_id = sign_all, market_id
+
+
+@pytest.mark.asyncio
+async def test_sends_leave_in_nonce_order(monkeypatch):
+    sent = []
+    _fake_send(monkeypatch, sent)
+    ex = LighterExchange(object(), 1, ids=ClientOrderIdAllocator())
+    _fake_sign(ex, iter(range(100)))
+    await asyncio.gather(*[ex.place_limit("ETH", "BUY", 100.0, 1.0) for _ in range(4)],
+                         ex.cancel("ETH", 7), ex.cancel_all(None), ex.place_market("ETH", "SELL", "1", mark_px=2000.0),
+                         ex.close_positions([("ETH", "BUY", "1", 2000.0), ("BTC", "SELL", "1", 30000.0)]))
+    assert sent == sorted(sent) and len(sent) == 9
+
+
+@pytest.mark.asyncio
+async def test_exchanges_on_one_pooled_client_share_the_send_sequence(monkeypatch):
+    sent = []
+    _fake_send(monkeypatch, sent)
+    monkeypatch.setenv("AEGON_SIGN_WORKERS", "2")
+    client, nonce = object(), iter(range(100))  # one client: one nonce stream
+    a, b = (LighterExchange(client, 1, ids=ClientOrderIdAllocator()) for _ in range(2))
+    try:
+        assert a.pool is b.pool and a._seq is b._seq is a.pool.seq
+        _fake_sign(a, nonce)
+        _fake_sign(b, nonce)
+        await asyncio.gather(*[ex.place_limit("ETH", "BUY", 100.0, 1.0) for ex in (a, b, a, b, a, b)])
+        assert sent == sorted(sent) and len(sent) == 6
+    finally:
+        sign_pool._POOLS.pop(id(client)).close()
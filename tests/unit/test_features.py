@@ -0,0 +1,47 @@
+# test features
+import asyncio
+
+from packages.data.features import MarketFeatures
+from packages.strategies.micro_spread_pulse import MicroSpreadPulseBot
+
+
+def _trade(tid, ts, px="100"):
+    return {"trade_id": tid, "timestamp": ts, "price": px, "size": "1", "is_maker_ask": True}
+
+
+def test_reconnect_snapshot_dedups_by_trade_id():
+    f = MarketFeatures()
+    f.on_stream({"type": "subscribed/trade", "trades": [_trade(1, 1000)]})
+    f.on_stream({"type": "update/trade", "trades": [_trade(2, 2000)]})
+    # after a reconnect: replays 1 and 2, plus 3 printed in the same millisecond as 2
+    f.on_stream({"type": "subscribed/trade", "trades": [_trade(1, 1000), _trade(2, 2000), _trade(3, 2000)]})
+    assert f.trades == 3
+
+
+class _NoRest:
+    async def get_spread(self, market):
+        raise AssertionError("quoted from REST with a local book")
+
+
+def test_poll_mode_quotes_from_local_book():
+    bot = MicroSpreadPulseBot(_NoRest(), "ETH")
+    bot.on_stream({"type": "subscribed/order_book", "order_book": {
+        "bids": [{"price": "99", "size": "3"}], "asks": [{"price": "101", "size": "1"}]}})
+    assert asyncio.run(bot.get_mid_px()) == 100.0
+    assert bot.features.book_imbalance() == 0.5
+
+
+class _Rest:
+    async def get_spread(self, market):
+        return 199.0, 201.0, 2.0
+
+
+def test_stale_local_book_falls_back_to_rest():
+    bot = MicroSpreadPulseBot(_Rest(), "ETH")
+    bot.on_stream({"type": "subscribed/order_book", "order_book": {
+        "bids": [{"price": "99", "size": "3"}], "asks": [{"price": "101", "size": "1"}]}})
+    assert asyncio.run(bot.get_mid_px()) == 100.0
+    bot.book.updated -= bot.cfg.book_stale_sec + 1  # feed went quiet: the book is frozen
+    assert asyncio.run(bot.get_mid_px()) == 200.0
+    bot.on_stream({"type": "update/order_book", "order_book": {"bids": [{"price": "100", "size": "1"}]}})
+    assert bot.book.age() < 1 and asyncio.run(bot.get_mid_px()) == 100.5
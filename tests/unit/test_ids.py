@@ -0,0 +1,65 @@
+# test ids
+import json
+import multiprocessing
+
+import pytest
+
+from packages.utils import ids
+from packages.utils.ids import (MAX_CLIENT_ORDER_INDEX, MAX_SEQ, MAX_SHARD, ClientOrderIdAllocator,
+                                default_allocator, split)
+
+
+def _take(path, n, out):
+    a = ClientOrderIdAllocator(shard=0, state_path=path, block=7)
+    out.put([a.next() for _ in range(n)])
+
+
+def test_two_allocators_on_one_state_file_never_collide(tmp_path):
+    path = str(tmp_path / "coi-0.json")
+    a = ClientOrderIdAllocator(shard=0, state_path=path, block=10)
+    b = ClientOrderIdAllocator(shard=0, state_path=path, block=10)
+    got = [x.next() for _ in range(35) for x in (a, b)]
+    assert len(set(got)) == len(got)
+
+
+def test_processes_sharing_a_shard_never_collide(tmp_path):
+    path = str(tmp_path / "coi-0.json")
+    ctx = multiprocessing.get_context("fork")
+    out = ctx.Queue()
+    procs = [ctx.Process(target=_take, args=(path, 200, out)) for _ in range(3)]
+    for p in procs:
+        p.start()
+    got = [x for _ in procs for x in out.get(timeout=30)]
+    for p in procs:
+        p.join(10)
+    assert len(got) == 600 and len(set(got)) == 600
+
+
+def test_restart_continues_past_the_persisted_ceiling(tmp_path):
+    path = tmp_path / "coi-3.json"
+    a = ClientOrderIdAllocator(shard=3, state_path=str(path), block=5)
+    first = [a.next() for _ in range(12)]
+    ceiling = json.loads(path.read_text())["ceiling"]
+    path.write_text(json.dumps({"shard": 3, "ceiling": ceiling + 10**9}))  # e.g. a clock step back
+    b = ClientOrderIdAllocator(shard=3, state_path=str(path), block=5)
+    nxt = b.next()
+    assert first == sorted(first) and split(nxt) == (3, ceiling + 10**9) and nxt > max(first)
+
+
+def test_indices_stay_within_48_bits(tmp_path):
+    path = tmp_path / "coi-255.json"
+    path.write_text(json.dumps({"shard": MAX_SHARD, "ceiling": MAX_SEQ - 1}))
+    a = ClientOrderIdAllocator(shard=MAX_SHARD, state_path=str(path), block=1)
+    assert [a.next(), a.next()] == [MAX_CLIENT_ORDER_INDEX - 1, MAX_CLIENT_ORDER_INDEX]
+    with pytest.raises(OverflowError):
+        a.next()
+    with pytest.raises(ValueError):
+        ClientOrderIdAllocator(shard=MAX_SHARD + 1)
+
+
+def test_default_allocator_uses_coi_state_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("COI_SHARD", "2")
+    monkeypatch.setenv("COI_STATE_DIR", str(tmp_path / "s"))
+    monkeypatch.setattr(ids, "_default", None)
+    assert split(default_allocator().next())[0] == 2
+    assert (tmp_path / "s" / "coi-2.json").exists()
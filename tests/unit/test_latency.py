@@ -0,0 +1,127 @@
+# test latency
+import asyncio
+
+import pytest
+
+from packages.telemetry import latency
+
+
+@pytest.fixture
+def spans():
+    was = latency.enabled()
+    latency.reset()
+    latency.enable(True)
+    yield latency
+    latency.enable(was)
+    latency.reset()
+
+
+def test_spans_and_timed_record_per_stage(spans):
+    @latency.timed("t.sync")
+    def work(x):
+        return x + 1
+
+    @latency.timed("t.async")
+    async def awork():
+        await asyncio.sleep(0.002)
+        return "ok"
+
+    assert work(1) == 2 and asyncio.run(awork()) == "ok"
+    with latency.span("t.block"):
+        pass
+    latency.record("t.external", 0.25)
+    snap = latency.snapshot()
+    assert {k: v["count"] for k, v in snap.items()} == {"t.async": 1, "t.block": 1, "t.external": 1, "t.sync": 1}
+    assert snap["t.async"]["min_ms"] >= 2.0
+    assert snap["t.external"]["p50_ms"] == pytest.approx(250.0, rel=0.04)
+
+
+def test_timed_records_when_the_call_raises(spans):
+    @latency.timed("t.fail")
+    def boom():
+        raise RuntimeError("x")
+
+    with pytest.raises(RuntimeError):
+        boom()
+    assert latency.histogram("t.fail").count == 1
+
+
+def test_disabled_is_a_noop(spans):
+    latency.enable(False)
+
+    @latency.timed("t.off")
+    def work():
+        return 1
+
+    assert work() == 1
+    assert latency.span("t.off") is latency.span("t.other")  # the shared no-op span
+    with latency.span("t.off"):
+        pass
+    latency.record("t.off", 1.0)
+    assert latency.snapshot() == {}
+
+
+def test_bucket_boundaries_and_relative_error():
+    from packages.telemetry.latency import _NBUCKETS, _SUB_COUNT, _bucket, _bucket_high
+
+    for v in range(2 * _SUB_COUNT):  # exact below 64
+        assert _bucket(v) == v and _bucket_high(v) == v
+    prev = _bucket(2 * _SUB_COUNT - 1)
+    for shift in range(1, 30):
+        lo = 1 << (shift + 5)
+        for v in (lo - 1, lo, lo + 1, lo + (1 << shift) - 1, lo + (1 << shift)):
+            idx = _bucket(v)
+            assert idx >= prev or v < lo  # monotonic in v
+            high = _bucket_high(idx)
+            assert v <= high and (high - v) / v <= 1 / _SUB_COUNT
+            assert idx < _NBUCKETS - 1 or v > (1 << 41)
+        assert _bucket(lo) == _bucket(lo + (1 << shift) - 1) != _bucket(lo + (1 << shift))  # sub-bucket width
+        prev = _bucket(lo)
+
+
+def test_percentile_within_the_sub_bucket_bound():
+    h = latency.Histogram()
+    for v in range(1, 100_001):
+        h.record(v * 1000)  # 1us .. 100ms
+    for q in (0.5, 0.9, 0.99, 0.999):
+        exact = q * 100_000 * 1000
+        assert exact * (1 - 1e-5) <= h.percentile(q) <= exact * (1 + 1 / 32)
+    assert h.percentile(1.0) == h.max == 100_000_000 and h.min == 1000
+    assert latency.Histogram().percentile(0.5) == 0
+
+
+def test_overflow_is_clamped_to_the_top_bucket():
+    from packages.telemetry.latency import _NBUCKETS, _bucket
+
+    h = latency.Histogram()
+    huge = 1 << 60
+    h.record(huge)
+    assert _bucket(huge) == _NBUCKETS - 1 and h.counts[-1] == 1
+    assert h.percentile(0.5) == huge  # capped at the observed max, not the bucket's edge
+
+
+def test_render_prometheus(spans):
+    from packages.telemetry.latency import _bucket, _bucket_high
+
+    for ms in (1, 2, 3, 4):
+        latency.histogram("rest.send_tx").record(ms * 1_000_000)
+    lines = latency.render_prometheus().splitlines()
+    assert lines[:2] == ["# HELP aegon_stage_latency_seconds Hot-path stage latency.",
+                         "# TYPE aegon_stage_latency_seconds summary"]
+    p50 = _bucket_high(_bucket(2_000_000)) / 1e9  # the upper edge of 2ms's sub-bucket (within 1/32)
+    assert lines[2] == f'aegon_stage_latency_seconds{{stage="rest.send_tx",quantile="0.5"}} {p50:.9f}'
+    assert lines[5] == 'aegon_stage_latency_seconds{stage="rest.send_tx",quantile="0.999"} 0.004000000'  # max
+    assert lines[-2:] == ['aegon_stage_latency_seconds_sum{stage="rest.send_tx"} 0.010000000',
+                          'aegon_stage_latency_seconds_count{stage="rest.send_tx"} 4']
+    assert len(lines) == 2 + len(latency.QUANTILES) + 2
+
+
+@pytest.mark.asyncio
+async def test_metrics_server_leaves_recording_opt_in(spans):
+    from packages.telemetry import server
+    latency.enable(False)
+    stop = await server.start(0, stall_ms=1000)
+    try:
+        assert not latency.enabled()
+    finally:
+        await stop()
@@ -0,0 +1,60 @@
+# test loaders
+import asyncio
+import random
+
+from packages.data.book import LocalBook
+from packages.data.loaders import Recording
+from packages.data.recorder import MarketRecorder
+
+MARKETS = {0: {"symbol": "ETH"}, 1: {"symbol": "BTC"}}
+
+
+def _book_msg(rng, mid, snap):
+    side = lambda base, sgn: [{"price": str(base + sgn * rng.randint(1, 8)), "size": str(rng.choice([0, 1, 2, 3]))}
+                              for _ in range(3)]
+    return {"type": f"{'subscribed' if snap else 'update'}/order_book", "channel": f"order_book:{mid}",
+            "order_book": {"bids": side(100, -1), "asks": side(100, 1), "offset": 0}}
+
+
+def _full_replay(rec, market_id, ts_ns):
+    book, seq, snap, msg = LocalBook(), None, False, None
+
+    def apply():
+        if seq is not None:
+            book.reset(msg) if snap else book.apply(msg)
+
+    for recv_ns, _, row in rec.events(kinds=("book",), markets=[market_id]):
+        if recv_ns > ts_ns:
+            break
+        if row["msg_seq"] != seq:
+            apply()
+            seq, snap, msg = row["msg_seq"], row["is_snapshot"], {"bids": [], "asks": []}
+        if row["size"] > 0 or not snap:
+            msg["asks" if row["is_ask"] else "bids"].append((row["price"], row["size"]))
+    apply()
+    return book
+
+
+def test_book_at_matches_a_full_replay(tmp_path):
+    rng = random.Random(3)
+    rec = MarketRecorder(str(tmp_path), MARKETS, flush_rows=10, flush_sec=3600)
+    for i in range(120):
+        mid = i % 2
+        rec.on_stream(_book_msg(rng, mid, snap=i < 2 or i in (60, 61)))  # a resubscribe halfway
+    asyncio.run(rec.aclose())
+
+    r = Recording(str(tmp_path))
+    (f,) = r.files("book")
+    assert f.num_batches > 20
+    stamps = sorted(set(r.arrays("book", ["recv_ns"])["recv_ns"].tolist()))
+    for ts in stamps[::7] + [stamps[-1]]:
+        for mid in (0, 1):
+            got, want = r.book_at(mid, ts), _full_replay(r, mid, ts)
+            assert (got.bids, got.asks) == (want.bids, want.asks)
+    assert r.book_at(0, stamps[0] - 1).mid() is None
+
+    # a lookup after the resubscribe only touches the batches since that snapshot
+    read, batch = [], f.batch
+    f.batch = lambda i: read.append(i) or batch(i)
+    r.book_at(0, stamps[-1])
+    assert min(read) > 0 and len(set(read)) <= f.num_batches // 2
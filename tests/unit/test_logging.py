@@ -0,0 +1,47 @@
+# test logging
+import io
+import json
+
+import structlog
+
+from packages.config.logging import LogWriter, QueueLogger, Throttle, render
+
+
+class Clock:
+    def __init__(self, t=0.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+def _logger(writer, throttle):
+    return structlog.wrap_logger(QueueLogger(writer), processors=[
+        throttle, structlog.processors.JSONRenderer(serializer=render)])
+
+
+def test_throttle_and_writer_lines():
+    out, clock = io.StringIO(), Clock()
+    writer = LogWriter(stream=out)
+    log = _logger(writer, Throttle(sample={"Tick": 0.5}, rate={"Requoted": 2.0}, clock=clock))
+    for _ in range(4):
+        log.info("Tick")         # 1 in 2 kept
+    for _ in range(5):
+        log.info("Requoted")     # burst of 2, then nothing until the bucket refills
+    clock.t += 1.0
+    log.info("Requoted")
+    log.info("Other", d={1: 2}, t={(1, 2): "x"})  # keys codec.dumpb cannot write must not raise
+    writer.close()
+    lines = [json.loads(x) for x in out.getvalue().splitlines()]
+    assert [(x["event"], x.get("suppressed")) for x in lines] == [
+        ("Tick", None), ("Tick", 1), ("Requoted", None), ("Requoted", None), ("Requoted", 3), ("Other", None)]
+    assert lines[-1]["d"] == {"1": 2} and lines[-1]["t"] == {"(1, 2)": "x"}
+
+
+def test_writer_drops_past_max_pending_and_reports_it():
+    out = io.StringIO()
+    writer = LogWriter(stream=out, max_pending=0)
+    writer.put(b'{"event":"lost"}')
+    assert writer.dropped == 1
+    writer.close()
+    assert json.loads(out.getvalue()) == {"event": "Log lines dropped", "dropped": 1, "level": "warning"}
@@ -0,0 +1,92 @@
+# test market maker
+import asyncio
+
+import pytest
+
+from packages.strategies.micro_spread_pulse import MicroSpreadPulseBot, MSPConfig
+
+
+class FakeExchange:
+    def __init__(self):
+        self.calls = []
+        self.coi = 0
+
+    async def cancel_replace(self, market, cancel, quotes):
+        self.calls.append((list(cancel), [q["side"] for q in quotes]))
+        placed = []
+        for _ in quotes:
+            self.coi += 1
+            placed.append(self.coi)
+        return {"placed": placed, "cancelled": list(cancel), "result": None}
+
+
+def _book(kind="subscribed", bid="99", ask="101"):
+    return {"type": f"{kind}/order_book", "order_book": {"bids": [{"price": bid, "size": "1"}],
+                                                         "asks": [{"price": ask, "size": "1"}]}}
+
+
+async def _until(cond, timeout=2.0):
+    async def wait():
+        while not cond():
+            await asyncio.sleep(0.01)
+    await asyncio.wait_for(wait(), timeout)
+
+
+@pytest.mark.asyncio
+async def test_idle_stream_withdraws_quotes_and_requotes_on_resume():
+    ex = FakeExchange()
+    bot = MicroSpreadPulseBot(ex, "ETH", MSPConfig(stream_idle_sec=0.05, max_active_cycles=100))
+    stop = asyncio.Event()
+    loop = asyncio.create_task(bot.quote_loop(stop))
+    bot.on_stream(_book())
+    bot._wake.set()
+    await _until(lambda: bot.live_quotes)
+    # the stream goes silent: the resting quotes are cancelled, nothing new is placed
+    await _until(lambda: not bot.live_quotes)
+    assert ex.calls == [([], ["BUY", "SELL"]), ([1, 2], [])]
+    # messages resume on the same mid: quoted again right away
+    bot.on_stream(_book("update"))
+    await _until(lambda: bot.live_quotes)
+    assert ex.calls[-1] == ([], ["BUY", "SELL"])
+    stop.set()
+    await loop
+
+
+class Log:
+    def __init__(self):
+        self.warned = []
+
+    def warn(self, event, **kw):
+        self.warned.append(event)
+
+    info = warn
+
+
+class CrashingHub:
+    def __init__(self):
+        self.runs = 0
+
+    async def run(self, stop, log=None):
+        self.runs += 1
+        if self.runs == 1:
+            raise RuntimeError("feed task died")
+        await stop.wait()
+
+
+@pytest.mark.asyncio
+async def test_hub_crash_pulls_every_bots_quotes_and_restarts():
+    from apps.trader.tasks.multi_mm import supervise_feed
+
+    ex, log, stop = FakeExchange(), Log(), asyncio.Event()
+    bots = [MicroSpreadPulseBot(ex, m) for m in ("ETH", "BTC")]
+    for bot in bots:
+        bot.on_stream(_book())
+        await bot.requote(bot.book.mid())
+    hub = CrashingHub()
+    feed = asyncio.create_task(supervise_feed(hub, bots, stop, log, restart_delay=0.01))
+    await _until(lambda: all(not b.live_quotes for b in bots))
+    assert all(b.book.mid() is None for b in bots)  # no requote off the frozen book
+    assert log.warned == ["Stream hub crashed, withdrawing quotes and restarting"]
+    await _until(lambda: hub.runs == 2)
+    stop.set()
+    await asyncio.wait_for(feed, 1)
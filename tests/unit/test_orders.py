@@ -1 +1,142 @@
 # test orders
+import json
+
+import pytest
+
+from packages.core.usecases.cancel_orders import build_cancel_replace
+from packages.core.usecases.close_position import build_market_close
+from packages.execution import exchange_impl
+from packages.execution.exchange_impl import LighterExchange
+from packages.lighter_sdk_adapter import rest, signer
+from packages.utils.ids import ClientOrderIdAllocator
+
+
+class Nonces:
+    def __init__(self, start=40):
+        self.n = start
+        self.failed = []
+
+    def next_nonce(self):
+        self.n += 1
+        return 0, self.n
+
+    def acknowledge_failure(self, api_key_index):
+        self.failed.append(api_key_index)
+
+
+class FakeSigner:
+    """The SignerClient surface the adapter uses; sign_* return the kwargs as tx_info."""
+    TX_TYPE_CREATE_ORDER, TX_TYPE_CANCEL_ORDER, TX_TYPE_CANCEL_ALL_ORDERS = 14, 15, 16
+    ORDER_TYPE_LIMIT, ORDER_TYPE_MARKET = 0, 1
+    ORDER_TIME_IN_FORCE_IMMEDIATE_OR_CANCEL, ORDER_TIME_IN_FORCE_GOOD_TILL_TIME = 0, 1
+    ORDER_TIME_IN_FORCE_POST_ONLY = 2
+    DEFAULT_28_DAY_ORDER_EXPIRY = -1
+    CANCEL_ALL_TIF_IMMEDIATE = 0
+
+    def __init__(self, fail_on=None):
+        self.nonce_manager = Nonces()
+        self.fail_on = fail_on
+
+    def switch_api_key(self, api_key_index):
+        return None
+
+    def _sign(self, what, kw):
+        if kw["nonce"] == self.fail_on:
+            return None, "bad signature"
+        return json.dumps({"what": what, **kw}), None
+
+    def sign_create_order(self, **kw):
+        return self._sign("create", kw)
+
+    def sign_cancel_order(self, **kw):
+        return self._sign("cancel", kw)
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    out = []
+
+    async def send_tx_batch(client, tx_types, tx_infos, api_key_indices=None):
+        out.append((tx_types, [json.loads(t) for t in tx_infos]))
+        return {"code": 200}
+
+    async def send_tx(client, tx_type, tx_info, api_key_index=None):
+        out.append(([tx_type], [json.loads(tx_info)]))
+        return {"code": 200}
+
+    async def market_meta(client, market):
+        return {"price_decimals": 2, "size_decimals": 4}
+
+    async def get_spread(client, market):
+        return 1999.0, 2001.0, 2.0
+
+    monkeypatch.setattr(exchange_impl, "send_tx", send_tx)
+    monkeypatch.setattr(exchange_impl, "send_tx_batch", send_tx_batch)
+    monkeypatch.setattr(rest, "get_spread", get_spread)
+    monkeypatch.setattr(signer, "get_market_meta", market_meta)
+    return out
+
+
+def _exchange(client):
+    ex = LighterExchange(client, 1, ids=ClientOrderIdAllocator())
+
+    async def market_id(market):
+        return 3
+
+    ex._market_id = market_id
+    return ex
+
+
+QUOTES = [{"side": "BUY", "price": 1999.5, "base_amount": 0.1}, {"side": "SELL", "price": 2000.5, "base_amount": 0.1}]
+
+
+def test_build_cancel_replace_puts_cancels_first():
+    creates = [{"side": "BUY"}, {"side": "SELL"}]
+    bodies = build_cancel_replace("ETH", [7, 8], creates)
+    assert [b.get("action", "create") for b in bodies] == ["cancel", "cancel", "create", "create"]
+    assert [b.get("order_index") for b in bodies[:2]] == [7, 8]
+
+
+@pytest.mark.asyncio
+async def test_cancel_replace_is_one_batch_cancels_first_consecutive_nonces(sent):
+    ex = _exchange(FakeSigner())
+    res = await ex.cancel_replace("ETH", [7, 8], QUOTES)
+    (tx_types, infos), = sent
+    assert tx_types == [15, 15, 14, 14]
+    assert [i["what"] for i in infos] == ["cancel", "cancel", "create", "create"]
+    assert [i["order_index"] for i in infos[:2]] == [7, 8]
+    assert [i["nonce"] for i in infos] == [41, 42, 43, 44]
+    assert all(i["market_index"] == 3 for i in infos)
+    assert [i["price"] for i in infos[2:]] == [199950, 200050] and [i["is_ask"] for i in infos[2:]] == [False, True]
+    assert res["placed"] == [i["client_order_index"] for i in infos[2:]] and res["cancelled"] == [7, 8]
+
+
+@pytest.mark.asyncio
+async def test_failed_signature_sends_nothing(sent):
+    client = FakeSigner(fail_on=43)  # the first create
+    ex = _exchange(client)
+    with pytest.raises(ValueError, match="bad signature"):
+        await ex.cancel_replace("ETH", [7, 8], QUOTES)
+    assert sent == [] and client.nonce_manager.failed == [0]
+
+
+def test_market_close_is_bounded_ioc():
+    body = build_market_close("ETH", "BUY", 1, 2000.0, max_slippage_bps=50, client_order_index=9)
+    assert body["side"] == "SELL" and float(body["price"]) == pytest.approx(1990.0)
+    assert body["time_in_force"] == "ORDER_TIME_IN_FORCE_IMMEDIATE_OR_CANCEL" and body["order_expiry"] == 0
+    with pytest.raises(ValueError, match="mark"):
+        build_market_close("ETH", "BUY", 1, None)
+
+
+@pytest.mark.asyncio
+async def test_closeouts_sign_ioc_no_expiry_and_a_protection_price(sent):
+    ex = _exchange(FakeSigner())
+    await ex.close_positions([("ETH", "BUY", "0.5", 2000.0), ("ETH", "SELL", "0.5")])  # second: mark from the book
+    (tx_types, infos), = sent
+    assert tx_types == [14, 14]
+    assert all(i["order_type"] == 1 and i["time_in_force"] == 0 and i["order_expiry"] == 0 and i["reduce_only"]
+               for i in infos)
+    assert [(i["is_ask"], i["price"]) for i in infos] == [(True, 199000), (False, 201000)]  # mark -/+ 50 bps
+    await ex.place_market("ETH", "BUY", "0.1", mark_px=2000.0)
+    (_, (buy,)) = sent[1]
+    assert buy["time_in_force"] == 0 and buy["order_expiry"] == 0 and buy["price"] == 201000
@@ -0,0 +1,38 @@
+# test recorder
+import asyncio
+
+import pytest
+
+from packages.data.recorder import MarketRecorder
+
+MARKETS = {0: {"symbol": "ETH", "price_decimals": 2, "size_decimals": 4}}
+
+
+def _trade_msg(tid):
+    return {"type": "update/trade", "channel": "trade:0",
+            "trades": [{"trade_id": tid, "timestamp": 1000 + tid, "price": "100", "size": "1"}]}
+
+
+def test_rows_reach_the_manifest(tmp_path):
+    rec = MarketRecorder(str(tmp_path), MARKETS, flush_sec=3600)
+    for i in range(3):
+        rec.on_stream(_trade_msg(i))
+    asyncio.run(rec.aclose())
+    assert rec.error is None
+    assert [(f["kind"], f["rows"]) for f in rec._load_manifest()] == [("trade", 3)]
+
+
+def test_write_failure_surfaces_on_next_flush_and_close(tmp_path):
+    rec = MarketRecorder(str(tmp_path), MARKETS, flush_sec=3600)
+
+    def fail(*args):
+        raise OSError("disk full")
+
+    rec._write = fail
+    rec.on_stream(_trade_msg(1))
+    rec.flush()
+    rec._pending[0].exception()  # wait for the writer thread
+    with pytest.raises(RuntimeError, match="disk full"):
+        rec.flush()
+    with pytest.raises(RuntimeError, match="disk full"):
+        asyncio.run(rec.aclose())
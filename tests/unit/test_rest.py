@@ -0,0 +1,56 @@
+# test rest
+import lighter
+import pytest
+
+from packages.execution.exchange_impl import LighterExchange
+from packages.lighter_sdk_adapter import rest
+from packages.telemetry import health, metrics
+from packages.utils.ids import ClientOrderIdAllocator
+
+
+class Nonces:
+    def __init__(self):
+        self.failed = []
+
+    def acknowledge_failure(self, api_key_index):
+        self.failed.append(api_key_index)
+
+
+class FailingClient:
+    def __init__(self, exc):
+        self.exc = exc
+        self.nonce_manager = Nonces()
+
+    async def send_tx(self, tx_type, tx_info):
+        raise self.exc
+
+    async def send_tx_batch(self, tx_types, tx_infos):
+        raise self.exc
+
+
+@pytest.mark.asyncio
+async def test_send_failures_are_counted_by_status():
+    before = metrics.counter("aegon_send_failures_total", path="sendTxBatch", status=429)
+    client = FailingClient(lighter.ApiException(status=429, reason="Too Many Requests"))
+    with pytest.raises(lighter.ApiException):
+        await rest.send_tx_batch(client, [14, 14], ["a", "b"], api_key_indices=[3, 3])
+    assert metrics.counter("aegon_send_failures_total", path="sendTxBatch", status=429) == before + 2
+    assert client.nonce_manager.failed == [3, 3]
+
+    client = FailingClient(ConnectionError("reset"))
+    before = metrics.counter("aegon_send_failures_total", path="sendTx", status="ConnectionError")
+    with pytest.raises(ConnectionError):
+        await rest.send_tx(client, 14, "a")
+    assert metrics.counter("aegon_send_failures_total", path="sendTx", status="ConnectionError") == before + 1
+
+
+def test_markets_readiness_registered_when_the_exchange_is_built(monkeypatch):
+    health.reset()
+    monkeypatch.setattr(rest, "_MARKET_ID_CACHE", {})
+    try:
+        LighterExchange(object(), 1, ids=ClientOrderIdAllocator())
+        assert health.readiness() == (False, {"markets": False})
+        rest._MARKET_ID_CACHE["ETHUSDC"] = 0
+        assert health.readiness() == (True, {"markets": True})
+    finally:
+        health.reset()
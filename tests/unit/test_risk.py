@@ -1 +1,101 @@
 # test risk
+from types import SimpleNamespace
+
+from packages.risk.engine import RiskEngine, RiskLimits
+
+
+class Clock:
+    def __init__(self, t):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+DAY = 1_700_006_400.0  # 2023-11-15T00:00:00Z
+
+
+def _engine(clock=None, state_dir="", **limits):
+    kw = dict(max_leverage=5.0, max_concurrent=2, daily_dd_stop_pct=2.0, max_risk_pct=0.0)
+    kw.update(limits)
+    risk = RiskEngine(RiskLimits(**kw), state_dir=state_dir, clock=clock or Clock(DAY + 3600))
+    risk.sync_account({"total_asset_value": "10000", "positions": [
+        {"symbol": "ETH", "sign": 1, "position": "1", "position_value": "2000", "open_order_count": 1}]})
+    return risk
+
+
+def test_check_limits_and_reduce_always_allowed():
+    risk = _engine(max_order_notional=5000, max_open_orders=3)
+    assert risk.equity == 10000 and risk.total_notional == 2000
+    assert risk.check("ETH", "BUY", 1, 2000) == (True, "")
+    assert risk.check("ETH", "BUY", 3, 2000) == (False, "ORDER_NOTIONAL")
+    assert risk.check("ETH", "BUY", 1, 2000, orders=3) == (False, "OPEN_ORDERS")
+    assert risk.check("ETH", "BUY", 0, 2000) == (False, "BAD_QTY")
+    # closing the long never hits the notional / leverage caps
+    assert risk.check("ETH", "SELL", 1, 2000) == (True, "")
+
+
+def test_check_leverage_concurrency_and_not_synced():
+    assert RiskEngine(RiskLimits(), state_dir="").check("ETH", "BUY", 1, 100) == (False, "NOT_SYNCED")
+    risk = _engine()
+    assert risk.check("ETH", "BUY", 25, 2000) == (False, "LEV_CAP")  # 52k gross on 10k equity
+    assert risk.check("BTC", "BUY", 0.1, 30000) == (True, "")
+    risk.on_fill("BTC", "BUY", 0.1, 30000)
+    assert risk.open_positions == 2
+    assert risk.check("SOL", "BUY", 1, 100) == (False, "MAX_CONCURRENT")
+
+
+def test_check_batch_counts_pending_orders_together():
+    risk = _engine(max_total_notional=10000)
+    single = [("ETH", "BUY", 3, 2000)]
+    assert risk.check_batch(single) == (True, "")
+    # each leg fits alone; together they exceed the total notional cap
+    assert risk.check_batch(single * 2) == (False, "TOTAL_NOTIONAL:ETH")
+    # two new markets on top of ETH: the second one breaks max_concurrent
+    assert risk.check_batch([("BTC", "BUY", 0.01, 30000), ("SOL", "BUY", 1, 100)]) == (False, "MAX_CONCURRENT:SOL")
+
+
+def test_check_intent_counts_bracket_legs_and_stop_risk():
+    risk = _engine(max_open_orders=3, max_risk_pct=1.0)
+    intent = SimpleNamespace(market="BTC", side="BUY", base_amount="0.1", entry_px=30000.0,
+                             stop_px=29500.0, tp_px=31000.0)
+    assert risk.check_intent(intent) == (False, "OPEN_ORDERS")  # 1 open + 3 legs
+    risk.set_limits(RiskLimits(max_leverage=5.0, max_concurrent=2, max_open_orders=4, max_risk_pct=1.0))
+    assert risk.check_intent(intent) == (True, "")  # 50 at risk <= 1% of 10k
+    wide = SimpleNamespace(**{**vars(intent), "stop_px": 28000.0})
+    assert risk.check_intent(wide) == (False, "RISK_PCT")
+
+
+def test_set_limits_keeps_exposure_and_updates_market_caps():
+    risk = _engine()
+    risk.set_limits(RiskLimits(max_leverage=5.0, max_concurrent=2, markets={"ETH": {"max_market_notional": 3000}}))
+    assert risk.exposure("ETH").qty == 1 and risk.exposure("ETH").max_notional == 3000
+    assert risk.check("ETH", "BUY", 1, 2000) == (False, "MARKET_NOTIONAL")
+    assert risk.check("ETH-USDC", "SELL", 1, 2000) == (True, "")
+
+
+def test_day_roll_resets_baseline_and_survives_restart(tmp_path):
+    clock = Clock(DAY + 3600)
+    risk = _engine(clock, state_dir=str(tmp_path))
+    risk.on_mark("ETH", 1850)  # -150
+    assert risk.intraday_pnl == -150
+    assert risk.check("ETH", "BUY", 0.1, 1850) == (True, "")
+    risk.on_mark("ETH", 1700)  # -300: 3% of day-start equity
+    assert risk.check("ETH", "BUY", 0.1, 1700) == (False, "DAILY_STOP")
+
+    restarted = RiskEngine(risk.limits, state_dir=str(tmp_path), clock=clock)
+    restarted.sync_account({"total_asset_value": "9700", "positions": []})
+    assert restarted.day_start_equity == 10000 and restarted.intraday_pnl == -300
+
+    clock.t = DAY + 86400 + 60  # next UTC day: today's equity is the new baseline
+    assert risk.intraday_pnl == 0
+    assert risk.check("ETH", "BUY", 0.1, 1700) == (True, "")
+
+
+def test_order_open_counts_until_next_snapshot():
+    risk = _engine(max_open_orders=3)
+    risk.on_order_open("BTC", 2)
+    assert risk.check("BTC", "BUY", 0.01, 30000) == (False, "OPEN_ORDERS")
+    risk.sync_account({"total_asset_value": "10000", "positions": [
+        {"symbol": "ETH", "sign": 1, "position": "1", "position_value": "2000", "open_order_count": 0}]})
+    assert risk.snapshot()["open_orders"] == 0
@@ -0,0 +1,132 @@
+# test risk watch
+import asyncio
+
+import pytest
+
+from apps.trader.tasks.risk_watch import DAILY_STOP, LIQUIDATION, MARGIN, POSITION_STOP, RiskWatcher, WatchConfig
+from packages.risk.engine import RiskEngine, RiskLimits
+
+ACCOUNT = 12
+
+
+class Clock:
+    def __init__(self, t=100.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+class FakeExchange:
+    def __init__(self, fail=0):
+        self.calls = []
+        self.fail = fail
+
+    async def close_positions(self, closes):
+        self.calls.append(closes)
+        if self.fail:
+            self.fail -= 1
+            raise RuntimeError("rejected")
+        return {"code": 200}
+
+
+def _pos(mid, sym, qty, value, avg, liq="0"):
+    return {"market_id": mid, "symbol": sym, "sign": 1 if qty >= 0 else -1, "position": str(abs(qty)),
+            "position_value": str(value), "avg_entry_price": str(avg), "liquidation_price": liq,
+            "initial_margin_fraction": "10"}
+
+
+def _trade(tid, size, price, buy=True):
+    return {"trade_id": tid, "size": str(size), "price": str(price),
+            "bid_account_id": ACCOUNT if buy else 99, "ask_account_id": 99 if buy else ACCOUNT}
+
+
+def _watcher(exchange=None, clock=None, resync=None, **cfg):
+    risk = RiskEngine(RiskLimits(max_leverage=10, daily_dd_stop_pct=2.0), state_dir="")
+    w = RiskWatcher(risk, exchange or FakeExchange(), WatchConfig(**cfg), ACCOUNT, clock=clock or Clock(),
+                    resync=resync)
+    acc = {"total_asset_value": "10000", "collateral": "10000",
+           "positions": [_pos(0, "ETH", 1, 2000, 2000), _pos(1, "BTC", 0.1, 3000, 30000)]}
+    w.on_stream({"type": "subscribed/account_all", "positions": acc["positions"], "account": acc})
+    return w
+
+
+@pytest.mark.asyncio
+async def test_resubscribe_snapshot_trades_are_not_fills():
+    resynced = asyncio.Event()
+
+    async def resync():
+        resynced.set()
+        return {"total_asset_value": "10000", "positions": [_pos(0, "ETH", 1, 2000, 2000),
+                                                          _pos(1, "BTC", 0.1, 3000, 30000)]}
+
+    w = _watcher(resync=resync)
+    # snapshot without an `account`: a day of history that must not be replayed into cash
+    history = {"0": [_trade(i, 1, 2000, buy=i % 2 == 0) for i in range(1, 9)]}
+    w.on_stream({"type": "subscribed/account_all", "trades": history,
+                 "positions": {"0": _pos(0, "ETH", 1, 2000, 2000), "1": _pos(1, "BTC", 0.1, 3000, 30000)}})
+    assert w.risk.equity == pytest.approx(10000)
+    await asyncio.wait_for(resynced.wait(), 1)
+    await asyncio.sleep(0)
+    assert not w.cash_stale and w.exchange.calls == []
+
+    # the same trades replayed in an update are skipped by trade id; a new one applies once
+    w.on_stream({"type": "update/account_all", "trades": {"0": history["0"] + [_trade(9, 1, 1900)]},
+                 "positions": {"0": _pos(0, "ETH", 2, 4000, 1950)}})
+    w.on_stream({"type": "update/account_all", "trades": {"0": [_trade(9, 1, 1900)]},
+                 "positions": {"0": _pos(0, "ETH", 2, 4000, 1950)}})
+    assert w.risk.exposure("ETH").qty == 2 and w.risk.equity == pytest.approx(10100)  # bought 1 at 1900, marked 2000
+
+
+@pytest.mark.asyncio
+async def test_breaches_one_per_market_in_priority_order():
+    w = _watcher(position_stop_pct=5.0, liq_buffer_pct=2.0, max_margin_usage=10.0)
+    w.liq_px["BTC"] = 27500.0
+    w.risk.on_mark("ETH", 1880)       # 6% against the long: POSITION_STOP
+    w.risk.on_mark("BTC", 28000)      # within 2% of liquidation, and 6.7% against: LIQUIDATION wins
+    assert [(p, k) for p, k, _ in w.breaches()] == [(LIQUIDATION, "BTC"), (POSITION_STOP, "ETH")]
+
+    w.liq_px.clear()
+    w.cfg.position_stop_pct = 0
+    w.risk.on_mark("ETH", 1000)       # -1000 on a 10k day: DAILY_STOP, larger notional first
+    assert [(p, k) for p, k, _ in w.breaches()] == [(DAILY_STOP, "BTC"), (DAILY_STOP, "ETH")]
+
+
+@pytest.mark.asyncio
+async def test_margin_breach_closes_largest_first_until_under_cap():
+    w = _watcher(position_stop_pct=0, max_margin_usage=0.04, close_all_on_daily_stop=False)
+    # margin 10% of 5k notional = 500 on 10k equity: 5% > 4%; closing BTC (300) is enough
+    assert [(p, k) for p, k, _ in w.breaches()] == [(MARGIN, "BTC")]
+
+
+@pytest.mark.asyncio
+async def test_check_fires_once_then_waits_retry_sec():
+    clock = Clock()
+    ex = FakeExchange()
+    w = _watcher(ex, clock, position_stop_pct=5.0, retry_sec=5.0)
+    w.on_stream({"type": "update/trade", "channel": "trade:0", "trades": [{"price": "1880"}]})
+    await w.inflight
+    assert ex.calls == [[("ETH", "BUY", 1.0, 1880.0)]] and "ETH" in w.closing  # priced off the streamed mark
+    clock.t += 1.0
+    w.check()
+    assert w.inflight is None and len(ex.calls) == 1   # still closing: not re-fired
+    clock.t += 5.0
+    w.check()
+    await w.inflight
+    assert len(ex.calls) == 2
+    # position gone: the market leaves `closing`
+    w.on_stream({"type": "update/account_all", "positions": {"0": _pos(0, "ETH", 0, 0, 0)}})
+    assert "ETH" not in w.closing
+
+
+@pytest.mark.asyncio
+async def test_failed_closeout_is_retried_immediately():
+    ex = FakeExchange(fail=1)
+    w = _watcher(ex, position_stop_pct=5.0, retry_sec=60.0)
+    w.risk.on_mark("ETH", 1880)
+    w.check()
+    await w.inflight
+    for _ in range(3):
+        await asyncio.sleep(0)
+    # the failure cleared `closing` and the follow-up check() fired again without waiting retry_sec
+    assert len(ex.calls) == 2 and len(w.latencies) == 1 and "ETH" in w.closing
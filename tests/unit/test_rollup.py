@@ -0,0 +1,96 @@
+# test rollup
+import asyncio
+
+import pytest
+
+from apps.trader.tasks import rollup
+from apps.trader.tasks.rollup import Rollup
+from packages.data.recorder import MarketRecorder
+from packages.portfolio import report
+from packages.utils.ids import SEQ_BITS, ClientOrderIdAllocator, load_tags
+
+ACCOUNT = 12
+DAY_MS = 1_736_899_200_000  # 2025-01-15
+
+
+def _coi(shard, seq):
+    return (shard << SEQ_BITS) | seq
+
+
+def _fill(tid, side, size, price, coi, maker=False, ts=DAY_MS):
+    buy = side == "BUY"
+    return {"trade_id": tid, "size": str(size), "price": str(price), "timestamp": ts,
+            "bid_account_id": ACCOUNT if buy else 99, "ask_account_id": 99 if buy else ACCOUNT,
+            "bid_client_id" if buy else "ask_client_id": coi,
+            "is_maker_ask": maker != buy}  # our side was the maker iff maker
+
+
+def _msg(trades=None, positions=None, orders=None, funding=None, kind="update"):
+    msg = {"type": f"{kind}/account_all", "channel": f"account_all:{ACCOUNT}"}
+    if trades:
+        msg["trades"] = {"0": trades}
+    if positions:
+        msg["positions"] = {"0": positions}
+    if orders:
+        msg["orders"] = {"0": orders}
+    if funding:
+        msg["funding_histories"] = {"0": funding}
+    return msg
+
+
+def test_on_event_attributes_prices_and_dedups():
+    copy_coi, mm_coi = _coi(2, 1), _coi(1, 5)
+    r = Rollup(ACCOUNT, shards={1: "mm"}, tags={copy_coi: {"strategy": "copy", "leader": "alice"}},
+               taker_fee_bps=5, maker_fee_bps=1)
+    r.on_event(_msg(positions={"market_id": 0, "symbol": "ETH", "position": "0"}))
+    r.on_event(_msg(trades=[_fill(1, "BUY", 2, 2000, copy_coi)]))
+    r.on_event(_msg(trades=[_fill(1, "BUY", 2, 2000, copy_coi)], kind="subscribed"))  # replay
+    # sell fill known only by order index: mapped through an earlier order ack
+    r.on_event(_msg(orders=[{"order_index": 77, "client_order_index": mm_coi}]))
+    sell = _fill(2, "SELL", 1, 2100, None, maker=True)
+    sell["ask_id"] = 77
+    r.on_event(_msg(trades=[sell], funding=[{"timestamp": DAY_MS // 1000, "change": "-1.5"}]))
+    r.on_event(_msg(funding=[{"timestamp": DAY_MS // 1000, "change": "-1.5"}]))  # same funding again
+    day = DAY_MS // 86_400_000
+    copy = r.rows[(day, "ETH", "copy", "alice")]
+    mm = r.rows[(day, "ETH", "mm", "-")]
+    assert copy[:3] == [1, 2.0, 4000.0] and copy[4] == pytest.approx(4000 * 5e-4)
+    assert mm[:4] == [1, 1.0, 2100.0, pytest.approx(100.0)] and mm[4] == pytest.approx(2100 * 1e-4)
+    assert r.rows[(day, "ETH", "-", "-")][5] == pytest.approx(-1.5)
+    assert r.positions["ETH"] == [1.0, 2000.0]
+
+
+def _record(root, msgs):
+    rec = MarketRecorder(str(root), {0: {"symbol": "ETH"}}, account_index=ACCOUNT, flush_sec=3600)
+    for m in msgs:
+        rec.on_stream(m)
+    asyncio.run(rec.aclose())
+
+
+def test_runs_fold_from_the_watermark_and_compact(tmp_path):
+    data, out, state = tmp_path / "rec", tmp_path / "rollup", tmp_path / "state"
+    cfg = tmp_path / "rollup.yml"
+    cfg.write_text("shards:\n  1: mm\nmax_parts: 2\n")
+    ids = ClientOrderIdAllocator(shard=2, state_path=str(state / "coi-2.json"))
+    coi = ids.next()
+    ids.tag(coi, strategy="copy", leader="alice")
+    ids.close()
+    assert load_tags(str(state)) == {coi: {"strategy": "copy", "leader": "alice"}}
+
+    def run():
+        return rollup.run(str(data), str(out), ACCOUNT, str(cfg), state_dir=str(state))
+
+    _record(data, [_msg(positions={"market_id": 0, "symbol": "ETH", "position": "0"}),
+                   _msg(trades=[_fill(1, "BUY", 1, 2000, coi)])])
+    assert run()["events"] == 2
+    assert run()["events"] == 0  # nothing after the watermark: no new part
+    assert len(report.parts(str(out))) == 1
+    for tid in (2, 3):
+        _record(data, [_msg(trades=[_fill(tid, "SELL", 0.5, 2100, _coi(1, tid))])])
+        assert run()["events"] == 1
+    # the third part went over max_parts: merged into one covering the whole range
+    ps = report.parts(str(out))
+    assert len(ps) == 1
+    t = report.summarize(report.load(str(out)), ["strategy", "leader"]).to_pylist()
+    assert [(r["strategy"], r["leader"], r["fills"]) for r in t] == [("copy", "alice", 1), ("mm", "-", 2)]
+    assert sum(r["realized"] for r in t) == pytest.approx(100.0)
@@ -0,0 +1,65 @@
+# test rpc
+import asyncio
+import os
+import socket
+
+import pytest
+
+from apps.trader.rpc import DaemonUnavailable, call, serve
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "t.sock")
+
+
+def _handlers():
+    seen = []
+
+    async def echo(args):
+        seen.append(args)
+        return {"args": args, "big": "x" * 100_000}  # past asyncio's 64 KiB line default
+
+    async def boom(args):
+        raise ValueError("bad size")
+
+    return {"echo": echo, "boom": boom}, seen
+
+
+@pytest.mark.asyncio
+async def test_call_round_trips_and_surfaces_errors(path):
+    handlers, seen = _handlers()
+    server = await serve(path, handlers)
+    try:
+        assert oct(os.stat(path).st_mode & 0o777) == "0o600"
+        res = await call(path, "echo", {"market": "ETH", "size": 1})
+        assert res["args"] == {"market": "ETH", "size": 1} and len(res["big"]) == 100_000
+        out = await asyncio.gather(*(call(path, "echo", {"i": i}) for i in range(5)))  # one connection each
+        assert [r["args"]["i"] for r in out] == list(range(5)) and len(seen) == 6
+        with pytest.raises(RuntimeError, match="boom failed: ValueError: bad size"):
+            await call(path, "boom")
+        with pytest.raises(RuntimeError, match="unknown command 'nope'"):
+            await call(path, "nope")
+        with pytest.raises(RuntimeError, match="already listening"):
+            await serve(path, handlers)
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_no_daemon_is_unavailable_and_a_stale_socket_is_replaced(path):
+    with pytest.raises(DaemonUnavailable):
+        await call(path, "echo")
+    stale = socket.socket(socket.AF_UNIX)
+    stale.bind(path)  # a socket file nobody listens on: left by a daemon that died
+    stale.close()
+    with pytest.raises(DaemonUnavailable):
+        await call(path, "echo")
+    handlers, _ = _handlers()
+    server = await serve(path, handlers)
+    try:
+        assert (await call(path, "echo", {"a": 1}))["args"] == {"a": 1}
+    finally:
+        server.close()
+        await server.wait_closed()
@@ -0,0 +1,88 @@
+# test snapshot
+import asyncio
+import csv
+import json
+
+import httpx
+import pytest
+
+from apps.trader.tasks import snapshot
+from apps.trader.tasks.snapshot import FIELDS, Snapshotter
+from packages.lighter_sdk_adapter import rest
+
+BOOKS = [{"symbol": "ETH", "market_id": 0, "status": "active"}, {"symbol": "BTC", "market_id": 1, "status": "active"},
+         {"symbol": "OLD", "market_id": 2, "status": "inactive"}, {"symbol": "SOL", "market_id": 3, "status": "active"}]
+STATS = {0: {"last_trade_price": "2000.5", "daily_quote_token_volume": "1000000"}}
+LEVELS = {0: {"bids": [[1999.0, 2.0], [1998.0, 1.0]], "asks": [[2001.0, 1.5], [2002.0, 3.0]]},
+          1: {"bids": [[30000.0, 0.1]], "asks": []}}
+
+
+def _throttled(retry_after="0"):
+    req = httpx.Request("GET", "http://venue/api/v1/orderBookOrders")
+    return httpx.HTTPStatusError("429", request=req, response=httpx.Response(
+        429, headers={"retry-after": retry_after}, request=req))
+
+
+@pytest.fixture
+def venue(monkeypatch):
+    calls = {"throttle": {1: 1}, "book": [], "in_flight": 0, "peak": 0}
+
+    async def get_order_books(client):
+        return BOOKS
+
+    async def get_exchange_stats(client):
+        return STATS
+
+    async def get_book_orders(client, market_id, limit=50):
+        calls["book"].append((market_id, limit))
+        calls["in_flight"] += 1
+        calls["peak"] = max(calls["peak"], calls["in_flight"])
+        try:
+            await asyncio.sleep(0.01)
+            if calls["throttle"].get(market_id):
+                calls["throttle"][market_id] -= 1
+                raise _throttled()
+            if market_id not in LEVELS:
+                raise httpx.ConnectError("refused")
+            return LEVELS[market_id]
+        finally:
+            calls["in_flight"] -= 1
+
+    monkeypatch.setattr(rest, "get_order_books", get_order_books)
+    monkeypatch.setattr(rest, "get_exchange_stats", get_exchange_stats)
+    monkeypatch.setattr(rest, "get_book_orders", get_book_orders)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_scan_fetches_active_markets_concurrently_and_retries_a_429(venue):
+    snap = Snapshotter(object(), rps=1000.0, concurrency=8)
+    rows, info = await snap.scan(depth=2)
+    by = {r["market"]: r for r in rows}
+    assert sorted(by) == ["BTC", "ETH", "SOL"]  # the inactive market is skipped
+    assert venue["peak"] == 3 and sorted(venue["book"]) == [(0, 8), (1, 8), (1, 8), (3, 8)]
+    assert (info["markets"], info["requests"], info["throttled"], info["errors"]) == (3, 6, 1, 1)
+    assert snap.bucket.rate == 500.0  # halved by the 429
+
+    eth = by["ETH"]
+    assert (eth["bid"], eth["ask"], eth["mid"], eth["spread"]) == (1999.0, 2001.0, 2000.0, 2.0)
+    assert eth["spread_bps"] == 10.0 and (eth["bid_size"], eth["ask_size"]) == (2.0, 1.5)
+    assert (eth["bid_depth_usd"], eth["ask_depth_usd"], eth["levels"]) == (5996.0, 9007.5, 2)
+    assert (eth["last_price"], eth["daily_volume_usd"]) == (2000.5, 1e6)
+    assert by["BTC"]["bid"] == 30000.0 and by["BTC"]["mid"] is None and by["BTC"]["error"] is None
+    assert by["SOL"]["error"].startswith("ConnectError") and by["SOL"]["bid"] is None
+
+
+@pytest.mark.asyncio
+async def test_scan_filters_markets_and_writes_json_and_csv(venue, tmp_path):
+    venue["throttle"] = {}
+    rows, info = await Snapshotter(object(), rps=1000.0).scan(["eth-usdc", "BTCUSDC"], depth=1)
+    assert sorted(r["market"] for r in rows) == ["BTC", "ETH"] and info["requests"] == 4
+    snapshot.write(rows, info, str(tmp_path / "out" / "snap.json"))
+    snapshot.write(rows, info, str(tmp_path / "snap.csv"))
+    data = json.loads((tmp_path / "out" / "snap.json").read_text())
+    assert data["markets"] == 2 and [r["market"] for r in data["rows"]] == [r["market"] for r in rows]
+    with open(tmp_path / "snap.csv", newline="") as f:
+        table = list(csv.DictReader(f))
+    assert tuple(table[0]) == FIELDS and len(table) == 2
+    assert "ETH" in snapshot.render(rows)
@@ -0,0 +1,68 @@
+# test strategies
+import random
+import statistics
+
+import pytest
+
+from packages.strategies.base import Bar, BarBuilder
+from packages.strategies.breakout_retest import BreakoutRetest, BRConfig
+from packages.strategies.indicators import ATR, EMA, VWAP, RingBuffer, RollingHigh, RollingLow, RollingMean, ZScore
+
+
+def test_rolling_indicators_match_naive_windows():
+    rng = random.Random(11)
+    xs = [rng.uniform(90, 110) for _ in range(500)]
+    n = 20
+    mean, hi, lo, z = RollingMean(n), RollingHigh(n), RollingLow(n), ZScore(n)
+    ring = RingBuffer(n)
+    for i, x in enumerate(xs):
+        mean.update(x)
+        hi.update(x)
+        lo.update(x)
+        z.update(x)
+        ring.push(x)
+        w = xs[max(0, i - n + 1):i + 1]
+        assert mean.mean == pytest.approx(statistics.fmean(w))
+        assert (hi.value, lo.value) == (max(w), min(w))
+        assert [ring[k] for k in range(len(ring))] == w
+        if len(w) >= 2:
+            assert mean.std == pytest.approx(statistics.stdev(w))
+            assert z.value == pytest.approx((x - statistics.fmean(w)) / statistics.stdev(w))
+    assert mean.ready() and hi.ready() and z.ready()
+
+
+def test_ema_atr_and_vwap_by_hand():
+    ema = EMA(3)  # alpha 0.5
+    assert [ema.update(x) for x in (10, 20, 20)] == [10, 15, 17.5]
+    atr = ATR(2)
+    assert atr.update(11, 9, 10) == 2  # high - low
+    assert atr.update(14, 11, 13) == 3  # true range 4 from the previous close; simple mean while warming up
+    assert atr.ready() and atr.update(13, 12, 12.5) == 2  # Wilder smoothing of a true range of 1
+    vwap = VWAP(2)
+    vwap.update(100, 1)
+    vwap.update(110, 3)
+    assert vwap.value == pytest.approx(107.5)
+    assert vwap.update(120, 1) == pytest.approx((110 * 3 + 120) / 4)  # the first print left the window
+
+
+def test_bar_builder_emits_on_the_next_interval():
+    bb = BarBuilder(60)
+    assert bb.on_trade(100, 1, 0) is None and bb.on_trade(102, 2, 30) is None and bb.on_trade(99, 1, 59) is None
+    bar = bb.on_trade(101, 1, 61)
+    assert (bar.ts, bar.open, bar.high, bar.low, bar.close, bar.volume, bar.trades) == (0, 100, 102, 99, 99, 4, 3)
+    assert bb.roll(100) is None and bb.roll(120).close == 101
+
+
+def test_breakout_retest_arms_enters_on_retest_and_exits_at_target():
+    s = BreakoutRetest(BRConfig(lookback=3, atr_len=2, retest_atr=0.25, stop_atr=1.0, tp_atr=2.0))
+    flat = [Bar(i * 60, 100, 101, 99, 100) for i in range(5)]
+    for b in flat:
+        s.on_bar(b)
+    s.on_bar(Bar(300, 100.5, 103.5, 100.5, 103))   # closes above the 3-bar high of 101: armed
+    assert (s.armed, s.level, s.target) == (1, 101, 0.0)
+    s.on_bar(Bar(360, 102.4, 102.5, 101.2, 102))   # pulls back to within 0.25 ATR of 101, closes above: long
+    assert s.target == 1.0 and s.armed == 0
+    atr = s.atr.value
+    assert s.stop == pytest.approx(101 - atr) and s.tp == pytest.approx(102 + 2 * atr)
+    s.on_bar(Bar(420, 102, s.tp + 0.1, 101.5, s.tp))  # target hit: flat
+    assert s.target == 0.0 and s.stop is None
@@ -0,0 +1,67 @@
+# test valuation
+import random
+
+import pytest
+
+from packages.portfolio.valuation import Valuation
+from packages.risk.engine import RiskEngine, RiskLimits
+
+MARKETS = ["ETH", "BTC", "SOL", "HYPE"]
+
+
+def _book():
+    risk = RiskEngine(RiskLimits(), state_dir="")
+    risk.sync_account({"total_asset_value": "10000", "positions": [
+        {"symbol": "ETH", "sign": 1, "position": "2", "position_value": "4000", "avg_entry_price": "1900"},
+        {"symbol": "BTC", "sign": -1, "position": "0.1", "position_value": "3000", "avg_entry_price": "31000"},
+        {"symbol": "SOL", "sign": 1, "position": "10", "position_value": "1000", "avg_entry_price": "100"}]})
+    return risk
+
+
+def _totals(val):
+    return [val.unrealized, val.net_exposure, val.gross_exposure, val.margin_used, val.equity]
+
+
+def test_load_matches_the_risk_book():
+    risk = _book()
+    val = Valuation(default_imf=0.1)
+    val.sync_imf([{"symbol": "BTC", "initial_margin_fraction": "20"}])
+    val.load(risk)
+    assert val.equity == pytest.approx(risk.equity)
+    assert val.gross_exposure == pytest.approx(risk.total_notional)
+    assert val.position("ETH")["upnl"] == pytest.approx(200)
+    assert val.margin_used == pytest.approx(4000 * 0.1 + 3000 * 0.2 + 1000 * 0.1)
+
+
+def test_incremental_totals_match_revalue():
+    rng = random.Random(7)
+    risk = _book()
+    val = Valuation(default_imf=0.1)
+    val.load(risk)
+    base = {"ETH": 2000.0, "BTC": 30000.0, "SOL": 100.0, "HYPE": 30.0}
+    for _ in range(500):
+        m = rng.choice(MARKETS)
+        px = base[m] * (1 + rng.uniform(-0.05, 0.05))
+        risk.on_mark(m, px)
+        val.on_mark(m, px)
+    batch = {m: base[m] * (1 + rng.uniform(-0.05, 0.05)) for m in MARKETS}
+    val.on_marks(list(batch), list(batch.values()))
+    for m, px in batch.items():
+        risk.on_mark(m, px)
+    val.set_position("HYPE", -50, 31.0)
+    risk.on_fill("HYPE", "SELL", 50, 31.0)
+    risk.on_mark("HYPE", batch["HYPE"])
+    incremental = _totals(val)
+    assert val.equity == pytest.approx(risk.equity)
+    val.revalue()
+    assert incremental == pytest.approx(_totals(val))
+
+
+def test_reload_after_a_fill_keeps_one_book():
+    risk = _book()
+    val = Valuation()
+    val.load(risk)
+    risk.on_fill("ETH", "SELL", 2, 2100)  # close the long: realized goes to cash in the risk book
+    val.load(risk)
+    assert val.position("ETH")["qty"] == 0 and val.position("ETH")["realized"] == pytest.approx(400)
+    assert val.equity == pytest.approx(risk.equity)